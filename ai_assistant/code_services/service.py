@@ -6,7 +6,14 @@ import json # For parsing metadata
 import asyncio
 
 # Assuming these imports are relative to the ai_assistant package root
-from ..config import get_model_for_task, is_debug_mode
+from ..config import (
+    get_model_for_task,
+    is_debug_mode,
+    CODE_GEN_COMPONENT_CONCURRENCY,
+    CODE_GEN_COMPONENT_TIMEOUT_SECONDS,
+    CODE_GEN_COMPONENT_MAX_RETRIES
+)
+from ..core.deadline import deadline_expired, shrink_timeout
 from ..core.fs_utils import write_to_file
 from ..core.task_manager import TaskManager, ActiveTaskType, ActiveTaskStatus # Added
 
@@ -178,6 +185,9 @@ class CodeService:
         self.self_modification_service = self_modification_service
         self.task_manager = task_manager
         self.notification_manager = notification_manager # Store NotificationManager
+        # Bounds concurrent component-detail requests across all generate_code calls on one event loop.
+        self._component_semaphore: Optional[asyncio.Semaphore] = None
+        self._component_semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
         logger.info("CodeService initialized.")
         if is_debug_mode(): # pragma: no cover
             print(f"[DEBUG] CodeService initialized with llm_provider: {llm_provider}, self_modification_service: {self_modification_service}, task_manager: {task_manager}, notification_manager: {notification_manager}")
@@ -191,9 +201,9 @@ class CodeService:
             logger.info("CodeService initialized without a NotificationManager. Notifications will be skipped.")
 
 
-    def _update_task(self, task_id: Optional[str], status: ActiveTaskStatus, reason: Optional[str] = None, step_desc: Optional[str] = None):
+    def _update_task(self, task_id: Optional[str], status: ActiveTaskStatus, reason: Optional[str] = None, step_desc: Optional[str] = None, progress: Optional[int] = None):
         if task_id and self.task_manager:
-            self.task_manager.update_task_status(task_id, status, reason=reason, step_desc=step_desc)
+            self.task_manager.update_task_status(task_id, status, reason=reason, step_desc=step_desc, progress=progress)
 
     async def generate_code(
         self,
@@ -441,7 +451,7 @@ class CodeService:
             elif context == "EXPERIMENTAL_HIERARCHICAL_FULL_TOOL":
                 high_level_description = prompt_or_description
                 logs = [f"Context: EXPERIMENTAL_HIERARCHICAL_FULL_TOOL. Desc: {high_level_description[:50]}... (Task ID: {task_id})"]
-                self._update_task(task_id, ActiveTaskStatus.PLANNING_CODE_STRUCTURE, step_desc="Generating outline via _generate_hierarchical_outline")
+                self._update_task(task_id, ActiveTaskStatus.PLANNING, step_desc="Generating outline via _generate_hierarchical_outline")
 
                 outline_gen_result = await self._generate_hierarchical_outline(high_level_description, llm_config)
                 logs.extend(outline_gen_result.get("logs", []))
@@ -464,9 +474,6 @@ class CodeService:
                     return result
 
                 self._update_task(task_id, ActiveTaskStatus.GENERATING_CODE, step_desc="Generating details for components based on outline")
-                component_details: Dict[str, Optional[str]] = {}
-                all_details_succeeded = True
-                any_detail_succeeded = False
 
                 components_to_generate = []
                 if parsed_outline.get("components"):
@@ -485,22 +492,11 @@ class CodeService:
 
                 logs.append(f"Found {len(components_to_generate)} components for detail generation.")
 
-                for comp_def_for_detail_gen in components_to_generate:
-                    current_comp_key = comp_def_for_detail_gen.get("name")
-                    logs.append(f"Generating details for component key: {current_comp_key}")
-                    detail_code = await self._generate_detail_for_component(
-                        component_definition=comp_def_for_detail_gen,
-                        full_outline=parsed_outline,
-                        llm_config=llm_config
-                    )
-                    if detail_code:
-                        component_details[current_comp_key] = detail_code
-                        logs.append(f"Successfully generated details for {current_comp_key}.")
-                        any_detail_succeeded = True
-                    else:
-                        component_details[current_comp_key] = None
-                        logs.append(f"Failed to generate details for {current_comp_key}.")
-                        all_details_succeeded = False
+                component_details: Dict[str, Optional[str]] = await self._generate_component_details(
+                    components_to_generate, parsed_outline, llm_config, task_id, logs
+                )
+                any_detail_succeeded = any(component_details.values())
+                all_details_succeeded = all(component_details.values())
 
                 detail_gen_status = "ERROR_DETAIL_GENERATION_FAILED"
                 if not current_error: current_error = None
@@ -541,7 +537,7 @@ class CodeService:
                 high_level_description = prompt_or_description
                 logs = [f"Context: HIERARCHICAL_GEN_COMPLETE_TOOL. Desc: {high_level_description[:50]}... (Task ID: {task_id})"]
 
-                self._update_task(task_id, ActiveTaskStatus.PLANNING_CODE_STRUCTURE, step_desc="Generating outline for complete tool")
+                self._update_task(task_id, ActiveTaskStatus.PLANNING, step_desc="Generating outline for complete tool")
                 outline_gen_result = await self._generate_hierarchical_outline(high_level_description, llm_config)
 
                 logs.extend(outline_gen_result.get("logs", []))
@@ -586,22 +582,11 @@ class CodeService:
                 logs.append(f"Found {len(components_to_generate)} components for detail generation.")
 
                 if components_to_generate:
-                    for comp_def_for_detail in components_to_generate:
-                        comp_name_key = comp_def_for_detail.get("name")
-                        logs.append(f"Generating details for component: {comp_name_key}")
-                        detail_code = await self._generate_detail_for_component(
-                            component_definition=comp_def_for_detail,
-                            full_outline=parsed_outline,
-                            llm_config=llm_config
-                        )
-                        if detail_code:
-                            component_details[comp_name_key] = detail_code
-                            logs.append(f"Successfully generated details for {comp_name_key}.")
-                            any_detail_succeeded = True
-                        else:
-                            component_details[comp_name_key] = None
-                            logs.append(f"Failed to generate details for {comp_name_key}.")
-                            all_details_succeeded = False
+                    component_details = await self._generate_component_details(
+                        components_to_generate, parsed_outline, llm_config, task_id, logs
+                    )
+                    any_detail_succeeded = any(component_details.values())
+                    all_details_succeeded = all(component_details.values())
                 else:
                     logs.append("No components listed in outline for detail generation. Proceeding to assembly.")
 
@@ -1069,6 +1054,83 @@ class CodeService:
 
         return lint_messages, error_string
 
+    def _get_component_semaphore(self) -> asyncio.Semaphore:
+        """Returns the semaphore limiting concurrent component requests on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._component_semaphore is None or self._component_semaphore_loop is not loop:
+            self._component_semaphore = asyncio.Semaphore(max(1, CODE_GEN_COMPONENT_CONCURRENCY))
+            self._component_semaphore_loop = loop
+        return self._component_semaphore
+
+    async def _generate_component_details(
+        self,
+        components_to_generate: List[Dict[str, Any]],
+        full_outline: Dict[str, Any],
+        llm_config: Optional[Dict[str, Any]],
+        task_id: Optional[str],
+        logs: List[str]
+    ) -> Dict[str, Optional[str]]:
+        """
+        Generates the code of every component concurrently, with at most CODE_GEN_COMPONENT_CONCURRENCY
+        requests in flight. Each component gets CODE_GEN_COMPONENT_TIMEOUT_SECONDS per attempt and up to
+        CODE_GEN_COMPONENT_MAX_RETRIES retries, both capped by the current prompt's deadline; progress is
+        reported to the TaskManager as components finish.
+        Returns component key -> code (None on failure) in outline order, so assembly is deterministic.
+        """
+        semaphore = self._get_component_semaphore()
+        total = len(components_to_generate)
+        completed = 0
+        component_logs: List[List[str]] = [[] for _ in components_to_generate]
+
+        async def detail_one(index: int, component_def: Dict[str, Any]) -> Optional[str]:
+            nonlocal completed
+            comp_key = component_def.get("name")
+            entry_logs = component_logs[index]
+            entry_logs.append(f"Generating details for component: {comp_key}")
+            detail_code: Optional[str] = None
+            for attempt in range(CODE_GEN_COMPONENT_MAX_RETRIES + 1):
+                if attempt > 0:
+                    entry_logs.append(f"Retrying details for {comp_key} (attempt {attempt + 1}/{CODE_GEN_COMPONENT_MAX_RETRIES + 1}).")
+                try:
+                    async with semaphore:
+                        detail_code = await asyncio.wait_for(
+                            self._generate_detail_for_component(
+                                component_definition=component_def,
+                                full_outline=full_outline,
+                                llm_config=llm_config
+                            ),
+                            timeout=shrink_timeout(CODE_GEN_COMPONENT_TIMEOUT_SECONDS)
+                        )
+                except asyncio.TimeoutError:
+                    entry_logs.append(f"Timed out after {CODE_GEN_COMPONENT_TIMEOUT_SECONDS}s generating details for {comp_key}.")
+                    detail_code = None
+                except Exception as e_detail:
+                    logger.warning(f"Error generating details for component '{comp_key}': {e_detail}")
+                    entry_logs.append(f"Error generating details for {comp_key}: {e_detail}")
+                    detail_code = None
+                if detail_code or deadline_expired(): # No retry once the prompt's time budget is used up
+                    break
+            if detail_code:
+                entry_logs.append(f"Successfully generated details for {comp_key}.")
+            else:
+                entry_logs.append(f"Failed to generate details for {comp_key}.")
+            completed += 1
+            self._update_task(
+                task_id, ActiveTaskStatus.GENERATING_CODE,
+                step_desc=f"Generated details for {completed}/{total} components (last: {comp_key})",
+                progress=int(completed * 100 / total)
+            )
+            return detail_code
+
+        results = await asyncio.gather(
+            *(detail_one(index, component_def) for index, component_def in enumerate(components_to_generate))
+        )
+        component_details: Dict[str, Optional[str]] = {}
+        for component_def, entry_logs, detail_code in zip(components_to_generate, component_logs, results):
+            logs.extend(entry_logs)
+            component_details[component_def.get("name")] = detail_code
+        return component_details
+
     async def _generate_detail_for_component(
         self,
         component_definition: Dict[str, Any],
@@ -26,7 +26,8 @@ from ai_assistant.memory.event_logger import log_event, get_recent_events
 from ai_assistant.core.autonomous_reflection import run_self_reflection_cycle, select_suggestion_for_autonomous_action
 from ai_assistant.tools.tool_system import tool_system_instance
 from ai_assistant.learning.autonomous_learning import learn_facts_from_interaction
-from ai_assistant.config import AUTONOMOUS_LEARNING_ENABLED, CONVERSATION_HISTORY_TURNS
+from ai_assistant.config import AUTONOMOUS_LEARNING_ENABLED, CONVERSATION_HISTORY_TURNS, PROMPT_DEADLINE_SECONDS, PROMPT_DEADLINE_GRACE_SECONDS
+from ai_assistant.core.deadline import deadline_scope, run_within_deadline
 from ai_assistant.utils.display_utils import (
     CLIColors, color_text, format_header, format_message,
     format_input_prompt, format_thinking, format_tool_execution,
@@ -40,7 +41,7 @@ from ai_assistant.core import project_manager
 from ai_assistant.core import suggestion_manager as suggestion_manager_module
 from ai_assistant.core import status_reporting
 from ai_assistant.utils.conversational_helpers import rephrase_error_message_conversationally # Added
-from ai_assistant.llm_interface.ollama_client import OllamaProvider # Added
+from ai_assistant.llm_interface.ollama_client import OllamaProvider, get_default_provider # Added
 from ai_assistant.planning.hierarchical_planner import HierarchicalPlanner # Added
 from prompt_toolkit import PromptSession, print_formatted_text
 from prompt_toolkit.patch_stdout import patch_stdout
@@ -425,72 +426,106 @@ def _perform_tool_registration(module_path: str, function_name: str, tool_name:
 
 
 async def _process_command_wrapper(prompt: str, orchestrator: DynamicOrchestrator, queue: asyncio.Queue):
-    """Wraps orchestrator processing, handles learning, and puts results on a queue."""
-    try:
-        success, response = await orchestrator.process_prompt(prompt)
-        status_message_str = format_status("Task completed", True) if success else format_status("Task failed", False)
-
-        await queue.put({
-            "type": "status_update",
-            "message": status_message_str,
-            "prompt_context": prompt
-        })
-
-        if AUTONOMOUS_LEARNING_ENABLED and response and success:
-            learned_facts = await learn_facts_from_interaction(prompt, response, AUTONOMOUS_LEARNING_ENABLED)
-            if learned_facts:
-                await queue.put({
-                    "type": "learning_result",
-                    "facts": learned_facts,
-                    "original_prompt": prompt
-                })
-
-        await queue.put({"type": "command_result", "prompt": prompt, "success": success, "response": response})
+    """
+    Wraps orchestrator processing, handles learning, and puts results on a queue.
+    The whole prompt runs under a PROMPT_DEADLINE_SECONDS deadline (see core/deadline.py).
+    """
+    with deadline_scope(PROMPT_DEADLINE_SECONDS, label="prompt") as deadline:
+        try:
+            def _queue_partial_output(event: Dict[str, Any]) -> None:
+                queue.put_nowait({"type": "partial_output", "prompt": prompt, **event})
 
-    except Exception as e:
-        technical_error_for_log = f"Error processing '{prompt}': {type(e).__name__}: {str(e)}"
-        technical_error_msg_for_llm = f"{type(e).__name__}: {str(e)}"
-        user_friendly_error_msg = technical_error_msg_for_llm # Fallback
-
-        # Attempt to rephrase the error
-        # _orchestrator is the global instance used by the CLI
-        if _orchestrator and _orchestrator.action_executor and \
-           _orchestrator.action_executor.code_service and \
-           _orchestrator.action_executor.code_service.llm_provider:
-            try:
-                user_friendly_error_msg = await rephrase_error_message_conversationally(
-                    technical_error_message=technical_error_msg_for_llm,
-                    original_user_query=prompt, # 'prompt' is the original user input to the command
-                    llm_provider=_orchestrator.action_executor.code_service.llm_provider
-                )
-            except Exception as e_rephrase: # pragma: no cover
-                # Log that rephrasing failed, user will see technical error
-                # Use print for CLI debug messages if no logger is set up for CLI specifically
-                print(color_text(f"[CLI DEBUG] Error rephrasing direct wrapper exception: {e_rephrase}", CLIColors.DEBUG_MESSAGE))
-        else: # pragma: no cover
-            print(color_text("[CLI DEBUG] LLM provider not available for direct wrapper exception rephrasing.", CLIColors.DEBUG_MESSAGE))
-
-        # Log the original, full technical error
-        log_event(
-            event_type="CLI_WRAPPER_ERROR",
-            description=technical_error_for_log, # Log the more detailed technical error
-            source="cli._process_command_wrapper",
-            metadata={"prompt": prompt, "error": str(e), "traceback": traceback.format_exc()}
-        )
+            success, response = await run_within_deadline(
+                orchestrator.process_prompt(prompt, on_partial_output=_queue_partial_output),
+                "the prompt finished", grace_seconds=PROMPT_DEADLINE_GRACE_SECONDS
+            )
+            status_message_str = format_status("Task completed", True) if success else format_status("Task failed", False)
+
+            await queue.put({
+                "type": "status_update",
+                "message": status_message_str,
+                "prompt_context": prompt
+            })
+
+            if AUTONOMOUS_LEARNING_ENABLED and response and success and not deadline.expired():
+                learned_facts = await learn_facts_from_interaction(prompt, response, AUTONOMOUS_LEARNING_ENABLED)
+                if learned_facts:
+                    await queue.put({
+                        "type": "learning_result",
+                        "facts": learned_facts,
+                        "original_prompt": prompt
+                    })
+
+            await queue.put({"type": "command_result", "prompt": prompt, "success": success, "response": response})
+
+        except asyncio.CancelledError:
+            deadline.cancel() # Work still running in threads sees the cancellation at its next check
+            queue.put_nowait({"type": "command_result", "prompt": prompt, "success": False, "response": "Cancelled."})
+            raise
+
+        except Exception as e:
+            technical_error_for_log = f"Error processing '{prompt}': {type(e).__name__}: {str(e)}"
+            technical_error_msg_for_llm = f"{type(e).__name__}: {str(e)}"
+            user_friendly_error_msg = technical_error_msg_for_llm # Fallback
+
+            # Attempt to rephrase the error
+            # _orchestrator is the global instance used by the CLI
+            if _orchestrator and _orchestrator.action_executor and \
+               _orchestrator.action_executor.code_service and \
+               _orchestrator.action_executor.code_service.llm_provider:
+                try:
+                    user_friendly_error_msg = await rephrase_error_message_conversationally(
+                        technical_error_message=technical_error_msg_for_llm,
+                        original_user_query=prompt, # 'prompt' is the original user input to the command
+                        llm_provider=_orchestrator.action_executor.code_service.llm_provider
+                    )
+                except Exception as e_rephrase: # pragma: no cover
+                    # Log that rephrasing failed, user will see technical error
+                    # Use print for CLI debug messages if no logger is set up for CLI specifically
+                    print(color_text(f"[CLI DEBUG] Error rephrasing direct wrapper exception: {e_rephrase}", CLIColors.DEBUG_MESSAGE))
+            else: # pragma: no cover
+                print(color_text("[CLI DEBUG] LLM provider not available for direct wrapper exception rephrasing.", CLIColors.DEBUG_MESSAGE))
+
+            # Log the original, full technical error
+            log_event(
+                event_type="CLI_WRAPPER_ERROR",
+                description=technical_error_for_log, # Log the more detailed technical error
+                source="cli._process_command_wrapper",
+                metadata={"prompt": prompt, "error": str(e), "traceback": traceback.format_exc()}
+            )
 
-        # Queue the (potentially rephrased) error message for display
-        status_update_msg_display = format_message("ERROR", f"Error processing '{prompt}': {user_friendly_error_msg}", CLIColors.ERROR_MESSAGE)
-        await queue.put({
-            "type": "status_update",
-            "message": status_update_msg_display,
-            "prompt_context": prompt
-        })
-        await queue.put({
-            "type": "command_result",
-            "prompt": prompt,
-            "success": False,
-            "response": user_friendly_error_msg # This is the message that will be displayed by _handle_cli_results
-        })
+            # Queue the (potentially rephrased) error message for display
+            status_update_msg_display = format_message("ERROR", f"Error processing '{prompt}': {user_friendly_error_msg}", CLIColors.ERROR_MESSAGE)
+            await queue.put({
+                "type": "status_update",
+                "message": status_update_msg_display,
+                "prompt_context": prompt
+            })
+            await queue.put({
+                "type": "command_result",
+                "prompt": prompt,
+                "success": False,
+                "response": user_friendly_error_msg # This is the message that will be displayed by _handle_cli_results
+            })
+
+def _render_partial_output(result_item: Dict[str, Any]):
+    """Prints one streamed planning event (see DynamicOrchestrator.process_prompt)."""
+    stage = result_item.get("stage")
+    if stage == "plan_step":
+        step = result_item.get("step") or {}
+        args_preview = ", ".join(str(arg)[:40] for arg in step.get("args", []))
+        text = f"Step {result_item.get('index', 0) + 1}: {step.get('tool_name', '?')}({args_preview})"
+    elif stage == "outline_item":
+        text = f"Outline: {result_item.get('text', '')}"
+    elif stage == "detailed_task":
+        text = f"  Task ({result_item.get('outline_group', '')}): {result_item.get('text', '')}"
+    elif stage == "project_step":
+        step = result_item.get("step") or {}
+        text = f"  Step {step.get('step_id', '?')} [{step.get('type', '?')}]: {step.get('description', '')}"
+    else:
+        text = str(result_item.get("text", ""))
+    if text:
+        print_formatted_text(ANSI(color_text(f"⋯ {text}", CLIColors.THINKING)))
 
 async def _handle_cli_results(queue: asyncio.Queue):
     """Checks the queue and prints any results."""
@@ -501,6 +536,8 @@ async def _handle_cli_results(queue: asyncio.Queue):
 
             if item_type == "status_update":
                 print_formatted_text(result_item.get('message'))
+            elif item_type == "partial_output":
+                _render_partial_output(result_item)
             elif item_type == "command_result":
                 original_prompt = result_item.get("prompt", "Unknown prompt")
                 success = result_item.get("success")
@@ -555,7 +592,8 @@ async def start_cli():
     # Note: OllamaProvider default base_url is http://localhost:11434. Ensure it's running.
     # Consider making base_url configurable if needed.
     try:
-        llm_provider = OllamaProvider()
+        # Shared provider so the CLI reuses the same pooled HTTP sessions as module-level LLM calls.
+        llm_provider = get_default_provider()
         # Simple check to see if provider is responsive, can be expanded
         # await llm_provider.list_models_async() # Example check, might be too slow for startup
     except Exception as e_provider: # pragma: no cover
@@ -718,6 +756,9 @@ async def start_cli():
                         print_formatted_text(format_message("CMD", "/review_insights", CLIColors.COMMAND))
                         print_formatted_text(ANSI(color_text("      Review insights and propose actions", CLIColors.SYSTEM_MESSAGE)))
 
+                        print_formatted_text(format_message("CMD", "/cancel", CLIColors.COMMAND))
+                        print_formatted_text(ANSI(color_text("      Cancel the prompts still being worked on", CLIColors.SYSTEM_MESSAGE)))
+
                         print_formatted_text(format_message("CMD", "/exit or /quit", CLIColors.COMMAND))
                         print_formatted_text(ANSI(color_text("      Exit the assistant", CLIColors.SYSTEM_MESSAGE)))
 
@@ -1093,6 +1134,14 @@ async def start_cli():
                         else:
                             print_formatted_text(format_message("WARNING", "Detailed plan step statuses not available or invalid for this task.", CLIColors.WARNING))
                         print_formatted_text(draw_separator())
+                    elif command == "/cancel":
+                        running_tasks = [t for t in user_command_tasks if not t.done()]
+                        if not running_tasks:
+                            print_formatted_text(format_message("INFO", "No running prompts to cancel.", CLIColors.SYSTEM_MESSAGE))
+                            continue
+                        for task in running_tasks:
+                            task.cancel() # Cancels in-flight LLM requests and tool calls via the prompt's deadline scope
+                        print_formatted_text(format_status(f"Cancelled {len(running_tasks)} running prompt(s)", True))
                     elif command == "/review_insights": # pragma: no cover
                         print_formatted_text(format_header("Reviewing Actionable Insights"))
 
@@ -1256,6 +1305,9 @@ async def start_cli():
                 global_reflection_log.save_log()
                 print_formatted_text(format_status("Reflection log saved", True))
 
+            if _task_manager_cli_instance:
+                _task_manager_cli_instance.flush()
+
             print_formatted_text(draw_separator())
             print(format_message("GOODBYE", "AI Assistant shutting down. Have a great day!", CLIColors.SUCCESS))
             print_formatted_text(draw_separator())
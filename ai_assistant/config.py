@@ -54,10 +54,186 @@ TASK_MODELS: Dict[str, Optional[str]] = {
     "fact_extraction": DEFAULT_MODEL,              # For extracting facts for autonomous learning
     "tool_design": DEFAULT_MODEL,                # For designing tool components (name, params, code) from a description
     "tool_creation": DEFAULT_MODEL,              # For the AI to create new tools
+    "error_rephrasing": DEFAULT_MODEL,           # For turning technical errors into user-friendly messages
     # Add other tasks here as needed, e.g.:
     # "translation": "another_model:latest",
 }
 
+# --- Ollama HTTP Connection Pool Configuration ---
+# OllamaProvider keeps long-lived pooled sessions (requests + aiohttp) instead of
+# opening a new connection for every LLM call.
+OLLAMA_POOL_MAX_CONNECTIONS = 16          # Total connections kept by the async connector / sync adapter
+OLLAMA_POOL_MAX_CONNECTIONS_PER_HOST = 8  # Upper bound of concurrent connections to a single Ollama host
+OLLAMA_KEEPALIVE_SECONDS = 60.0           # How long idle keep-alive connections are held open
+OLLAMA_REQUEST_TIMEOUT_SECONDS = 600.0    # Total timeout for a single generation request
+OLLAMA_CONNECT_TIMEOUT_SECONDS = 5.0      # Connecting to the server; a host that is down fails after this
+OLLAMA_READ_TIMEOUT_SECONDS = 600.0       # Waiting for the server's response (a long generation sends nothing until done)
+# Requests the Ollama server processes concurrently (its OLLAMA_NUM_PARALLEL setting).
+OLLAMA_NUM_PARALLEL = int(os.environ.get('OLLAMA_NUM_PARALLEL', '4'))
+
+# --- Ollama Backend Pool Configuration ---
+# Base URLs of several Ollama servers (comma-separated in the OLLAMA_BACKENDS environment variable,
+# e.g. "http://box1:11434,http://box2:11434"). When set, requests are routed to the healthy server
+# with the fewest outstanding requests that has the model; empty uses the single default host.
+OLLAMA_BACKENDS: List[str] = [url.strip() for url in os.environ.get('OLLAMA_BACKENDS', '').split(',') if url.strip()]
+OLLAMA_BACKEND_HEALTH_CHECK_INTERVAL_SECONDS = 30.0 # How often /api/tags is polled to eject/readmit servers
+OLLAMA_BACKEND_HEALTH_CHECK_TIMEOUT_SECONDS = 5.0
+OLLAMA_BACKEND_MAX_CONSECUTIVE_FAILURES = 3         # Failed requests in a row before a server is ejected
+# Send a request to a second server too if the first has not answered after this many seconds;
+# the first answer wins. 0 disables hedging (every hedge costs the servers a duplicate generation).
+OLLAMA_HEDGE_AFTER_SECONDS = 0.0
+
+# --- LLM Request Scheduler Configuration ---
+# Every LLM request waits for a slot from OllamaProvider's scheduler. Requests are admitted by
+# priority class ("interactive" for the user path, then "background", then "batch") while their
+# endpoint and model are below these limits.
+LLM_SCHEDULER_MAX_CONCURRENT_PER_ENDPOINT = OLLAMA_NUM_PARALLEL
+LLM_SCHEDULER_MAX_CONCURRENT_PER_MODEL = OLLAMA_NUM_PARALLEL    # Per model on each endpoint
+LLM_SCHEDULER_MODEL_CONCURRENCY = {}         # Per-model overrides, e.g. {"qwen3:latest": 1}
+LLM_SCHEDULER_INTERACTIVE_RESERVED_SLOTS = 1 # Endpoint slots background/batch requests may not take
+LLM_SCHEDULER_AGING_SECONDS = 60.0           # A queued request moves up one class per this many seconds waited
+# Identical LLM requests in flight at the same time share one HTTP call. By default only
+# deterministic (temperature 0) requests are coalesced; callers pass coalesce=True/False to opt a
+# sampled request in or to insist on an independent sample.
+LLM_SINGLEFLIGHT_ENABLED = True
+
+# --- LLM Circuit Breaker Configuration ---
+# Each Ollama server has a circuit breaker. When at least LLM_CIRCUIT_MIN_REQUESTS requests were
+# made to it in the last LLM_CIRCUIT_WINDOW_SECONDS and LLM_CIRCUIT_FAILURE_RATE of them failed
+# (connection errors, timeouts, 5xx), the circuit opens: requests to that server fail immediately
+# for LLM_CIRCUIT_OPEN_SECONDS, after which a single probe request decides whether it closes again.
+LLM_CIRCUIT_BREAKER_ENABLED = True
+LLM_CIRCUIT_WINDOW_SECONDS = 60.0
+LLM_CIRCUIT_MIN_REQUESTS = 5
+LLM_CIRCUIT_FAILURE_RATE = 0.5
+LLM_CIRCUIT_OPEN_SECONDS = 30.0
+LLM_REQUEST_RETRIES = 3 # Retries of a request that failed transiently (connection error, timeout, 5xx)
+
+# --- Hierarchical Code Generation Configuration ---
+# CodeService details the components of an outline concurrently, at most this many at a time.
+CODE_GEN_COMPONENT_CONCURRENCY = OLLAMA_NUM_PARALLEL
+CODE_GEN_COMPONENT_TIMEOUT_SECONDS = 300.0  # Per attempt, for one component's LLM request
+CODE_GEN_COMPONENT_MAX_RETRIES = 1          # Extra attempts when a component fails or times out
+
+# --- Task Manager Persistence Configuration ---
+# Every task change is appended to a small journal next to active_tasks.json; the
+# full snapshot is rewritten at most once per this many seconds (and immediately
+# when a task reaches a terminal status, or on TaskManager.flush()). 0 writes every change.
+TASK_STATE_COALESCE_SECONDS = 5.0
+
+# --- Hierarchical Project Planning Configuration ---
+# HierarchicalPlanner expands outline items and elaborates their tasks concurrently,
+# with at most this many LLM requests in flight.
+HIERARCHICAL_PLAN_CONCURRENCY = OLLAMA_NUM_PARALLEL
+HIERARCHICAL_PLAN_TIMEOUT_SECONDS = 1800.0  # Whole-plan budget; the steps finished by then are returned. 0 disables it.
+
+# --- Plan Execution Configuration ---
+# ExecutionAgent runs plan steps that do not depend on each other ([[step_N_output]]) concurrently,
+# up to this many at a time. Only tools declared read-only take part; other steps keep plan order.
+# 1 runs every plan strictly sequentially.
+PLAN_MAX_CONCURRENT_STEPS = 4
+# After a step fails, re-plan only the failed step and what follows it: the planner sees the
+# completed steps with their outputs, and execution resumes at the failed step instead of
+# re-running them. False always asks for a whole new plan.
+PLAN_INCREMENTAL_REPLANNING = True
+# Characters of each completed step's output shown to the planner in an incremental re-plan.
+REPLAN_STEP_OUTPUT_PREVIEW_CHARS = 500
+# Completed steps of hierarchical project plans (execute_project_plan) are checkpointed in the
+# structured store as they finish, under their ActiveTask, so a task interrupted by a crash or
+# restart is resumed at startup and skips the steps whose inputs are unchanged. A plan's
+# checkpoints are removed once it succeeds; those older than PLAN_CHECKPOINT_MAX_AGE_HOURS are
+# ignored and pruned. (ExecutionAgent plans are short and not tied to a task; they are not checkpointed.)
+PLAN_STEP_CHECKPOINTS_ENABLED = True
+PLAN_CHECKPOINT_MAX_AGE_HOURS = 48
+
+# --- Prompt Deadline Configuration ---
+# Every CLI prompt gets this end-to-end time budget (0 disables it). Planning, execution with
+# retries and re-planning, summarization and fact learning share it: LLM and tool timeouts are
+# shrunk to what is left, no retries or re-plans start once it is used up, and the prompt's
+# remaining work is cancelled PROMPT_DEADLINE_GRACE_SECONDS after it expires (the grace lets the
+# orchestrator report the failure itself). /cancel cancels running prompts at once.
+PROMPT_DEADLINE_SECONDS = 1800.0
+PROMPT_DEADLINE_GRACE_SECONDS = 5.0
+
+# --- Blob Store Configuration ---
+# Step results larger than BLOB_INLINE_MAX_BYTES (as UTF-8 text or JSON) are stored once, gzip
+# compressed and keyed by SHA-256, in BLOB_STORE_DIR_NAME under the data directory. Plans,
+# reflection entries, checkpoints and prompts carry a small reference (hash, size and a
+# BLOB_PREVIEW_CHARS preview); the content is read back only when a step's placeholder needs it.
+# Blobs nothing refers to any more are deleted by BlobStore.gc() after BLOB_GC_GRACE_SECONDS.
+BLOB_STORE_DIR_NAME = "blobs"
+BLOB_INLINE_MAX_BYTES = 16 * 1024
+BLOB_PREVIEW_CHARS = 200
+BLOB_GC_GRACE_SECONDS = 3600
+
+# --- Structured Store Configuration ---
+# Projects, suggestions, notifications, goals and actionable insights are kept in one SQLite
+# (WAL) file per data directory, one table per entity. Their legacy JSON files are imported
+# once and renamed to '<name>.migrated'.
+STRUCTURED_STORE_DB_FILENAME = "assistant_store.sqlite3"
+
+# --- Tool Discovery Configuration ---
+# Names, first docstring lines and *_SCHEMA dicts of the custom tool modules' functions are kept
+# in this file next to the tool registry, keyed by each module's source path, mtime and hash.
+# Unchanged modules are registered from it and imported on their first tool execution.
+TOOL_DISCOVERY_MANIFEST_FILENAME = "tool_discovery_manifest.json"
+
+# --- Tool Execution Configuration ---
+# Synchronous tools run on a shared thread pool unless registered with executor="inline" (trivially
+# fast, run on the event loop) or executor="process" (CPU-bound, picklable module-level functions).
+TOOL_THREAD_POOL_WORKERS = 8
+TOOL_PROCESS_POOL_WORKERS = 2
+# An inline tool call slower than this moves the tool to the thread pool.
+TOOL_INLINE_MAX_SECONDS = 0.005
+# Results of tools whose schema sets "cacheable" (see ai_assistant/tools/tool_result_cache.py)
+# are kept in an in-memory LRU of this size, for the schema's cache_ttl_seconds or this default.
+TOOL_RESULT_CACHE_MAX_ENTRIES = 256
+TOOL_RESULT_CACHE_DEFAULT_TTL_SECONDS = 300.0
+
+# --- LLM Response Cache Configuration ---
+# Identical (model, prompt, temperature, max_tokens, thinking mode) requests are answered from
+# an in-memory LRU backed by an SQLite file in the data directory.
+# Only temperature-0 requests are cached unless a caller opts in with cache=True.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_DB_FILENAME = "llm_response_cache.sqlite3"
+LLM_CACHE_MEMORY_MAX_ENTRIES = 512
+LLM_CACHE_DISK_MAX_ENTRIES = 20000
+LLM_CACHE_DEFAULT_TTL_SECONDS = 3600.0
+# Per-task TTLs, keyed by the task names used in TASK_MODELS. A TTL of 0 disables caching for that task.
+LLM_CACHE_TASK_TTL_SECONDS: Dict[str, float] = {
+    "reflection": 6 * 3600.0,         # Suggestion scoring is stable between reflection cycles
+    "reviewing": 6 * 3600.0,
+    "error_rephrasing": 24 * 3600.0,
+    "fact_extraction": 24 * 3600.0,
+    "summarization": 3600.0,
+    "planning": 0.0,                  # Plans depend on live state; never replay them
+    "code_generation": 0.0,
+}
+
+# --- Embedding / Semantic Retrieval Configuration ---
+# Facts, tool descriptions and suggestions are embedded for similarity search (see memory/vector_index.py).
+# "ollama" uses the Ollama embeddings endpoint and falls back to "hashing" (a deterministic,
+# offline hashing vectorizer) if the endpoint is unavailable.
+EMBEDDING_BACKEND = "ollama"
+EMBEDDING_MODEL = "nomic-embed-text"
+HASHING_EMBEDDING_DIMENSION = 512
+EMBEDDING_PRIMARY_RETRY_SECONDS = 300.0     # After "ollama" embeddings fail, use "hashing" this long before trying again
+VECTOR_INDEX_SUBDIR = "vector_indexes"      # Under the data directory
+SUGGESTION_DEDUP_SIMILARITY_THRESHOLD = 0.92 # Cosine similarity above which a new suggestion is a duplicate
+TOOL_ALTERNATIVE_MIN_SIMILARITY = 0.2        # Minimum similarity for a tool to be offered as an alternative
+
+# --- Planner Tool Shortlisting ---
+# Planning prompts describe only the tools most relevant to the goal (see planning/tool_retrieval.py).
+# Registries with at most PLANNER_TOOL_SHORTLIST_SIZE tools besides the core tools are sent in full.
+PLANNER_TOOL_SHORTLIST_SIZE = 15
+# Tools always offered to the planner when registered (the planning prompt refers to them by name).
+PLANNER_CORE_TOOLS: List[str] = [
+    "request_user_clarification",
+    "search_duckduckgo",
+    "process_search_results",
+    "no_op_tool",
+]
+
 # Number of recent conversational turns (user/AI exchanges) to include in LLM prompts for context
 CONVERSATION_HISTORY_TURNS = 5
 
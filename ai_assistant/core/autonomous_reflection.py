@@ -24,6 +24,7 @@ from unittest.mock import patch, AsyncMock, MagicMock # Ensure these are importe
 from ai_assistant.llm_interface.ollama_client import invoke_ollama_model 
 from ai_assistant.core.reflection import global_reflection_log, ReflectionLogEntry 
 from ..memory.event_logger import log_event
+from ai_assistant.tools.tool_catalog import render_tools_json
 from ai_assistant.config import get_model_for_task, is_debug_mode
 from ai_assistant.learning.evolution import apply_code_modification
 from datetime import datetime, timezone, timedelta 
@@ -409,7 +410,7 @@ def _invoke_suggestion_scoring_llm(suggestion: Dict[str, Any], llm_model_name: O
     )
 
     model_to_use = llm_model_name if llm_model_name is not None else get_model_for_task("reflection")
-    llm_response_str = invoke_ollama_model(prompt, model_name=model_to_use)
+    llm_response_str = invoke_ollama_model(prompt, model_name=model_to_use, task_name="reflection", cache=True)
 
     if not llm_response_str:
         logger.warning(f"Received no response from LLM for suggestion scoring (model: {model_to_use}). Suggestion ID: {suggestion.get('suggestion_id', 'N/A')}")
@@ -482,7 +483,7 @@ def _invoke_suggestion_review_llm(suggestion: Dict[str, Any], llm_model_name: Op
     )
 
     model_to_use = llm_model_name if llm_model_name is not None else get_model_for_task("reflection")
-    llm_response_str = invoke_ollama_model(prompt, model_name=model_to_use)
+    llm_response_str = invoke_ollama_model(prompt, model_name=model_to_use, task_name="reviewing", cache=True)
 
     if not llm_response_str:
         logger.warning(f"Received no response from LLM for suggestion review (model: {model_to_use}). Suggestion ID: {suggestion_id}")
@@ -586,7 +587,7 @@ def run_self_reflection_cycle(
 
     try:
         patterns_json_list_str = json.dumps(identified_patterns_list, indent=2)
-        available_tools_json_str = json.dumps(available_tools, indent=2)
+        available_tools_json_str = render_tools_json(available_tools)
     except TypeError as e:
         logger.error(f"Error serializing patterns or tools to JSON for suggestion generation: {e}")
         log_event(
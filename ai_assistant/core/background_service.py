@@ -13,6 +13,7 @@ from ai_assistant.tools import tool_system # To get available tools
 # Modified: Import the specific curation function and config for interval
 from ai_assistant.custom_tools.knowledge_tools import run_periodic_fact_store_curation_async
 from ai_assistant.config import is_debug_mode, FACT_CURATION_INTERVAL_SECONDS
+from ai_assistant.llm_interface.request_scheduler import PRIORITY_BACKGROUND, PRIORITY_BATCH, llm_priority, set_llm_priority
 
 # Configure logger for this module
 logger = logging.getLogger(__name__)
@@ -130,6 +131,8 @@ def read_text_from_file(filepath: str) -> str:
 async def _background_loop_async():
     global _last_fact_curation_time, _last_project_execution_scan_time
     print("BackgroundService: Async loop started.")
+    # LLM requests made by this task (and the threads/tasks it starts) queue behind the user's.
+    set_llm_priority(PRIORITY_BACKGROUND)
     _last_fact_curation_time = time.time()
     _last_project_execution_scan_time = time.time()
 
@@ -167,7 +170,8 @@ async def _background_loop_async():
             logger.info(f"BackgroundService: Running LLM fact curation (current time: {current_time_str_curation})...")
             try:
                 # Call the dedicated function from knowledge_tools
-                curation_success = await run_periodic_fact_store_curation_async()
+                with llm_priority(PRIORITY_BATCH):
+                    curation_success = await run_periodic_fact_store_curation_async()
                 if curation_success: # pragma: no cover
                     logger.info("BackgroundService: LLM fact curation process completed successfully.")
                 else: # pragma: no cover
@@ -10,6 +10,7 @@ from ai_assistant.llm_interface.ollama_client import invoke_ollama_model_async
 from ai_assistant.config import get_model_for_task, CONVERSATION_HISTORY_TURNS, is_debug_mode, get_data_dir
 from ai_assistant.planning.execution import ExecutionAgent # Assuming ExecutionAgent is the correct type
 from ai_assistant.tools.tool_system import ToolSystem # Assuming ToolSystem is the correct type
+from ai_assistant.tools.tool_catalog import render_tools_json
 from .reflection import global_reflection_log
 from ai_assistant.memory.event_logger import log_event, get_recent_events
 from ai_assistant.custom_tools.knowledge_tools import recall_facts # Added import
@@ -128,7 +129,8 @@ async def detect_missed_tool_opportunity(
         return None
 
     try:
-        tools_json_string = json.dumps(available_tools, indent=2)
+        # Escaped for .format(), especially if it becomes "{}" for an empty dict; memoized per registry version.
+        escaped_tools_json_string = render_tools_json(available_tools, escape_braces=True)
     except TypeError: # pragma: no cover
         print("Error: Could not serialize available_tools to JSON for LLM prompt.")
         return None
@@ -165,8 +167,6 @@ async def detect_missed_tool_opportunity(
     escaped_user_statement = user_statement.replace('{', '{{').replace('}', '}}')
     escaped_conversation_history = conversation_history_for_prompt.replace('{', '{{').replace('}', '}}')
     escaped_learned_facts_str = facts_for_prompt.replace('{', '{{').replace('}', '}}')
-    # tools_json_string also needs escaping, especially if it becomes "{}" for an empty dict.
-    escaped_tools_json_string = tools_json_string.replace('{', '{{').replace('}', '}}')
 
     try:
         prompt = MISSED_TOOL_OPPORTUNITY_PROMPT_TEMPLATE.format(
@@ -0,0 +1,129 @@
+# ai_assistant/core/deadline.py
+"""
+End-to-end time budgets for user prompts.
+
+The CLI opens a deadline scope per prompt (PROMPT_DEADLINE_SECONDS). The
+deadline lives in a context variable, so it follows the prompt's work through
+awaits, tasks and asyncio.to_thread without being passed around: the Ollama
+client shrinks its timeouts to the remaining budget and does not send requests
+once it is used up, ToolSystem.execute_tool bounds tool calls by it, and the
+planner and ExecutionAgent stop retrying and re-planning when it has expired,
+and execute_project_plan stops between steps.
+A scope opened inside another never outlives the outer one.
+
+Cancelling a deadline (the user's /cancel) makes it expired at once, so work
+still running in threads stops at its next check.
+"""
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, Optional
+
+_current_deadline: contextvars.ContextVar[Optional["Deadline"]] = contextvars.ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    """The time budget of the current prompt is used up, or the prompt was cancelled."""
+
+
+class Deadline:
+    """A point in time by which the work of a scope must be done; `seconds` of None or 0 means no limit."""
+
+    def __init__(self, seconds: Optional[float], label: str = "prompt", parent: Optional["Deadline"] = None):
+        self.label = label
+        self.budget_seconds = seconds if seconds and seconds > 0 else None
+        self.parent = parent
+        self.expires_at: Optional[float] = time.monotonic() + seconds if self.budget_seconds else None
+        if parent is not None and parent.expires_at is not None:
+            self.expires_at = parent.expires_at if self.expires_at is None else min(self.expires_at, parent.expires_at)
+        self._cancelled = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (0.0 once expired or cancelled), or None without a time limit."""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() == 0.0
+
+    def check(self, stage: str = "") -> None:
+        """Raises DeadlineExceededError if the deadline has expired or was cancelled."""
+        if not self.expired():
+            return
+        before = f" before {stage}" if stage else ""
+        if self.cancelled:
+            raise DeadlineExceededError(f"The {self.label} was cancelled{before}.")
+        raise DeadlineExceededError(f"The {self.label}'s time budget of {self.budget_seconds:.0f}s was used up{before}.")
+
+    def shrink(self, timeout: Optional[float]) -> Optional[float]:
+        """`timeout` capped to the remaining time; None or 0 (no timeout) becomes the remaining time."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        if timeout is None or timeout <= 0:
+            return remaining
+        return min(timeout, remaining)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float], label: str = "prompt") -> Iterator[Deadline]:
+    """Makes a new deadline (bounded by the enclosing one, if any) current for the block."""
+    deadline = Deadline(seconds, label, parent=_current_deadline.get())
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+def deadline_expired() -> bool:
+    """Whether the current deadline (if any) has expired or was cancelled."""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired()
+
+
+def check_deadline(stage: str = "") -> None:
+    """Raises DeadlineExceededError if the current deadline has expired; no-op without one."""
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def shrink_timeout(timeout: Optional[float]) -> Optional[float]:
+    """A stage's own timeout, capped to what is left of the current deadline."""
+    deadline = _current_deadline.get()
+    return timeout if deadline is None else deadline.shrink(timeout)
+
+
+async def run_within_deadline(awaitable: Awaitable[Any], stage: str = "", grace_seconds: float = 0.0) -> Any:
+    """
+    Awaits `awaitable`, cancelling it if the current deadline (plus `grace_seconds`,
+    which lets the work notice the deadline itself and wind down) passes first;
+    that raises DeadlineExceededError.
+    """
+    deadline = _current_deadline.get()
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining + grace_seconds)
+    except asyncio.TimeoutError:
+        if not deadline.expired():
+            raise # Raised by the work itself, not by the deadline
+        deadline.check(stage)
+        raise
@@ -18,7 +18,10 @@ except ImportError: # pragma: no cover
         return os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core_data"))
 
 
+from ai_assistant.memory.structured_store import get_structured_store, structured_store_path_for
+
 NOTIFICATIONS_FILE_NAME = "notifications.json"
+NOTIFICATIONS_TABLE = "notifications"
 
 class NotificationStatus(Enum):
     UNREAD = auto()
@@ -86,44 +89,55 @@ class Notification:
         return cls(**data)
 
 
+def _load_legacy_notifications(filepath: str) -> Optional[List[Dict[str, Any]]]:
+    """Reads the legacy notifications JSON file for migration. Returns None if it cannot be read."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+            if not content:
+                return []
+            return json.loads(content)
+    except (IOError, json.JSONDecodeError) as e: # pragma: no cover
+        print(f"Error loading notifications from '{filepath}': {e}.")
+        return None
+
+def _sortable_timestamp(data: Dict[str, Any]) -> Optional[str]:
+    """UTC timestamp with a fixed-width fraction, so the indexed column sorts chronologically."""
+    try:
+        timestamp = datetime.fromisoformat(data['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+
 class NotificationManager:
     def __init__(self, filepath: Optional[str] = None):
         self.filepath = filepath or os.path.join(get_data_dir(), NOTIFICATIONS_FILE_NAME)
-        self.notifications: List[Notification] = []
-        self._load_notifications()
-
-    def _ensure_data_dir_exists(self):
-        dir_path = os.path.dirname(self.filepath)
-        if not os.path.exists(dir_path): # pragma: no cover
-            os.makedirs(dir_path, exist_ok=True)
+        self.repository = get_structured_store(structured_store_path_for(self.filepath)).repository(
+            NOTIFICATIONS_TABLE, "notification_id",
+            columns={
+                "status": lambda n: n.get('status'),
+                "event_type": lambda n: n.get('event_type'),
+                "timestamp": _sortable_timestamp,
+            },
+            legacy_path=self.filepath, legacy_loader=_load_legacy_notifications
+        )
 
-    def _load_notifications(self):
-        self._ensure_data_dir_exists()
-        if not os.path.exists(self.filepath):
-            self.notifications = []
-            return
+    @property
+    def notifications(self) -> List[Notification]:
+        """All notifications, newest first."""
+        return self._query()
 
-        try:
-            with open(self.filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-                if not content:
-                    self.notifications = []
-                    return
-                data_list = json.loads(content)
-                self.notifications = [Notification.from_dict(item) for item in data_list]
-                self.notifications.sort(key=lambda n: n.timestamp, reverse=True)
-        except (IOError, json.JSONDecodeError, ValueError) as e: # pragma: no cover
-            print(f"Error loading notifications from '{self.filepath}': {e}. Initializing with empty list.")
-            self.notifications = []
-
-    def _save_notifications(self):
-        self._ensure_data_dir_exists()
-        try:
-            self.notifications.sort(key=lambda n: n.timestamp, reverse=True)
-            with open(self.filepath, 'w', encoding='utf-8') as f:
-                json.dump([n.to_dict() for n in self.notifications], f, indent=4)
-        except IOError as e: # pragma: no cover
-            print(f"Error saving notifications to '{self.filepath}': {e}")
+    def _query(self, where: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> List[Notification]:
+        notifications = []
+        for data in self.repository.find(where, order_by="timestamp", descending=True, limit=limit):
+            try:
+                notifications.append(Notification.from_dict(data))
+            except ValueError as e: # pragma: no cover
+                print(f"Error loading notification from '{self.repository.store.db_path}': {e}. Skipping it.")
+        return notifications
 
     def add_notification(
         self,
@@ -143,8 +157,7 @@ class NotificationManager:
             related_item_type=related_item_type,
             details_payload=details_payload or {}
         )
-        self.notifications.insert(0, new_notification)
-        self._save_notifications()
+        self.repository.upsert(new_notification.to_dict())
         print(f"NotificationManager: Added notification {new_notification.notification_id} ({event_type.name})")
         return new_notification
 
@@ -154,43 +167,36 @@ class NotificationManager:
         type_filter: Optional[NotificationType] = None,
         limit: int = 10
     ) -> List[Notification]:
-        filtered_notifications = self.notifications
+        where: Dict[str, Any] = {}
         if status_filter:
-            filtered_notifications = [n for n in filtered_notifications if n.status == status_filter]
+            where["status"] = status_filter.name
         if type_filter:
-            filtered_notifications = [n for n in filtered_notifications if n.event_type == type_filter]
-
-        return filtered_notifications[:limit]
+            where["event_type"] = type_filter.name
+        return self._query(where, limit=limit)
 
     def _get_notification_by_id(self, notification_id: str) -> Optional[Notification]:
-        for notification in self.notifications:
-            if notification.notification_id == notification_id:
-                return notification
-        return None
+        data = self.repository.get(notification_id)
+        return Notification.from_dict(data) if data else None
+
+    def _set_status(self, notification_ids: List[str], new_status: NotificationStatus, from_statuses: List[NotificationStatus]) -> bool:
+        """Moves the listed notifications that are in one of `from_statuses` to `new_status`, in one write."""
+        if not notification_ids:
+            return False
+        changed = self._query({"id": list(notification_ids), "status": [s.name for s in from_statuses]})
+        for notification in changed:
+            notification.status = new_status
+            notification.timestamp = datetime.now(timezone.utc)
+        if changed:
+            self.repository.upsert_many([n.to_dict() for n in changed])
+        return len(changed) > 0
 
     def mark_as_read(self, notification_ids: List[str]) -> bool:
-        updated_count = 0
-        for nid in notification_ids:
-            notification = self._get_notification_by_id(nid)
-            if notification and notification.status == NotificationStatus.UNREAD:
-                notification.status = NotificationStatus.READ
-                notification.timestamp = datetime.now(timezone.utc)
-                updated_count +=1
-        if updated_count > 0:
-            self._save_notifications()
-        return updated_count > 0
+        return self._set_status(notification_ids, NotificationStatus.READ, [NotificationStatus.UNREAD])
 
     def mark_as_archived(self, notification_ids: List[str]) -> bool:
-        updated_count = 0
-        for nid in notification_ids:
-            notification = self._get_notification_by_id(nid)
-            if notification and notification.status != NotificationStatus.ARCHIVED:
-                notification.status = NotificationStatus.ARCHIVED
-                notification.timestamp = datetime.now(timezone.utc)
-                updated_count +=1
-        if updated_count > 0:
-            self._save_notifications()
-        return updated_count > 0
+        return self._set_status(
+            notification_ids, NotificationStatus.ARCHIVED, [NotificationStatus.UNREAD, NotificationStatus.READ]
+        )
 
 if __name__ == '__main__': # pragma: no cover
     print("--- Testing NotificationManager ---")
@@ -199,10 +205,8 @@ if __name__ == '__main__': # pragma: no cover
         os.makedirs(data_dir_for_test, exist_ok=True)
 
     test_file = os.path.join(data_dir_for_test, "test_notifications.json")
-    if os.path.exists(test_file):
-        os.remove(test_file)
-
     manager = NotificationManager(filepath=test_file)
+    manager.repository.replace_all([]) # Start from an empty notifications table
 
     print(f"Initial notifications (should be 0): {len(manager.get_notifications(status_filter=None))}")
 
@@ -253,6 +257,6 @@ if __name__ == '__main__': # pragma: no cover
         assert all_loaded[1].notification_id == n3.notification_id # Read, middle timestamp
         assert all_loaded[2].notification_id == n2.notification_id # Unread, oldest timestamp
 
-    print(f"Notification file used: {test_file}")
+    print(f"Notification store used: {manager.repository.store.db_path}")
     # if os.path.exists(test_file): os.remove(test_file) # Clean up for repeated tests
     print("--- NotificationManager Test Finished ---")
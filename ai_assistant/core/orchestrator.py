@@ -3,7 +3,7 @@
 import re
 import os
 import asyncio
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from ..planning.planning import PlannerAgent
 from ..planning.execution import ExecutionAgent 
 from ..memory.event_logger import log_event
@@ -11,9 +11,10 @@ from ..core.reflection import global_reflection_log, analyze_last_failure
 from ..learning.learning import LearningAgent
 from ..tools.tool_system import tool_system_instance
 from ..config import is_debug_mode
+from .deadline import check_deadline
 from ..utils.display_utils import CLIColors, color_text
 from ..execution.action_executor import ActionExecutor
-from ..memory.persistent_memory import load_learned_facts
+from ..memory.fact_store import get_fact_store
 from .task_manager import TaskManager
 from .notification_manager import NotificationManager
 from ..utils.conversational_helpers import summarize_tool_result_conversationally, rephrase_error_message_conversationally
@@ -99,9 +100,18 @@ class DynamicOrchestrator:
                 f"{outcome_str}")
         return "\n".join(summary_lines)
 
-    async def process_prompt(self, prompt: str) -> Tuple[bool, str]:
+    async def process_prompt(
+        self,
+        prompt: str,
+        on_partial_output: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[bool, str]:
         """
         Process a user prompt by creating and executing a dynamic plan.
+        If `on_partial_output` is given, planning output is streamed to it as it is
+        generated (e.g. {"stage": "plan_step", "index": 0, "step": {...}}), so the
+        caller can show progress before the plan is complete.
+        Under a deadline (see core/deadline.py), each stage only starts while time is
+        left; a prompt whose budget runs out fails with an explanation.
         Returns (success, response_message)
         """
         try:
@@ -116,37 +126,17 @@ class DynamicOrchestrator:
             )
 
             # --- Fact Retrieval ---
-            all_learned_facts = load_learned_facts()
-            relevant_facts_for_prompt: List[Dict[str, Any]] = [] # Ensure type
-
-            if all_learned_facts:
-                # Refined selection logic:
-                keyword_matched_facts: List[Dict[str, Any]] = [] # Ensure type
-                prompt_keywords_set = set(prompt.lower().split()) # Ensure type
-                for fact_entry in all_learned_facts:
-                    fact_text_lower = fact_entry.get("text", "").lower()
-                    if any(keyword in fact_text_lower for keyword in prompt_keywords_set):
-                        if len(keyword_matched_facts) < 5:
-                            keyword_matched_facts.append(fact_entry)
-
-                relevant_facts_for_prompt = list(keyword_matched_facts)
-
-                category_matched_facts_count = 0
-                preferred_categories = ["user_preference", "project_context", "general_knowledge"] # Moved definition here
-                for fact_entry in reversed(all_learned_facts):
-                    if len(relevant_facts_for_prompt) >= 7:
-                        break
-                    if category_matched_facts_count >= 2:
-                        break
-
-                    is_already_added = any(rf['fact_id'] == fact_entry['fact_id'] for rf in relevant_facts_for_prompt)
-                    if not is_already_added and fact_entry.get("category") in preferred_categories:
-                         relevant_facts_for_prompt.append(fact_entry)
-                         category_matched_facts_count +=1
-
-                MAX_FACTS_FOR_PROMPT = 7
-                if len(relevant_facts_for_prompt) > MAX_FACTS_FOR_PROMPT:
-                    relevant_facts_for_prompt = relevant_facts_for_prompt[:MAX_FACTS_FOR_PROMPT]
+            # Up to 5 facts ranked by relevance to the prompt (keyword + embedding similarity),
+            # then up to 2 of the most recent facts in preferred categories (at most 7 in total).
+            preferred_categories = ["user_preference", "project_context", "general_knowledge"]
+            fact_store = get_fact_store()
+            # Embedding may call the Ollama embeddings endpoint, so keep it off the event loop.
+            relevant_facts_for_prompt: List[Dict[str, Any]] = await asyncio.to_thread(fact_store.hybrid_search, prompt, 5)
+            relevant_facts_for_prompt.extend(fact_store.recent(
+                limit=2,
+                categories=preferred_categories,
+                exclude_ids=[fact.get("fact_id") for fact in relevant_facts_for_prompt]
+            ))
 
             learned_facts_section_str = ""
             if relevant_facts_for_prompt:
@@ -224,11 +214,16 @@ class DynamicOrchestrator:
                 else:
                     final_context_for_planner = learned_facts_section_str
 
+            check_deadline("planning")
+            planner_stream_kwargs: Dict[str, Any] = {}
+            if on_partial_output:
+                planner_stream_kwargs["on_step"] = lambda event: on_partial_output({"stage": "plan_step", **event})
             self.current_plan = await self.planner.create_plan_with_llm(
                 goal_description=prompt,
                 available_tools=available_tools_rich,
                 project_context_summary=final_context_for_planner,
-                project_name_for_context=project_name_for_context
+                project_name_for_context=project_name_for_context,
+                **planner_stream_kwargs
             )
 
             use_hierarchical_planner = False
@@ -254,9 +249,14 @@ class DynamicOrchestrator:
                 if is_debug_mode():
                     print(f"DEBUG: Hierarchical Planner invoked for: {prompt}")
 
+                check_deadline("hierarchical planning")
+                hierarchical_stream_kwargs: Dict[str, Any] = {}
+                if on_partial_output:
+                    hierarchical_stream_kwargs["on_progress"] = on_partial_output
                 generated_project_plan = await self.hierarchical_planner.generate_full_project_plan(
                     user_goal=prompt,
-                    project_context=final_context_for_planner
+                    project_context=final_context_for_planner,
+                    **hierarchical_stream_kwargs
                 )
 
                 if not generated_project_plan:
@@ -318,6 +318,7 @@ class DynamicOrchestrator:
 
             if is_debug_mode():
                 print(f"DynamicOrchestrator: Executing plan with {len(self.current_plan)} steps")
+            check_deadline("executing the plan")
 
             final_plan_attempted, results_of_final_attempt = await self.executor.execute_plan(
                 prompt,
@@ -5,18 +5,20 @@ from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional, Union
 
 from ai_assistant.config import get_data_dir
+from ai_assistant.memory.structured_store import Repository, get_structured_store, structured_store_path_for
+from ai_assistant.tools.tool_result_cache import invalidate_tag
 from ai_assistant.utils.display_utils import CLIColors, color_text # For potential direct use or consistency
 
 PROJECTS_FILE_NAME = "projects.json"
+PROJECTS_TABLE = "projects"
+# Tool result cache tag of tools that resolve a project's root_path (see LIST_PROJECT_FILES_SCHEMA)
+PROJECTS_CACHE_TAG = "projects"
 
 def get_projects_file_path() -> str:
     return os.path.join(get_data_dir(), PROJECTS_FILE_NAME)
 
-def _load_projects() -> List[Dict[str, Any]]:
-    """Loads projects from the JSON file."""
-    filepath = get_projects_file_path()
-    if not os.path.exists(filepath):
-        return []
+def _load_legacy_projects(filepath: str) -> Optional[List[Dict[str, Any]]]:
+    """Reads the legacy projects JSON file for migration. Returns None if it cannot be read."""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -25,23 +27,24 @@ def _load_projects() -> List[Dict[str, Any]]:
             return json.loads(content)
     except (IOError, json.JSONDecodeError) as e:
         print(color_text(f"Error loading projects: {e}", CLIColors.ERROR_MESSAGE))
-        return []
+        return None
 
-def _save_projects(projects: List[Dict[str, Any]]) -> bool:
-    """Saves projects to the JSON file."""
+def _projects_repository() -> Repository:
+    """The projects table, indexed by lower-cased name and status."""
     filepath = get_projects_file_path()
-    try:
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(projects, f, indent=4)
-        return True
-    except IOError as e:
-        print(color_text(f"Error saving projects: {e}", CLIColors.ERROR_MESSAGE))
-        return False
+    return get_structured_store(structured_store_path_for(filepath)).repository(
+        PROJECTS_TABLE, "project_id",
+        columns={
+            "name_key": lambda p: (p.get('name') or '').lower(),
+            "status": lambda p: p.get('status', 'unknown'),
+            "created_at": lambda p: p.get('created_at'),
+        },
+        legacy_path=filepath, legacy_loader=_load_legacy_projects
+    )
 
 def list_projects() -> List[Dict[str, Any]]:
     """Returns a list of all projects."""
-    return _load_projects()
+    return _projects_repository().find()
 
 # Conceptual Schema for create_project tool
 # CREATE_PROJECT_SCHEMA = {
@@ -54,8 +57,8 @@ def list_projects() -> List[Dict[str, Any]]:
 # }
 def create_project(name: str, description: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """Creates a new project."""
-    projects = _load_projects()
-    if any(p['name'].lower() == name.lower() for p in projects):
+    repository = _projects_repository()
+    if repository.find_one({"name_key": name.lower()}):
         print(color_text(f"Project with name '{name}' already exists.", CLIColors.ERROR_MESSAGE))
         return None
 
@@ -69,36 +72,32 @@ def create_project(name: str, description: Optional[str] = None) -> Optional[Dic
         "updated_at": datetime.now(timezone.utc).isoformat(),
         "tasks": []
     }
-    projects.append(new_project)
-    if _save_projects(projects):
+    if repository.upsert(new_project):
+        invalidate_tag(PROJECTS_CACHE_TAG) # A name can now resolve to a different project
         print(color_text(f"Project '{name}' created successfully with ID: {new_project['project_id']}.", CLIColors.SUCCESS))
         return new_project
     return None
 
 def find_project(identifier: str) -> Optional[Dict[str, Any]]:
     """Finds a project by its ID or name."""
-    projects = _load_projects()
+    repository = _projects_repository()
     # Try by ID first
-    for project in projects:
-        if project['project_id'] == identifier:
-            return project
+    project = repository.get(identifier)
+    if project is not None:
+        return project
     # Then try by name (case-insensitive)
-    for project in projects:
-        if project['name'].lower() == identifier.lower():
-            return project
-    return None
+    return repository.find_one({"name_key": identifier.lower()})
 
 def remove_project(identifier: str) -> bool:
     """Removes a project by its ID or name."""
-    projects = _load_projects()
     project_to_remove = find_project(identifier)
 
     if not project_to_remove:
         print(color_text(f"Project '{identifier}' not found.", CLIColors.ERROR_MESSAGE))
         return False
 
-    projects = [p for p in projects if p['project_id'] != project_to_remove['project_id']]
-    if _save_projects(projects):
+    if _projects_repository().delete(project_to_remove['project_id']):
+        invalidate_tag(PROJECTS_CACHE_TAG)
         print(color_text(f"Project '{project_to_remove['name']}' (ID: {project_to_remove['project_id']}) removed.", CLIColors.SUCCESS))
         return True
     return False
@@ -133,71 +132,54 @@ def update_project(identifier: str, new_name: Optional[str] = None, new_descript
         print(color_text("Error: No changes provided for update_project. Specify new_name and/or new_description.", CLIColors.ERROR_MESSAGE))
         return None
 
-    projects = _load_projects()
-    project_to_update = None
-    updated = False
-
     # Find the project first to get its ID for accurate conflict checking
-    current_project_obj = find_project(identifier)
-    if not current_project_obj:
+    project_to_update = find_project(identifier)
+    if not project_to_update:
         print(color_text(f"Error: Project '{identifier}' not found for update.", CLIColors.ERROR_MESSAGE))
         return None
 
-    current_project_id = current_project_obj['project_id']
+    current_project_id = project_to_update['project_id']
+    repository = _projects_repository()
 
     # If new_name is provided, check for name conflicts against other projects
-    if new_name is not None and new_name.lower() != current_project_obj['name'].lower(): # Only check if name is actually changing
-        if any(p['name'].lower() == new_name.lower() and p['project_id'] != current_project_id for p in projects):
+    if new_name is not None and new_name.lower() != project_to_update['name'].lower(): # Only check if name is actually changing
+        conflicting_project = repository.find_one({"name_key": new_name.lower()})
+        if conflicting_project and conflicting_project['project_id'] != current_project_id:
             print(color_text(f"Error: Another project with the name '{new_name}' already exists.", CLIColors.ERROR_MESSAGE))
             return None
 
-    for project_in_list in projects:
-        # Operate on the found project using its unique ID to avoid issues if identifier was a name
-        if project_in_list['project_id'] == current_project_id:
-            project_to_update = project_in_list # This is the actual object in the list to modify
-            if new_name is not None and project_to_update['name'] != new_name:
-                project_to_update['name'] = new_name
-                updated = True
-            if new_description is not None and project_to_update['description'] != new_description:
-                project_to_update['description'] = new_description
-                updated = True
-
-            if updated:
-                project_to_update['updated_at'] = datetime.now(timezone.utc).isoformat()
-            break
-
-    # This check should technically be redundant due to find_project above, but kept for safety.
-    if not project_to_update: # pragma: no cover
-        print(color_text(f"Project '{identifier}' (ID: {current_project_id}) not found in list for update (internal error).", CLIColors.ERROR_MESSAGE))
-        return None
+    updated = False
+    original_name = project_to_update['name']
+    if new_name is not None and project_to_update['name'] != new_name:
+        project_to_update['name'] = new_name
+        updated = True
+    if new_description is not None and project_to_update.get('description') != new_description:
+        project_to_update['description'] = new_description
+        updated = True
 
     if not updated:
-        print(color_text(f"No actual changes detected for project '{current_project_obj['name']}'. Name and description are the same.", CLIColors.WARNING_MESSAGE))
+        print(color_text(f"No actual changes detected for project '{original_name}'. Name and description are the same.", CLIColors.WARNING))
         return project_to_update # Return the project as is
 
-    if _save_projects(projects):
+    project_to_update['updated_at'] = datetime.now(timezone.utc).isoformat()
+    if repository.upsert(project_to_update):
+        invalidate_tag(PROJECTS_CACHE_TAG) # A renamed project is found under another name
         print(color_text(f"Project '{project_to_update['name']}' (ID: {current_project_id}) updated successfully.", CLIColors.SUCCESS))
         return project_to_update
     else: # pragma: no cover
-        print(color_text(f"Failed to save updates for project '{current_project_obj['name']}'.", CLIColors.ERROR_MESSAGE))
+        print(color_text(f"Failed to save updates for project '{original_name}'.", CLIColors.ERROR_MESSAGE))
         return None
 
 def update_project_status(identifier: str, new_status: str) -> bool:
     """Updates the status of a project."""
-    projects = _load_projects()
-    project_found = False
-    for project in projects:
-        if project['project_id'] == identifier or project['name'].lower() == identifier.lower():
-            project['status'] = new_status
-            project['updated_at'] = datetime.now(timezone.utc).isoformat()
-            project_found = True
-            break
-    
-    if not project_found:
+    project = find_project(identifier)
+    if not project:
         print(color_text(f"Project '{identifier}' not found for status update.", CLIColors.ERROR_MESSAGE))
         return False
 
-    if _save_projects(projects):
+    project['status'] = new_status
+    project['updated_at'] = datetime.now(timezone.utc).isoformat()
+    if _projects_repository().upsert(project):
         print(color_text(f"Status of project '{identifier}' updated to '{new_status}'.", CLIColors.SUCCESS))
         return True
     return False
@@ -205,16 +187,11 @@ def update_project_status(identifier: str, new_status: str) -> bool:
 
 def get_all_projects_summary_status() -> str:
     """Returns a summary string of all project statuses."""
-    projects = _load_projects()
-    if not projects:
+    status_counts = _projects_repository().count_by("status")
+    if not status_counts:
         return "No projects found."
-    
-    status_counts: Dict[str, int] = {}
-    for project in projects:
-        status = project.get('status', 'unknown')
-        status_counts[status] = status_counts.get(status, 0) + 1
-    
-    summary_lines = [f"Total Projects: {len(projects)}"]
+
+    summary_lines = [f"Total Projects: {sum(status_counts.values())}"]
     for status, count in status_counts.items():
         summary_lines.append(f"  - {status.capitalize()}: {count}")
     return "\n".join(summary_lines)
@@ -231,23 +208,16 @@ def get_all_projects_summary_status() -> str:
 # }
 def set_project_root_path(identifier: str, new_root_path: str) -> bool:
     """Sets or updates the root file path for a project."""
-    projects = _load_projects()
-    project_found = False
-
-    abs_new_root_path = os.path.abspath(new_root_path) # Store as absolute path
-
-    for project in projects:
-        if project['project_id'] == identifier or project['name'].lower() == identifier.lower():
-            project['root_path'] = abs_new_root_path
-            project['updated_at'] = datetime.now(timezone.utc).isoformat()
-            project_found = True
-            break
-
-    if not project_found:
+    project = find_project(identifier)
+    if not project:
         print(color_text(f"Project '{identifier}' not found for setting root path.", CLIColors.ERROR_MESSAGE))
         return False
 
-    if _save_projects(projects):
+    abs_new_root_path = os.path.abspath(new_root_path) # Store as absolute path
+    project['root_path'] = abs_new_root_path
+    project['updated_at'] = datetime.now(timezone.utc).isoformat()
+    if _projects_repository().upsert(project):
+        invalidate_tag(PROJECTS_CACHE_TAG) # Cached listings and reads of the old root are stale now
         print(color_text(f"Root path for project '{identifier}' set to '{abs_new_root_path}'.", CLIColors.SUCCESS))
         return True
     return False # pragma: no cover
@@ -265,11 +235,9 @@ def set_project_root_path(identifier: str, new_root_path: str) -> bool:
 if __name__ == "__main__": # pragma: no cover
     print("--- Testing Project Manager ---")
 
-    # Clean up projects.json before running tests if it exists
-    projects_file = get_projects_file_path()
-    if os.path.exists(projects_file):
-        os.remove(projects_file)
-        print(f"Removed existing '{PROJECTS_FILE_NAME}' for a clean test run.")
+    # Clear the projects table before running tests
+    _projects_repository().replace_all([])
+    print("Cleared existing projects for a clean test run.")
 
     print("\n--- Listing Projects (Initial) ---")
     print(list_projects())
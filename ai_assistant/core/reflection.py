@@ -2,19 +2,19 @@
 import datetime
 import re
 import json # For the simplistic check in to_serializable_dict
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Deque, Iterable
 import traceback # For serializing exception tracebacks
 import uuid
-import os # For os.path.exists and os.path.getsize
 from ai_assistant.config import is_debug_mode
 
-# Import the new functions and filepath from persistent_memory
-from ai_assistant.memory.persistent_memory import (
-    save_reflection_log_entries,
-    load_reflection_log_entries,
-    REFLECTION_LOG_FILEPATH # Import the default filepath
-)
+from ai_assistant.memory.persistent_memory import REFLECTION_LOG_FILEPATH # Legacy JSON log; migrated on first use
+from ai_assistant.memory.reflection_log_store import ReflectionLogStore, reflection_log_dir_for
+from ai_assistant.memory.blob_store import BlobRef, BLOB_REF_MARKER, is_blob_ref_dict
+
+# Number of most recent entries ReflectionLog keeps in memory; older ones are read from disk on demand.
+REFLECTION_LOG_RING_SIZE = 500
 
 @dataclass
 class ReflectionLogEntry:
@@ -41,23 +41,33 @@ class ReflectionLogEntry:
 
     def to_serializable_dict(self) -> Dict[str, Any]:
         """Converts the entry to a dictionary suitable for JSON serialization."""
-        serializable_results = []
-        for res in self.execution_results:
-            if isinstance(res, Exception):
-                # CHANGE 1: Store a structured dictionary for exceptions
-                serializable_results.append({
-                    "_is_error_representation_": True,  # Clear marker
-                    "error_type_name": type(res).__name__,
-                    "error_message_str": str(res),
-                    # Optionally add traceback for individual step errors if needed:
-                    # "error_traceback_snippet": traceback.format_exception_only(type(res), res)[-1].strip()
-                })
-            else:
-                try:
-                    json.dumps(res) # Check if directly serializable
-                    serializable_results.append(res)
-                except (TypeError, OverflowError):
-                    serializable_results.append(str(res)) # Fallback to string
+        serializable_results = None
+        if not any(isinstance(res, (Exception, BlobRef)) for res in self.execution_results):
+            try:
+                json.dumps(self.execution_results) # One check for the common, all-serializable case
+                serializable_results = list(self.execution_results)
+            except (TypeError, ValueError, OverflowError):
+                pass
+        if serializable_results is None:
+            serializable_results = []
+            for res in self.execution_results:
+                if isinstance(res, Exception):
+                    # CHANGE 1: Store a structured dictionary for exceptions
+                    serializable_results.append({
+                        "_is_error_representation_": True,  # Clear marker
+                        "error_type_name": type(res).__name__,
+                        "error_message_str": str(res),
+                        # Optionally add traceback for individual step errors if needed:
+                        # "error_traceback_snippet": traceback.format_exception_only(type(res), res)[-1].strip()
+                    })
+                elif isinstance(res, BlobRef):
+                    serializable_results.append(res.to_dict()) # Large results are logged by reference
+                else:
+                    try:
+                        json.dumps(res) # Check if directly serializable
+                        serializable_results.append(res)
+                    except (TypeError, ValueError, OverflowError):
+                        serializable_results.append(str(res)) # Fallback to string
 
         return {
             "goal_description": self.goal_description,
@@ -134,6 +144,8 @@ class ReflectionLogEntry:
                 res_str = ""
                 if isinstance(res_item, dict) and res_item.get("_is_error_representation_"):
                     res_str = f"Error: {res_item.get('error_type_name')}: {res_item.get('error_message_str')}"
+                elif is_blob_ref_dict(res_item):
+                    res_str = f"<blob {res_item[BLOB_REF_MARKER][:19]} ({res_item.get('size')} bytes): {res_item.get('preview', '')}"
                 else:
                     res_str = str(res_item)
 
@@ -216,61 +228,103 @@ class ReflectionLogEntry:
 
 
 class ReflectionLog:
-    """Manages a log of reflection entries with persistence."""
-    def __init__(self, filepath: str = REFLECTION_LOG_FILEPATH):
+    """
+    Manages a log of reflection entries with persistence.
+
+    Entries are appended to a segmented JSONL store (see ReflectionLogStore) as they are
+    added. Only the most recent `ring_size` entries are kept in memory (`log_entries`);
+    older ones are read from disk on demand by get_entries() and get_entry().
+    A filepath of ":memory:" keeps the log in memory only.
+    """
+    def __init__(self, filepath: str = REFLECTION_LOG_FILEPATH, ring_size: int = REFLECTION_LOG_RING_SIZE):
         self.filepath: str = filepath
-        self.log_entries: List[ReflectionLogEntry] = []
+        self.ring_size: int = ring_size
+        self.store: Optional[ReflectionLogStore] = None
+        if filepath != ":memory:":
+            self.store = ReflectionLogStore(reflection_log_dir_for(filepath), legacy_path=filepath)
+        self._log_entries: Deque[ReflectionLogEntry] = deque(maxlen=ring_size)
         self.load_log()
 
-    def load_log(self):
-        """Loads reflection log entries from the persistent file."""
-        if is_debug_mode():
-            print(f"ReflectionLog: Loading log from '{self.filepath}'...")
-        loaded_entry_dicts = load_reflection_log_entries(self.filepath)
-        temp_entries = []
-        for entry_data in loaded_entry_dicts:
+    @property
+    def log_entries(self) -> Deque[ReflectionLogEntry]:
+        """The most recent entries (at most ring_size), oldest first."""
+        return self._log_entries
+
+    @log_entries.setter
+    def log_entries(self, entries: Iterable[ReflectionLogEntry]) -> None:
+        """Replaces the in-memory recent entries. Entries already on disk are not changed."""
+        self._log_entries = deque(entries, maxlen=self.ring_size)
+
+    @staticmethod
+    def _deserialize_entries(entry_dicts: Iterable[Any]) -> List[ReflectionLogEntry]:
+        entries = []
+        for entry_data in entry_dicts:
             if not isinstance(entry_data, dict):
                 # This is a warning, so it should probably always print or use logger.warning
                 print(f"ReflectionLog: Warning - Skipping non-dictionary item in loaded log data: {str(entry_data)[:100]}...")
                 continue
             try:
-                temp_entries.append(ReflectionLogEntry.from_serializable_dict(entry_data))
+                entries.append(ReflectionLogEntry.from_serializable_dict(entry_data))
             except Exception as e:
                 print(f"ReflectionLog: Error deserializing entry data: '{str(entry_data)[:100]}...'. Error: {e}. Skipping.")
-        self.log_entries = temp_entries
+        return entries
+
+    def load_log(self):
+        """Loads the most recent ring_size entries from the persistent store."""
+        if self.store is None:
+            return
+        if is_debug_mode():
+            print(f"ReflectionLog: Loading log from '{self.store.directory}'...")
+        recent_entry_dicts = self.store.tail(self.ring_size)
+        self.log_entries = self._deserialize_entries(reversed(recent_entry_dicts))
         if is_debug_mode():
-            print(f"ReflectionLog: Loaded {len(self.log_entries)} entries from '{self.filepath}'.")
-        if not self.log_entries and os.path.exists(self.filepath) and os.path.getsize(self.filepath) > 0:
-             print(f"ReflectionLog: Warning - File '{self.filepath}' exists and is not empty, but no valid log entries were loaded. The file might be corrupted or in an old format.")
+            print(f"ReflectionLog: Loaded {len(self.log_entries)} recent entries from '{self.store.directory}'.")
+        if recent_entry_dicts and not self.log_entries:
+            print(f"ReflectionLog: Warning - No valid log entries could be loaded from '{self.store.directory}'. The log might be corrupted.")
 
     def save_log(self):
-        """Saves the current reflection log entries to the persistent file."""
+        """Makes sure every added entry is durable on disk. Entries are written as they are added."""
+        if self.store is None:
+            return
         if is_debug_mode():
-            print(f"ReflectionLog: Attempting to save {len(self.log_entries)} log entries to '{self.filepath}'...")
-        entries_to_save = []
-        for entry in self.log_entries:
-            try:
-                entries_to_save.append(entry.to_serializable_dict())
-            except Exception as e:
-                print(f"ReflectionLog: Error serializing entry for goal '{entry.goal_description}'. Error: {e}. Skipping this entry for save.")
-
-        if save_reflection_log_entries(self.filepath, entries_to_save):
-            if is_debug_mode():
-                print(f"ReflectionLog: Successfully saved {len(entries_to_save)} entries to '{self.filepath}'.")
-        else:
-            print(f"ReflectionLog: Failed to save log entries to '{self.filepath}'.")
+            print(f"ReflectionLog: Flushing log to '{self.store.directory}'...")
+        try:
+            self.store.flush()
+        except OSError as e:
+            print(f"ReflectionLog: Failed to flush log to '{self.store.directory}'. Error: {e}")
 
     def add_entry(self, entry: ReflectionLogEntry):
-        """Appends a new entry to the in-memory log."""
+        """Appends a new entry to the in-memory ring and the persistent store."""
         self.log_entries.append(entry)
-        # Save the log immediately after adding an entry
-        self.save_log()
+        if self.store is None:
+            return
+        try:
+            self.store.append(entry.to_serializable_dict())
+        except Exception as e:
+            print(f"ReflectionLog: Error saving entry for goal '{entry.goal_description}'. Error: {e}")
 
     def get_entries(self, limit: int = 10) -> List[ReflectionLogEntry]:
-        """Returns the last 'limit' entries from the in-memory log."""
+        """Returns the last 'limit' entries, oldest first. Entries older than the in-memory ring are read from disk."""
         if limit <= 0:
             return []
-        return self.log_entries[-limit:]
+        recent = list(self.log_entries)
+        if limit <= len(recent) or len(recent) < self.ring_size or self.store is None:
+            return recent[-limit:]
+        older_entry_dicts = self.store.tail(limit)[len(recent):]
+        return self._deserialize_entries(reversed(older_entry_dicts)) + recent
+
+    def get_entry(self, entry_id: str) -> Optional[ReflectionLogEntry]:
+        """Returns the entry with `entry_id`, from memory or via the store's id index, or None."""
+        for entry in reversed(self.log_entries):
+            if entry.entry_id == entry_id:
+                return entry
+        if self.store is None:
+            return None
+        entry_data = self.store.get(entry_id)
+        if entry_data is None:
+            return None
+        entries = self._deserialize_entries([entry_data])
+        return entries[0] if entries else None
 
     def log_execution(
         self,
@@ -351,30 +405,28 @@ class ReflectionLog:
             commit_info=commit_info
         )
         self.add_entry(entry)
+        for result in execution_results:
+            if isinstance(result, BlobRef):
+                result.store.acquire(result) # The persisted entry now refers to it
         return entry # Return the created entry
 
 global_reflection_log = ReflectionLog()
 
-_STOP_WORDS = set([
-    "a", "an", "the", "is", "are", "was", "were", "be", "been", "being",
-    "have", "has", "had", "do", "does", "did", "will", "would", "should", "can",
-    "could", "may", "might", "must", "and", "or", "but", "if", "because", "as",
-    "until", "while", "of", "at", "by", "for", "with", "about", "against",
-    "between", "into", "through", "during", "before", "after", "above", "below",
-    "to", "from", "up", "down", "in", "out", "on", "off", "over", "under",
-    "again", "further", "then", "once", "here", "there", "when", "where", "why",
-    "how", "all", "any", "both", "each", "few", "more", "most", "other", "some",
-    "such", "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very",
-    "s", "t", "can", "will", "just", "don", "should", "now", "tool", "function",
-    "input", "inputs", "output", "outputs", "args", "str", "int", "float", "list",
-    "returns", "calculates", "performs", "executes", "given", "specified"
-])
-
-def _extract_keywords(text: str) -> set:
-    if not text:
-        return set()
-    words = re.findall(r'\b\w+\b', text.lower())
-    return {word for word in words if word not in _STOP_WORDS and len(word) > 2}
+def _find_alternative_tools(failed_tool_name: str, tool_registry: Dict[str, str], top_k: int = 2) -> List[Dict[str, Any]]:
+    """Ranks the other registered tools by embedding similarity to the failed tool's name and description."""
+    from ai_assistant.config import TOOL_ALTERNATIVE_MIN_SIMILARITY
+    from ai_assistant.memory.vector_index import get_vector_index
+
+    tool_index = get_vector_index("tool_descriptions")
+    tool_index.sync({name: f"{name}: {description}" for name, description in tool_registry.items()})
+    failed_tool_text = f"{failed_tool_name}: {tool_registry.get(failed_tool_name, '')}"
+    matches = tool_index.query(
+        [failed_tool_text], top_k=top_k + 1, min_score=TOOL_ALTERNATIVE_MIN_SIMILARITY
+    )[0]
+    return [
+        {"name": name, "description": tool_registry[name], "score": score}
+        for name, score in matches if name != failed_tool_name
+    ][:top_k]
 
 LLM_FAILURE_ANALYSIS_PROMPT = """The AI assistant encountered an issue in its last operation. Please analyze the details and provide insights.
 Original Goal: {goal}
@@ -398,6 +450,7 @@ Response:
 def analyze_last_failure(tool_registry: Dict[str, str], ollama_model_name: Optional[str] = None) -> Optional[str]:
     from ai_assistant.llm_interface.ollama_client import invoke_ollama_model
     from ai_assistant.config import get_model_for_task
+    from ai_assistant.tools.tool_catalog import render_tools_json
 
     model_to_use = ollama_model_name if ollama_model_name is not None else get_model_for_task("reflection")
 
@@ -416,7 +469,7 @@ def analyze_last_failure(tool_registry: Dict[str, str], ollama_model_name: Optio
     except TypeError:
         plan_str = str(last_entry.plan) + " (Note: Plan contained non-serializable data)"
     try:
-        tools_json_str = json.dumps(tool_registry, indent=2)
+        tools_json_str = render_tools_json(tool_registry)
     except TypeError:
         tools_json_str = str(tool_registry) + " (Note: Tool registry contained non-serializable data)"
 
@@ -457,23 +510,15 @@ def analyze_last_failure(tool_registry: Dict[str, str], ollama_model_name: Optio
 
         error_msg_display = str(last_entry.error_message) if last_entry.error_message else last_entry.error_type
         if failed_tool_name and failed_tool_name in tool_registry:
-            failed_tool_keywords = _extract_keywords(tool_registry.get(failed_tool_name, "") + " " + failed_tool_name)
-            alternatives = []
-            if failed_tool_keywords:
-                for name, description in tool_registry.items():
-                    if name == failed_tool_name: continue
-                    common_keywords = failed_tool_keywords.intersection(_extract_keywords(description + " " + name))
-                    if common_keywords:
-                        alternatives.append({"name": name, "description": description, "score": len(common_keywords), "common": list(common_keywords)})
-                alternatives.sort(key=lambda x: x["score"], reverse=True)
+            alternatives = _find_alternative_tools(failed_tool_name, tool_registry)
             if alternatives:
-                suggestion_str = f"LLM analysis failed. Fallback keyword analysis for tool '{failed_tool_name}' (Error: {error_msg_display}):\n"
+                suggestion_str = f"LLM analysis failed. Fallback similarity analysis for tool '{failed_tool_name}' (Error: {error_msg_display}):\n"
                 suggestion_str += "Possible alternatives:\n"
-                for alt in alternatives[:2]:
-                    suggestion_str += f"  - '{alt['name']}': {alt['description']} (Common: {alt['common']})\n"
+                for alt in alternatives:
+                    suggestion_str += f"  - '{alt['name']}': {alt['description']} (Similarity: {alt['score']:.2f})\n"
                 return suggestion_str.strip()
             else:
-                return f"LLM analysis failed. Fallback: Tool '{failed_tool_name}' failed (Error: {error_msg_display}). No keyword-based alternatives found."
+                return f"LLM analysis failed. Fallback: Tool '{failed_tool_name}' failed (Error: {error_msg_display}). No similar alternative tools found."
         else:
             return f"LLM analysis failed. Fallback: The operation failed (Error: {error_msg_display}). Review the plan and tool descriptions for alternatives."
 
@@ -77,14 +77,18 @@ Now, please review the provided code.
 """
 
 class ReviewerAgent:
-    def __init__(self, llm_model_name: Optional[str] = None):
+    def __init__(self, llm_model_name: Optional[str] = None, coalesce: bool = True):
         """
         Initializes the ReviewerAgent.
         Args:
             llm_model_name: Optional name of the LLM model to use for reviews.
                             If None, it will be determined by `get_model_for_task`.
+            coalesce: If True, a review whose prompt is identical to one already in flight
+                      (e.g. the second critic of a CriticalReviewCoordinator) shares its LLM call.
+                      Pass False for an independent sample.
         """
         self.llm_model_name = llm_model_name if llm_model_name else get_model_for_task("code_reviewer")
+        self.coalesce = coalesce
         if not self.llm_model_name:
             # Fallback if "code_reviewer" is not defined
             self.llm_model_name = get_model_for_task("general_purpose_llm") # Or another capable model like "code_generation"
@@ -151,7 +155,8 @@ class ReviewerAgent:
             llm_response_str = await invoke_ollama_model_async(
                 prompt,
                 model_name=self.llm_model_name,
-                temperature=0.2
+                temperature=0.2,
+                coalesce=self.coalesce
             )
 
             if not llm_response_str or not llm_response_str.strip():
@@ -14,6 +14,7 @@ import asyncio # For running the async review process
 from unittest.mock import patch, AsyncMock # For __main__ block mocking
 from typing import Optional, Dict, Any # Ensure Optional, Dict, Any are imported for type hints
 from .task_manager import TaskManager, ActiveTaskStatus, ActiveTaskType
+from ai_assistant.tools.tool_result_cache import invalidate_path
 
 
 # Configure logger for this module
@@ -229,6 +230,7 @@ async def edit_function_source_code(module_path: str, function_name: str, new_co
         _update_parent_task(task_manager, parent_task_id, ActiveTaskStatus.APPLYING_CHANGES, step_desc="Writing modified code to file")
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(new_source_code)
+        invalidate_path(file_path) # e.g. cached find_agent_tool_source results
         
         success_step_desc = f"Code for '{function_name}' in '{module_path}' successfully written to disk."
         _update_parent_task(task_manager, parent_task_id, ActiveTaskStatus.APPLYING_CHANGES, step_desc=success_step_desc)
@@ -418,6 +420,7 @@ async def edit_project_file(
     try:
         with open(absolute_file_path, 'w', encoding='utf-8') as f:
             f.write(new_content)
+        invalidate_path(absolute_file_path)
         logger.info(f"Successfully wrote content to project file: '{absolute_file_path}'.")
         _update_p_task(ActiveTaskStatus.APPLYING_CHANGES, step_desc=f"Content written to {os.path.basename(absolute_file_path)} successfully.")
         return f"Project file '{absolute_file_path}' updated successfully after review."
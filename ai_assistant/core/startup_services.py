@@ -1,31 +1,86 @@
 # ai_assistant/core/startup_services.py
 import asyncio
 import logging # For logging in the future, using print for now
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from .task_manager import TaskManager, ActiveTask, ActiveTaskStatus, ActiveTaskType
 from .notification_manager import NotificationManager, NotificationType
+from ..config import PLAN_STEP_CHECKPOINTS_ENABLED
+from ..llm_interface.request_scheduler import PRIORITY_BACKGROUND, set_llm_priority
+from ..memory.blob_store import get_blob_store
+from ..memory.step_checkpoints import get_step_checkpoint_store
 
 # Placeholder for ActionExecutor if needed in more advanced resumption
 # from ..execution.action_executor import ActionExecutor
 
 logger = logging.getLogger(__name__)
 
+# Hierarchical project tasks in these states were executing their plan when the agent stopped
+RESUMABLE_PROJECT_PLAN_STATUSES = [ActiveTaskStatus.INITIALIZING, ActiveTaskStatus.EXECUTING_PROJECT_PLAN]
+
+# Strong references to the background runs of resumed project plans
+_resumed_project_plan_runs: "set[asyncio.Task]" = set()
+
+
+async def _resume_project_plan(
+    task: ActiveTask,
+    task_manager: TaskManager,
+    notification_manager: Optional[NotificationManager]
+) -> Dict[str, Any]:
+    """Re-runs a task's project plan; steps checkpointed before the interruption are skipped."""
+    from ..custom_tools.project_execution_tools import execute_project_plan # Imported lazily; it pulls in the project tools
+
+    set_llm_priority(PRIORITY_BACKGROUND) # Runs in its own task; nobody is waiting on it interactively
+    result = await asyncio.to_thread(
+        execute_project_plan,
+        task.details.get("project_plan", []),
+        task.task_id,
+        task_manager,
+        task.details.get("project_name")
+    )
+    overall_status = result.get("overall_status")
+    restored_steps = sum(1 for step in result.get("step_results", []) if step.get("restored_from_checkpoint"))
+    summary = f"Resumed project plan finished with status '{overall_status}' ({restored_steps} step(s) restored from checkpoints)."
+    print(f"StartupServices: Task {task.task_id}: {summary}")
+
+    # execute_project_plan left the task COMPLETED_SUCCESSFULLY (which notifies) or PROJECT_PLAN_FAILED_STEP
+    if notification_manager and overall_status not in ["success", "partial_success"]:
+        notification_manager.add_notification(
+            NotificationType.TASK_FAILED_UNKNOWN,
+            f"Task '{task.description[:50]}...' (ID: {task.task_id}): {summary}",
+            related_item_id=task.task_id,
+            related_item_type="task"
+        )
+    return result
+
+
 async def resume_interrupted_tasks(
     task_manager: TaskManager,
-    notification_manager: Optional[NotificationManager] = None
+    notification_manager: Optional[NotificationManager] = None,
+    resume_project_plans: bool = True
     # action_executor: Optional[ActionExecutor] = None # If direct re-execution is attempted
-):
+) -> List["asyncio.Task"]:
     """
     Checks for tasks that were active during the last session and might have been interrupted.
-    Marks them as FAILED_INTERRUPTED. Future enhancements could attempt more sophisticated resumption.
+    Hierarchical project tasks that were executing their plan are resumed in the background:
+    their completed steps are restored from step checkpoints and execution continues at the
+    first incomplete step. Other interrupted tasks are marked as FAILED_INTERRUPTED.
 
     Args:
         task_manager: The TaskManager instance with loaded tasks.
         notification_manager: Optional NotificationManager to send notifications.
+        resume_project_plans: If False, interrupted project plans are marked as interrupted too.
+
+    Returns:
+        The asyncio tasks running the resumed project plans.
     """
     print("StartupServices: Checking for interrupted tasks...") # Replace with logger.info
     interrupted_tasks_found = 0
+    resumed_runs: List[asyncio.Task] = []
+    resume_project_plans = resume_project_plans and PLAN_STEP_CHECKPOINTS_ENABLED
+    if resume_project_plans:
+        get_step_checkpoint_store().prune_expired()
+    get_blob_store().gc() # No run is in flight yet: drop large results nothing refers to any more
 
     # TaskManager loads tasks in its __init__. We just list them here.
     # Define statuses that indicate a task was in progress and not yet finished.
@@ -44,7 +99,19 @@ async def resume_interrupted_tasks(
     active_tasks_on_startup = task_manager.list_active_tasks(status_filter=None)
 
     for task in active_tasks_on_startup:
-        if task.status in non_terminal_statuses:
+        if (resume_project_plans and task.task_type == ActiveTaskType.HIERARCHICAL_PROJECT_EXECUTION and
+                task.status in RESUMABLE_PROJECT_PLAN_STATUSES and task.details.get("project_plan")):
+            print(f"StartupServices: Task {task.task_id} ('{task.description[:30]}...') was executing its project plan; resuming it from its checkpoints.")
+            task_manager.update_task_status(
+                task.task_id,
+                ActiveTaskStatus.EXECUTING_PROJECT_PLAN,
+                step_desc="Resuming project plan after agent restart."
+            )
+            run = asyncio.create_task(_resume_project_plan(task, task_manager, notification_manager))
+            _resumed_project_plan_runs.add(run)
+            run.add_done_callback(_resumed_project_plan_runs.discard)
+            resumed_runs.append(run)
+        elif task.status in non_terminal_statuses:
             interrupted_tasks_found += 1
             original_status = task.status
             reason = f"Task was in state '{original_status.name}' and agent shutdown occurred."
@@ -66,10 +133,11 @@ async def resume_interrupted_tasks(
                     related_item_type="task"
                 )
 
-    if interrupted_tasks_found == 0:
+    if interrupted_tasks_found == 0 and not resumed_runs:
         print("StartupServices: No potentially interrupted tasks found.") # Replace with logger.info
     else:
-        print(f"StartupServices: Processed {interrupted_tasks_found} potentially interrupted task(s).") # Replace with logger.info
+        print(f"StartupServices: Processed {interrupted_tasks_found} potentially interrupted task(s); resumed {len(resumed_runs)} project plan(s).") # Replace with logger.info
+    return resumed_runs
 
 
 if __name__ == '__main__': # pragma: no cover
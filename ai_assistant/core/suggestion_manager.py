@@ -4,43 +4,20 @@ import uuid
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional # TYPE_CHECKING removed
 
-from ai_assistant.config import get_data_dir
+from ai_assistant.config import get_data_dir, SUGGESTION_DEDUP_SIMILARITY_THRESHOLD
+from ai_assistant.memory.structured_store import Repository, get_structured_store, structured_store_path_for
+from ai_assistant.memory.vector_index import get_vector_index
 from ai_assistant.utils.display_utils import CLIColors, color_text
 from .notification_manager import NotificationManager, NotificationType # NotificationManager added to direct imports
 
 SUGGESTIONS_FILE_NAME = "suggestions.json"
+SUGGESTIONS_TABLE = "suggestions"
 
 def get_suggestions_file_path() -> str:
     return os.path.join(get_data_dir(), SUGGESTIONS_FILE_NAME)
 
-def _load_suggestions() -> List[Dict[str, Any]]:
-    """Loads suggestions from the JSON file."""
-    filepath = get_suggestions_file_path()
-    if not os.path.exists(filepath):
-        # Create a dummy suggestions file if it doesn't exist for demo purposes
-        print(color_text(f"Suggestions file not found at {filepath}. Creating a dummy file.", CLIColors.SYSTEM_MESSAGE))
-        dummy_suggestions = [
-            {
-                "suggestion_id": str(uuid.uuid4()),
-                "type": "tool_improvement",
-                "description": "Consider adding a 'search_web_archive' tool for historical data.",
-                "status": "pending",
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-                "reason_for_status": ""
-            },
-            {
-                "suggestion_id": str(uuid.uuid4()),
-                "type": "fact_learning",
-                "description": "The agent could learn common shell commands and their uses.",
-                "status": "pending",
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-                "reason_for_status": ""
-            }
-        ]
-        _save_suggestions(dummy_suggestions)
-        return dummy_suggestions
+def _load_legacy_suggestions(filepath: str) -> Optional[List[Dict[str, Any]]]:
+    """Reads the legacy suggestions JSON file for migration. Returns None if it cannot be read."""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -49,49 +26,74 @@ def _load_suggestions() -> List[Dict[str, Any]]:
             return json.loads(content)
     except (IOError, json.JSONDecodeError) as e:
         print(color_text(f"Error loading suggestions: {e}", CLIColors.ERROR_MESSAGE))
-        return []
+        return None
 
-def _save_suggestions(suggestions: List[Dict[str, Any]]) -> bool:
-    """Saves suggestions to the JSON file."""
+def _suggestions_repository() -> Repository:
+    """The suggestions table, indexed by status, type and creation time."""
     filepath = get_suggestions_file_path()
-    try:
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(suggestions, f, indent=4)
-        return True
-    except IOError as e:
-        print(color_text(f"Error saving suggestions: {e}", CLIColors.ERROR_MESSAGE))
-        return False
-
-def list_suggestions() -> List[Dict[str, Any]]:
-    """Returns a list of all suggestions."""
-    return _load_suggestions()
+    return get_structured_store(structured_store_path_for(filepath)).repository(
+        SUGGESTIONS_TABLE, "suggestion_id",
+        columns={
+            "status": lambda s: s.get('status', 'unknown'),
+            "type": lambda s: s.get('type'),
+            "created_at": lambda s: s.get('created_at'),
+        },
+        legacy_path=filepath, legacy_loader=_load_legacy_suggestions
+    )
+
+def _create_dummy_suggestions(repository: Repository) -> List[Dict[str, Any]]:
+    """Stores a couple of demo suggestions when there are none yet."""
+    print(color_text(f"No suggestions found in {repository.store.db_path}. Creating dummy suggestions.", CLIColors.SYSTEM_MESSAGE))
+    dummy_suggestions = [
+        {
+            "suggestion_id": str(uuid.uuid4()),
+            "type": "tool_improvement",
+            "description": "Consider adding a 'search_web_archive' tool for historical data.",
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "reason_for_status": ""
+        },
+        {
+            "suggestion_id": str(uuid.uuid4()),
+            "type": "fact_learning",
+            "description": "The agent could learn common shell commands and their uses.",
+            "status": "pending",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "reason_for_status": ""
+        }
+    ]
+    repository.upsert_many(dummy_suggestions)
+    return dummy_suggestions
+
+def list_suggestions(status: Optional[str] = None, suggestion_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Returns all suggestions, or those with the given status and/or type."""
+    repository = _suggestions_repository()
+    if repository.count() == 0:
+        _create_dummy_suggestions(repository)
+    where: Dict[str, Any] = {}
+    if status is not None:
+        where["status"] = status
+    if suggestion_type is not None:
+        where["type"] = suggestion_type
+    return repository.find(where)
 
 def find_suggestion(suggestion_id: str) -> Optional[Dict[str, Any]]:
     """Finds a suggestion by its ID."""
-    suggestions = _load_suggestions()
-    for suggestion in suggestions:
-        if suggestion['suggestion_id'] == suggestion_id:
-            return suggestion
-    return None
+    return _suggestions_repository().get(suggestion_id)
 
 def _update_suggestion_status(suggestion_id: str, new_status: str, reason: Optional[str] = None) -> bool:
     """Internal helper to update suggestion status."""
-    suggestions = _load_suggestions()
-    suggestion_found = False
-    for suggestion in suggestions:
-        if suggestion['suggestion_id'] == suggestion_id:
-            suggestion['status'] = new_status
-            suggestion['reason_for_status'] = reason or suggestion.get('reason_for_status', '')
-            suggestion['updated_at'] = datetime.now(timezone.utc).isoformat()
-            suggestion_found = True
-            break
-    
-    if not suggestion_found:
+    suggestion = find_suggestion(suggestion_id)
+    if not suggestion:
         print(color_text(f"Suggestion with ID '{suggestion_id}' not found.", CLIColors.ERROR_MESSAGE))
         return False
 
-    if _save_suggestions(suggestions):
+    suggestion['status'] = new_status
+    suggestion['reason_for_status'] = reason or suggestion.get('reason_for_status', '')
+    suggestion['updated_at'] = datetime.now(timezone.utc).isoformat()
+    if _suggestions_repository().upsert(suggestion):
         print(color_text(f"Status of suggestion '{suggestion_id}' updated to '{new_status}'.", CLIColors.SUCCESS))
         # Notification logic will be added to the public-facing functions
         return True
@@ -144,16 +146,11 @@ def mark_suggestion_implemented(suggestion_id: str, reason: Optional[str] = "Suc
 
 def get_suggestions_summary_status() -> str:
     """Returns a summary string of all suggestion statuses."""
-    suggestions = _load_suggestions()
-    if not suggestions:
+    status_counts = _suggestions_repository().count_by("status")
+    if not status_counts:
         return "No suggestions found."
-    
-    status_counts: Dict[str, int] = {}
-    for suggestion in suggestions:
-        status = suggestion.get('status', 'unknown')
-        status_counts[status] = status_counts.get(status, 0) + 1
-    
-    summary_lines = [f"Total Suggestions: {len(suggestions)}"]
+
+    summary_lines = [f"Total Suggestions: {sum(status_counts.values())}"]
     for status, count in status_counts.items():
         summary_lines.append(f"  - {status.capitalize()}: {count}")
     return "\n".join(summary_lines)
@@ -163,6 +160,21 @@ def _normalize_description(description: str) -> str:
     return description.lower().strip()
 
 # Example of how a new suggestion might be added internally by the system
+SUGGESTIONS_VECTOR_INDEX_NAME = "suggestions"
+
+def _find_semantic_duplicate(description: str, suggestions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Returns the existing suggestion whose description embedding is closest to `description`, if above the dedup threshold."""
+    suggestion_index = get_vector_index(SUGGESTIONS_VECTOR_INDEX_NAME)
+    suggestion_index.sync({
+        suggestion["suggestion_id"]: suggestion.get("description", "")
+        for suggestion in suggestions if suggestion.get("suggestion_id")
+    })
+    matches = suggestion_index.query([description], top_k=1, min_score=SUGGESTION_DEDUP_SIMILARITY_THRESHOLD)[0]
+    if not matches:
+        return None
+    matched_id = matches[0][0]
+    return next((suggestion for suggestion in suggestions if suggestion.get("suggestion_id") == matched_id), None)
+
 def add_new_suggestion(
     type: str,
     description: str,
@@ -171,10 +183,12 @@ def add_new_suggestion(
 ) -> Optional[Dict[str, Any]]:
     """
     Adds a new suggestion to the system (typically called by AI components).
-    Performs deduplication based on normalized description.
+    Performs deduplication based on normalized description, then on embedding
+    similarity (SUGGESTION_DEDUP_SIMILARITY_THRESHOLD) to catch near-duplicates.
     Links to a source reflection ID if provided.
     """
-    suggestions = _load_suggestions()
+    repository = _suggestions_repository()
+    suggestions = repository.find()
     normalized_new_description = _normalize_description(description)
 
     for existing_suggestion in suggestions:
@@ -183,6 +197,11 @@ def add_new_suggestion(
             print(color_text(f"Duplicate suggestion detected. New: '{description}' matches existing ID '{existing_suggestion['suggestion_id']}' with description '{existing_suggestion['description']}'. Not adding.", CLIColors.INFO_MESSAGE))
             return existing_suggestion # Return the existing one
 
+    similar_suggestion = _find_semantic_duplicate(description, suggestions)
+    if similar_suggestion:
+        print(color_text(f"Near-duplicate suggestion detected. New: '{description}' is similar to existing ID '{similar_suggestion['suggestion_id']}' with description '{similar_suggestion['description']}'. Not adding.", CLIColors.INFO_MESSAGE))
+        return similar_suggestion
+
     new_suggestion = {
         "suggestion_id": str(uuid.uuid4()),
         "type": type,
@@ -193,8 +212,7 @@ def add_new_suggestion(
         "reason_for_status": "",
         "source_reflection_id": source_reflection_id # Add this line
     }
-    suggestions.append(new_suggestion)
-    if _save_suggestions(suggestions):
+    if repository.upsert(new_suggestion):
         if notification_manager:
             notification_manager.add_notification(
                 event_type=NotificationType.NEW_SUGGESTION_CREATED_AI, # Or a more specific type if available
@@ -204,20 +222,18 @@ def add_new_suggestion(
                 details_payload=new_suggestion # Send full suggestion as details
             )
         return new_suggestion
-    return None # Should not happen if _save_suggestions is successful
+    return None # Should not happen if the suggestion was stored
 
 if __name__ == "__main__": # pragma: no cover
     from .notification_manager import NotificationManager # For __main__ test
     print("--- Testing Suggestion Manager ---")
 
-    # Clean up suggestions.json before running tests if it exists
-    suggestions_file = get_suggestions_file_path()
-    if os.path.exists(suggestions_file):
-        os.remove(suggestions_file)
-        print(f"Removed existing '{SUGGESTIONS_FILE_NAME}' for a clean test run.")
+    # Clear the suggestions table before running tests
+    _suggestions_repository().replace_all([])
+    print("Cleared existing suggestions for a clean test run.")
 
     print("\n--- Listing Suggestions (Initial, after dummy creation) ---")
-    initial_loaded_suggestions = list_suggestions() # This will trigger dummy creation if file was removed
+    initial_loaded_suggestions = list_suggestions() # This will trigger dummy creation as the table is empty
     for s in initial_loaded_suggestions:
         print(f"- {s['suggestion_id']}: {s['description'][:50]}... ({s['status']})")
 
@@ -265,7 +281,7 @@ if __name__ == "__main__": # pragma: no cover
 
     # Check that no new suggestions were added for duplicates
     # Initial dummy + sugg1 + sugg2 = expected count
-    # The number of initial dummies can vary if _load_suggestions creates them.
+    # The number of initial dummies can vary if list_suggestions creates them.
     # Let's count based on descriptions added in this test run.
     unique_descs_added_in_run = {sugg1_desc.strip(), sugg2_desc.strip()}
     # Count how many of these are in the final list (should be all of them)
@@ -178,9 +178,7 @@ class SuggestionProcessor:
             batch_task = self.task_manager.add_task(task_type=task_type, description=batch_task_description)
             batch_task_id = batch_task.task_id
 
-        pending_suggestions = [
-            s for s in list_suggestions() if s.get("status") == "pending" and s.get("type") == "tool_improvement"
-        ]
+        pending_suggestions = list_suggestions(status="pending", suggestion_type="tool_improvement")
         if not pending_suggestions:
             print("SuggestionProcessor: No pending tool improvement suggestions to process.")
             self._update_task_if_manager(batch_task_id, ActiveTaskStatus.COMPLETED_SUCCESSFULLY, reason="No pending tool improvement suggestions found.")
@@ -293,8 +291,8 @@ if __name__ == '__main__': # pragma: no cover
 
                 # Add a dummy suggestion to process if the file is empty or doesn't exist
                 # This ensures _identify_target_tool_from_suggestion has something to work with
-                # Note: _load_suggestions in suggestion_manager already creates dummy suggestions
-                # if the file is not found, so this might not be strictly necessary unless
+                # Note: list_suggestions in suggestion_manager already creates dummy suggestions
+                # if there are none yet, so this might not be strictly necessary unless
                 # we want a very specific suggestion for this test.
 
                 print("Attempting to process pending suggestions (limit 1)...")
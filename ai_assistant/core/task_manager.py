@@ -154,8 +154,14 @@ class ActiveTask:
         )
 
 ACTIVE_TASKS_FILE_NAME = "active_tasks.json"
+# Suffix of the append-only journal of task changes not yet in the snapshot (active_tasks.json.journal).
+ACTIVE_TASKS_JOURNAL_SUFFIX = ".journal"
+import functools
 import os
 import json
+import threading
+import time
+from ai_assistant.config import TASK_STATE_COALESCE_SECONDS
 from .notification_manager import NotificationManager, NotificationType
 
 
@@ -170,8 +176,32 @@ def _ensure_data_dir_exists():
     return data_dir
 
 
+def _synchronized(method):
+    """Runs a TaskManager method under the manager's lock."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class TaskManager:
-    def __init__(self, notification_manager: Optional['NotificationManager'] = None, filepath: Optional[str] = None):
+    """
+    Tracks active tasks and persists them with write-behind.
+
+    Every change is appended to a journal (one JSON record per line) next to the
+    active tasks file, which makes recovery after a crash lossless. The snapshot
+    (active_tasks.json) is rewritten atomically at most once per `coalesce_seconds`,
+    whenever a task reaches a terminal status, and on flush(); the journal is
+    emptied after each snapshot. On load the snapshot is read and the journal
+    replayed on top of it.
+
+    Tasks are updated from worker threads (project plans run on the tool thread
+    pool, resumed tasks via asyncio.to_thread), so the task table, the journal
+    handle and the snapshot are only touched under a reentrant lock.
+    """
+    def __init__(self, notification_manager: Optional['NotificationManager'] = None, filepath: Optional[str] = None,
+                 coalesce_seconds: Optional[float] = None):
         self._active_tasks: Dict[str, ActiveTask] = {}
         self._completed_tasks_archive: List[ActiveTask] = []
         self._archive_limit = 100
@@ -179,9 +209,16 @@ class TaskManager:
 
         _ensure_data_dir_exists()
         self.active_tasks_filepath = filepath or os.path.join(get_data_dir(), ACTIVE_TASKS_FILE_NAME)
+        self.journal_filepath = self.active_tasks_filepath + ACTIVE_TASKS_JOURNAL_SUFFIX
+        self.coalesce_seconds = TASK_STATE_COALESCE_SECONDS if coalesce_seconds is None else coalesce_seconds
+        self._lock = threading.RLock()
+        self._journal_file = None
+        self._journal_records = 0 # Changes journaled since the last snapshot
+        self._last_snapshot_at: Optional[float] = None
         self._load_active_tasks()
 
 
+    @_synchronized
     def _load_active_tasks(self):
         try:
             if os.path.exists(self.active_tasks_filepath) and os.path.getsize(self.active_tasks_filepath) > 0:
@@ -202,18 +239,96 @@ class TaskManager:
             print(f"TaskManager: Error loading active tasks from '{self.active_tasks_filepath}': {e}. Initializing empty task list.")
             self._active_tasks = {}
 
+        if self._replay_journal():
+            self._save_active_tasks() # Fold the replayed changes into the snapshot
+
+    def _replay_journal(self) -> int:
+        """Applies the journaled changes that did not reach the snapshot. Returns the number of records applied."""
+        if not os.path.exists(self.journal_filepath):
+            return 0
+        applied = 0
+        try:
+            with open(self.journal_filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        op = record["op"]
+                        if op == "upsert":
+                            task = ActiveTask.from_dict(record["task"])
+                            self._active_tasks[task.task_id] = task
+                        elif op == "remove":
+                            self._active_tasks.pop(record["task_id"], None)
+                        elif op == "clear":
+                            self._active_tasks.clear()
+                        else:
+                            continue
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        continue # Torn last line of a crashed session, or a corrupted record
+                    applied += 1
+        except IOError as e: # pragma: no cover
+            print(f"TaskManager: Error reading task journal '{self.journal_filepath}': {e}")
+        if applied:
+            print(f"TaskManager: Recovered {applied} journaled task change(s) from '{self.journal_filepath}'.")
+        return applied
+
+    @_synchronized
+    def _journal(self, record: Dict[str, Any]):
+        """Appends one change record to the journal. Flushed to the OS immediately, so it survives a process crash."""
+        try:
+            if self._journal_file is None:
+                _ensure_data_dir_exists()
+                self._journal_file = open(self.journal_filepath, 'a', encoding='utf-8')
+            self._journal_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._journal_file.flush()
+            self._journal_records += 1
+        except (IOError, TypeError, ValueError) as e: # pragma: no cover
+            print(f"TaskManager: Error journaling task change to '{self.journal_filepath}': {e}")
+            self._save_active_tasks() # Fall back to a full snapshot
+
+    def _journal_task(self, task: ActiveTask):
+        self._journal({"op": "upsert", "task": task.to_dict()})
+
+    @_synchronized
     def _save_active_tasks(self):
+        """Atomically rewrites the snapshot (temp file + rename) and empties the journal."""
         try:
             _ensure_data_dir_exists()
             tasks_to_save = [task.to_dict() for task in self._active_tasks.values()]
-            with open(self.active_tasks_filepath, 'w', encoding='utf-8') as f:
+            temp_filepath = self.active_tasks_filepath + ".tmp"
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
                 json.dump(tasks_to_save, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_filepath, self.active_tasks_filepath)
         except IOError as e: # pragma: no cover
             print(f"TaskManager: Error saving active tasks to '{self.active_tasks_filepath}': {e}")
+            return
         except Exception as e_gen: # pragma: no cover
             print(f"TaskManager: An unexpected error occurred during _save_active_tasks: {e_gen}")
+            return
+
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+        if os.path.exists(self.journal_filepath):
+            os.remove(self.journal_filepath)
+        self._journal_records = 0
+        self._last_snapshot_at = time.monotonic()
+
+    @_synchronized
+    def _save_if_due(self):
+        """Rewrites the snapshot unless one was written less than coalesce_seconds ago."""
+        if (self.coalesce_seconds <= 0 or self._last_snapshot_at is None or
+                time.monotonic() - self._last_snapshot_at >= self.coalesce_seconds):
+            self._save_active_tasks()
 
+    @_synchronized
+    def flush(self):
+        """Writes any journaled changes to the snapshot. Call on shutdown."""
+        if self._journal_records:
+            self._save_active_tasks()
 
+    @_synchronized
     def add_task(self, description: str, task_type: ActiveTaskType, related_item_id: Optional[str] = None, details: Optional[Dict[str, Any]] = None) -> ActiveTask:
         # Ensure description and task_type are first, as per dataclass definition
         initialized_details = details or {}
@@ -253,13 +368,16 @@ class TaskManager:
             details=initialized_details
         )
         self._active_tasks[new_task.task_id] = new_task
-        self._save_active_tasks()
+        self._journal_task(new_task)
+        self._save_if_due()
         print(f"TaskManager: New task added: {new_task.task_id} - {description[:50]}... ({task_type.name})")
         return new_task
 
+    @_synchronized
     def get_task(self, task_id: str) -> Optional[ActiveTask]:
         return self._active_tasks.get(task_id)
 
+    @_synchronized
     def update_task_status(self,
                            task_id: str,
                            new_status: ActiveTaskStatus,
@@ -323,7 +441,7 @@ class TaskManager:
                             step_desc = "All plan steps processed."
 
             task.update_status(new_status, reason, step_desc, sub_step_name, progress, is_error_increment, out_preview, resume_data)
-            self._save_active_tasks()
+            self._journal_task(task)
             print(f"TaskManager: Task {task_id} ({task.description[:30]}...) status updated from {old_status.name} to {new_status.name}. Step: {task.current_step_description or 'N/A'}")
 
             terminal_statuses = [
@@ -369,19 +487,24 @@ class TaskManager:
                         related_item_type="task",
                         details_payload={"task_type": task.task_type.name, "description": task.description}
                     )
-                self._archive_task(task_id)
+                self._archive_task(task_id) # Writes the snapshot
+            else:
+                self._save_if_due()
         else:
             print(f"TaskManager: Error - Task {task_id} not found for status update.")
         return task
 
+    @_synchronized
     def _archive_task(self, task_id: str):
         if task_id in self._active_tasks:
             task_to_archive = self._active_tasks.pop(task_id)
             self._completed_tasks_archive.append(task_to_archive)
             if len(self._completed_tasks_archive) > self._archive_limit: # pragma: no cover
                 self._completed_tasks_archive.pop(0)
-            self._save_active_tasks()
+            self._journal({"op": "remove", "task_id": task_id})
+            self._save_active_tasks() # Terminal status: persist now rather than in the coalescing window
 
+    @_synchronized
     def list_active_tasks(self, task_type_filter: Optional[ActiveTaskType] = None, status_filter: Optional[ActiveTaskStatus] = None) -> List[ActiveTask]:
         tasks = list(self._active_tasks.values())
         if task_type_filter:
@@ -391,15 +514,18 @@ class TaskManager:
         tasks.sort(key=lambda t: t.created_at, reverse=True)
         return tasks
 
+    @_synchronized
     def list_archived_tasks(self, limit: int = 20) -> List[ActiveTask]:
         return sorted(self._completed_tasks_archive, key=lambda t: t.last_updated_at, reverse=True)[:limit]
 
 
+    @_synchronized
     def clear_all_tasks(self, clear_archive: bool = False):
         """Primarily for testing or reset purposes."""
         self._active_tasks.clear()
         if clear_archive:
             self._completed_tasks_archive.clear()
+        self._journal({"op": "clear"})
         self._save_active_tasks()
         print(f"TaskManager: All active tasks cleared. Archive cleared: {clear_archive}")
 
@@ -492,6 +618,7 @@ if __name__ == '__main__': # pragma: no cover
     assert task2_reloaded_tm3 is None, "Task 2 should remain archived (not active) in TM3."
 
 
+    tm3.flush()
     if os.path.exists(test_active_tasks_file):
         os.remove(test_active_tasks_file)
     if os.path.exists(test_file_dir):
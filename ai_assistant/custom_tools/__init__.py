@@ -1,5 +1,3 @@
 # This file marks custom_tools as a package.
-from . import conversational_tools
-from . import project_management_tools
-from . import project_execution_tools
-from . import my_extra_tools # Ensure tools from this module are discoverable
+# Tool modules are not imported here: ToolSystem discovers them by module path and
+# defers importing unchanged ones until one of their tools is executed.
@@ -120,7 +120,8 @@ GET_SYSTEM_STATUS_SUMMARY_SCHEMA = {
         {"name": "archived_limit", "type": "int", "description": "Optional. Max archived tasks to detail (default 3)."},
         {"name": "unread_notifications_limit", "type": "int", "description": "Optional. Max unread notifications to detail (default 3)."}
     ],
-    "returns": {"type": "str", "description": "A multi-line string summarizing system status and notifications."}
+    "returns": {"type": "str", "description": "A multi-line string summarizing system status and notifications."},
+    "side_effects": "read_only" # Only reads tasks, suggestions and notifications
 }
 
 
@@ -188,7 +189,8 @@ GET_ITEM_DETAILS_BY_ID_SCHEMA = {
     "returns": {
         "type": "dict",
         "description": "A dictionary containing the item's details, or an error dictionary if not found or type is invalid."
-    }
+    },
+    "side_effects": "read_only" # Only reads tasks, suggestions and notifications
 }
 
 def list_formatted_suggestions(status_filter: Optional[str] = "pending") -> List[Dict[str, Any]]:
@@ -203,14 +205,15 @@ def list_formatted_suggestions(status_filter: Optional[str] = "pending") -> List
         A list of dictionaries, where each dictionary contains key details of a suggestion.
         Returns an empty list if no suggestions match or if suggestion_manager is unavailable.
     """
-    all_suggs = list_suggestions() # This is imported from suggestion_manager
+    status_to_filter = status_filter.lower() if status_filter else "pending"
+
+    # This is imported from suggestion_manager; a status filter is an indexed query.
+    all_suggs = list_suggestions() if status_to_filter == "all" else list_suggestions(status=status_to_filter)
     if not all_suggs:
         return []
 
     filtered_suggestions: List[Dict[str, Any]] = []
 
-    status_to_filter = status_filter.lower() if status_filter else "pending"
-
     for sugg in all_suggs:
         # Ensure sugg is a dict and has 'status' key before lowercasing
         current_status = sugg.get('status', '').lower() if isinstance(sugg, dict) else ''
@@ -242,7 +245,8 @@ LIST_FORMATTED_SUGGESTIONS_SCHEMA = {
         "type": "list",
         "item_type": "dict",
         "description": "A list of dictionaries, each representing a suggestion with its key details (id, type, description, status, created_at). Returns an empty list if no suggestions match."
-    }
+    },
+    "side_effects": "read_only" # Only reads tasks, suggestions and notifications
 }
 
 
@@ -6,6 +6,8 @@ from typing import Union, Optional, Dict, Any, List # Added Optional, Dict, Any,
 # Import get_data_dir from the main config to centralize data paths for some things,
 # but ai_generated_projects will be directly under ai_assistant.
 from ..config import get_data_dir # Keep for other potential data uses if any
+from ..tools.tool_result_cache import invalidate_path
+from ..core.project_manager import PROJECTS_CACHE_TAG
 
 # Module-level constant for the base directory where projects will be created.
 # Changed: Now places ai_generated_projects directly under the 'ai_assistant' package directory.
@@ -93,6 +95,7 @@ def write_text_to_file(full_filepath: str, content: str) -> str:
         
         with open(full_filepath, 'w', encoding='utf-8') as f:
             f.write(content)
+        invalidate_path(full_filepath) # Cached reads of this file (or listings of its directory) are stale
         return f"Success: Content written to '{full_filepath}'."
     except OSError as e:
         return f"Error writing to file '{full_filepath}': {e}"
@@ -127,6 +130,18 @@ def read_text_from_file(full_filepath: str) -> str:
     except Exception as e:
         return f"An unexpected error occurred while reading file '{full_filepath}': {e}"
 
+READ_TEXT_FROM_FILE_SCHEMA = {
+    "name": "read_text_from_file",
+    "description": "Reads and returns the text content from the specified file.",
+    "parameters": [
+        {"name": "full_filepath", "type": "str", "description": "The absolute or relative path to the file."}
+    ],
+    "returns": {"type": "str", "description": "The content of the file, or an error message."},
+    "cacheable": True,
+    "idempotent": True,
+    "invalidation_keys": [{"path_arg": "full_filepath"}]
+}
+
 def list_project_files(project_identifier: str, sub_directory: Optional[str] = None) -> Dict[str, Any]:
     """
     Lists files and directories within a specified project's root path or a subdirectory thereof.
@@ -183,6 +198,19 @@ def list_project_files(project_identifier: str, sub_directory: Optional[str] = N
     except Exception as e: # pragma: no cover
         return {"status": "error", "message": f"Failed to list project files for '{project_identifier}' at '{path_to_list}': {str(e)}"}
 
+LIST_PROJECT_FILES_SCHEMA = {
+    "name": "list_project_files",
+    "description": "Lists files and directories within a specified project's root path or a subdirectory thereof.",
+    "parameters": [
+        {"name": "project_identifier", "type": "str", "description": "The ID or name of the project."},
+        {"name": "sub_directory", "type": "str", "description": "Optional. A subdirectory within the project to list."}
+    ],
+    "returns": {"type": "dict", "description": "'status', 'path_listed', 'files' and 'directories', or 'status' and 'message' on error."},
+    "cacheable": True,
+    "idempotent": True,
+    "invalidation_keys": [{"result_path": "path_listed"}, {"tag": PROJECTS_CACHE_TAG}] # The tag: project roots moving
+}
+
 def get_project_file_content(project_identifier: str, file_path_in_project: str) -> Dict[str, Any]:
     """
     Reads the content of a specified file within a project.
@@ -234,6 +262,19 @@ def get_project_file_content(project_identifier: str, file_path_in_project: str)
     except Exception as e: # pragma: no cover
         return {"status": "error", "message": f"Failed to read project file '{file_path_in_project}' from '{project_identifier}': {str(e)}"}
 
+GET_PROJECT_FILE_CONTENT_SCHEMA = {
+    "name": "get_project_file_content",
+    "description": "Reads the content of a specified file within a project.",
+    "parameters": [
+        {"name": "project_identifier", "type": "str", "description": "The ID or name of the project."},
+        {"name": "file_path_in_project", "type": "str", "description": "The relative path to the file within the project's root directory."}
+    ],
+    "returns": {"type": "dict", "description": "'status', 'file_path' and 'content', or 'status' and 'message' on error."},
+    "cacheable": True,
+    "idempotent": True,
+    "invalidation_keys": [{"result_path": "file_path"}, {"tag": PROJECTS_CACHE_TAG}]
+}
+
 if __name__ == '__main__':
     import shutil
     import tempfile
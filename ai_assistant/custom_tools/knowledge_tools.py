@@ -1,7 +1,8 @@
 # ai_assistant/custom_tools/knowledge_tools.py
 import json
 from typing import Optional, List
-from ai_assistant.memory.persistent_memory import load_learned_facts, save_learned_facts
+from ai_assistant.memory.persistent_memory import load_learned_facts, save_learned_facts, LEARNED_FACTS_CACHE_TAG
+from ai_assistant.memory.fact_store import get_fact_store
 from ai_assistant.llm_interface.ollama_client import invoke_ollama_model_async # Changed to async
 from ai_assistant.config import get_model_for_task, is_debug_mode
 import re # For cleaning LLM response
@@ -162,23 +163,34 @@ def recall_facts(query: Optional[str] = None) -> List[str]:
     Args:
         query: An optional keyword or phrase to filter facts.
                If omitted or empty, all facts are returned.
-               The filter is case-insensitive.
+               Matching is case-insensitive and word-based; results are
+               ranked by relevance (BM25), best match first.
 
     Returns:
         A list of strings, where each string is a learned fact matching the query.
         Returns all facts if no query is provided.
         Returns an empty list if no facts are stored or if no facts match the query.
     """
-    all_facts = load_learned_facts() # From persistent_memory.py
-
-    if not all_facts:
-        return []
+    fact_store = get_fact_store()
 
     if query and query.strip():
-        query_lower = query.lower()
-        return [fact for fact in all_facts if query_lower in fact.lower()]
-    
-    return all_facts
+        matched_facts = fact_store.search(query, top_k=None)
+    else:
+        matched_facts = fact_store.all_facts()
+
+    return [fact.get("text", "") for fact in matched_facts]
+
+RECALL_FACTS_SCHEMA = {
+    "name": "recall_facts",
+    "description": "Retrieves a list of learned facts from the curated fact store, optionally filtered by a query.",
+    "parameters": [
+        {"name": "query", "type": "str", "description": "Optional. A keyword or phrase to filter facts; all facts are returned if omitted."}
+    ],
+    "returns": {"type": "list", "description": "The matching facts, best match first."},
+    "cacheable": True,
+    "idempotent": True,
+    "invalidation_keys": [{"tag": LEARNED_FACTS_CACHE_TAG}] # Invalidated by save_learned_facts
+}
 
 async def run_periodic_fact_store_curation_async() -> bool:
     """
@@ -319,7 +319,10 @@ FIND_AGENT_TOOL_SOURCE_SCHEMA = {
     "returns": tuple(sorted({
         "type": "string",
         "description": "A JSON string representing a dictionary with keys 'module_path', 'function_name', 'file_path', 'source_code', or null if not found."
-    }.items()))
+    }.items())),
+    "cacheable": True,
+    "idempotent": True,
+    "invalidation_keys": [{"result_path": "file_path"}] # A "not found" (None) result is not cached
 }
 
 def stage_agent_tool_modification(
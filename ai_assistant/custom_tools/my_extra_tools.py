@@ -77,6 +77,18 @@ def search_duckduckgo(*args, **kwargs) -> str:
         print(f"Error serializing search results to JSON for query '{query}': {te}. Results: {results}")
         return "[]"
 
+SEARCH_DUCKDUCKGO_SCHEMA = {
+    "name": "search_duckduckgo",
+    "description": "Searches the internet using DuckDuckGo and returns the results as a JSON string.",
+    "parameters": [
+        {"name": "query", "type": "str", "description": "The search query."}
+    ],
+    "returns": {"type": "str", "description": "A JSON list of up to 5 results with 'title', 'href' and 'body'."},
+    "cacheable": True, # Identical queries within a plan or re-plan reuse the results
+    "idempotent": True,
+    "cache_ttl_seconds": 600
+}
+
 def search_google_custom_search(query: str, num_results: Union[int, str] = 5) -> str:
     """
     Searches Google. Args: query (str). Optional in kwargs: num_results (str, 1-10, default '5').
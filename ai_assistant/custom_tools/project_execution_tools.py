@@ -19,6 +19,9 @@ from ai_assistant.custom_tools.project_management_tools import (
 )
 from .code_execution_tools import execute_sandboxed_python_script # Added import
 from ..core.task_manager import TaskManager, ActiveTaskStatus # Added
+from ..config import PLAN_STEP_CHECKPOINTS_ENABLED
+from ..core.deadline import DeadlineExceededError, check_deadline
+from ..memory.step_checkpoints import get_step_checkpoint_store, inputs_hash
 
 # --- Plan Execution Tool ---
 
@@ -281,14 +284,31 @@ def execute_project_plan(
 
     step_results = []
     overall_success = True
+    stopped_reason: Optional[str] = None
     execution_log = [f"Starting execution of project plan for: {project_name or 'Unnamed Project'}"]
 
+    # Completed steps are checkpointed under the parent task, so re-running an interrupted task skips them
+    checkpoints = get_step_checkpoint_store() if PLAN_STEP_CHECKPOINTS_ENABLED and parent_task_id else None
+    checkpoint_run_id = f"project_plan_{parent_task_id}"
+
     for i, step in enumerate(project_plan):
         step_id = step.get("step_id", f"step_{i+1}")
         description = step.get("description", "No description")
         step_type = step.get("type", "unknown")
         details = step.get("details", {})
 
+        # Run from a prompt, the plan stops between steps once the prompt's deadline has passed or it was
+        # cancelled, rather than carrying on detached from it; completed steps stay checkpointed for a retry.
+        try:
+            check_deadline(f"project step '{description}'")
+        except DeadlineExceededError as e:
+            stopped_reason = str(e)
+            log_message = f"Stopping plan execution before step {step_id} ('{description}'): {stopped_reason}"
+            print(f"[ProjectExecutor] {log_message}")
+            execution_log.append(log_message)
+            overall_success = False
+            break
+
         current_step_result = {
             "step_id": step_id,
             "description": description,
@@ -303,7 +323,19 @@ def execute_project_plan(
         error_message_for_tm = None
         output_preview_for_tm = None
 
-        if step_type == "python_script":
+        step_inputs_hash = inputs_hash({"type": step_type, "description": description, "details": details}) if checkpoints else None
+        restored, restored_step_result = checkpoints.load(checkpoint_run_id, step_id, step_inputs_hash) if checkpoints else (False, None)
+
+        if restored:
+            log_message = f"Step '{description}' already completed before the interruption; restored from checkpoint."
+            print(f"[ProjectExecutor] {log_message}")
+            execution_log.append(log_message)
+            current_step_result = restored_step_result
+            current_step_result["restored_from_checkpoint"] = True
+            step_status_for_tm = "success"
+            output_preview_for_tm = "Restored from checkpoint."
+
+        elif step_type == "python_script":
             script_content = details.get("script_content")
             if not script_content:
                 log_message = f"Error: No script_content provided for python_script step: '{description}'"
@@ -392,7 +424,10 @@ def execute_project_plan(
             output_preview_for_tm = f"Step type '{step_type}' not implemented."
 
         step_results.append(current_step_result)
-        current_step_result["error_message"] = error_message_for_tm
+        if not restored:
+            current_step_result["error_message"] = error_message_for_tm
+            if checkpoints and current_step_result["status"] in ["success", "simulated_approved"]:
+                checkpoints.save(checkpoint_run_id, step_id, i, step_inputs_hash, current_step_result)
 
         if task_manager_instance and parent_task_id:
             task_manager_instance.update_task_status(
@@ -416,6 +451,8 @@ def execute_project_plan(
 
     if not project_plan and not step_results:
         final_overall_status = "error"
+    elif stopped_reason:
+        final_overall_status = "stopped"
     elif not overall_success:
         final_overall_status = "failed"
     elif all(s["status"] in ["success", "simulated_approved", "skipped_unimplemented"] for s in step_results):
@@ -433,6 +470,17 @@ def execute_project_plan(
             final_overall_status = "unknown_state"
 
     execution_log.append(f"Project plan execution finished with overall status: {final_overall_status}")
+    if checkpoints and final_overall_status in ["success", "partial_success"]:
+        checkpoints.clear_run(checkpoint_run_id) # A failed plan keeps them, so retrying the task resumes it
+
+    # Leave the parent task in a final state, so a restart does not take it for an interrupted run
+    if task_manager_instance and parent_task_id and (step_results or stopped_reason):
+        plan_succeeded = final_overall_status in ["success", "partial_success"]
+        task_manager_instance.update_task_status(
+            task_id=parent_task_id,
+            new_status=ActiveTaskStatus.COMPLETED_SUCCESSFULLY if plan_succeeded else ActiveTaskStatus.PROJECT_PLAN_FAILED_STEP,
+            reason=None if plan_succeeded else stopped_reason or f"Project plan execution finished with status '{final_overall_status}'."
+        )
     return {
         "overall_status": final_overall_status,
         "project_name": project_name,
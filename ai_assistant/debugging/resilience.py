@@ -23,7 +23,8 @@ def retry_with_backoff(
     retries: int = 3,
     base_delay: float = 1.0,
     max_delay: float = 10.0,
-    jitter: bool = True
+    jitter: bool = True,
+    retry_if: Optional[Callable[[Exception], bool]] = None
 ) -> Callable[[CallableT], CallableT]:
     """
     A decorator to retry a function with exponential backoff.
@@ -33,6 +34,8 @@ def retry_with_backoff(
         base_delay: Initial delay in seconds.
         max_delay: Maximum delay in seconds.
         jitter: Whether to add random jitter to the delay.
+        retry_if: Optional predicate; exceptions for which it returns False are
+                  re-raised at once instead of retried. Default: retry any Exception.
     """
     def decorator(func: CallableT) -> CallableT:
         if asyncio.iscoroutinefunction(func):
@@ -44,6 +47,8 @@ def retry_with_backoff(
                         return await func(*args, **kwargs)
                     except Exception as e:
                         last_exception = e
+                        if retry_if is not None and not retry_if(e):
+                            raise
                         if attempt == retries:
                             logger.error(
                                 f"Async function {func.__name__} failed after {attempt + 1} attempts. Re-raising last exception: {type(e).__name__}: {e}"
@@ -73,6 +78,8 @@ def retry_with_backoff(
                         return func(*args, **kwargs)
                     except Exception as e:
                         last_exception = e
+                        if retry_if is not None and not retry_if(e):
+                            raise
                         if attempt == retries:
                             logger.error(
                                 f"Sync function {func.__name__} failed after {attempt + 1} attempts. Re-raising last exception: {type(e).__name__}: {e}"
@@ -10,7 +10,8 @@ import logging
 from ai_assistant.config import is_debug_mode
 from ai_assistant.core import self_modification
 from ..core.reflection import global_reflection_log, ReflectionLogEntry  # Add ReflectionLogEntry to import
-from ai_assistant.memory.persistent_memory import load_learned_facts, save_learned_facts, LEARNED_FACTS_FILEPATH
+from ai_assistant.memory.persistent_memory import save_learned_facts, LEARNED_FACTS_FILEPATH
+from ai_assistant.memory.fact_store import get_fact_store
 from ai_assistant.core.suggestion_manager import mark_suggestion_implemented # Added import
 import json # Added for parsing LLM response in _is_fact_valuable
 from ai_assistant.planning.planning import PlannerAgent
@@ -140,9 +141,9 @@ class ActionExecutor:
         """
         Finds the original ReflectionLogEntry based on its unique entry_id.
         """
-        for entry in reversed(global_reflection_log.log_entries):
-            if entry.entry_id == entry_id:
-                return entry
+        entry = global_reflection_log.get_entry(entry_id)
+        if entry is not None:
+            return entry
         print(f"ActionExecutor: Warning - Could not find original reflection entry with ID '{entry_id}'.")
         return None
 
@@ -339,7 +340,9 @@ class ActionExecutor:
             llm_response_str = await self.code_service.llm_provider.invoke_ollama_model_async(
                 prompt,
                 model_name=model_name,
-                temperature=0.2
+                temperature=0.2,
+                task_name="fact_extraction",
+                cache=True
             )
 
             if not llm_response_str or not llm_response_str.strip():
@@ -517,7 +520,8 @@ class ActionExecutor:
                 return False
 
             try:
-                current_facts = load_learned_facts()
+                fact_store = get_fact_store()
+                current_facts = fact_store.all_facts()
                 normalized_fact_to_learn = fact_to_learn.strip()
 
                 if any(entry.get("text", "").strip().lower() == normalized_fact_to_learn.lower() for entry in current_facts):
@@ -558,7 +562,7 @@ class ActionExecutor:
                 }
                 current_facts.append(new_fact_entry)
 
-                if save_learned_facts(current_facts):
+                if fact_store.save(current_facts): # Write-through keeps the fact index current
                     log_message = f"Successfully added valuable fact: '{normalized_fact_to_learn}' (Category: {determined_category})."
                     if source_insight_id: mark_suggestion_implemented(source_insight_id, f"Valuable fact added: {normalized_fact_to_learn} (Category: {determined_category})", notification_manager=self.notification_manager)
                     self._update_task_if_manager(action_task_id, ActiveTaskStatus.COMPLETED_SUCCESSFULLY, step_desc="Fact learned and saved.")
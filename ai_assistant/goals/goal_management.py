@@ -1,12 +1,14 @@
 # Code for goal management.
+import json
 import uuid
 from typing import List, Dict, Optional, Union
-from ai_assistant.memory.persistent_memory import save_goals_to_file, load_goals_from_file
+from ai_assistant.memory.structured_store import Repository, get_structured_store, structured_store_path_for
 import os
 
 # --- Constants ---
 DEFAULT_GOALS_FILE_DIR = "data"
 DEFAULT_GOALS_FILE = os.path.join(DEFAULT_GOALS_FILE_DIR, "goals.json")
+GOALS_TABLE = "goals"
 
 # --- Goal Data Structure ---
 # A goal will be represented as a dictionary.
@@ -28,48 +30,49 @@ def _generate_goal_id() -> str:
 
 # --- Persistence Functions ---
 
+def _load_legacy_goals(filepath: str) -> Optional[List[Dict]]:
+    """Reads the legacy goals JSON file ({id: goal}) for migration. Returns None if it cannot be read."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        return list(json.loads(content).values()) if content.strip() else []
+    except (IOError, json.JSONDecodeError, AttributeError) as e:
+        print(f"GoalManagement: Error loading goals from {filepath}: {e}")
+        return None
+
+def _goals_repository() -> Repository:
+    """The goals table, indexed by status and priority."""
+    return get_structured_store(structured_store_path_for(DEFAULT_GOALS_FILE)).repository(
+        GOALS_TABLE, "id",
+        columns={
+            "status": lambda g: g.get("status"),
+            "priority": lambda g: g.get("priority"),
+        },
+        legacy_path=DEFAULT_GOALS_FILE, legacy_loader=_load_legacy_goals
+    )
+
 def save_current_goals() -> bool:
-    """Saves the current in-memory _goals_db to the DEFAULT_GOALS_FILE."""
-    # The save_goals_to_file function in persistent_memory.py handles os.makedirs
-    return save_goals_to_file(DEFAULT_GOALS_FILE, _goals_db)
+    """Saves the current in-memory _goals_db to the goals table, replacing its contents."""
+    return _goals_repository().replace_all(_goals_db.values())
 
 def load_persisted_goals() -> bool:
     """
-    Loads goals from DEFAULT_GOALS_FILE and replaces the in-memory _goals_db.
-    Returns True if loading was successful and _goals_db was updated, False otherwise.
+    Loads goals from the goals table and replaces the in-memory _goals_db.
+    An empty or missing store gives an empty _goals_db. Always returns True.
     """
     global _goals_db
-    loaded_data = load_goals_from_file(DEFAULT_GOALS_FILE)
-    if loaded_data or (not loaded_data and os.path.exists(DEFAULT_GOALS_FILE)): 
-        # If loaded_data is not empty, or it's empty because the file itself was empty JSON ({})
-        # and not because the file was missing (which load_goals_from_file handles by returning {}).
-        # This logic ensures we overwrite with an empty DB if the file is truly empty vs. not found.
-        # However, load_goals_from_file returns {} for missing file as well, so the check for
-        # os.path.exists isn't strictly necessary if we trust its "file not found" behavior.
-        # Let's simplify: if load_goals_from_file returns a dict (even empty), it's "successful".
-        _goals_db = loaded_data
-        # print(f"Goal management: _goals_db updated from {DEFAULT_GOALS_FILE}") # For debugging
-        return True
-    # If load_goals_from_file returned {} AND the file didn't exist, it's not an "error" for this function,
-    # but it means no goals were loaded to replace the current DB.
-    # The current implementation of load_goals_from_file returns {} for file not found,
-    # so this function will effectively reset the _goals_db if the file is not found.
-    # This might be desired, or one might want to only replace if the file *is* found.
-    # For now, we'll consider any dict returned (even empty from a non-existent file) as a valid load.
-    # The function `load_goals_from_file` already prints messages for file not found or errors.
-    # So, if loaded_data is {} because file wasn't found, _goals_db becomes {}.
-    _goals_db = loaded_data # This line ensures _goals_db is replaced even if file was empty or not found.
-    return True # Consider it successful in terms of attempting a load.
+    _goals_db = {goal["id"]: goal for goal in _goals_repository().find()}
+    return True
 
 def _initialize_goals_db():
-    """Loads goals from the default file when the module is first initialized."""
+    """Loads goals from the goals table when the module is first initialized."""
     global _goals_db
-    print(f"GoalManagement: Initializing goals database from '{DEFAULT_GOALS_FILE}'...")
-    _goals_db = load_goals_from_file(DEFAULT_GOALS_FILE)
+    print(f"GoalManagement: Initializing goals database from '{_goals_repository().store.db_path}'...")
+    _goals_db = {goal["id"]: goal for goal in _goals_repository().find()}
     if _goals_db:
         print(f"GoalManagement: Successfully loaded {len(_goals_db)} goals on startup.")
     else:
-        print("GoalManagement: No goals loaded on startup or file not found/empty. Starting with an empty database.")
+        print("GoalManagement: No goals loaded on startup or store not found/empty. Starting with an empty database.")
 
 # --- CRUD Functions ---
 
@@ -167,7 +170,7 @@ if __name__ == '__main__':
     print("\n--- Testing Goal Management with Persistence ---")
     
     # Ensure the test data directory is clean or doesn't interfere
-    # For these tests, goal_management uses DEFAULT_GOALS_FILE ("data/goals.json")
+    # For these tests, goal_management uses the goals table next to DEFAULT_GOALS_FILE ("data/goals.json")
     # We should probably use a different file for its own tests to avoid side effects
     # with the main application's data. However, for this example, we'll assume
     # it's okay or that we clean up "data/goals.json" after.
@@ -184,7 +187,7 @@ if __name__ == '__main__':
     # Save goals
     print("\nSaving current goals...")
     if save_current_goals():
-        print("Goals saved successfully to DEFAULT_GOALS_FILE.")
+        print("Goals saved successfully to the goals table.")
     else:
         print("Error saving goals.")
     
@@ -194,7 +197,7 @@ if __name__ == '__main__':
     print(f"In-memory goals after clearing: {list_goals()}") # Should be empty
 
     if load_persisted_goals():
-        print("Goals loaded successfully from DEFAULT_GOALS_FILE.")
+        print("Goals loaded successfully from the goals table.")
     else:
         print("Error loading goals or file not found.")
     
@@ -228,13 +231,10 @@ if __name__ == '__main__':
     else:
         print(f"Goal {g1['id']} not found after second load. This is an error.")
 
-    # Clean up the default goals file for next time / other tests
+    # Clean up the goals table for next time / other tests
     # In a real app, you wouldn't usually do this in the __main__ block.
-    if os.path.exists(DEFAULT_GOALS_FILE):
-        print(f"\nCleaning up by removing {DEFAULT_GOALS_FILE}...")
-        os.remove(DEFAULT_GOALS_FILE)
-        if os.path.exists(DEFAULT_GOALS_FILE_DIR) and not os.listdir(DEFAULT_GOALS_FILE_DIR):
-            os.rmdir(DEFAULT_GOALS_FILE_DIR)
+    print("\nCleaning up by clearing the goals table...")
+    _goals_repository().replace_all([])
 
 
     print("\n--- End of Goal Management Persistence Testing ---")
@@ -33,6 +33,7 @@ This module aims to close the loop in the agent's operational cycle:
 Plan -> Execute -> Reflect -> Learn -> Evolve.
 """
 import datetime
+import json
 import os
 import asyncio
 import uuid # Added for entry_id in MockReflectionLogEntry
@@ -43,9 +44,12 @@ from ..core.task_manager import TaskManager
 from ..core.notification_manager import NotificationManager # Made unconditional
 
 from ai_assistant.core.reflection import ReflectionLogEntry
-from ai_assistant.memory.persistent_memory import save_actionable_insights, load_actionable_insights, ACTIONABLE_INSIGHTS_FILEPATH
+from ai_assistant.memory.persistent_memory import ACTIONABLE_INSIGHTS_FILEPATH
+from ai_assistant.memory.structured_store import get_structured_store, structured_store_path_for
 from ai_assistant.execution.action_executor import ActionExecutor
 
+INSIGHTS_TABLE = "actionable_insights"
+
 class InsightType(Enum):
     TOOL_BUG_SUSPECTED = auto()
     TOOL_USAGE_ERROR = auto()
@@ -80,6 +84,25 @@ class ActionableInsight:
         if not self.insight_id:
             # Generate a new UUID-based insight_id if not provided or empty
             self.insight_id = f"{self.type.name}_{uuid.uuid4().hex[:8]}"
+def _load_legacy_insights(filepath: str) -> Optional[List[Dict[str, Any]]]:
+    """Reads the legacy actionable insights JSON file for migration. Returns None if it cannot be read."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+        loaded_insights = json.loads(content) if content.strip() else []
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"LearningAgent: Error loading actionable insights from {filepath}: {e}")
+        return None
+    if not isinstance(loaded_insights, list): # pragma: no cover
+        print(f"LearningAgent: Warning - Data in actionable insights file '{filepath}' is not a list. Not migrating it.")
+        return None
+    return loaded_insights
+
+def _insight_to_dict(insight: ActionableInsight) -> Dict[str, Any]:
+    insight_dict = asdict(insight)
+    insight_dict['type'] = insight.type.name
+    return insight_dict
+
 class LearningAgent:
     def __init__(self, insights_filepath: Optional[str] = None,
                  task_manager: Optional[TaskManager] = None,
@@ -93,11 +116,21 @@ class LearningAgent:
             task_manager=self.task_manager,
             notification_manager=self.notification_manager # Pass it
         )
+        self.repository = get_structured_store(structured_store_path_for(self.insights_filepath)).repository(
+            INSIGHTS_TABLE, "insight_id",
+            columns={
+                "status": lambda i: i.get('status'),
+                "type": lambda i: i.get('type'),
+                "priority": lambda i: i.get('priority'),
+                "creation_timestamp": lambda i: i.get('creation_timestamp'),
+            },
+            legacy_path=self.insights_filepath, legacy_loader=_load_legacy_insights
+        )
         self._load_insights()
 
     def _load_insights(self):
-        print(f"LearningAgent: Loading insights from '{self.insights_filepath}'...")
-        insights_data = load_actionable_insights(filepath=self.insights_filepath)
+        print(f"LearningAgent: Loading insights from '{self.repository.store.db_path}'...")
+        insights_data = self.repository.find()
         loaded_count = 0
         for data in insights_data:
             if not isinstance(data, dict): # pragma: no cover
@@ -120,23 +153,23 @@ class LearningAgent:
                 loaded_count += 1
             except Exception as e: # pragma: no cover
                 print(f"LearningAgent: Error deserializing insight data: '{str(data)[:100]}...'. Error: {e}. Skipping.")
-        print(f"LearningAgent: Loaded {loaded_count} actionable insights from '{self.insights_filepath}'.")
+        print(f"LearningAgent: Loaded {loaded_count} actionable insights from '{self.repository.store.db_path}'.")
         if not self.insights and insights_data: # pragma: no cover
-             print(f"LearningAgent: Warning - Insights data file '{self.insights_filepath}' was not empty, but no valid insights were loaded. File might be corrupted or in an old format.")
+             print(f"LearningAgent: Warning - Insights table in '{self.repository.store.db_path}' was not empty, but no valid insights were loaded. Records might be corrupted or in an old format.")
 
     def _save_insights(self):
-        print(f"LearningAgent: Saving {len(self.insights)} insights to '{self.insights_filepath}'...")
-        insights_as_dicts = []
-        for insight in self.insights:
-            insight_dict = asdict(insight)
-            insight_dict['type'] = insight.type.name
-            insights_as_dicts.append(insight_dict)
-
-        if save_actionable_insights(insights_as_dicts, filepath=self.insights_filepath):
+        """Replaces the stored insights with self.insights."""
+        print(f"LearningAgent: Saving {len(self.insights)} insights to '{self.repository.store.db_path}'...")
+        if self.repository.replace_all([_insight_to_dict(insight) for insight in self.insights]):
             print(f"LearningAgent: Successfully saved insights.")
         else: # pragma: no cover
             print(f"LearningAgent: Failed to save insights.")
 
+    def _save_insight(self, insight: ActionableInsight):
+        """Stores one new or changed insight."""
+        if not self.repository.upsert(_insight_to_dict(insight)): # pragma: no cover
+            print(f"LearningAgent: Failed to save insight {insight.insight_id}.")
+
     def process_reflection_entry(self, entry: ReflectionLogEntry) -> Optional[ActionableInsight]:
         # Use the new unique entry_id from ReflectionLogEntry
         source_entry_ref_id = entry.entry_id # NEW WAY
@@ -222,7 +255,7 @@ class LearningAgent:
 
         if generated_insight:
             self.insights.append(generated_insight)
-            self._save_insights()
+            self._save_insight(generated_insight)
             return generated_insight
 
         return None
@@ -287,7 +320,7 @@ class LearningAgent:
                 selected_insight.metadata["action_exception_timestamp"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
                 selected_insight.metadata["exception_details"] = str(e)
                 execution_success = False
-        self._save_insights()
+        self._save_insight(selected_insight)
         return proposed_action, execution_success
 
 if __name__ == '__main__': # pragma: no cover
@@ -298,7 +331,6 @@ if __name__ == '__main__': # pragma: no cover
 
     async def run_learning_tests():
         test_insights_file = "test_actionable_insights.json"
-        if os.path.exists(test_insights_file): os.remove(test_insights_file)
 
         custom_tools_dir = os.path.join("ai_assistant", "custom_tools")
         os.makedirs(custom_tools_dir, exist_ok=True)
@@ -319,6 +351,8 @@ if __name__ == '__main__': # pragma: no cover
             task_manager=test_task_manager,
             notification_manager=test_notification_manager_for_agent
         )
+        agent.insights = []
+        agent._save_insights() # Start from an empty insights table
 
         # Test process_reflection_entry correctly uses entry.entry_id
         # Use the actual ReflectionLogEntry
@@ -392,7 +426,6 @@ if __name__ == '__main__': # pragma: no cover
         assert action_result_tuple_3 is None, f"Expected no action on 3rd attempt, but got {action_result_tuple_3}"
         print("No action proposed on 3rd attempt, as expected.")
 
-        if os.path.exists(test_insights_file):
-            print(f"Test file {test_insights_file} can be manually inspected or removed.")
+        print(f"Insights table in {agent.repository.store.db_path} can be manually inspected.")
 
     asyncio.run(run_learning_tests())
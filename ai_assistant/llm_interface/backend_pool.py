@@ -0,0 +1,252 @@
+# ai_assistant/llm_interface/backend_pool.py
+"""
+Routing of LLM requests across several Ollama servers.
+
+A BackendPool holds one Backend per server base URL (OLLAMA_BACKENDS). Each
+request goes to the healthy backend with the fewest outstanding requests,
+preferring backends known to have the requested model (from their /api/tags
+listing). A backend is ejected after OLLAMA_BACKEND_MAX_CONSECUTIVE_FAILURES
+failed requests or a failed health check, and readmitted by the next health
+check that reaches it (which also resets its circuit breaker, see
+circuit_breaker.py). Health checks run every
+OLLAMA_BACKEND_HEALTH_CHECK_INTERVAL_SECONDS, started by the async request path.
+If every backend is ejected, requests are still routed (to all of them) rather
+than failed outright.
+
+Async requests can be hedged: when the first backend has not answered after
+OLLAMA_HEDGE_AFTER_SECONDS, the same request is also sent to a second backend
+and the first answer wins; the other request is cancelled.
+"""
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Set
+
+import aiohttp
+
+from ai_assistant.config import (
+    is_debug_mode,
+    OLLAMA_BACKEND_HEALTH_CHECK_INTERVAL_SECONDS,
+    OLLAMA_BACKEND_HEALTH_CHECK_TIMEOUT_SECONDS,
+    OLLAMA_BACKEND_MAX_CONSECUTIVE_FAILURES,
+    OLLAMA_HEDGE_AFTER_SECONDS,
+)
+from ai_assistant.llm_interface.circuit_breaker import reset_circuit_breakers
+
+
+class Backend:
+    """One Ollama server and what the pool knows about it."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.outstanding = 0
+        self.healthy = True
+        self.consecutive_failures = 0
+        self.models: Optional[Set[str]] = None # Unknown until the first health check
+        self.requests = 0
+        self.failures = 0
+        self.total_latency_seconds = 0.0
+
+    def has_model(self, model: str) -> Optional[bool]:
+        """True/False if the backend's model list is known, else None."""
+        if self.models is None:
+            return None
+        return model in self.models or f"{model}:latest" in self.models
+
+    def stats(self) -> Dict[str, Any]:
+        successes = self.requests - self.failures
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "avg_latency_seconds": round(self.total_latency_seconds / successes, 4) if successes else 0.0,
+            "models": sorted(self.models) if self.models is not None else None,
+        }
+
+
+class BackendPool:
+    """Least-outstanding, model-aware routing with health checks and optional hedging."""
+
+    def __init__(
+        self,
+        base_urls: List[str],
+        health_check_interval: float = OLLAMA_BACKEND_HEALTH_CHECK_INTERVAL_SECONDS,
+        max_consecutive_failures: int = OLLAMA_BACKEND_MAX_CONSECUTIVE_FAILURES,
+        hedge_after_seconds: float = OLLAMA_HEDGE_AFTER_SECONDS
+    ):
+        if not base_urls:
+            raise ValueError("BackendPool needs at least one backend URL.")
+        self.backends = [Backend(url) for url in base_urls]
+        self.health_check_interval = health_check_interval
+        self.max_consecutive_failures = max(1, max_consecutive_failures)
+        self.hedge_after_seconds = hedge_after_seconds
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+        self._last_health_check = 0.0
+        self._health_check_task: Optional[asyncio.Task] = None
+
+    # --- Routing ---
+
+    def choose(self, model: str, exclude: Optional[List[Backend]] = None) -> Optional[Backend]:
+        """The backend for the next `model` request, or None if every backend is excluded."""
+        with self._lock:
+            candidates = [b for b in self.backends if b not in (exclude or [])]
+            if not candidates:
+                return None
+            candidates = [b for b in candidates if b.healthy] or candidates
+            with_model = [b for b in candidates if b.has_model(model) is not False]
+            candidates = with_model or candidates
+            # Fewest outstanding requests first; among equals, the one that has served the fewest so far.
+            return min(candidates, key=lambda b: (b.outstanding, b.requests))
+
+    def _start(self, backend: Backend) -> float:
+        with self._lock:
+            backend.outstanding += 1
+            backend.requests += 1
+        return time.monotonic()
+
+    def _finish(self, backend: Backend, started_at: float, succeeded: Optional[bool]) -> None:
+        """Records the outcome of a request; `succeeded=None` (e.g. a cancelled hedge) records nothing."""
+        with self._lock:
+            backend.outstanding -= 1
+            if succeeded is None:
+                backend.requests -= 1
+            elif succeeded:
+                backend.consecutive_failures = 0
+                backend.total_latency_seconds += time.monotonic() - started_at
+            else:
+                backend.failures += 1
+                backend.consecutive_failures += 1
+                if backend.healthy and backend.consecutive_failures >= self.max_consecutive_failures:
+                    backend.healthy = False
+                    print(f"BackendPool: Ejecting Ollama backend {backend.base_url} after {backend.consecutive_failures} consecutive failures.")
+
+    @contextmanager
+    def track(self, backend: Backend) -> Iterator[None]:
+        """Counts a request to `backend` as outstanding for the duration of the block; an exception is a failure."""
+        started_at = self._start(backend)
+        succeeded: Optional[bool] = None
+        try:
+            yield
+            succeeded = True
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            self._finish(backend, started_at, succeeded) # None (e.g. a stream closed early) records no outcome
+
+    def run_sync(self, model: str, attempt: Callable[[str], Any]) -> Any:
+        """Calls `attempt(base_url)` on the chosen backend. A None result or an exception counts as a failure."""
+        backend = self.choose(model)
+        started_at = self._start(backend)
+        succeeded = False
+        try:
+            result = attempt(backend.base_url)
+            succeeded = result is not None
+            return result
+        finally:
+            self._finish(backend, started_at, succeeded)
+
+    async def _attempt_async(self, backend: Backend, attempt: Callable[[str], Awaitable[Any]]) -> Any:
+        started_at = self._start(backend)
+        succeeded: Optional[bool] = False
+        try:
+            result = await attempt(backend.base_url)
+            succeeded = result is not None
+            return result
+        except asyncio.CancelledError:
+            succeeded = None
+            raise
+        finally:
+            self._finish(backend, started_at, succeeded)
+
+    async def run_async(
+        self,
+        model: str,
+        attempt: Callable[[str], Awaitable[Any]],
+        session: Optional[aiohttp.ClientSession] = None
+    ) -> Any:
+        """Async counterpart of run_sync, with hedging (if enabled) and periodic health checks (given a session)."""
+        if session is not None:
+            self._maybe_schedule_health_check(session)
+        first = self.choose(model)
+        if self.hedge_after_seconds <= 0 or len(self.backends) < 2:
+            return await self._attempt_async(first, attempt)
+
+        pending = {asyncio.create_task(self._attempt_async(first, attempt))}
+        done, pending = await asyncio.wait(pending, timeout=self.hedge_after_seconds)
+        hedge: Optional[asyncio.Task] = None
+        if not done:
+            second = self.choose(model, exclude=[first])
+            if second is not None:
+                if is_debug_mode():
+                    print(f"[DEBUG] BackendPool: No answer from {first.base_url} after {self.hedge_after_seconds}s; hedging to {second.base_url}.")
+                hedge = asyncio.create_task(self._attempt_async(second, attempt))
+                pending.add(hedge)
+                with self._lock:
+                    self.hedged_requests += 1
+        try:
+            while True:
+                if not done:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                finished = done.pop()
+                failed = finished.exception() is not None or finished.result() is None
+                if not failed or (not pending and not done):
+                    if finished is hedge and not failed:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return finished.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # --- Health checks ---
+
+    async def check_health(self, session: aiohttp.ClientSession) -> Dict[str, bool]:
+        """Lists each backend's models (/api/tags); reachable backends are readmitted, others ejected."""
+        self._last_health_check = time.monotonic()
+        timeout = aiohttp.ClientTimeout(total=OLLAMA_BACKEND_HEALTH_CHECK_TIMEOUT_SECONDS)
+
+        async def check(backend: Backend) -> bool:
+            try:
+                async with session.get(f"{backend.base_url}/api/tags", timeout=timeout) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+                models = {m.get("name") for m in data.get("models", []) if isinstance(m, dict) and m.get("name")}
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                with self._lock:
+                    if backend.healthy:
+                        print(f"BackendPool: Ejecting Ollama backend {backend.base_url}: health check failed ({e}).")
+                    backend.healthy = False
+                return False
+            with self._lock:
+                if not backend.healthy:
+                    print(f"BackendPool: Readmitting Ollama backend {backend.base_url}.")
+                    reset_circuit_breakers(backend.base_url)
+                backend.healthy = True
+                backend.consecutive_failures = 0
+                backend.models = models
+            return True
+
+        results = await asyncio.gather(*(check(b) for b in self.backends))
+        return {b.base_url: ok for b, ok in zip(self.backends, results)}
+
+    def _maybe_schedule_health_check(self, session: aiohttp.ClientSession) -> None:
+        if self.health_check_interval <= 0 or time.monotonic() - self._last_health_check < self.health_check_interval:
+            return
+        if self._health_check_task is not None and not self._health_check_task.done():
+            return
+        self._last_health_check = time.monotonic()
+        self._health_check_task = asyncio.create_task(self.check_health(session))
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-backend health, load, latency and models, plus hedging counters."""
+        with self._lock:
+            return {
+                "backends": {b.base_url: b.stats() for b in self.backends},
+                "hedged_requests": self.hedged_requests,
+                "hedge_wins": self.hedge_wins,
+            }
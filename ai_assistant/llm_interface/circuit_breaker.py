@@ -0,0 +1,175 @@
+# ai_assistant/llm_interface/circuit_breaker.py
+"""
+Circuit breakers for LLM servers, one per endpoint.
+
+A breaker starts CLOSED and lets requests through while recording their
+outcomes in a rolling window of LLM_CIRCUIT_WINDOW_SECONDS. Once the window
+holds at least LLM_CIRCUIT_MIN_REQUESTS outcomes and the share of failures
+(connection errors, timeouts, 5xx; see LLMClientError.breaker_failure) reaches
+LLM_CIRCUIT_FAILURE_RATE, it OPENs (other errors are not recorded at all): requests fail at once with
+LLMCircuitOpenError instead of waiting on a server that is down. After
+LLM_CIRCUIT_OPEN_SECONDS it is HALF_OPEN and lets one probe request through;
+its success closes the breaker, its failure opens it again.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+from ai_assistant.config import (
+    LLM_CIRCUIT_BREAKER_ENABLED,
+    LLM_CIRCUIT_WINDOW_SECONDS,
+    LLM_CIRCUIT_MIN_REQUESTS,
+    LLM_CIRCUIT_FAILURE_RATE,
+    LLM_CIRCUIT_OPEN_SECONDS,
+)
+from ai_assistant.llm_interface.errors import LLMCircuitOpenError, LLMClientError
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+_breakers: Dict[str, "CircuitBreaker"] = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a rolling window of request outcomes."""
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = LLM_CIRCUIT_WINDOW_SECONDS,
+        min_requests: int = LLM_CIRCUIT_MIN_REQUESTS,
+        failure_rate: float = LLM_CIRCUIT_FAILURE_RATE,
+        open_seconds: float = LLM_CIRCUIT_OPEN_SECONDS,
+        enabled: bool = LLM_CIRCUIT_BREAKER_ENABLED
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = max(1, min_requests)
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.enabled = enabled
+        self.state = STATE_CLOSED
+        self.times_opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque() # (time, failed)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now: float) -> None:
+        self.state = STATE_OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def before_request(self) -> bool:
+        """Admits a request or raises LLMCircuitOpenError. Returns True if the request is the half-open probe."""
+        if not self.enabled:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_OPEN and now - self._opened_at >= self.open_seconds:
+                self.state = STATE_HALF_OPEN
+            if self.state == STATE_CLOSED:
+                return False
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            retry_in = max(0.0, self.open_seconds - (now - self._opened_at))
+            raise LLMCircuitOpenError(f"Circuit for {self.name} is {self.state}; not sending the request (retry in ~{retry_in:.0f}s).")
+
+    def record(self, failed: bool, probe: bool = False) -> None:
+        """Records the outcome of an admitted request."""
+        if not self.enabled:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if probe:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self.state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state != STATE_CLOSED:
+                return # A request admitted before the breaker opened
+            self._outcomes.append((now, failed))
+            self._prune(now)
+            failures = sum(1 for _, f in self._outcomes if f)
+            if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.failure_rate:
+                print(f"CircuitBreaker: Opening circuit for {self.name} ({failures}/{len(self._outcomes)} requests failed "
+                      f"in the last {self.window_seconds:.0f}s); failing fast for {self.open_seconds:.0f}s.")
+                self._open(now)
+
+    def _abandon_probe(self) -> None:
+        with self._lock:
+            self._probe_in_flight = False
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Admits the request in the block (or raises LLMCircuitOpenError) and records how it ended.
+        Errors that are not the server's fault (client errors, bugs, cancellation) record no outcome,
+        so they neither count as failures nor dilute the failure rate as successes.
+        """
+        probe = self.before_request()
+        try:
+            yield
+        except LLMClientError as e:
+            if e.breaker_failure:
+                self.record(True, probe)
+            elif probe:
+                self._abandon_probe()
+            raise
+        except BaseException:
+            if probe:
+                self._abandon_probe()
+            raise
+        else:
+            self.record(False, probe)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            return {
+                "state": self.state,
+                "window_requests": len(self._outcomes),
+                "window_failures": sum(1 for _, f in self._outcomes if f),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """The breaker for an LLM server (see request_scheduler.endpoint_key), created on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """The state and recent outcomes of every server's breaker."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {endpoint: breaker.stats() for endpoint, breaker in breakers.items()}
+
+
+def reset_circuit_breakers(endpoint: Optional[str] = None) -> None:
+    """Forgets the breaker of one server, or of all of them."""
+    with _breakers_lock:
+        if endpoint is None:
+            _breakers.clear()
+        else:
+            _breakers.pop(endpoint, None)
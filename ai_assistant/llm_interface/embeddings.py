@@ -0,0 +1,183 @@
+# ai_assistant/llm_interface/embeddings.py
+"""
+Local text embedding backends for semantic retrieval.
+
+`OllamaEmbeddingBackend` calls Ollama's batched /api/embed endpoint.
+`HashingEmbeddingBackend` is a deterministic hashing vectorizer that needs no model
+(word unigrams/bigrams and character trigrams) used offline and in tests.
+Backends return L2-normalised float32 matrices, so a dot product is the cosine similarity.
+Vectors from different backends are not comparable; `embed_with_name()` tells which
+backend produced a matrix, so indexes never mix them.
+"""
+import hashlib
+import re
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_assistant.config import (
+    is_debug_mode,
+    EMBEDDING_BACKEND,
+    EMBEDDING_MODEL,
+    EMBEDDING_PRIMARY_RETRY_SECONDS,
+    HASHING_EMBEDDING_DIMENSION
+)
+from ai_assistant.llm_interface.errors import LLMClientError
+
+_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+# Function words dominate short texts under feature hashing, so the hashing backend ignores them.
+_HASHING_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "was", "with"
+}
+# (connect, read) timeouts for embedding requests; embeddings are short calls.
+_EMBED_TIMEOUT_SECONDS = (3.0, 60.0)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingBackend:
+    """Interface: `embed(texts)` returns a (len(texts), dimension) float32 matrix of unit vectors."""
+
+    name: str = "base"
+    dimension: int = 0
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def embed_with_name(self, texts: Sequence[str]) -> Tuple[str, np.ndarray]:
+        """Like `embed`, also returning the name of the backend that produced the vectors."""
+        return self.name, self.embed(texts)
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """Signed feature hashing of words, word bigrams and character trigrams."""
+
+    def __init__(self, dimension: int = HASHING_EMBEDDING_DIMENSION):
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def _features(self, text: str) -> List[str]:
+        words = [word for word in _WORD_PATTERN.findall(text.lower()) if word not in _HASHING_STOPWORDS]
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text or ""):
+                digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                column = value % self.dimension
+                # Word features weigh more than sub-word features.
+                weight = 1.0 if feature[0] != "c" else 0.5
+                matrix[row, column] += weight if (value >> 63) & 1 else -weight
+        return _normalize_rows(matrix)
+
+
+class OllamaEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds texts with an Ollama embedding model via /api/embed, through the same pooled
+    session, scheduler, circuit breaker and deadline as other LLM requests (see
+    ollama_client.embed_texts). Failures raise LLMClientError.
+    """
+
+    def __init__(self, model: str = EMBEDDING_MODEL, base_url: Optional[str] = None):
+        self.model = model
+        self.base_url = base_url
+        self.name = f"ollama-{model}"
+        self.dimension = 0 # Known after the first successful call
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        from ai_assistant.llm_interface.ollama_client import embed_texts
+        # Not retried: callers fall back to another backend, and queries embed on the prompt path.
+        embeddings = embed_texts(list(texts), self.model, base_url=self.base_url, timeout=_EMBED_TIMEOUT_SECONDS, retries=0)
+        matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+        self.dimension = matrix.shape[1]
+        return _normalize_rows(matrix)
+
+
+class FallbackEmbeddingBackend(EmbeddingBackend):
+    """
+    Uses `primary`; when it fails, uses `fallback` for `retry_primary_seconds` and then
+    tries `primary` again. `name` reflects the active backend, so indexes built with one
+    backend are rebuilt rather than mixed with vectors from the other.
+    """
+
+    def __init__(
+        self,
+        primary: EmbeddingBackend,
+        fallback: EmbeddingBackend,
+        retry_primary_seconds: float = EMBEDDING_PRIMARY_RETRY_SECONDS
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.retry_primary_seconds = retry_primary_seconds
+        self._active = primary
+        self._primary_failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self._active.name
+
+    @property
+    def dimension(self) -> int:
+        return self._active.dimension
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return self.embed_with_name(texts)[1]
+
+    def embed_with_name(self, texts: Sequence[str]) -> Tuple[str, np.ndarray]:
+        with self._lock:
+            try_primary = (self._primary_failed_at is None
+                           or time.monotonic() - self._primary_failed_at >= self.retry_primary_seconds)
+        if try_primary:
+            try:
+                vectors = self.primary.embed(texts)
+            except (LLMClientError, ValueError) as e:
+                with self._lock:
+                    was_active = self._active is self.primary
+                    self._active = self.fallback
+                    self._primary_failed_at = time.monotonic()
+                if was_active:
+                    print(f"Warning: Embedding backend '{self.primary.name}' unavailable ({e}). Falling back to "
+                          f"'{self.fallback.name}'; retrying it in {self.retry_primary_seconds:.0f}s.")
+            else:
+                with self._lock:
+                    recovered = self._active is not self.primary
+                    self._active = self.primary
+                    self._primary_failed_at = None
+                if recovered:
+                    print(f"Embedding backend '{self.primary.name}' is available again.")
+                return self.primary.name, vectors
+        return self.fallback.name, self.fallback.embed(texts)
+
+
+_embedding_backend: Optional[EmbeddingBackend] = None
+_embedding_backend_lock = threading.Lock()
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """Returns the process-wide embedding backend selected by EMBEDDING_BACKEND."""
+    global _embedding_backend
+    if _embedding_backend is None:
+        with _embedding_backend_lock:
+            if _embedding_backend is None:
+                hashing_backend = HashingEmbeddingBackend()
+                if EMBEDDING_BACKEND == "ollama":
+                    _embedding_backend = FallbackEmbeddingBackend(OllamaEmbeddingBackend(), hashing_backend)
+                else:
+                    if EMBEDDING_BACKEND != "hashing" and is_debug_mode():
+                        print(f"[DEBUG] Unknown EMBEDDING_BACKEND '{EMBEDDING_BACKEND}', using hashing.")
+                    _embedding_backend = hashing_backend
+    return _embedding_backend
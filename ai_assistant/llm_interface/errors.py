@@ -0,0 +1,64 @@
+# ai_assistant/llm_interface/errors.py
+"""
+Typed failures of LLM requests.
+
+The transport layer of the Ollama client raises these instead of returning
+None, so that retry_with_backoff can retry the transient ones (`retryable`) and
+the circuit breaker can count the ones that mean the server is unwell
+(`breaker_failure`). The public invoke functions still turn them into a None
+result for their callers.
+"""
+from typing import Optional
+
+
+class LLMClientError(Exception):
+    """A request to the LLM server failed."""
+    retryable = False       # Worth sending again after a backoff
+    breaker_failure = False # Counts against the server in its circuit breaker
+
+
+class LLMUnavailableError(LLMClientError):
+    """The server could not be reached or did not answer in time."""
+    retryable = True
+    breaker_failure = True
+
+
+class LLMConnectionError(LLMUnavailableError):
+    """Connecting to the server failed or the connection was lost."""
+
+
+class LLMTimeoutError(LLMUnavailableError):
+    """The server accepted the request but did not answer within the read timeout."""
+
+
+class LLMHTTPError(LLMClientError):
+    """The server answered with an error status. 5xx (and 429) are transient; other 4xx are not."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status is None or self.status >= 500 or self.status == 429
+
+    @property
+    def breaker_failure(self) -> bool:
+        return self.status is None or self.status >= 500
+
+
+class LLMResponseError(LLMClientError):
+    """The server's response could not be understood (e.g. invalid JSON)."""
+
+
+class LLMCircuitOpenError(LLMClientError):
+    """The circuit breaker for the server is open: the request was not sent."""
+
+
+class LLMDeadlineExceededError(LLMClientError):
+    """The current prompt's time budget (see core/deadline.py) ran out before or while the request was made."""
+
+
+def is_retryable_llm_error(error: BaseException) -> bool:
+    """retry_if predicate for retry_with_backoff: retries transient LLM failures only."""
+    return isinstance(error, LLMClientError) and error.retryable
@@ -1,10 +1,13 @@
 # ai_assistant/llm_interface/ollama_client.py
 import requests
 import json
-from typing import Optional, Dict, Union, Tuple, Any, List
+from typing import Optional, Dict, Union, Tuple, Any, List, AsyncIterator, NamedTuple
 import asyncio
 import aiohttp
+import contextlib
 import os # Added import os
+import threading
+from requests.adapters import HTTPAdapter
 
 from ai_assistant.config import (
     DEFAULT_MODEL as CFG_DEFAULT_MODEL,
@@ -14,9 +17,32 @@ from ai_assistant.config import (
     ENABLE_CHAIN_OF_THOUGHT,
     DEFAULT_TEMPERATURE_THINKING,
     DEFAULT_TEMPERATURE_RESPONSE,
-    THINKING_CONFIG
+    THINKING_CONFIG,
+    OLLAMA_POOL_MAX_CONNECTIONS,
+    OLLAMA_POOL_MAX_CONNECTIONS_PER_HOST,
+    OLLAMA_KEEPALIVE_SECONDS,
+    OLLAMA_REQUEST_TIMEOUT_SECONDS,
+    OLLAMA_CONNECT_TIMEOUT_SECONDS,
+    OLLAMA_READ_TIMEOUT_SECONDS,
+    OLLAMA_BACKENDS,
+    LLM_REQUEST_RETRIES
 )
+from ai_assistant.core.deadline import deadline_expired, shrink_timeout
 from ai_assistant.debugging.resilience import retry_with_backoff
+from ai_assistant.llm_interface.backend_pool import BackendPool
+from ai_assistant.llm_interface.circuit_breaker import circuit_breaker_stats, get_circuit_breaker
+from ai_assistant.llm_interface.errors import (
+    LLMClientError,
+    LLMConnectionError,
+    LLMDeadlineExceededError,
+    LLMHTTPError,
+    LLMResponseError,
+    LLMTimeoutError,
+    is_retryable_llm_error,
+)
+from ai_assistant.llm_interface.response_cache import LLMResponseCache, get_response_cache
+from ai_assistant.llm_interface.request_scheduler import endpoint_key, get_request_scheduler
+from ai_assistant.llm_interface.singleflight import get_singleflight, should_coalesce
 
 OLLAMA_API_ENDPOINT = "http://192.168.86.30:11434/api/generate"
 OLLAMA_CHAT_API_ENDPOINT = "http://192.168.86.30:11434/api/chat"
@@ -66,16 +92,167 @@ def process_llm_response(response_data: Dict) -> Optional[Tuple[str, Optional[st
         
     return (content, thinking)
 
-@retry_with_backoff(retries=3, base_delay=1.0, max_delay=10.0, jitter=True)
+def _thinking_mode_for(model_name: str) -> str:
+    """Which reasoning mode a request runs in; part of the response cache key."""
+    if ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS:
+        return "native_thinking"
+    if ENABLE_CHAIN_OF_THOUGHT:
+        return "chain_of_thought"
+    return "none"
+
+def _cache_key_for_request(
+    prompt: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    task_name: Optional[str],
+    cache: Optional[bool]
+) -> Optional[str]:
+    """Returns the response cache key if this request may use the cache, else None."""
+    response_cache = get_response_cache()
+    if not response_cache.should_cache(temperature, task_name=task_name, cache=cache):
+        return None
+    return LLMResponseCache.make_key(model_name, prompt, temperature, max_tokens, _thinking_mode_for(model_name))
+
+def _api_endpoint_for(base_url: str, model_name: str) -> str:
+    """The API URL a request for `model_name` uses on the server at `base_url`."""
+    use_chat_api = ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS
+    return f"{base_url.rstrip('/')}/api/{'chat' if use_chat_api else 'generate'}"
+
+def _flight_key_for_request(
+    prompt: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    coalesce: Optional[bool]
+) -> Optional[str]:
+    """Returns the key identical in-flight requests share if this request may be coalesced, else None."""
+    if not should_coalesce(temperature, coalesce):
+        return None
+    return LLMResponseCache.make_key(model_name, prompt, temperature, max_tokens, _thinking_mode_for(model_name))
+
+def _sync_timeout() -> Tuple[float, float]:
+    """
+    (connect, read) timeouts for `requests`: a host that is down fails in seconds, a long
+    generation is still awaited. Both are capped to what is left of the current deadline.
+    """
+    return (shrink_timeout(OLLAMA_CONNECT_TIMEOUT_SECONDS), shrink_timeout(OLLAMA_READ_TIMEOUT_SECONDS))
+
+def _async_timeout() -> aiohttp.ClientTimeout:
+    """aiohttp counterpart of `_sync_timeout`, within the overall request timeout."""
+    return aiohttp.ClientTimeout(
+        total=shrink_timeout(OLLAMA_REQUEST_TIMEOUT_SECONDS),
+        sock_connect=shrink_timeout(OLLAMA_CONNECT_TIMEOUT_SECONDS),
+        sock_read=shrink_timeout(OLLAMA_READ_TIMEOUT_SECONDS)
+    )
+
+def _check_deadline_before_request() -> None:
+    if deadline_expired():
+        raise LLMDeadlineExceededError("The time budget for this prompt is used up; not sending the request.")
+
+def _timeout_error(message: str) -> LLMClientError:
+    """A timeout caused by the current deadline is reported as such, not as a slow server."""
+    if deadline_expired():
+        return LLMDeadlineExceededError(f"The time budget for this prompt ran out during the request: {message}")
+    return LLMTimeoutError(message)
+
+def _llm_error_from_requests(e: requests.exceptions.RequestException) -> LLMClientError:
+    """The typed LLM error for a `requests` failure."""
+    if isinstance(e, ValueError): # requests' JSONDecodeError
+        return LLMResponseError(str(e))
+    if isinstance(e, requests.exceptions.HTTPError):
+        return LLMHTTPError(str(e), e.response.status_code if e.response is not None else None)
+    if isinstance(e, requests.exceptions.ConnectTimeout) and deadline_expired():
+        return _timeout_error(str(e))
+    if isinstance(e, requests.exceptions.ConnectionError): # Includes ConnectTimeout
+        return LLMConnectionError(str(e))
+    if isinstance(e, requests.exceptions.Timeout):
+        return _timeout_error(str(e))
+    return LLMClientError(str(e))
+
+def _llm_error_from_aiohttp(e: BaseException) -> LLMClientError:
+    """The typed LLM error for an aiohttp failure or timeout."""
+    if isinstance(e, aiohttp.ContentTypeError):
+        return LLMResponseError(str(e))
+    if isinstance(e, aiohttp.ClientResponseError):
+        return LLMHTTPError(str(e), e.status)
+    if isinstance(e, asyncio.TimeoutError): # Includes aiohttp's ServerTimeoutError
+        return _timeout_error(str(e) or "Request to Ollama timed out.")
+    if isinstance(e, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return LLMConnectionError(str(e))
+    return LLMClientError(str(e))
+
 def invoke_ollama_model(
     prompt: str,
     model_name: str = DEFAULT_OLLAMA_MODEL,
     temperature: float = 0.7,
-    max_tokens: int = 1500
+    max_tokens: int = 1500,
+    api_endpoint_override: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    task_name: Optional[str] = None,
+    cache: Optional[bool] = None,
+    coalesce: Optional[bool] = None,
+    backend_pool: Optional[BackendPool] = None
 ) -> Optional[str]:
+    """
+    Invokes an Ollama model synchronously and returns the response text (or None).
+    Responses are served from / stored into the response cache when allowed:
+    `cache=None` caches temperature-0 requests only, `cache=True` opts a sampled
+    request in, `cache=False` bypasses. `task_name` (a TASK_MODELS key) selects the TTL.
+    `coalesce` follows the same rules for sharing the result of an identical
+    request already in flight (see singleflight.py). Without an
+    `api_endpoint_override`, the request is routed through `backend_pool` (or the
+    configured OLLAMA_BACKENDS pool, if any) instead of the default host.
+    Transient failures (see errors.py) are retried with backoff; while a server's
+    circuit breaker is open, requests to it fail at once. Timeouts are capped to
+    the current prompt's deadline, and no request is sent once it has expired.
+    Failures are reported and return None.
+    """
+    cache_key = _cache_key_for_request(prompt, model_name, temperature, max_tokens, task_name, cache)
+    if cache_key:
+        cached_response = get_response_cache().get(cache_key)
+        if cached_response is not None:
+            if is_debug_mode(): print(f"[DEBUG] LLM response cache hit for model {model_name} (task: {task_name}).")
+            return cached_response
+
+    @retry_with_backoff(retries=LLM_REQUEST_RETRIES, base_delay=1.0, max_delay=10.0, jitter=True, retry_if=is_retryable_llm_error)
+    def attempt(api_endpoint: Optional[str]) -> Optional[str]:
+        _check_deadline_before_request()
+        endpoint = endpoint_key(api_endpoint or OLLAMA_API_ENDPOINT)
+        with get_circuit_breaker(endpoint).guard(), get_request_scheduler().slot_sync(model_name, endpoint):
+            return _invoke_ollama_model_uncached(prompt, model_name, temperature, max_tokens, api_endpoint, session)
+
+    def send() -> Optional[str]:
+        pool = backend_pool or (None if api_endpoint_override else get_default_backend_pool())
+        try:
+            if pool is not None:
+                result = pool.run_sync(model_name, lambda base_url: attempt(_api_endpoint_for(base_url, model_name)))
+            else:
+                result = attempt(api_endpoint_override)
+        except LLMClientError as e:
+            print(f"LLM request to model '{model_name}' failed: {e}")
+            return None
+        if cache_key and result:
+            get_response_cache().put(cache_key, result, task_name=task_name, model=model_name)
+        return result
+
+    flight_key = _flight_key_for_request(prompt, model_name, temperature, max_tokens, coalesce)
+    return get_singleflight().do_sync(flight_key, send) if flight_key else send()
+
+def _invoke_ollama_model_uncached(
+    prompt: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    api_endpoint_override: Optional[str],
+    session: Optional[requests.Session]
+) -> str:
     enable_thinking = ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS
     enable_chain_of_thought = ENABLE_CHAIN_OF_THOUGHT and not enable_thinking
     use_chat_api = enable_thinking
+    http = session or get_default_provider().get_sync_session()
+    # The chain-of-thought phases always use the generate API of the selected host.
+    cot_api_endpoint = api_endpoint_override or OLLAMA_API_ENDPOINT
 
     if enable_chain_of_thought:
         thinking_prompt = THINKING_PROMPT_TEMPLATE.format(user_prompt=prompt)
@@ -92,7 +269,7 @@ def invoke_ollama_model(
             print(f"[DEBUG] Chain of thought - Thinking phase starting for model {model_name}")
             print(f"[DEBUG] Thinking prompt: {thinking_prompt[:200]}...")
         try:
-            thinking_response = requests.post(OLLAMA_API_ENDPOINT, json=thinking_payload, timeout=600)
+            thinking_response = http.post(cot_api_endpoint, json=thinking_payload, timeout=_sync_timeout())
             thinking_response.raise_for_status()
             thinking_result = thinking_response.json().get("response", "").strip()
             if thinking_result:
@@ -112,7 +289,7 @@ def invoke_ollama_model(
             if is_debug_mode():
                 print(f"[DEBUG] Chain of thought - Response phase starting")
                 print(f"[DEBUG] Response prompt: {response_prompt[:200]}...")
-            final_response = requests.post(OLLAMA_API_ENDPOINT, json=final_payload, timeout=600)
+            final_response = http.post(cot_api_endpoint, json=final_payload, timeout=_sync_timeout())
             final_response.raise_for_status()
             final_result = final_response.json().get("response", "").strip()
             if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
@@ -120,7 +297,7 @@ def invoke_ollama_model(
             return final_result
         except requests.exceptions.RequestException as e:
             print(f"Error during chain of thought process: {e}")
-            return None
+            raise _llm_error_from_requests(e) from e
 
     payload = {
         "model": model_name,
@@ -130,14 +307,14 @@ def invoke_ollama_model(
         "options": {"temperature": temperature, "num_predict": max_tokens}
     }
     if use_chat_api: payload["think"] = True
-    api_endpoint = OLLAMA_CHAT_API_ENDPOINT if use_chat_api else OLLAMA_API_ENDPOINT
+    api_endpoint = api_endpoint_override or (OLLAMA_CHAT_API_ENDPOINT if use_chat_api else OLLAMA_API_ENDPOINT)
 
     try:
         if is_debug_mode():
             print(f"[DEBUG] Sending request to Ollama with model: {model_name}, prompt: '{prompt[:100]}...'")
             if enable_thinking: print(f"[DEBUG] Native thinking enabled for model {model_name}")
         else: print(f"Sending request to Ollama with model: {model_name}, prompt: '{prompt[:50]}...'")
-        response = requests.post(api_endpoint, json=payload, timeout=600)
+        response = http.post(api_endpoint, json=payload, timeout=_sync_timeout())
         response.raise_for_status()
     except requests.exceptions.HTTPError as e:
         print(f"HTTP error occurred: {e}")
@@ -145,19 +322,20 @@ def invoke_ollama_model(
             print(f"[DEBUG] Status code: {e.response.status_code}")
             try: print(f"[DEBUG] Response body: {e.response.json()}")
             except Exception: print(f"[DEBUG] Response body could not be parsed as JSON.")
-        return None
+        raise _llm_error_from_requests(e) from e
     except requests.exceptions.RequestException as e:
         print(f"Error invoking Ollama model '{model_name}': {e}")
         print("Please ensure the Ollama service is running and accessible.")
-        return None
+        raise _llm_error_from_requests(e) from e
     except Exception as e:
         print(f"An unexpected error occurred during the request: {e}")
-        return None
+        raise LLMResponseError(f"Unexpected error during the request: {e}") from e
 
     try:
         parsed_response = response.json()
         result = process_llm_response(parsed_response)
-        if not result: return None
+        if not result:
+            raise LLMResponseError("The response from Ollama had no content.")
         content, thinking = result
         if enable_thinking:
             if thinking:
@@ -169,18 +347,67 @@ def invoke_ollama_model(
                 print(f"[DEBUG] Native thinking enabled for {model_name}, but no thinking process was returned by the model.")
         if is_debug_mode(): print(f"[DEBUG] Final content being returned: {content[:200]}...")
         return content
-    except json.JSONDecodeError:
+    except json.JSONDecodeError as e:
         print("Error: Failed to parse JSON response from Ollama.")
         print(f"Raw response text: {response.text}")
-        return None
+        raise LLMResponseError(f"Failed to parse JSON response from Ollama: {e}") from e
 
 async def invoke_ollama_model_async_internal(
     prompt: str,
     model_name: str = DEFAULT_OLLAMA_MODEL,
     temperature: float = 0.7,
     max_tokens: int = 1500,
-    api_endpoint_override: Optional[str] = None
+    api_endpoint_override: Optional[str] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    task_name: Optional[str] = None,
+    cache: Optional[bool] = None,
+    coalesce: Optional[bool] = None,
+    backend_pool: Optional[BackendPool] = None
 ) -> Optional[str]:
+    """Async counterpart of `invoke_ollama_model`, with the same caching, coalescing, routing and retry rules."""
+    cache_key = _cache_key_for_request(prompt, model_name, temperature, max_tokens, task_name, cache)
+    if cache_key:
+        cached_response = get_response_cache().get(cache_key)
+        if cached_response is not None:
+            if is_debug_mode(): print(f"[DEBUG] LLM response cache hit for model {model_name} (task: {task_name}).")
+            return cached_response
+
+    @retry_with_backoff(retries=LLM_REQUEST_RETRIES, base_delay=1.0, max_delay=10.0, jitter=True, retry_if=is_retryable_llm_error)
+    async def attempt(api_endpoint: Optional[str]) -> Optional[str]:
+        _check_deadline_before_request()
+        endpoint = endpoint_key(api_endpoint or OLLAMA_API_ENDPOINT)
+        with get_circuit_breaker(endpoint).guard():
+            async with get_request_scheduler().slot(model_name, endpoint):
+                return await _invoke_ollama_model_async_uncached(prompt, model_name, temperature, max_tokens, api_endpoint, session)
+
+    async def send() -> Optional[str]:
+        pool = backend_pool or (None if api_endpoint_override else get_default_backend_pool())
+        try:
+            if pool is not None:
+                result = await pool.run_async(
+                    model_name, lambda base_url: attempt(_api_endpoint_for(base_url, model_name)),
+                    session=session or await get_default_provider().get_async_session()
+                )
+            else:
+                result = await attempt(api_endpoint_override)
+        except LLMClientError as e:
+            print(f"LLM request to model '{model_name}' failed: {e}")
+            return None
+        if cache_key and result:
+            get_response_cache().put(cache_key, result, task_name=task_name, model=model_name)
+        return result
+
+    flight_key = _flight_key_for_request(prompt, model_name, temperature, max_tokens, coalesce)
+    return await get_singleflight().do(flight_key, send) if flight_key else await send()
+
+async def _invoke_ollama_model_async_uncached(
+    prompt: str,
+    model_name: str,
+    temperature: float,
+    max_tokens: int,
+    api_endpoint_override: Optional[str],
+    session: Optional[aiohttp.ClientSession]
+) -> str:
     enable_thinking = ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS
     enable_chain_of_thought = ENABLE_CHAIN_OF_THOUGHT and not enable_thinking
     use_chat_api = enable_thinking
@@ -188,7 +415,9 @@ async def invoke_ollama_model_async_internal(
     current_api_endpoint = api_endpoint_override if api_endpoint_override else OLLAMA_API_ENDPOINT
     if use_chat_api and not api_endpoint_override:
         current_api_endpoint = OLLAMA_CHAT_API_ENDPOINT
-
+    if session is None:
+        session = await get_default_provider().get_async_session()
+    request_timeout = _async_timeout()
 
     if enable_chain_of_thought:
         thinking_prompt = THINKING_PROMPT_TEMPLATE.format(user_prompt=prompt)
@@ -199,39 +428,44 @@ async def invoke_ollama_model_async_internal(
         if is_debug_mode():
             print(f"[DEBUG] Chain of thought - Thinking phase starting for model {model_name}")
             print(f"[DEBUG] Thinking prompt: {thinking_prompt[:200]}...")
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=600.0)) as session:
-            try:
-                async with session.post(OLLAMA_API_ENDPOINT, json=thinking_payload) as thinking_response:
-                    thinking_response.raise_for_status()
-                    thinking_data = await thinking_response.json()
-                    thinking_result = thinking_data.get("response", "").strip()
-                    if thinking_result:
-                        if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
-                            print(f"[DEBUG] {THINKING_CONFIG['display']['prefix'].strip()} {thinking_result} {THINKING_CONFIG['display']['suffix'].strip()}")
-                        elif not is_debug_mode() and THINKING_CONFIG["display"]["show_in_release"]:
-                            print(f"{THINKING_CONFIG['display']['prefix'].strip()} {thinking_result} {THINKING_CONFIG['display']['suffix'].strip()}")
-                    elif is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
-                        print(f"[DEBUG] Async CoT: No thinking process generated.")
-                    response_prompt = RESPONSE_WITH_THINKING_PROMPT_TEMPLATE.format(
-                        thinking_process=thinking_result, user_prompt=prompt
-                    )
-                    final_payload = {
-                        "model": model_name, "prompt": response_prompt, "stream": False,
-                        "options": {"temperature": DEFAULT_TEMPERATURE_RESPONSE, "num_predict": max_tokens}
-                    }
-                    if is_debug_mode():
-                        print(f"[DEBUG] Chain of thought - Response phase starting")
-                        print(f"[DEBUG] Response prompt: {response_prompt[:200]}...")
-                    async with session.post(OLLAMA_API_ENDPOINT, json=final_payload) as final_response:
-                        final_response.raise_for_status()
-                        final_data = await final_response.json()
-                        final_result = final_data.get("response", "").strip()
-                        if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
-                             print(f"[DEBUG] Async CoT Final Response: {final_result[:200]}...")
-                        return final_result
-            except aiohttp.ClientError as e: print(f"HTTP error occurred in async CoT: {e}"); return None
-            except json.JSONDecodeError as e: print(f"Error decoding JSON in async CoT: {e}"); return None
-            except Exception as e: print(f"An unexpected error occurred in async CoT: {e}"); return None
+        try:
+            async with session.post(current_api_endpoint, json=thinking_payload, timeout=request_timeout) as thinking_response:
+                thinking_response.raise_for_status()
+                thinking_data = await thinking_response.json()
+                thinking_result = thinking_data.get("response", "").strip()
+                if thinking_result:
+                    if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
+                        print(f"[DEBUG] {THINKING_CONFIG['display']['prefix'].strip()} {thinking_result} {THINKING_CONFIG['display']['suffix'].strip()}")
+                    elif not is_debug_mode() and THINKING_CONFIG["display"]["show_in_release"]:
+                        print(f"{THINKING_CONFIG['display']['prefix'].strip()} {thinking_result} {THINKING_CONFIG['display']['suffix'].strip()}")
+                elif is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
+                    print(f"[DEBUG] Async CoT: No thinking process generated.")
+                response_prompt = RESPONSE_WITH_THINKING_PROMPT_TEMPLATE.format(
+                    thinking_process=thinking_result, user_prompt=prompt
+                )
+                final_payload = {
+                    "model": model_name, "prompt": response_prompt, "stream": False,
+                    "options": {"temperature": DEFAULT_TEMPERATURE_RESPONSE, "num_predict": max_tokens}
+                }
+                if is_debug_mode():
+                    print(f"[DEBUG] Chain of thought - Response phase starting")
+                    print(f"[DEBUG] Response prompt: {response_prompt[:200]}...")
+                async with session.post(current_api_endpoint, json=final_payload, timeout=request_timeout) as final_response:
+                    final_response.raise_for_status()
+                    final_data = await final_response.json()
+                    final_result = final_data.get("response", "").strip()
+                    if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
+                         print(f"[DEBUG] Async CoT Final Response: {final_result[:200]}...")
+                    return final_result
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"HTTP error occurred in async CoT: {e}")
+            raise _llm_error_from_aiohttp(e) from e
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON in async CoT: {e}")
+            raise LLMResponseError(str(e)) from e
+        except Exception as e:
+            print(f"An unexpected error occurred in async CoT: {e}")
+            raise LLMResponseError(f"Unexpected error in async CoT: {e}") from e
 
     payload = {
         "model": model_name,
@@ -247,97 +481,493 @@ async def invoke_ollama_model_async_internal(
         if enable_thinking: print(f"[DEBUG] Native thinking enabled for model {model_name}")
     else: print(f"Sending async request to Ollama with model: {model_name}, prompt: '{prompt[:50]}...'")
 
-    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=600.0)) as session:
-        try:
-            async with session.post(current_api_endpoint, json=payload) as response:
+    try:
+        async with session.post(current_api_endpoint, json=payload, timeout=request_timeout) as response:
+            response.raise_for_status()
+            response_data = await response.json()
+            if is_debug_mode(): print(f"[DEBUG] Ollama async response JSON: {str(response_data)[:500]}")
+            result = process_llm_response(response_data)
+            if not result:
+                raise LLMResponseError("The response from Ollama had no content.")
+            content, thinking = result
+            if enable_thinking:
+                if thinking:
+                    if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
+                        print(f"[DEBUG] {THINKING_CONFIG['display']['prefix'].strip()} {thinking} {THINKING_CONFIG['display']['suffix'].strip()}")
+                    elif not is_debug_mode() and THINKING_CONFIG["display"]["show_in_release"]:
+                        print(f"{THINKING_CONFIG['display']['prefix'].strip()} {thinking} {THINKING_CONFIG['display']['suffix'].strip()}")
+                elif is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
+                    print(f"[DEBUG] Async native thinking enabled for {model_name}, but no thinking process was returned by the model.")
+            if is_debug_mode(): print(f"[DEBUG] Async final content being returned: {content[:200]}...")
+            return content
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"HTTP error occurred in async call: {e}")
+        raise _llm_error_from_aiohttp(e) from e
+    except json.JSONDecodeError as e:
+        print("Error: Failed to parse JSON response from Ollama (async).")
+        raise LLMResponseError(str(e)) from e
+    except LLMClientError:
+        raise
+    except Exception as e:
+        print(f"An unexpected error occurred during the async request: {e}")
+        raise LLMResponseError(f"Unexpected error during the async request: {e}") from e
+
+def embed_texts(
+    texts: List[str],
+    model_name: str,
+    base_url: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    timeout: Tuple[float, float] = (OLLAMA_CONNECT_TIMEOUT_SECONDS, 60.0),
+    retries: Optional[int] = None
+) -> List[List[float]]:
+    """
+    Embeds `texts` with one request to Ollama's batched /api/embed endpoint of `base_url`
+    (default: the default provider's host). Like generation requests, it takes a
+    scheduler slot, respects the server's circuit breaker and the current prompt's
+    deadline, and transient failures are retried with backoff (`retries`, default
+    LLM_REQUEST_RETRIES). Unlike them, failures raise LLMClientError, so the caller can
+    fall back to another embedding backend.
+    """
+    provider = get_default_provider()
+    api_endpoint = f"{(base_url or provider.base_url).rstrip('/')}/api/embed"
+    http = session or provider.get_sync_session()
+
+    @retry_with_backoff(retries=LLM_REQUEST_RETRIES if retries is None else retries,
+                        base_delay=1.0, max_delay=10.0, jitter=True, retry_if=is_retryable_llm_error)
+    def attempt() -> List[List[float]]:
+        _check_deadline_before_request()
+        endpoint = endpoint_key(api_endpoint)
+        with get_circuit_breaker(endpoint).guard(), get_request_scheduler().slot_sync(model_name, endpoint):
+            try:
+                response = http.post(
+                    api_endpoint,
+                    json={"model": model_name, "input": list(texts)},
+                    timeout=(shrink_timeout(timeout[0]), shrink_timeout(timeout[1]))
+                )
                 response.raise_for_status()
-                response_data = await response.json()
-                if is_debug_mode(): print(f"[DEBUG] Ollama async response JSON: {str(response_data)[:500]}")
-                result = process_llm_response(response_data)
-                if not result: return None
-                content, thinking = result
-                if enable_thinking:
-                    if thinking:
-                        if is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
-                            print(f"[DEBUG] {THINKING_CONFIG['display']['prefix'].strip()} {thinking} {THINKING_CONFIG['display']['suffix'].strip()}")
-                        elif not is_debug_mode() and THINKING_CONFIG["display"]["show_in_release"]:
-                            print(f"{THINKING_CONFIG['display']['prefix'].strip()} {thinking} {THINKING_CONFIG['display']['suffix'].strip()}")
-                    elif is_debug_mode() and THINKING_CONFIG["display"]["show_working"]:
-                        print(f"[DEBUG] Async native thinking enabled for {model_name}, but no thinking process was returned by the model.")
-                if is_debug_mode(): print(f"[DEBUG] Async final content being returned: {content[:200]}...")
-                return content
-        except aiohttp.ClientError as e: print(f"HTTP error occurred in async call: {e}"); return None
-        except json.JSONDecodeError: print("Error: Failed to parse JSON response from Ollama (async)."); return None
-        except Exception as e: print(f"An unexpected error occurred during the async request: {e}"); return None
-
-invoke_ollama_model_async = retry_with_backoff(retries=3, base_delay=1.0, max_delay=10.0, jitter=True)(invoke_ollama_model_async_internal)
+                embeddings = response.json().get("embeddings")
+            except requests.exceptions.RequestException as e:
+                raise _llm_error_from_requests(e) from e
+            if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                raise LLMResponseError(f"Unexpected /api/embed response for model '{model_name}'.")
+            return embeddings
+
+    return attempt()
+
+# Retries now happen per endpoint attempt, inside the circuit breaker (see invoke_ollama_model).
+invoke_ollama_model_async = invoke_ollama_model_async_internal
+
+STREAM_CHUNK_THINKING = "thinking"
+STREAM_CHUNK_CONTENT = "content"
+
+class LLMStreamChunk(NamedTuple):
+    """A piece of a streamed completion: `kind` is STREAM_CHUNK_THINKING or STREAM_CHUNK_CONTENT."""
+    kind: str
+    text: str
+
+def _chunks_from_stream_line(line_data: Dict[str, Any]) -> List[LLMStreamChunk]:
+    """Converts one NDJSON line of /api/generate or /api/chat streaming output into chunks."""
+    chunks: List[LLMStreamChunk] = []
+    message = line_data.get("message")
+    if isinstance(message, dict):
+        thinking, content = message.get("thinking"), message.get("content")
+    else:
+        thinking, content = line_data.get("thinking"), line_data.get("response")
+    if thinking:
+        chunks.append(LLMStreamChunk(STREAM_CHUNK_THINKING, thinking))
+    if content:
+        chunks.append(LLMStreamChunk(STREAM_CHUNK_CONTENT, content))
+    return chunks
+
+async def _stream_ndjson_request(
+    session: aiohttp.ClientSession,
+    api_endpoint: str,
+    payload: Dict[str, Any]
+) -> AsyncIterator[LLMStreamChunk]:
+    """
+    Posts a streaming request and yields chunks as Ollama's NDJSON lines arrive. Failures raise
+    LLMClientError, including a stream that ends before Ollama's final "done" line.
+    """
+    done = False
+    try:
+        async with session.post(api_endpoint, json=payload, timeout=_async_timeout()) as response:
+            response.raise_for_status()
+            async for raw_line in response.content:
+                line = raw_line.strip()
+                if not line:
+                    continue
+                line_data = json.loads(line)
+                if line_data.get("error"):
+                    raise aiohttp.ClientPayloadError(f"Ollama stream error: {line_data['error']}")
+                for chunk in _chunks_from_stream_line(line_data):
+                    yield chunk
+                if line_data.get("done"):
+                    done = True
+                    break
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        raise _llm_error_from_aiohttp(e) from e
+    except json.JSONDecodeError as e:
+        raise LLMResponseError(f"Failed to parse a streamed JSON line from Ollama: {e}") from e
+    if not done:
+        raise LLMConnectionError("The stream from Ollama ended before the response was done.")
+
+async def stream_ollama_model_async(
+    prompt: str,
+    model_name: str = DEFAULT_OLLAMA_MODEL,
+    temperature: float = 0.7,
+    max_tokens: int = 1500,
+    api_endpoint_override: Optional[str] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    backend_pool: Optional[BackendPool] = None
+) -> AsyncIterator[LLMStreamChunk]:
+    """
+    Streaming counterpart of `invoke_ollama_model_async_internal`.
+    Yields thinking and content chunks as the model produces them instead of
+    waiting for the whole completion. With chain-of-thought prompting, the
+    thinking phase is streamed as thinking chunks followed by the response phase.
+    Errors are reported and then raised as LLMClientError, so a stream that broke
+    off can be told apart from a complete one; the consumer decides what to do
+    with the chunks it already has. The scheduler slot is held until the stream
+    ends or the generator is closed; consumers that stop early should close it
+    (e.g. with contextlib.aclosing).
+    Streams are routed like other requests and respect the server's circuit
+    breaker, but are never hedged or retried.
+    """
+    enable_thinking = ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS
+    enable_chain_of_thought = ENABLE_CHAIN_OF_THOUGHT and not enable_thinking
+    use_chat_api = enable_thinking
+
+    current_api_endpoint = api_endpoint_override if api_endpoint_override else OLLAMA_API_ENDPOINT
+    if use_chat_api and not api_endpoint_override:
+        current_api_endpoint = OLLAMA_CHAT_API_ENDPOINT
+    pool = backend_pool or (None if api_endpoint_override else get_default_backend_pool())
+    backend = pool.choose(model_name) if pool is not None else None
+    if backend is not None:
+        current_api_endpoint = _api_endpoint_for(backend.base_url, model_name)
+    if session is None:
+        session = await get_default_provider().get_async_session()
+
+    if is_debug_mode():
+        print(f"[DEBUG] Streaming request to Ollama with model: {model_name}, prompt: '{prompt[:100]}...' to {current_api_endpoint}")
+
+    try:
+        _check_deadline_before_request()
+        endpoint = endpoint_key(current_api_endpoint)
+        with pool.track(backend) if backend is not None else contextlib.nullcontext(), get_circuit_breaker(endpoint).guard():
+            async with get_request_scheduler().slot(model_name, endpoint):
+                if enable_chain_of_thought:
+                    thinking_payload = {
+                        "model": model_name, "prompt": THINKING_PROMPT_TEMPLATE.format(user_prompt=prompt), "stream": True,
+                        "options": {"temperature": DEFAULT_TEMPERATURE_THINKING, "num_predict": max_tokens}
+                    }
+                    thinking_parts: List[str] = []
+                    async with contextlib.aclosing(_stream_ndjson_request(session, current_api_endpoint, thinking_payload)) as chunks:
+                        async for chunk in chunks:
+                            thinking_parts.append(chunk.text)
+                            yield LLMStreamChunk(STREAM_CHUNK_THINKING, chunk.text)
+                    final_payload = {
+                        "model": model_name,
+                        "prompt": RESPONSE_WITH_THINKING_PROMPT_TEMPLATE.format(
+                            thinking_process="".join(thinking_parts).strip(), user_prompt=prompt
+                        ),
+                        "stream": True,
+                        "options": {"temperature": DEFAULT_TEMPERATURE_RESPONSE, "num_predict": max_tokens}
+                    }
+                    async with contextlib.aclosing(_stream_ndjson_request(session, current_api_endpoint, final_payload)) as chunks:
+                        async for chunk in chunks:
+                            yield chunk
+                    return
+
+                payload = {
+                    "model": model_name,
+                    "messages": [{"role": "user", "content": prompt}] if use_chat_api else None,
+                    "prompt": "" if use_chat_api else prompt,
+                    "stream": True,
+                    "options": {"temperature": temperature, "num_predict": max_tokens}
+                }
+                if use_chat_api: payload["think"] = True
+                async with contextlib.aclosing(_stream_ndjson_request(session, current_api_endpoint, payload)) as chunks:
+                    async for chunk in chunks:
+                        yield chunk
+    except LLMClientError as e:
+        print(f"Streaming request to Ollama model '{model_name}' failed: {e}")
+        raise
 
 class OllamaProvider:
     """
     A provider class for interacting with an Ollama service.
-    This class wraps the model invocation functions.
+    This class wraps the model invocation functions and owns the long-lived,
+    pooled HTTP sessions (sync `requests` and async `aiohttp`) used for them,
+    so repeated calls reuse keep-alive connections instead of reconnecting,
+    and exposes the process-wide request scheduler every LLM request takes a
+    slot from before it is sent.
+
+    Requests go to `base_url`, or are spread over several servers by a
+    BackendPool when `base_urls` is given (or, with neither, when
+    OLLAMA_BACKENDS is configured). Each server has a circuit breaker; while
+    it is open, requests to that server return None without being sent.
     """
-    def __init__(self, model_name: str = DEFAULT_OLLAMA_MODEL, base_url: Optional[str] = None):
+    def __init__(
+        self,
+        model_name: str = DEFAULT_OLLAMA_MODEL,
+        base_url: Optional[str] = None,
+        base_urls: Optional[List[str]] = None,
+        max_connections: int = OLLAMA_POOL_MAX_CONNECTIONS,
+        max_connections_per_host: int = OLLAMA_POOL_MAX_CONNECTIONS_PER_HOST,
+        keepalive_timeout: float = OLLAMA_KEEPALIVE_SECONDS
+    ):
         self.model = model_name
         # Ensure os is imported if you use os.path.join here
         # For now, assuming OLLAMA_API_ENDPOINT is a full URL and we derive base_url
+        if base_urls:
+            self.backend_pool: Optional[BackendPool] = BackendPool(base_urls)
+        else:
+            self.backend_pool = None if base_url else get_default_backend_pool()
+        if self.backend_pool is not None:
+            base_url = base_url or self.backend_pool.backends[0].base_url # For list_models_async and embeddings
         self.base_url = base_url or OLLAMA_API_ENDPOINT.rsplit('/api/', 1)[0]
         self.generate_endpoint = os.path.join(self.base_url, "api/generate")
         self.chat_endpoint = os.path.join(self.base_url, "api/chat")
 
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+
+        self._sync_session: Optional[requests.Session] = None
+        self._sync_session_lock = threading.Lock()
+        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._async_session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.scheduler = get_request_scheduler() # Shared by all providers: they talk to the same servers
+
+    def get_sync_session(self) -> requests.Session:
+        """Returns the pooled `requests.Session`, creating it on first use."""
+        if self._sync_session is None:
+            with self._sync_session_lock:
+                if self._sync_session is None:
+                    session = requests.Session()
+                    hosts = len(self.backend_pool.backends) if self.backend_pool is not None else 1
+                    adapter = HTTPAdapter(
+                        pool_connections=max(1, hosts),               # Per-host pools to keep
+                        pool_maxsize=self.max_connections_per_host    # Connections kept per host
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._sync_session = session
+        return self._sync_session
+
+    async def get_async_session(self) -> aiohttp.ClientSession:
+        """
+        Returns the pooled `aiohttp.ClientSession` for the running event loop.
+        aiohttp sessions are bound to the loop they were created on, so a new
+        session is created if the loop changed (e.g. separate `asyncio.run` calls);
+        the old one is closed first.
+        """
+        loop = asyncio.get_running_loop()
+        if (self._async_session is None or self._async_session.closed
+                or self._async_session_loop is not loop):
+            old_session, old_loop = self._async_session, self._async_session_loop
+            self._async_session, self._async_session_loop = None, None
+            if old_session is not None:
+                await self._close_async_session(old_session, old_loop)
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._async_session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=OLLAMA_REQUEST_TIMEOUT_SECONDS)
+            )
+            self._async_session_loop = loop
+        return self._async_session
+
+    def close_sync(self) -> None:
+        """Closes the pooled sync session, if one was opened."""
+        with self._sync_session_lock:
+            if self._sync_session is not None:
+                self._sync_session.close()
+                self._sync_session = None
+
+    @staticmethod
+    async def _close_async_session(session: aiohttp.ClientSession, session_loop: Optional[asyncio.AbstractEventLoop]) -> None:
+        """Closes a pooled session, also when it belongs to an event loop other than the running one."""
+        if session.closed:
+            return
+        if session_loop is None or session_loop is asyncio.get_running_loop():
+            await session.close()
+        elif session_loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop) # Closed on its own loop
+        else:
+            # Its loop has finished (e.g. an earlier asyncio.run): nothing can be awaited there any more.
+            # Detaching drops the session's last reference to its connector; aiohttp's connector
+            # finalizer then closes any transports still open, without relying on a private close API.
+            session.detach()
+            if is_debug_mode():
+                print("[DEBUG] OllamaProvider: closed an async session left over from a finished event loop.")
+
+    async def close(self) -> None:
+        """Closes both pooled sessions. Safe to call more than once."""
+        session, session_loop = self._async_session, self._async_session_loop
+        self._async_session, self._async_session_loop = None, None
+        if session is not None:
+            await self._close_async_session(session, session_loop)
+        self.close_sync()
+
+    def _api_endpoint_override(self, model_name: str) -> Optional[str]:
+        """This provider's endpoint for `model_name`, or None when its backend pool routes the request."""
+        if self.backend_pool is not None:
+            return None
+        enable_thinking = ENABLE_THINKING and model_name in THINKING_SUPPORTED_MODELS
+        return self.chat_endpoint if enable_thinking else self.generate_endpoint
 
     async def invoke_ollama_model_async(
         self,
         prompt: str,
         model_name: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 1500
+        max_tokens: int = 1500,
+        task_name: Optional[str] = None,
+        cache: Optional[bool] = None,
+        coalesce: Optional[bool] = None
     ) -> Optional[str]:
         effective_model_name = model_name or self.model
-        enable_thinking = ENABLE_THINKING and effective_model_name in THINKING_SUPPORTED_MODELS
-        use_chat_api = enable_thinking
-        api_to_use = self.chat_endpoint if use_chat_api else self.generate_endpoint
-
         return await invoke_ollama_model_async_internal(
             prompt=prompt,
             model_name=effective_model_name,
             temperature=temperature,
             max_tokens=max_tokens,
-            api_endpoint_override=api_to_use
+            api_endpoint_override=self._api_endpoint_override(effective_model_name),
+            session=await self.get_async_session(),
+            task_name=task_name,
+            cache=cache,
+            coalesce=coalesce,
+            backend_pool=self.backend_pool
         )
 
-    def invoke_ollama_model(
+    async def stream_async(
         self,
         prompt: str,
         model_name: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 1500
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Streams thinking/content chunks for `prompt` as an async generator.
+        Raises LLMClientError if the stream fails or breaks off (see stream_ollama_model_async).
+        """
+        effective_model_name = model_name or self.model
+        stream = stream_ollama_model_async(
+            prompt=prompt,
+            model_name=effective_model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            api_endpoint_override=self._api_endpoint_override(effective_model_name),
+            session=await self.get_async_session(),
+            backend_pool=self.backend_pool
+        )
+        async with contextlib.aclosing(stream) as chunks:
+            async for chunk in chunks:
+                yield chunk
+
+    def invoke_ollama_model(
+        self,
+        prompt: str,
+        model_name: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1500,
+        task_name: Optional[str] = None,
+        cache: Optional[bool] = None,
+        coalesce: Optional[bool] = None
     ) -> Optional[str]:
         effective_model_name = model_name or self.model
         return invoke_ollama_model(
             prompt=prompt,
             model_name=effective_model_name,
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            api_endpoint_override=self._api_endpoint_override(effective_model_name),
+            session=self.get_sync_session(),
+            task_name=task_name,
+            cache=cache,
+            coalesce=coalesce,
+            backend_pool=self.backend_pool
         )
 
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss metrics of the shared LLM response cache."""
+        return get_response_cache().stats()
+
+    async def check_backends_async(self) -> Dict[str, bool]:
+        """Health-checks the backend pool now (ejecting/readmitting servers); {} without a pool."""
+        if self.backend_pool is None:
+            return {}
+        return await self.backend_pool.check_health(await self.get_async_session())
+
+    def get_backend_stats(self) -> Dict[str, Any]:
+        """Per-server health, load and latency of the backend pool; {} without a pool."""
+        return self.backend_pool.stats() if self.backend_pool is not None else {}
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """LLM calls executed vs. saved by sharing an identical in-flight request."""
+        return get_singleflight().stats()
+
+    def get_scheduler_stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight requests and queue wait times of the request scheduler."""
+        return self.scheduler.stats()
+
+    def get_circuit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """State and recent failure counts of each server's circuit breaker."""
+        return circuit_breaker_stats()
+
     async def list_models_async(self) -> List[Dict[str, Any]]:
         list_endpoint = os.path.join(self.base_url, "api/tags")
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=60.0)) as session:
-            try:
-                async with session.get(list_endpoint) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    return data.get("models", [])
-            except aiohttp.ClientError as e:
-                print(f"HTTP error listing models: {e}")
-                return []
-            except json.JSONDecodeError:
-                print("Error parsing JSON from list models response.")
-                return []
-            except Exception as e:
-                print(f"Unexpected error listing models: {e}")
-                return []
+        session = await self.get_async_session()
+        try:
+            async with session.get(list_endpoint, timeout=aiohttp.ClientTimeout(total=60.0)) as response:
+                response.raise_for_status()
+                data = await response.json()
+                return data.get("models", [])
+        except aiohttp.ClientError as e:
+            print(f"HTTP error listing models: {e}")
+            return []
+        except json.JSONDecodeError:
+            print("Error parsing JSON from list models response.")
+            return []
+        except Exception as e:
+            print(f"Unexpected error listing models: {e}")
+            return []
+
+_default_provider: Optional[OllamaProvider] = None
+_default_provider_lock = threading.Lock()
+_default_backend_pool: Optional[BackendPool] = None
+_default_backend_pool_lock = threading.Lock()
+
+def get_default_backend_pool() -> Optional[BackendPool]:
+    """The pool over the OLLAMA_BACKENDS servers, or None if none are configured (the default host is used)."""
+    global _default_backend_pool
+    if not OLLAMA_BACKENDS:
+        return None
+    with _default_backend_pool_lock:
+        if _default_backend_pool is None:
+            _default_backend_pool = BackendPool(OLLAMA_BACKENDS)
+        return _default_backend_pool
+
+def get_default_provider() -> OllamaProvider:
+    """
+    Returns the process-wide OllamaProvider whose pooled sessions back the
+    module-level `invoke_ollama_model*` functions.
+    """
+    global _default_provider
+    if _default_provider is None:
+        with _default_provider_lock:
+            if _default_provider is None:
+                _default_provider = OllamaProvider()
+    return _default_provider
+
+async def close_default_provider() -> None:
+    """Shutdown hook: closes the pooled sessions of the default provider."""
+    if _default_provider is not None:
+        await _default_provider.close()
 
 
 async def main_async_test():
@@ -0,0 +1,254 @@
+# ai_assistant/llm_interface/request_scheduler.py
+"""
+Admission control for LLM requests sent to Ollama.
+
+Every generation request (cache misses only) takes a slot from the process-wide
+scheduler (OllamaProvider.scheduler) before it is sent and returns it when the
+response is complete. A request is admitted when its endpoint and its model on
+that endpoint are both below their concurrency limits; otherwise it waits in a queue ordered by
+priority class and then arrival, so queued background work is passed over as
+soon as a user request arrives. The last LLM_SCHEDULER_INTERACTIVE_RESERVED_SLOTS
+slots of an endpoint are kept for interactive requests, and a waiting request
+moves up one class every LLM_SCHEDULER_AGING_SECONDS so lower classes are never
+starved.
+
+The priority class of a request is taken from the calling context (see
+llm_priority); it is "interactive" unless a caller such as the background
+service says otherwise. Sync and async callers share the same queue.
+"""
+import asyncio
+import contextvars
+import itertools
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from ai_assistant.config import (
+    LLM_SCHEDULER_MAX_CONCURRENT_PER_ENDPOINT,
+    LLM_SCHEDULER_MAX_CONCURRENT_PER_MODEL,
+    LLM_SCHEDULER_MODEL_CONCURRENCY,
+    LLM_SCHEDULER_INTERACTIVE_RESERVED_SLOTS,
+    LLM_SCHEDULER_AGING_SECONDS,
+)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+PRIORITY_BATCH = "batch"
+PRIORITY_CLASSES = (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH) # Highest first
+
+_WAIT_SAMPLES_PER_CLASS = 200
+
+_default_scheduler: Optional["LLMRequestScheduler"] = None
+_default_scheduler_lock = threading.Lock()
+
+_current_priority: contextvars.ContextVar[str] = contextvars.ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+def current_llm_priority() -> str:
+    """The priority class LLM requests made from the current context are queued with."""
+    return _current_priority.get()
+
+
+def set_llm_priority(priority: str) -> contextvars.Token:
+    """Sets the priority class for the rest of the current task or thread (and the tasks it starts)."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown LLM priority class '{priority}'. Expected one of {PRIORITY_CLASSES}.")
+    return _current_priority.set(priority)
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """Runs the LLM requests made inside the block with the given priority class."""
+    token = set_llm_priority(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def endpoint_key(api_endpoint: str) -> str:
+    """The server an API URL belongs to, e.g. 'http://host:11434' for 'http://host:11434/api/chat'."""
+    return api_endpoint.rsplit('/api/', 1)[0]
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "model", "endpoint", "enqueued_at", "wake", "granted")
+
+    def __init__(self, priority: str, sequence: int, model: str, endpoint: str, wake: Callable[[], None]):
+        self.priority = priority
+        self.sequence = sequence
+        self.model = model
+        self.endpoint = endpoint
+        self.enqueued_at = time.monotonic()
+        self.wake = wake
+        self.granted = False
+
+
+class LLMRequestScheduler:
+    """Priority queue plus per-model and per-endpoint concurrency limits for LLM requests."""
+
+    def __init__(
+        self,
+        max_per_endpoint: int = LLM_SCHEDULER_MAX_CONCURRENT_PER_ENDPOINT,
+        max_per_model: int = LLM_SCHEDULER_MAX_CONCURRENT_PER_MODEL,
+        model_limits: Optional[Dict[str, int]] = None,
+        interactive_reserved_slots: int = LLM_SCHEDULER_INTERACTIVE_RESERVED_SLOTS,
+        aging_seconds: float = LLM_SCHEDULER_AGING_SECONDS
+    ):
+        self.max_per_endpoint = max(1, max_per_endpoint)
+        self.max_per_model = max(1, max_per_model)
+        self.model_limits = dict(LLM_SCHEDULER_MODEL_CONCURRENCY if model_limits is None else model_limits)
+        self.interactive_reserved_slots = max(0, min(interactive_reserved_slots, self.max_per_endpoint - 1))
+        self.aging_seconds = aging_seconds
+
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._waiting: List[_Waiter] = []
+        self._in_flight_models: Counter = Counter() # Keyed by (endpoint, model)
+        self._in_flight_endpoints: Counter = Counter()
+        self._admitted: Counter = Counter()
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=_WAIT_SAMPLES_PER_CLASS) for p in PRIORITY_CLASSES}
+
+    # --- Admission ---
+
+    def _effective_rank(self, waiter: _Waiter, now: float) -> int:
+        rank = PRIORITY_CLASSES.index(waiter.priority)
+        if self.aging_seconds > 0:
+            rank -= int((now - waiter.enqueued_at) // self.aging_seconds)
+        return max(0, rank)
+
+    def _has_capacity(self, model: str, endpoint: str, rank: int) -> bool:
+        endpoint_limit = self.max_per_endpoint - (self.interactive_reserved_slots if rank > 0 else 0)
+        return (self._in_flight_endpoints[endpoint] < endpoint_limit
+                and self._in_flight_models[(endpoint, model)] < self.model_limits.get(model, self.max_per_model))
+
+    def _grant(self, waiter: _Waiter, now: float) -> None:
+        waiter.granted = True
+        self._in_flight_models[(waiter.endpoint, waiter.model)] += 1
+        self._in_flight_endpoints[waiter.endpoint] += 1
+        self._admitted[waiter.priority] += 1
+        self._waits[waiter.priority].append(now - waiter.enqueued_at)
+
+    def _dispatch(self) -> None:
+        """Admits queued requests, best first, while capacity allows. Must be called with the lock held."""
+        now = time.monotonic()
+        for waiter in sorted(self._waiting, key=lambda w: (self._effective_rank(w, now), w.sequence)):
+            if self._has_capacity(waiter.model, waiter.endpoint, self._effective_rank(waiter, now)):
+                self._waiting.remove(waiter)
+                self._grant(waiter, now)
+                try:
+                    waiter.wake()
+                except RuntimeError: # Its event loop is closed; nobody is left to use or return the slot
+                    self._in_flight_models[(waiter.endpoint, waiter.model)] -= 1
+                    self._in_flight_endpoints[waiter.endpoint] -= 1
+
+    def _enqueue(self, model: str, endpoint: str, priority: Optional[str], wake: Callable[[], None]) -> _Waiter:
+        waiter = _Waiter(priority or current_llm_priority(), next(self._sequence), model, endpoint, wake)
+        with self._lock:
+            self._waiting.append(waiter)
+            self._dispatch()
+        return waiter
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Removes a waiter that gave up (cancelled); returns its slot if it was admitted meanwhile."""
+        with self._lock:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+                return
+        if waiter.granted:
+            self.release(waiter.model, waiter.endpoint)
+
+    def release(self, model: str, endpoint: str) -> None:
+        """Returns a slot taken by acquire/acquire_sync and admits the next queued requests."""
+        with self._lock:
+            self._in_flight_models[(endpoint, model)] = max(0, self._in_flight_models[(endpoint, model)] - 1)
+            self._in_flight_endpoints[endpoint] = max(0, self._in_flight_endpoints[endpoint] - 1)
+            self._dispatch()
+
+    async def acquire(self, model: str, endpoint: str, priority: Optional[str] = None) -> None:
+        """Waits until a request for `model` at `endpoint` may be sent."""
+        loop = asyncio.get_running_loop()
+        admitted = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: admitted.done() or admitted.set_result(None))
+
+        waiter = self._enqueue(model, endpoint, priority, wake)
+        try:
+            await admitted
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+    def acquire_sync(self, model: str, endpoint: str, priority: Optional[str] = None) -> None:
+        """Blocking counterpart of acquire, for the synchronous client."""
+        try:
+            asyncio.get_running_loop()
+            on_event_loop = True
+        except RuntimeError:
+            on_event_loop = False
+        if on_event_loop:
+            # A sync call made on an event loop thread would block the loop that has to finish
+            # the requests it is waiting for, so it is admitted at once (and still counted).
+            with self._lock:
+                self._grant(_Waiter(priority or current_llm_priority(), next(self._sequence), model, endpoint, lambda: None),
+                            time.monotonic())
+            return
+        admitted = threading.Event()
+        self._enqueue(model, endpoint, priority, admitted.set)
+        admitted.wait()
+
+    @asynccontextmanager
+    async def slot(self, model: str, endpoint: str, priority: Optional[str] = None):
+        await self.acquire(model, endpoint, priority)
+        try:
+            yield
+        finally:
+            self.release(model, endpoint)
+
+    @contextmanager
+    def slot_sync(self, model: str, endpoint: str, priority: Optional[str] = None) -> Iterator[None]:
+        self.acquire_sync(model, endpoint, priority)
+        try:
+            yield
+        finally:
+            self.release(model, endpoint)
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth per class, requests in flight per model/endpoint, and recent queue wait times."""
+        with self._lock:
+            queued = Counter(w.priority for w in self._waiting)
+            in_flight_models: Counter = Counter()
+            for (_, model), count in self._in_flight_models.items():
+                in_flight_models[model] += count
+            wait_seconds = {}
+            for priority, samples in self._waits.items():
+                ordered = sorted(samples)
+                wait_seconds[priority] = {
+                    "admitted": self._admitted[priority],
+                    "avg": round(statistics.fmean(ordered), 4) if ordered else 0.0,
+                    "p95": round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else 0.0,
+                    "max": round(ordered[-1], 4) if ordered else 0.0,
+                }
+            return {
+                "queue_depth": {p: queued[p] for p in PRIORITY_CLASSES},
+                "in_flight": {
+                    "models": {m: n for m, n in in_flight_models.items() if n},
+                    "endpoints": {e: n for e, n in self._in_flight_endpoints.items() if n},
+                },
+                "wait_seconds": wait_seconds,
+            }
+
+
+def get_request_scheduler() -> LLMRequestScheduler:
+    """The process-wide scheduler shared by every OllamaProvider."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = LLMRequestScheduler()
+        return _default_scheduler
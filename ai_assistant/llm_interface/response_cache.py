@@ -0,0 +1,230 @@
+# ai_assistant/llm_interface/response_cache.py
+"""
+Content-addressed cache for LLM responses.
+
+Entries are keyed by a SHA-256 digest of (model, prompt, temperature,
+max_tokens, thinking mode). Lookups go to an in-memory LRU first and then to
+an SQLite file under the data directory, so identical prompts are not
+regenerated across reflection cycles or restarts. TTLs come from
+LLM_CACHE_TASK_TTL_SECONDS, keyed by the task names used in TASK_MODELS.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ai_assistant.config import (
+    get_data_dir,
+    is_debug_mode,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_DB_FILENAME,
+    LLM_CACHE_MEMORY_MAX_ENTRIES,
+    LLM_CACHE_DISK_MAX_ENTRIES,
+    LLM_CACHE_DEFAULT_TTL_SECONDS,
+    LLM_CACHE_TASK_TTL_SECONDS
+)
+
+# Number of disk writes between purges of expired / excess rows.
+_DISK_PURGE_INTERVAL = 200
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + SQLite) response cache with TTL expiry and hit/miss counters."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_memory_entries: int = LLM_CACHE_MEMORY_MAX_ENTRIES,
+        max_disk_entries: int = LLM_CACHE_DISK_MAX_ENTRIES,
+        default_ttl_seconds: float = LLM_CACHE_DEFAULT_TTL_SECONDS,
+        task_ttl_seconds: Optional[Dict[str, float]] = None,
+        use_disk: bool = True
+    ):
+        self.db_path = db_path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.task_ttl_seconds = dict(LLM_CACHE_TASK_TTL_SECONDS if task_ttl_seconds is None else task_ttl_seconds)
+        self.use_disk = use_disk
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._writes_since_purge = 0
+        self._stats: Dict[str, int] = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0,
+            "stores": 0, "evictions": 0, "expirations": 0, "bypasses": 0
+        }
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_tokens: int, thinking_mode: str) -> str:
+        """Returns the content address for a request."""
+        material = json.dumps([model, prompt, float(temperature), int(max_tokens), thinking_mode], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def ttl_for_task(self, task_name: Optional[str]) -> float:
+        """TTL in seconds for a TASK_MODELS task name; 0 means the task is never cached."""
+        if task_name and task_name in self.task_ttl_seconds:
+            return self.task_ttl_seconds[task_name]
+        return self.default_ttl_seconds
+
+    def should_cache(self, temperature: float, task_name: Optional[str] = None, cache: Optional[bool] = None) -> bool:
+        """
+        Decides whether a request may be served from / stored into the cache.
+        `cache=None` caches only deterministic (temperature 0) requests, `cache=True`
+        opts a sampled request in, and `cache=False` always bypasses.
+        """
+        if not LLM_CACHE_ENABLED or cache is False:
+            allowed = False
+        elif self.ttl_for_task(task_name) <= 0:
+            allowed = False
+        else:
+            allowed = cache is True or temperature == 0
+        if not allowed:
+            with self._lock:
+                self._stats["bypasses"] += 1
+        return allowed
+
+    def _get_conn(self) -> Optional[sqlite3.Connection]:
+        """Opens the SQLite tier on first use. Must be called with self._lock held."""
+        if not self.use_disk:
+            return None
+        if self._conn is None:
+            path = self.db_path or os.path.join(get_data_dir(), LLM_CACHE_DB_FILENAME)
+            try:
+                conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS llm_cache ("
+                    " key TEXT PRIMARY KEY, response TEXT NOT NULL, model TEXT, task TEXT,"
+                    " created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_cache (expires_at)")
+                conn.commit()
+                self._conn = conn
+            except sqlite3.Error as e:
+                print(f"Warning: LLM response cache could not open '{path}', continuing memory-only. Error: {e}")
+                self.use_disk = False
+                return None
+        return self._conn
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        """Inserts into the memory LRU. Must be called with self._lock held."""
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+                self._stats["expirations"] += 1
+
+            conn = self._get_conn()
+            if conn is not None:
+                try:
+                    row = conn.execute(
+                        "SELECT response, expires_at FROM llm_cache WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    if is_debug_mode():
+                        print(f"[DEBUG] LLM response cache read failed: {e}")
+                    row = None
+                if row is not None:
+                    response, expires_at = row
+                    if expires_at > now:
+                        self._remember(key, expires_at, response)
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        return response
+                    self._stats["expirations"] += 1
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, response: str, task_name: Optional[str] = None, model: Optional[str] = None) -> None:
+        ttl = self.ttl_for_task(task_name)
+        if ttl <= 0 or response is None:
+            return
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, expires_at, response)
+            self._stats["stores"] += 1
+            conn = self._get_conn()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, model, task, created_at, expires_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response, model, task_name, now, expires_at)
+                )
+                self._writes_since_purge += 1
+                if self._writes_since_purge >= _DISK_PURGE_INTERVAL:
+                    self._purge_disk(now)
+                conn.commit()
+            except sqlite3.Error as e:
+                if is_debug_mode():
+                    print(f"[DEBUG] LLM response cache write failed: {e}")
+
+    def _purge_disk(self, now: float) -> None:
+        """Drops expired rows and trims the table to max_disk_entries. Must hold self._lock."""
+        self._writes_since_purge = 0
+        conn = self._conn
+        conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._get_conn()
+            if conn is not None:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of hit/miss counters plus the current hit ratio."""
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            snapshot["memory_entries"] = len(self._memory)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = (snapshot["hits"] / lookups) if lookups else 0.0
+        return snapshot
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+def get_response_cache() -> LLMResponseCache:
+    """Returns the process-wide response cache used by the Ollama client."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = LLMResponseCache()
+    return _response_cache
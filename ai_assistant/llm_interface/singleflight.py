@@ -0,0 +1,130 @@
+# ai_assistant/llm_interface/singleflight.py
+"""
+Coalescing of identical in-flight LLM requests.
+
+While a request is in flight, an identical one (same key, see
+LLMResponseCache.make_key) does not send its own HTTP call: it waits for the
+first one and gets its result, or its exception. This complements the response
+cache, which only helps once the first response has been stored.
+
+Only requests whose result does not depend on sampling are coalesced by
+default (temperature 0); a caller can opt a sampled request in (`coalesce=True`)
+or demand an independent sample (`coalesce=False`). Sync and async callers
+share the same flights; a sync call made on an event loop thread never waits
+for a flight, since it would block the loop the flight may be running on.
+"""
+import asyncio
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ai_assistant.config import LLM_SINGLEFLIGHT_ENABLED
+
+_default_singleflight: Optional["SingleFlight"] = None
+_default_singleflight_lock = threading.Lock()
+
+
+class _LeaderAbandoned(Exception):
+    """The call a follower was waiting for was cancelled; the follower makes the call itself."""
+
+
+def should_coalesce(temperature: float, coalesce: Optional[bool] = None) -> bool:
+    """Whether a request may share an identical in-flight request's result."""
+    if coalesce is not None:
+        return coalesce
+    return LLM_SINGLEFLIGHT_ENABLED and temperature == 0
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with the same key share its outcome."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, concurrent.futures.Future] = {}
+        self._executed = 0
+        self._shared = 0
+
+    def _join_or_lead(self, key: str):
+        """Returns (future, is_leader)."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._shared += 1
+                return flight, False
+            flight = concurrent.futures.Future()
+            self._flights[key] = flight
+            self._executed += 1
+            return flight, True
+
+    def _finish(self, key: str, flight: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def _uncount_shared(self) -> None:
+        with self._lock:
+            self._shared -= 1
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits `call()`, or the identical call already in flight for `key`."""
+        flight, is_leader = self._join_or_lead(key)
+        if not is_leader:
+            try:
+                # Shielded: a follower giving up must not cancel the flight the others share
+                return await asyncio.shield(asyncio.wrap_future(flight))
+            except _LeaderAbandoned:
+                self._uncount_shared()
+                return await self.do(key, call)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            self._finish(key, flight)
+            flight.set_exception(_LeaderAbandoned())
+            raise
+        except BaseException as e:
+            self._finish(key, flight)
+            flight.set_exception(e)
+            raise
+        self._finish(key, flight)
+        flight.set_result(result)
+        return result
+
+    def do_sync(self, key: str, call: Callable[[], Any]) -> Any:
+        """Blocking counterpart of do()."""
+        try:
+            asyncio.get_running_loop()
+            on_event_loop = True
+        except RuntimeError:
+            on_event_loop = False
+        if on_event_loop:
+            return call() # See the module docstring: waiting here could deadlock the loop
+        flight, is_leader = self._join_or_lead(key)
+        if not is_leader:
+            try:
+                return flight.result()
+            except _LeaderAbandoned:
+                self._uncount_shared()
+                return self.do_sync(key, call)
+        try:
+            result = call()
+        except BaseException as e:
+            self._finish(key, flight)
+            flight.set_exception(e)
+            raise
+        self._finish(key, flight)
+        flight.set_result(result)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Calls executed, calls saved by joining an identical in-flight call, and flights now in progress."""
+        with self._lock:
+            return {"executed": self._executed, "coalesced": self._shared, "in_flight": len(self._flights)}
+
+
+def get_singleflight() -> SingleFlight:
+    """The process-wide request coalescer used by the Ollama client."""
+    global _default_singleflight
+    with _default_singleflight_lock:
+        if _default_singleflight is None:
+            _default_singleflight = SingleFlight()
+        return _default_singleflight
@@ -0,0 +1,118 @@
+# ai_assistant/llm_interface/stream_parsing.py
+"""
+Incremental parsers for streamed LLM output.
+
+They are fed text chunks as tokens arrive from `stream_ollama_model_async` and
+return the structured items that have become complete so far, so callers can
+validate or display them before the model has finished generating.
+"""
+import json
+import re
+from typing import Any, List
+
+
+class IncrementalJSONArrayParser:
+    """
+    Extracts the elements of a top-level JSON array of objects from a text stream.
+
+    Anything before the opening '[' (e.g. "JSON Plan:" or a ```json fence) is skipped.
+    Each element is returned from `feed()` as soon as its closing brace arrives.
+    Elements that are not valid JSON on their own are skipped; the caller's
+    full-response parse will report those errors.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0               # Next index of _buffer to scan
+        self._depth = 0             # 0 = outside the array, 1 = directly inside it
+        self._in_string = False
+        self._escape = False
+        self._element_start = -1
+        self.started = False
+        self.finished = False
+        self.items_emitted = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Adds a chunk of text and returns any newly completed array elements."""
+        if self.finished or not chunk:
+            return []
+        self._buffer += chunk
+        completed: List[Any] = []
+        buf = self._buffer
+        i = self._pos
+        while i < len(buf):
+            ch = buf[i]
+            if not self.started:
+                if ch == '[':
+                    self.started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if self._depth == 1:
+                    self._element_start = i
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._element_start >= 0:
+                    element_text = buf[self._element_start:i + 1]
+                    self._element_start = -1
+                    try:
+                        completed.append(json.loads(element_text))
+                        self.items_emitted += 1
+                    except json.JSONDecodeError:
+                        pass
+                elif self._depth == 0:
+                    self.finished = True
+                    i += 1
+                    break
+            i += 1
+
+        # Drop text that can no longer be part of a pending element.
+        if self._element_start >= 0:
+            self._buffer = buf[self._element_start:]
+            self._pos = i - self._element_start
+            self._element_start = 0
+        else:
+            self._buffer = ""
+            self._pos = 0
+        return completed
+
+
+class IncrementalLineListParser:
+    """
+    Extracts list items (one per line, optionally prefixed with '-', '*' or '1.')
+    from a text stream. A line is returned once its newline has arrived;
+    call `close()` at the end of the stream to get the final unterminated line.
+    """
+
+    _MARKER_PATTERNS = (re.compile(r"^\s*[-*]\s*"), re.compile(r"^\s*\d+\.\s*"))
+
+    def __init__(self):
+        self._pending = ""
+
+    def _clean(self, line: str) -> str:
+        line = line.strip()
+        for pattern in self._MARKER_PATTERNS:
+            line = pattern.sub("", line)
+        return line
+
+    def feed(self, chunk: str) -> List[str]:
+        self._pending += chunk
+        *complete_lines, self._pending = self._pending.split("\n")
+        return [item for item in (self._clean(line) for line in complete_lines) if item]
+
+    def close(self) -> List[str]:
+        remaining, self._pending = self._pending, ""
+        item = self._clean(remaining)
+        return [item] if item else []
@@ -18,7 +18,9 @@ from ai_assistant.config import CLEAR_EXISTING_KNOWLEDGE_ON_STARTUP, get_data_di
 # Their persisted data (e.g., JSON files in the data_dir) is targeted by
 # 'clear_knowledge_if_configured', which directly deletes files.
 # These classes are likely used by other components initialized via main.py.
-from ai_assistant.core.reflection import ReflectionLog # Manages reflection_log.json
+from ai_assistant.core.reflection import ReflectionLog # Manages the segmented reflection log
+# Shutdown hook for the pooled HTTP sessions used by all LLM calls.
+from ai_assistant.llm_interface.ollama_client import close_default_provider
 import asyncio
 import logging
 
@@ -83,6 +85,11 @@ async def async_main_runner():
         logger.info("Main (async_main_runner finally): Cleaning up background services...")
         await stop_background_services() # stop_background_services is async
         logger.info("Main (async_main_runner finally): Background services cleanup attempt complete.")
+        try:
+            await close_default_provider()
+            logger.info("Main (async_main_runner finally): Closed pooled Ollama HTTP sessions.")
+        except Exception as e_close: # pragma: no cover
+            logger.error(f"Main (async_main_runner finally): Failed to close Ollama HTTP sessions: {e_close}")
 
 if __name__ == "__main__":
     try:
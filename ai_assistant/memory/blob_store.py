@@ -0,0 +1,233 @@
+# ai_assistant/memory/blob_store.py
+"""
+Content-addressed storage for large step results.
+
+A result larger than BLOB_INLINE_MAX_BYTES is written once, gzip compressed, to
+`<data dir>/blobs/<aa>/<sha256>.gz` and replaced by a BlobRef: its hash, kind
+("text" for strings, "json" for lists/dicts), size and a short preview. A BlobRef
+serializes to a small dict marked with BLOB_REF_MARKER, so reflection entries,
+checkpoints and prompts carry the reference instead of the content; reading the
+content back (read / open_text) happens only when a step actually needs it.
+
+Reference counts live in the `blobs` table of the structured store. Every holder
+that keeps a reference beyond the current run acquires it (a persisted reflection
+entry, a step checkpoint) and releases it when it lets go. gc() deletes blobs with
+no holders once they have been unreferenced for BLOB_GC_GRACE_SECONDS; the grace
+period covers runs still using a blob nobody has acquired yet. It runs at startup.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from ai_assistant.config import (
+    get_data_dir, BLOB_STORE_DIR_NAME, BLOB_INLINE_MAX_BYTES, BLOB_PREVIEW_CHARS, BLOB_GC_GRACE_SECONDS
+)
+from ai_assistant.memory.structured_store import Repository, get_structured_store, structured_store_path_for
+
+BLOB_REF_MARKER = "_blob_ref_"
+BLOBS_TABLE = "blobs"
+
+_default_store: Optional["BlobStore"] = None
+_default_store_lock = threading.Lock()
+
+
+class BlobRef:
+    """A reference to a stored blob. str() gives a short handle with a preview, suitable for logs and prompts."""
+
+    def __init__(self, sha256: str, size: int, kind: str = "text", preview: str = "", store: Optional["BlobStore"] = None):
+        self.sha256 = sha256
+        self.size = size
+        self.kind = kind
+        self.preview = preview
+        self._store = store
+
+    @property
+    def handle(self) -> str:
+        return f"sha256:{self.sha256}"
+
+    @property
+    def store(self) -> "BlobStore":
+        return self._store or get_blob_store()
+
+    def read(self) -> Any:
+        """The original value: the string, or the list/dict for a "json" blob."""
+        return self.store.read(self)
+
+    def open_text(self) -> io.TextIOBase:
+        """A text stream over the content, decompressed as it is read."""
+        return self.store.open_text(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {BLOB_REF_MARKER: self.handle, "size": self.size, "kind": self.kind, "preview": self.preview}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], store: Optional["BlobStore"] = None) -> "BlobRef":
+        return cls(data[BLOB_REF_MARKER].split(":", 1)[-1], int(data.get("size", 0)), data.get("kind", "text"),
+                   data.get("preview", ""), store)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BlobRef) and other.sha256 == self.sha256 and other.kind == self.kind
+
+    def __hash__(self) -> int:
+        return hash((self.sha256, self.kind))
+
+    def __str__(self) -> str:
+        return f"<blob {self.handle[:19]} ({self.size} bytes {self.kind}): {self.preview}...>"
+
+    __repr__ = __str__
+
+
+def is_blob_ref_dict(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get(BLOB_REF_MARKER), str)
+
+
+def as_blob_ref(value: Any, store: Optional["BlobStore"] = None) -> Any:
+    """Turns a serialized reference (e.g. from a checkpoint) back into a BlobRef; other values are returned as is."""
+    return BlobRef.from_dict(value, store) if is_blob_ref_dict(value) else value
+
+
+class BlobStore:
+    """Gzip-compressed, SHA-256 addressed files with reference counts and garbage collection."""
+
+    def __init__(self, root: Optional[str] = None, db_path: Optional[str] = None,
+                 inline_max_bytes: int = BLOB_INLINE_MAX_BYTES):
+        self.root = root or os.path.join(get_data_dir(), BLOB_STORE_DIR_NAME)
+        self.db_path = db_path or structured_store_path_for(self.root)
+        self.inline_max_bytes = inline_max_bytes
+        self._lock = threading.Lock()
+
+    def _repository(self) -> Repository:
+        return get_structured_store(self.db_path).repository(
+            BLOBS_TABLE, "sha256",
+            columns={
+                "refcount": lambda b: b.get("refcount", 0),
+                "released_at": lambda b: b.get("released_at"),
+            }
+        )
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], f"{sha256}.gz")
+
+    def _encode(self, value: Any) -> Optional[tuple]:
+        """(kind, utf-8 bytes) of a value that can be stored, else None."""
+        if isinstance(value, str):
+            return "text", value.encode("utf-8")
+        if isinstance(value, (list, dict)) and not is_blob_ref_dict(value):
+            try:
+                return "json", json.dumps(value, ensure_ascii=False).encode("utf-8")
+            except (TypeError, ValueError):
+                return None
+        return None
+
+    def put(self, value: Any) -> BlobRef:
+        """Stores a string or JSON-serializable list/dict (once per distinct content) and returns its reference."""
+        encoded = self._encode(value)
+        if encoded is None:
+            raise TypeError(f"BlobStore can only store strings and JSON-serializable lists/dicts, not {type(value).__name__}.")
+        kind, data = encoded
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._path(sha256)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as compressed:
+                        compressed.write(data)
+                    os.replace(temp_path, path)
+                except BaseException:
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+                    raise
+            repository = self._repository()
+            record = repository.get(sha256)
+            if record is None:
+                repository.upsert({"sha256": sha256, "size": len(data), "kind": kind, "refcount": 0,
+                                   "created_at": time.time(), "released_at": time.time()})
+            elif record.get("refcount", 0) == 0:
+                record["released_at"] = time.time() # Restart the grace period for the new user
+                repository.upsert(record)
+        preview = value if kind == "text" else data.decode("utf-8")
+        return BlobRef(sha256, len(data), kind, preview[:BLOB_PREVIEW_CHARS], self)
+
+    def store_if_large(self, value: Any) -> Any:
+        """Returns a BlobRef for a string or list/dict larger than inline_max_bytes, else the value itself."""
+        encoded = self._encode(value)
+        if encoded is None or len(encoded[1]) <= self.inline_max_bytes:
+            return value
+        return self.put(value)
+
+    def open_text(self, ref: BlobRef) -> io.TextIOBase:
+        return gzip.open(self._path(ref.sha256), "rt", encoding="utf-8")
+
+    def read(self, ref: BlobRef) -> Any:
+        with self.open_text(ref) as stream:
+            content = stream.read()
+        return json.loads(content) if ref.kind == "json" else content
+
+    def exists(self, ref: BlobRef) -> bool:
+        return os.path.exists(self._path(ref.sha256))
+
+    def _adjust(self, sha256: str, delta: int) -> int:
+        with self._lock:
+            repository = self._repository()
+            record = repository.get(sha256)
+            if record is None:
+                return 0
+            record["refcount"] = max(0, record.get("refcount", 0) + delta)
+            if record["refcount"] == 0:
+                record["released_at"] = time.time()
+            repository.upsert(record)
+            return record["refcount"]
+
+    def acquire(self, ref: BlobRef) -> int:
+        """Records one more holder of `ref`. Returns the new reference count."""
+        return self._adjust(ref.sha256, 1)
+
+    def release(self, ref: BlobRef) -> int:
+        """Records that a holder let go of `ref`. Returns the new reference count."""
+        return self._adjust(ref.sha256, -1)
+
+    def refcount(self, ref: BlobRef) -> int:
+        record = self._repository().get(ref.sha256)
+        return record.get("refcount", 0) if record else 0
+
+    def gc(self, grace_seconds: float = BLOB_GC_GRACE_SECONDS) -> int:
+        """Deletes blobs unreferenced for longer than `grace_seconds`. Returns the number deleted."""
+        cutoff = time.time() - grace_seconds
+        deleted = 0
+        with self._lock:
+            repository = self._repository()
+            for record in repository.find({"refcount": 0}):
+                if (record.get("released_at") or 0) > cutoff:
+                    continue
+                path = self._path(record["sha256"])
+                if os.path.exists(path):
+                    os.remove(path)
+                repository.delete(record["sha256"])
+                deleted += 1
+        return deleted
+
+
+def resolve_blob_refs(value: Any) -> Any:
+    """The value with BlobRefs (at the top level or inside a list) replaced by their content."""
+    if isinstance(value, BlobRef):
+        return value.read()
+    if isinstance(value, list):
+        return [resolve_blob_refs(item) for item in value]
+    return value
+
+
+def get_blob_store() -> BlobStore:
+    """The shared blob store in the data directory."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = BlobStore()
+        return _default_store
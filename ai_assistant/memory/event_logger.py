@@ -1,28 +1,288 @@
+import atexit
 import json
 import os
+import threading
+import time
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, TextIO
 
 from ai_assistant.config import get_data_dir # Import the centralized function
 
-EVENT_LOG_FILENAME = "event_log.json"
+# Events are stored one JSON object per line and only ever appended, so logging an
+# event costs O(1) regardless of how long the session has been running.
+EVENT_LOG_FILENAME = "event_log.jsonl"
 EVENT_LOG_FILE = os.path.join(get_data_dir(), EVENT_LOG_FILENAME) # Use the centralized data directory
+# Pre-JSONL format: a single JSON array rewritten on every event. Migrated once on first use.
+LEGACY_EVENT_LOG_FILENAME = "event_log.json"
+LEGACY_EVENT_LOG_FILE = os.path.join(get_data_dir(), LEGACY_EVENT_LOG_FILENAME)
 MAX_LOG_ENTRIES_IN_MEMORY = 100 # For get_recent_events, not a hard limit on file size
 
-# Lock for file operations if we were in a threaded environment.
-# For CLI, less critical but good to be aware of potential race conditions
-# if the app becomes more complex. For now, direct file read/write is fine.
-# import threading
-# _file_lock = threading.Lock()
+# Rotation: the active file is renamed to event_log.1.jsonl (older segments shift up)
+# once it exceeds either limit. Only the newest EVENT_LOG_MAX_ROTATED_FILES segments are kept.
+EVENT_LOG_ROTATE_MAX_BYTES = 5 * 1024 * 1024
+EVENT_LOG_ROTATE_MAX_AGE_SECONDS = 24 * 3600.0
+EVENT_LOG_MAX_ROTATED_FILES = 5
 
-def _ensure_log_dir_exists():
-    """Ensures the log directory exists."""
-    # get_data_dir() called when EVENT_LOG_FILE is defined already ensures the base data directory exists.
-    # This function can ensure the specific directory for the log file exists if it were in a subdirectory
-    # of get_data_dir(), but since it's directly in get_data_dir(), this call is mostly redundant
-    # but harmless with exist_ok=True.
-    os.makedirs(os.path.dirname(EVENT_LOG_FILE), exist_ok=True)
+# Durability: every event is flushed to the OS immediately (so readers see it),
+# but fsync is batched to once per EVENT_LOG_FSYNC_BATCH_SIZE events or
+# EVENT_LOG_FSYNC_INTERVAL_SECONDS, whichever comes first.
+EVENT_LOG_FSYNC_BATCH_SIZE = 20
+EVENT_LOG_FSYNC_INTERVAL_SECONDS = 1.0
+
+_TAIL_READ_BLOCK_SIZE = 8192
+
+
+def rotated_log_path(log_path: str, index: int) -> str:
+    """Path of the index-th rotated segment (1 = most recently rotated)."""
+    base, ext = os.path.splitext(log_path)
+    return f"{base}.{index}{ext}"
+
+
+def _iter_lines_reversed(file_path: str, block_size: int = _TAIL_READ_BLOCK_SIZE) -> Iterator[str]:
+    """Yields the non-empty lines of a file from last to first, reading fixed-size blocks from the end."""
+    with open(file_path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b"\n")
+            remainder = lines.pop(0) # May be the tail of a line that continues in the previous block
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode('utf-8', errors='replace')
+        if remainder.strip():
+            yield remainder.decode('utf-8', errors='replace')
+
+
+def _segment_start_time(file_path: str) -> float:
+    """Unix time of the first event in a segment, falling back to the file's mtime."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            first_line = f.readline()
+        if first_line.strip():
+            return datetime.fromisoformat(json.loads(first_line)["timestamp"]).timestamp()
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    try:
+        return os.path.getmtime(file_path)
+    except OSError:
+        return time.time()
+
+
+def migrate_legacy_event_log(legacy_path: Optional[str] = None, target_path: Optional[str] = None) -> int:
+    """
+    One-shot migration of the legacy JSON-array log into the JSONL log.
+
+    Legacy events are written ahead of any events already in the JSONL file (they are
+    older), and the legacy file is renamed to '<name>.migrated' so it is not imported twice.
+
+    Returns:
+        The number of events migrated.
+    """
+    legacy_path = legacy_path or LEGACY_EVENT_LOG_FILE
+    target_path = target_path or EVENT_LOG_FILE
+    if not os.path.exists(legacy_path):
+        return 0
+
+    try:
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        events = json.loads(content) if content.strip() else []
+        if not isinstance(events, list):
+            print(f"Warning: Legacy event log '{legacy_path}' contained non-list data. Skipping migration.")
+            events = []
+    except (IOError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not read legacy event log '{legacy_path}' for migration: {e}")
+        events = []
+
+    try:
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        temp_path = target_path + ".migrating"
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for event in events:
+                if isinstance(event, dict):
+                    out.write(json.dumps(event, ensure_ascii=False) + "\n")
+            if os.path.exists(target_path):
+                with open(target_path, 'r', encoding='utf-8') as existing:
+                    for line in existing:
+                        out.write(line)
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, target_path)
+        os.replace(legacy_path, legacy_path + ".migrated")
+    except OSError as e:
+        print(f"IOError migrating legacy event log '{legacy_path}' to '{target_path}': {e}")
+        return 0
+    return sum(1 for event in events if isinstance(event, dict))
+
+
+class EventLogStore:
+    """Append-only JSONL event store with size/age rotation, batched fsync and reverse tail reads."""
+
+    def __init__(
+        self,
+        log_path: str,
+        legacy_path: Optional[str] = None,
+        max_bytes: int = EVENT_LOG_ROTATE_MAX_BYTES,
+        max_age_seconds: float = EVENT_LOG_ROTATE_MAX_AGE_SECONDS,
+        max_rotated_files: int = EVENT_LOG_MAX_ROTATED_FILES,
+        fsync_batch_size: int = EVENT_LOG_FSYNC_BATCH_SIZE,
+        fsync_interval_seconds: float = EVENT_LOG_FSYNC_INTERVAL_SECONDS
+    ):
+        self.log_path = log_path
+        self.legacy_path = legacy_path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_rotated_files = max_rotated_files
+        self.fsync_batch_size = fsync_batch_size
+        self.fsync_interval_seconds = fsync_interval_seconds
+
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._size = 0
+        self._segment_started_at = 0.0
+        self._unsynced_events = 0
+        self._last_fsync = time.monotonic()
+        self._migration_checked = False
+
+    def _ensure_migrated(self) -> None:
+        """Runs the legacy migration the first time the store is touched. Must hold self._lock."""
+        if not self._migration_checked:
+            self._migration_checked = True
+            if self.legacy_path:
+                migrate_legacy_event_log(self.legacy_path, self.log_path)
+
+    def _open(self) -> TextIO:
+        """Opens the active segment for appending. Must hold self._lock."""
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            self._file = open(self.log_path, 'a', encoding='utf-8')
+            self._size = self._file.tell()
+            self._segment_started_at = _segment_start_time(self.log_path) if self._size else time.time()
+        return self._file
+
+    def _sync(self) -> None:
+        """Flushes and fsyncs the active segment. Must hold self._lock."""
+        if self._file is not None and self._unsynced_events:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced_events = 0
+        self._last_fsync = time.monotonic()
+
+    def _close_file(self) -> None:
+        """Must hold self._lock."""
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+            self._file = None
+
+    def _rotate_if_needed(self, incoming_bytes: int) -> None:
+        """Must hold self._lock, with the active segment open."""
+        if self._size == 0:
+            return
+        too_big = self._size + incoming_bytes > self.max_bytes
+        too_old = time.time() - self._segment_started_at > self.max_age_seconds
+        if not (too_big or too_old):
+            return
+
+        self._close_file()
+        oldest = rotated_log_path(self.log_path, self.max_rotated_files)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.max_rotated_files - 1, 0, -1):
+            source = rotated_log_path(self.log_path, index)
+            if os.path.exists(source):
+                os.replace(source, rotated_log_path(self.log_path, index + 1))
+        if self.max_rotated_files > 0:
+            os.replace(self.log_path, rotated_log_path(self.log_path, 1))
+        else:
+            os.remove(self.log_path)
+        self._open()
+
+    def append(self, event: Dict[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        encoded_length = len(line.encode('utf-8'))
+        with self._lock:
+            self._ensure_migrated()
+            self._open()
+            self._rotate_if_needed(encoded_length)
+            self._file.write(line)
+            self._file.flush()
+            self._size += encoded_length
+            self._unsynced_events += 1
+            if (self._unsynced_events >= self.fsync_batch_size or
+                    time.monotonic() - self._last_fsync >= self.fsync_interval_seconds):
+                self._sync()
+
+    def segment_paths(self) -> List[str]:
+        """Existing segment files, newest first (active file, then .1, .2, ...)."""
+        candidates = [self.log_path] + [
+            rotated_log_path(self.log_path, index) for index in range(1, self.max_rotated_files + 1)
+        ]
+        return [path for path in candidates if os.path.exists(path)]
+
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to `limit` most recent events, newest first, without reading whole segments."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            self._ensure_migrated()
+            if self._file is not None:
+                self._file.flush()
+            segment_paths = self.segment_paths()
+
+        events: List[Dict[str, Any]] = []
+        for path in segment_paths:
+            try:
+                for line in _iter_lines_reversed(path):
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Torn or corrupted line; skip it rather than losing the whole log
+                    if isinstance(event, dict):
+                        events.append(event)
+                        if len(events) >= limit:
+                            return events
+            except OSError as e:
+                print(f"IOError reading event log segment {path}: {e}")
+        return events
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_file()
+
+
+_store: Optional[EventLogStore] = None
+_store_lock = threading.Lock()
+
+def _get_store() -> EventLogStore:
+    """Returns the store for the current EVENT_LOG_FILE (re-created if the path was changed)."""
+    global _store
+    with _store_lock:
+        if _store is None or _store.log_path != EVENT_LOG_FILE:
+            if _store is not None:
+                _store.close()
+            _store = EventLogStore(EVENT_LOG_FILE, legacy_path=LEGACY_EVENT_LOG_FILE)
+        return _store
+
+def close_event_log() -> None:
+    """Flushes, fsyncs and closes the event log. Registered with atexit."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+atexit.register(close_event_log)
 
 def log_event(
     event_type: str,
@@ -32,7 +292,7 @@ def log_event(
     correlation_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
-    Logs a structured event to the event_log.json file.
+    Appends a structured event to the JSONL event log.
 
     Args:
         event_type: Enum-like string for the type of event.
@@ -44,11 +304,9 @@ def log_event(
     Returns:
         The event dictionary that was logged.
     """
-    _ensure_log_dir_exists()
-
     event_id = uuid.uuid4().hex
     timestamp = datetime.now(timezone.utc).isoformat()
-    
+
     event = {
         "timestamp": timestamp,
         "event_id": event_id,
@@ -60,44 +318,20 @@ def log_event(
     if correlation_id:
         event["correlation_id"] = correlation_id
 
-    # with _file_lock: # If threading becomes a concern
     try:
-        if os.path.exists(EVENT_LOG_FILE):
-            with open(EVENT_LOG_FILE, 'r', encoding='utf-8') as f:
-                try:
-                    # Handle empty or malformed file
-                    content = f.read()
-                    if not content:
-                        events = []
-                    else:
-                        events = json.loads(content)
-                    if not isinstance(events, list): # Ensure it's a list, not some other JSON type
-                        print(f"Warning: Event log file '{EVENT_LOG_FILE}' contained non-list data. Reinitializing.")
-                        events = []
-                except json.JSONDecodeError:
-                    print(f"Warning: Could not decode JSON from '{EVENT_LOG_FILE}'. Reinitializing event log.")
-                    events = [] # If file is corrupted, start fresh to avoid losing new logs
-        else:
-            events = []
-
-        events.append(event)
-
-        with open(EVENT_LOG_FILE, 'w', encoding='utf-8') as f: # Corrected typo here
-            json.dump(events, f, indent=4, ensure_ascii=False)
-            
-        # Optional: print a confirmation or a summary of the logged event for debugging
-        # print(f"Event logged ({event_type}): {description[:50]}...")
-
-    except IOError as e:
+        _get_store().append(event)
+    except (IOError, OSError) as e:
         print(f"IOError logging event to {EVENT_LOG_FILE}: {e}")
     except Exception as e:
         print(f"Unexpected error logging event: {e}")
-        
+
     return event # Return the created event, even if logging failed, for potential in-memory use by caller
 
 def get_recent_events(limit: int = MAX_LOG_ENTRIES_IN_MEMORY) -> List[Dict[str, Any]]:
     """
-    Retrieves a list of the most recent events from the log file.
+    Retrieves a list of the most recent events from the log.
+    Reads backwards from the end of the newest segment, so the cost depends on `limit`
+    rather than on the size of the log.
 
     Args:
         limit: The maximum number of recent events to return.
@@ -105,33 +339,25 @@ def get_recent_events(limit: int = MAX_LOG_ENTRIES_IN_MEMORY) -> List[Dict[str,
     Returns:
         A list of event dictionaries, newest first. Returns empty if log is empty or error.
     """
-    # with _file_lock: # If threading
     try:
-        if not os.path.exists(EVENT_LOG_FILE):
-            return []
-        with open(EVENT_LOG_FILE, 'r', encoding='utf-8') as f:
-            try:
-                events = json.load(f)
-                if not isinstance(events, list):
-                     return [] # Or handle error
-            except json.JSONDecodeError:
-                return [] # Or handle error
-        
-        # Return last 'limit' events, newest first (assuming append-only log)
-        return events[-limit:][::-1] 
-    except IOError as e:
-        print(f"IOError reading event log {EVENT_LOG_FILE}: {e}")
-        return []
+        return _get_store().tail(limit)
     except Exception as e:
         print(f"Unexpected error reading event log: {e}")
         return []
 
 if __name__ == '__main__':
+    import tempfile
     print("--- Testing Event Logger ---")
-    
-    # Clean up old log file for fresh test
-    if os.path.exists(EVENT_LOG_FILE):
-        os.remove(EVENT_LOG_FILE)
+
+    # Use a scratch directory so the real log is untouched
+    scratch_dir = tempfile.mkdtemp()
+    EVENT_LOG_FILE = os.path.join(scratch_dir, EVENT_LOG_FILENAME)
+    LEGACY_EVENT_LOG_FILE = os.path.join(scratch_dir, LEGACY_EVENT_LOG_FILENAME)
+
+    # Seed a legacy JSON-array log to exercise the migration
+    with open(LEGACY_EVENT_LOG_FILE, 'w', encoding='utf-8') as f:
+        json.dump([{"timestamp": datetime.now(timezone.utc).isoformat(), "event_id": "legacy1",
+                    "event_type": "LEGACY_EVENT", "description": "From the old log.", "source": "test", "metadata": {}}], f)
 
     # Log some sample events
     event1_meta = {"tool_name": "test_tool", "version": "1.0"}
@@ -141,7 +367,7 @@ if __name__ == '__main__':
     event2_meta = {"goal_id": "g123", "status": "completed"}
     ev2 = log_event("GOAL_STATUS_UPDATED", "Goal status changed.", "goal_management.py", event2_meta)
     print(f"Logged event 2: {ev2.get('event_id')}")
-    
+
     ev3 = log_event("USER_INTERACTION", "User provided input.", "cli.py", {"input_length": 20})
     print(f"Logged event 3: {ev3.get('event_id')}")
 
@@ -150,42 +376,21 @@ if __name__ == '__main__':
     recent = get_recent_events(limit=2)
     for item in recent:
         print(f"  {item['timestamp']} - {item['event_type']}: {item['description']}")
-    
+
     assert len(recent) == 2, f"Expected 2 recent events, got {len(recent)}"
-    if recent: # Check if recent is not empty before indexing
-        assert recent[0]['event_id'] == ev3['event_id'], "Events not in newest-first order or wrong event"
-
-    # Check full log content
-    if os.path.exists(EVENT_LOG_FILE):
-        with open(EVENT_LOG_FILE, 'r') as f:
-            all_logged_events = json.load(f)
-        print(f"\nTotal events in log file: {len(all_logged_events)}")
-        assert len(all_logged_events) == 3, "Expected 3 events in the log file."
-        assert all_logged_events[0]['event_id'] == ev1['event_id']
-        assert all_logged_events[1]['event_id'] == ev2['event_id']
-        assert all_logged_events[2]['event_id'] == ev3['event_id']
-    else:
-        print("ERROR: Log file not found after logging events.")
-        assert False, "Log file not created."
-
-    print("\n--- Testing with empty/corrupted log file (before next logs) ---")
-    # Simulate corrupted log
-    with open(EVENT_LOG_FILE, 'w') as f:
-        f.write("this is not json")
-    
-    corrupt_read = get_recent_events(1)
-    assert corrupt_read == [], f"Expected empty list from corrupted log, got {corrupt_read}"
-    
-    # Log another event - should reinitialize due to corruption
-    ev4 = log_event("SYSTEM_WARNING", "Log file was corrupted, reinitialized.", "event_logger.py")
-    print(f"Logged event 4 (after corruption): {ev4.get('event_id')}")
-    
-    recent_after_corruption = get_recent_events(5)
-    assert len(recent_after_corruption) == 1, "Expected 1 event after reinitialization"
-    if recent_after_corruption:
-        assert recent_after_corruption[0]['event_id'] == ev4['event_id']
-    
-    print(f"Log content after reinit: {recent_after_corruption}")
+    assert recent[0]['event_id'] == ev3['event_id'], "Events not in newest-first order or wrong event"
+
+    all_events = get_recent_events(limit=10)
+    print(f"\nTotal events in log: {len(all_events)}")
+    assert [e['event_id'] for e in all_events] == [ev3['event_id'], ev2['event_id'], ev1['event_id'], "legacy1"]
+    assert os.path.exists(LEGACY_EVENT_LOG_FILE + ".migrated"), "Legacy log was not marked as migrated."
 
+    print("\n--- Testing with a corrupted line ---")
+    with open(EVENT_LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write("this is not json\n")
+    ev4 = log_event("SYSTEM_WARNING", "Logged after a corrupted line.", "event_logger.py")
+    recent_after_corruption = get_recent_events(2)
+    assert [e['event_id'] for e in recent_after_corruption] == [ev4['event_id'], ev3['event_id']]
 
+    close_event_log()
     print("\n--- Event Logger Tests Finished ---")
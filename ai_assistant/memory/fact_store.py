@@ -0,0 +1,380 @@
+# ai_assistant/memory/fact_store.py
+"""
+Indexed, in-memory view of learned_facts.json.
+
+The store keeps the parsed facts together with an inverted index and a
+category index, so prompt-time retrieval is a BM25 lookup over the posting
+lists of the query terms instead of a substring scan over every fact.
+Per-fact BM25 term weights are computed when the index is built, and each
+posting list is also kept in descending weight order so top-k queries can stop
+early (Fagin's threshold algorithm) instead of scoring every fact that shares
+a common word with the prompt. The cache is rebuilt when the file's
+(mtime, size, inode) changes, or immediately on writes made through `save()`.
+
+`semantic_search()` ranks facts by embedding similarity through a VectorIndex,
+and `hybrid_search()` fuses the BM25 and semantic rankings. The vector index is
+synced in a background thread when facts are saved or found to have changed
+(only changed facts are re-embedded); queries use the facts already indexed and
+never wait for embeddings, so a new fact is found by BM25 until it is embedded.
+"""
+import heapq
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ai_assistant.memory.persistent_memory import (
+    load_learned_facts,
+    save_learned_facts,
+    LEARNED_FACTS_FILEPATH
+)
+from ai_assistant.memory.vector_index import VectorIndex, get_vector_index
+
+# BM25 parameters (Robertson/Sparck Jones defaults).
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Reciprocal rank fusion constant used by hybrid_search.
+RRF_K = 60
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_]+")
+# Very common words carry no retrieval signal but have huge posting lists, so they are not indexed.
+STOPWORDS: Set[str] = {
+    "a", "about", "all", "also", "an", "and", "any", "are", "as", "at", "be", "been", "but", "by",
+    "can", "could", "did", "do", "does", "for", "from", "give", "had", "has", "have", "how", "i",
+    "if", "in", "into", "is", "it", "its", "just", "me", "my", "of", "on", "or", "our", "please",
+    "s", "show", "so", "some", "tell", "than", "that", "the", "their", "them", "then", "there",
+    "these", "they", "this", "to", "us", "was", "we", "were", "what", "when", "where", "which",
+    "who", "will", "with", "would", "you", "your"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases and splits text into index terms, dropping stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class FactStore:
+    """Cached learned-facts collection with BM25 retrieval, category filters and top-k selection."""
+
+    def __init__(self, filepath: str = LEARNED_FACTS_FILEPATH, vector_index: Optional[VectorIndex] = None):
+        self.filepath = filepath
+        self._vector_index = vector_index
+        self._index_version = 0
+        self._vector_index_version = -1
+        self._vector_sync_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        self._file_signature: Optional[Tuple[int, int, int]] = None
+        self._loaded = False
+        self._facts: List[Dict[str, Any]] = []
+        self._term_weights: Dict[str, Dict[int, float]] = {}      # term -> {fact index: BM25 weight}
+        self._term_impacts: Dict[str, List[Tuple[float, int]]] = {} # term -> [(weight, fact index)], best first
+        self._categories: Dict[str, Set[int]] = {}
+        self._category_order: Dict[str, List[int]] = {}             # category -> fact indices, oldest first
+
+    def _current_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.filepath)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _build_index(self, facts: List[Dict[str, Any]]) -> None:
+        """Must hold self._lock."""
+        self._index_version += 1
+        self._facts = [fact for fact in facts if isinstance(fact, dict)]
+        term_frequencies: Dict[str, Dict[int, int]] = {}
+        doc_lengths: List[int] = []
+        self._categories = {}
+        self._category_order = {}
+        for index, fact in enumerate(self._facts):
+            tokens = tokenize(str(fact.get("text", "")))
+            doc_lengths.append(len(tokens))
+            for token in tokens:
+                postings = term_frequencies.setdefault(token, {})
+                postings[index] = postings.get(index, 0) + 1
+            category = fact.get("category") or "uncategorized"
+            self._categories.setdefault(category, set()).add(index)
+            self._category_order.setdefault(category, []).append(index)
+
+        total_docs = len(self._facts)
+        avg_doc_length = (sum(doc_lengths) / total_docs) if total_docs else 1.0
+        self._term_weights = {}
+        self._term_impacts = {}
+        for term, postings in term_frequencies.items():
+            doc_freq = len(postings)
+            idf = math.log(1.0 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            weights = {}
+            for index, term_freq in postings.items():
+                norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_lengths[index] / (avg_doc_length or 1.0))
+                weights[index] = idf * term_freq * (BM25_K1 + 1.0) / (term_freq + norm)
+            self._term_weights[term] = weights
+            self._term_impacts[term] = sorted(((w, i) for i, w in weights.items()), key=lambda item: (-item[0], item[1]))
+
+    def _refresh(self) -> None:
+        """Reloads and re-indexes the facts file if it changed since the last load."""
+        signature = self._current_signature()
+        if self._loaded and signature == self._file_signature:
+            return
+        with self._lock:
+            signature = self._current_signature()
+            if self._loaded and signature == self._file_signature:
+                return
+            facts = load_learned_facts(self.filepath) if signature is not None else []
+            # load_learned_facts may rewrite the file (format migration); record the final signature.
+            self._file_signature = self._current_signature()
+            self._build_index(facts)
+            self._loaded = True
+
+    def invalidate(self) -> None:
+        """Forces a reload on the next access."""
+        with self._lock:
+            self._loaded = False
+
+    def save(self, facts: List[Dict[str, Any]]) -> bool:
+        """Write-through save: persists `facts` and re-indexes them without re-reading the file."""
+        with self._lock:
+            if not save_learned_facts(facts, self.filepath):
+                return False
+            self._file_signature = self._current_signature()
+            self._build_index(facts)
+            self._loaded = True
+            self._schedule_vector_sync()
+            return True
+
+    def all_facts(self) -> List[Dict[str, Any]]:
+        self._refresh()
+        return list(self._facts)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._facts)
+
+    def _candidate_filter(self, categories: Optional[Iterable[str]]) -> Optional[Set[int]]:
+        if categories is None:
+            return None
+        allowed: Set[int] = set()
+        for category in categories:
+            allowed |= self._categories.get(category, set())
+        return allowed
+
+    def search(
+        self,
+        query: str,
+        top_k: Optional[int] = 5,
+        categories: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the facts that best match `query`, ranked by BM25 score (best first).
+
+        Args:
+            query: Free text; it is tokenized the same way the facts are.
+            top_k: Maximum number of facts to return. None returns every matching fact.
+            categories: If given, only facts in one of these categories are considered.
+        """
+        self._refresh()
+        with self._lock:
+            terms = [term for term in set(tokenize(query)) if term in self._term_weights]
+            if not terms or top_k == 0:
+                return []
+            weight_maps = [self._term_weights[term] for term in terms]
+            allowed = self._candidate_filter(categories)
+
+            if top_k is None:
+                ranked = self._score_all(weight_maps, allowed)
+            elif allowed is not None and len(allowed) <= sum(len(weights) for weights in weight_maps):
+                ranked = heapq.nlargest(top_k, self._score_candidates(weight_maps, allowed))
+            else:
+                ranked = self._threshold_top_k([self._term_impacts[term] for term in terms], weight_maps, top_k, allowed)
+            return [self._facts[-negated_index] for _, negated_index in ranked]
+
+    # Ranked results are (score, -fact index) pairs, so ties keep file order.
+
+    @staticmethod
+    def _score_candidates(weight_maps: List[Dict[int, float]], candidates: Iterable[int]) -> List[Tuple[float, int]]:
+        scored = []
+        for index in candidates:
+            score = sum(weights.get(index, 0.0) for weights in weight_maps)
+            if score > 0.0:
+                scored.append((score, -index))
+        return scored
+
+    def _score_all(self, weight_maps: List[Dict[int, float]], allowed: Optional[Set[int]]) -> List[Tuple[float, int]]:
+        candidates: Set[int] = set()
+        for weights in weight_maps:
+            candidates.update(weights)
+        if allowed is not None:
+            candidates &= allowed
+        return sorted(self._score_candidates(weight_maps, candidates), reverse=True)
+
+    @staticmethod
+    def _threshold_top_k(
+        impact_lists: List[List[Tuple[float, int]]],
+        weight_maps: List[Dict[int, float]],
+        top_k: int,
+        allowed: Optional[Set[int]]
+    ) -> List[Tuple[float, int]]:
+        """
+        Top-k by walking the weight-ordered posting lists in parallel. After each round,
+        no unseen fact can score more than the sum of the weights at the current depth,
+        so scanning stops once the k-th best score reaches that bound.
+        """
+        best: List[Tuple[float, int]] = [] # Min-heap of the current top-k
+        seen: Set[int] = set()
+        max_depth = max(len(impacts) for impacts in impact_lists)
+        for depth in range(max_depth):
+            threshold = 0.0
+            for impacts in impact_lists:
+                if depth >= len(impacts):
+                    continue
+                weight, index = impacts[depth]
+                threshold += weight
+                if index in seen:
+                    continue
+                seen.add(index)
+                if allowed is not None and index not in allowed:
+                    continue
+                entry = (sum(weights.get(index, 0.0) for weights in weight_maps), -index)
+                if len(best) < top_k:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            if len(best) >= top_k and best[0][0] >= threshold:
+                break
+        return sorted(best, reverse=True)
+
+    def recent(
+        self,
+        limit: int,
+        categories: Optional[Iterable[str]] = None,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Returns up to `limit` of the most recently added facts (newest first), optionally filtered."""
+        self._refresh()
+        with self._lock:
+            excluded = set(exclude_ids or ())
+            if categories is None:
+                candidate_indices: Iterable[int] = range(len(self._facts) - 1, -1, -1)
+            else:
+                candidate_indices = heapq.merge(
+                    *(reversed(self._category_order.get(category, [])) for category in set(categories)),
+                    reverse=True
+                )
+            selected: List[Dict[str, Any]] = []
+            for index in candidate_indices:
+                if len(selected) >= limit:
+                    break
+                fact = self._facts[index]
+                if fact.get("fact_id") not in excluded:
+                    selected.append(fact)
+            return selected
+
+    def _get_vector_index(self) -> VectorIndex:
+        """Must hold self._lock."""
+        if self._vector_index is None:
+            self._vector_index = get_vector_index("learned_facts")
+        return self._vector_index
+
+    def _vector_index_stale(self) -> bool:
+        """Whether facts changed, or the embedding backend did, since the last sync. Must hold self._lock."""
+        return self._vector_index_version != self._index_version or self._get_vector_index().backend_changed
+
+    def sync_vector_index(self) -> int:
+        """Embeds the facts added or changed since the last sync, in the calling thread. Returns the number embedded."""
+        self._refresh()
+        with self._lock:
+            vector_index = self._get_vector_index()
+            version = self._index_version
+            items = {fact["fact_id"]: str(fact.get("text", "")) for fact in self._facts if fact.get("fact_id")}
+        embedded = vector_index.sync(items) # Outside self._lock: embedding may call the embedding server
+        with self._lock:
+            self._vector_index_version = version
+        return embedded
+
+    def _schedule_vector_sync(self) -> None:
+        """Starts a background sync of the vector index if it is stale and none is running. Must hold self._lock."""
+        if self._vector_sync_thread is None and self._vector_index_stale():
+            self._vector_sync_thread = threading.Thread(target=self._run_vector_sync, name="fact-vector-sync", daemon=True)
+            self._vector_sync_thread.start()
+
+    def _run_vector_sync(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if not self._vector_index_stale():
+                        self._vector_sync_thread = None
+                        return
+                self.sync_vector_index()
+        except Exception as e:
+            print(f"Warning: Syncing the learned facts vector index failed: {e}")
+            with self._lock:
+                self._vector_sync_thread = None
+
+    def wait_for_vector_sync(self, timeout: Optional[float] = None) -> None:
+        """Blocks until a running background sync of the vector index has finished."""
+        thread = self._vector_sync_thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def semantic_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        categories: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the facts most similar to `query` by embedding cosine similarity (best first).
+        Only facts already in the vector index are considered; if facts changed since the
+        last sync, a background sync is started instead of waiting for it.
+        """
+        self._refresh()
+        with self._lock:
+            if not self._facts or not query.strip():
+                return []
+            vector_index = self._get_vector_index()
+            self._schedule_vector_sync()
+            allowed_ids = None
+            if categories is not None:
+                allowed_ids = [self._facts[index].get("fact_id") for index in self._candidate_filter(categories)]
+            facts_by_id = {fact.get("fact_id"): fact for fact in self._facts}
+        matches = vector_index.query([query], top_k=top_k, allowed_ids=allowed_ids, min_score=min_score)[0]
+        return [facts_by_id[fact_id] for fact_id, _ in matches if fact_id in facts_by_id]
+
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 5,
+        categories: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Fuses the BM25 and semantic rankings with reciprocal rank fusion, so facts that
+        share the prompt's words and facts that paraphrase it can both be selected.
+        """
+        candidate_pool = max(top_k * 4, 20)
+        rankings = [
+            self.search(query, top_k=candidate_pool, categories=categories),
+            self.semantic_search(query, top_k=candidate_pool, categories=categories)
+        ]
+        fused_scores: Dict[str, float] = {}
+        facts_by_id: Dict[str, Dict[str, Any]] = {}
+        for ranking in rankings:
+            for rank, fact in enumerate(ranking):
+                fact_id = fact.get("fact_id")
+                facts_by_id[fact_id] = fact
+                fused_scores[fact_id] = fused_scores.get(fact_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        best_ids = sorted(fused_scores, key=lambda fact_id: fused_scores[fact_id], reverse=True)[:top_k]
+        return [facts_by_id[fact_id] for fact_id in best_ids]
+
+
+_fact_store: Optional[FactStore] = None
+_fact_store_lock = threading.Lock()
+
+def get_fact_store() -> FactStore:
+    """Returns the process-wide store for the default learned facts file."""
+    global _fact_store
+    if _fact_store is None:
+        with _fact_store_lock:
+            if _fact_store is None:
+                _fact_store = FactStore()
+    return _fact_store
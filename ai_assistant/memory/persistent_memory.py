@@ -1,10 +1,12 @@
 # Code for persistent memory management.
 import json
 import os
+import uuid
 from typing import Dict, Any, List
 import datetime # Added for __main__ tests for ActionableInsights
 
 from ai_assistant.config import get_data_dir # Import the centralized function
+from ai_assistant.tools.tool_result_cache import invalidate_tag
 
 def save_goals_to_file(filepath: str, goals_db: Dict[str, Any]) -> bool:
     """
@@ -74,6 +76,8 @@ def load_goals_from_file(filepath: str) -> Dict[str, Any]:
 
 LEARNED_FACTS_FILENAME = "learned_facts.json"
 LEARNED_FACTS_FILEPATH = os.path.join(get_data_dir(), LEARNED_FACTS_FILENAME)
+# Tool result cache tag of tools that read the learned facts (see RECALL_FACTS_SCHEMA)
+LEARNED_FACTS_CACHE_TAG = "learned_facts"
 
 ACTIONABLE_INSIGHTS_FILENAME = "actionable_insights.json"
 ACTIONABLE_INSIGHTS_FILEPATH = os.path.join(get_data_dir(), ACTIONABLE_INSIGHTS_FILENAME)
@@ -97,6 +101,7 @@ def save_learned_facts(facts: List[Dict[str, Any]], filepath: str = LEARNED_FACT
             
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(facts, f, indent=4, ensure_ascii=False)
+        invalidate_tag(LEARNED_FACTS_CACHE_TAG) # Cached recall_facts results are stale now
         return True
     except IOError as e: # pragma: no cover
         print(f"IOError saving learned facts to {filepath}: {e}")
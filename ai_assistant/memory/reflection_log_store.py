@@ -0,0 +1,273 @@
+# ai_assistant/memory/reflection_log_store.py
+"""
+Segmented append-only storage for the reflection log.
+
+Entries are stored one JSON object per line in numbered segment files
+(segment-000001.jsonl, segment-000002.jsonl, ...). A new segment is started once the
+active one exceeds REFLECTION_LOG_SEGMENT_MAX_BYTES, so adding an entry costs O(1)
+however long the log is. Next to the segments, index.tsv maps every entry_id to its
+(segment, byte offset) as "<entry_id>\t<segment>\t<offset>" lines, so a single entry
+can be read back without scanning the log.
+
+Reading the most recent entries only touches the tail of the newest segment(s); the
+id index is loaded the first time it is needed. If the process stopped between writing
+an entry and its index line, the missing index lines are rebuilt from the segments
+when the index is loaded.
+"""
+import json
+import os
+import threading
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from ai_assistant.memory.event_logger import _iter_lines_reversed
+from ai_assistant.memory.persistent_memory import load_reflection_log_entries
+
+REFLECTION_LOG_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+INDEX_FILENAME = "index.tsv"
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".jsonl"
+
+
+def reflection_log_dir_for(filepath: str) -> str:
+    """Directory holding the segmented log for a (legacy) reflection log path, e.g. data/reflection_log/."""
+    return os.path.splitext(filepath)[0]
+
+
+def segment_path(directory: str, number: int) -> str:
+    return os.path.join(directory, f"{_SEGMENT_PREFIX}{number:06d}{_SEGMENT_SUFFIX}")
+
+
+def _read_line_at(path: str, offset: int) -> Optional[Dict[str, Any]]:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        line = f.readline()
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+class ReflectionLogStore:
+    """Append-only, segmented JSONL store for reflection log entries with an on-disk entry_id index."""
+
+    def __init__(
+        self,
+        directory: str,
+        legacy_path: Optional[str] = None,
+        segment_max_bytes: int = REFLECTION_LOG_SEGMENT_MAX_BYTES
+    ):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.segment_max_bytes = segment_max_bytes
+        self.index_path = os.path.join(directory, INDEX_FILENAME)
+
+        self._lock = threading.RLock()
+        self._segments: Optional[List[int]] = None # Segment numbers, oldest first; None until scanned
+        self._file: Optional[BinaryIO] = None      # Active (newest) segment, opened for appending
+        self._size = 0
+        self._index_file: Optional[BinaryIO] = None
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None # entry_id -> (segment, offset); lazy
+
+    def _ensure_ready(self) -> List[int]:
+        """Scans the segment directory and migrates the legacy log on first use. Must hold self._lock."""
+        if self._segments is None:
+            segments = []
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX):
+                        try:
+                            segments.append(int(name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]))
+                        except ValueError:
+                            continue
+            self._segments = sorted(segments)
+            self._migrate_legacy()
+        return self._segments
+
+    def _migrate_legacy(self) -> None:
+        """
+        One-shot import of the legacy JSON-array log into an empty store. The legacy file is
+        renamed to '<name>.migrated' so it is not imported twice. Must hold self._lock.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        if self._segments:
+            print(f"ReflectionLogStore: Warning - Segmented log in '{self.directory}' already exists; "
+                  f"not importing legacy log '{self.legacy_path}'.")
+            return
+        entries = load_reflection_log_entries(self.legacy_path)
+        for entry in entries:
+            if isinstance(entry, dict):
+                self._append(entry, sync=False)
+        self._sync()
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        if entries:
+            print(f"ReflectionLogStore: Migrated {len(entries)} entries from '{self.legacy_path}' to '{self.directory}'.")
+
+    def _open(self) -> BinaryIO:
+        """Opens the active segment and the index for appending. Must hold self._lock."""
+        if self._file is None:
+            segments = self._ensure_ready()
+            os.makedirs(self.directory, exist_ok=True)
+            if not segments:
+                segments.append(1)
+            self._file = open(segment_path(self.directory, segments[-1]), 'ab')
+            self._size = self._file.tell()
+            self._index_file = open(self.index_path, 'ab')
+        return self._file
+
+    def _start_new_segment(self) -> None:
+        """Must hold self._lock, with the active segment open."""
+        self._sync()
+        self._file.close()
+        self._segments.append(self._segments[-1] + 1)
+        self._file = open(segment_path(self.directory, self._segments[-1]), 'ab')
+        self._size = 0
+
+    def _append(self, entry: Dict[str, Any], sync: bool = True) -> None:
+        """Must hold self._lock."""
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+        self._open()
+        if self._size and self._size + len(line) > self.segment_max_bytes:
+            self._start_new_segment()
+        segment, offset = self._segments[-1], self._size
+        self._file.write(line)
+        self._file.flush()
+        self._size += len(line)
+        entry_id = entry.get("entry_id")
+        if entry_id:
+            self._write_index_line(entry_id, segment, offset)
+        if sync:
+            self._sync()
+
+    def _write_index_line(self, entry_id: str, segment: int, offset: int) -> None:
+        """Must hold self._lock, with the index open."""
+        if "\n" in entry_id:
+            return
+        self._index_file.write(f"{entry_id}\t{segment}\t{offset}\n".encode('utf-8'))
+        self._index_file.flush()
+        if self._index is not None:
+            self._index[entry_id] = (segment, offset)
+
+    def _sync(self) -> None:
+        """fsyncs the active segment. The index is not fsynced; lost index lines are rebuilt on load. Must hold self._lock."""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        """Appends a serialized entry (a dict with an 'entry_id') and makes it durable."""
+        with self._lock:
+            self._append(entry)
+
+    def _load_index(self) -> Dict[str, Tuple[int, int]]:
+        """Loads the id index, indexing any entries written after the last index line. Must hold self._lock."""
+        if self._index is not None:
+            return self._index
+        segments = self._ensure_ready()
+        self._open()
+        index: Dict[str, Tuple[int, int]] = {}
+        last_position = (0, -1)
+        try:
+            with open(self.index_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        continue # Torn last line
+                    try:
+                        entry_id, segment, offset = line.decode('utf-8')[:-1].rsplit("\t", 2)
+                        position = (int(segment), int(offset))
+                    except ValueError:
+                        continue # Torn or corrupted line
+                    index[entry_id] = position
+                    last_position = max(last_position, position)
+        except FileNotFoundError:
+            pass
+        self._index = index
+
+        # Recovery: index entries that reached a segment but not the index.
+        for segment in segments:
+            if segment < last_position[0]:
+                continue
+            path = segment_path(self.directory, segment)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                offset = 0
+                if segment == last_position[0]:
+                    f.seek(last_position[1])
+                    offset = last_position[1] + len(f.readline())
+                for line in iter(f.readline, b""):
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        entry = None
+                    if isinstance(entry, dict) and entry.get("entry_id") and entry["entry_id"] not in index:
+                        self._write_index_line(entry["entry_id"], segment, offset)
+                    offset += len(line)
+        return index
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored entry with `entry_id`, or None. Loads the id index on first use."""
+        with self._lock:
+            position = self._load_index().get(entry_id)
+            if position is None:
+                return None
+            path = segment_path(self.directory, position[0])
+        try:
+            return _read_line_at(path, position[1])
+        except OSError as e:
+            print(f"ReflectionLogStore: IOError reading entry '{entry_id}' from {path}: {e}")
+            return None
+
+    def tail(self, limit: int) -> List[Dict[str, Any]]:
+        """Returns up to `limit` most recent entries, newest first, reading segments from the end."""
+        if limit <= 0:
+            return []
+        with self._lock:
+            segments = list(self._ensure_ready())
+        entries: List[Dict[str, Any]] = []
+        for segment in reversed(segments):
+            path = segment_path(self.directory, segment)
+            if not os.path.exists(path):
+                continue
+            for line in _iter_lines_reversed(path):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(entry, dict):
+                    entries.append(entry)
+                    if len(entries) >= limit:
+                        return entries
+        return entries
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """Yields every stored entry, oldest first, one segment at a time."""
+        with self._lock:
+            segments = list(self._ensure_ready())
+        for segment in segments:
+            path = segment_path(self.directory, segment)
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if isinstance(entry, dict):
+                        yield entry
+
+    def flush(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._sync()
+                self._file.close()
+                self._file = None
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
@@ -0,0 +1,136 @@
+# ai_assistant/memory/step_checkpoints.py
+"""
+Durable checkpoints of completed plan steps, so a plan interrupted by a crash or
+restart resumes at its first incomplete step instead of re-running everything.
+
+A checkpoint is keyed by (run_id, step_id) and holds a hash of the step's inputs
+(its tool or type and fully resolved arguments) and its JSON-serialized result, or
+the reference of a result kept in the blob store, which the checkpoint holds until
+it is cleared or overwritten. On resume a step is skipped only if its checkpoint
+exists and its inputs hash is unchanged, so a step whose arguments now resolve
+differently runs again. Results that cannot be serialized are not checkpointed;
+such a step simply runs again.
+
+Checkpoints live in the step_checkpoints table of the structured store. The code
+executing a run removes them once it finishes (clear_run); checkpoints older than
+PLAN_CHECKPOINT_MAX_AGE_HOURS are ignored and pruned.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_assistant.config import get_data_dir, PLAN_CHECKPOINT_MAX_AGE_HOURS
+from ai_assistant.memory.blob_store import BlobRef, BlobStore, as_blob_ref
+from ai_assistant.memory.structured_store import Repository, get_structured_store, structured_store_path_for
+
+STEP_CHECKPOINTS_TABLE = "step_checkpoints"
+
+_default_store: Optional["StepCheckpointStore"] = None
+_default_store_lock = threading.Lock()
+
+
+def _canonical_json(value: Any) -> Optional[str]:
+    try:
+        return json.dumps(value, sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def inputs_hash(inputs: Any) -> Optional[str]:
+    """SHA-256 of the canonical JSON of a step's inputs, or None if they cannot be serialized."""
+    canonical = _canonical_json(inputs)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest() if canonical is not None else None
+
+
+class StepCheckpointStore:
+    """The step checkpoints of every run, one row per completed step."""
+
+    def __init__(self, db_path: Optional[str] = None, max_age_hours: float = PLAN_CHECKPOINT_MAX_AGE_HOURS,
+                 blob_store: Optional[BlobStore] = None):
+        self.db_path = db_path or structured_store_path_for(os.path.join(get_data_dir(), STEP_CHECKPOINTS_TABLE))
+        self.max_age_hours = max_age_hours
+        self.blob_store = blob_store # Holds the blobs that checkpointed results refer to; None uses the shared store
+
+    def _repository(self) -> Repository:
+        return get_structured_store(self.db_path).repository(
+            STEP_CHECKPOINTS_TABLE, "checkpoint_id",
+            columns={
+                "run_id": lambda c: c.get("run_id"),
+                "completed_at": lambda c: c.get("completed_at"),
+            }
+        )
+
+    def _is_expired(self, checkpoint: Dict[str, Any]) -> bool:
+        try:
+            completed_at = datetime.fromisoformat(checkpoint["completed_at"])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return datetime.now(timezone.utc) - completed_at > timedelta(hours=self.max_age_hours)
+
+    def save(self, run_id: str, step_id: str, step_index: int, step_inputs_hash: Optional[str], result: Any) -> bool:
+        """Records a completed step. Returns False (and records nothing) if its inputs or result cannot be serialized."""
+        blob_ref = result if isinstance(result, BlobRef) else None
+        if blob_ref is not None:
+            result = blob_ref.to_dict()
+        if step_inputs_hash is None or _canonical_json(result) is None:
+            return False
+        checkpoint_id = f"{run_id}:{step_id}"
+        if blob_ref is not None:
+            (self.blob_store or blob_ref.store).acquire(blob_ref)
+        previous = self._repository().get(checkpoint_id)
+        if previous:
+            self._release_blobs([previous])
+        return bool(self._repository().upsert({
+            "checkpoint_id": checkpoint_id,
+            "run_id": run_id,
+            "step_id": step_id,
+            "step_index": step_index,
+            "inputs_hash": step_inputs_hash,
+            "result": result,
+            "completed_at": datetime.now(timezone.utc).isoformat(),
+        }))
+
+    def load(self, run_id: str, step_id: str, step_inputs_hash: Optional[str]) -> Tuple[bool, Any]:
+        """Returns (True, result) if the step completed before with the same inputs, else (False, None)."""
+        if step_inputs_hash is None:
+            return False, None
+        checkpoint = self._repository().get(f"{run_id}:{step_id}")
+        if not checkpoint or checkpoint.get("inputs_hash") != step_inputs_hash or self._is_expired(checkpoint):
+            return False, None
+        return True, as_blob_ref(checkpoint.get("result"), self.blob_store)
+
+    def completed_steps(self, run_id: str) -> List[Dict[str, Any]]:
+        """The unexpired checkpoints of a run, in step order."""
+        checkpoints = [c for c in self._repository().find({"run_id": run_id}) if not self._is_expired(c)]
+        return sorted(checkpoints, key=lambda c: c.get("step_index", 0))
+
+    def clear_run(self, run_id: str) -> int:
+        """Removes a finished run's checkpoints, releasing the blobs they refer to. Returns the number removed."""
+        self._release_blobs(self._repository().find({"run_id": run_id}))
+        return self._repository().delete_where({"run_id": run_id})
+
+    def _release_blobs(self, checkpoints: List[Dict[str, Any]]) -> None:
+        for checkpoint in checkpoints:
+            result = as_blob_ref(checkpoint.get("result"), self.blob_store)
+            if isinstance(result, BlobRef):
+                result.store.release(result)
+
+    def prune_expired(self) -> int:
+        """Removes the checkpoints older than max_age_hours. Returns the number removed."""
+        expired = [c for c in self._repository().find(order_by="completed_at") if self._is_expired(c)]
+        self._release_blobs(expired)
+        for checkpoint in expired:
+            self._repository().delete(checkpoint["checkpoint_id"])
+        return len(expired)
+
+
+def get_step_checkpoint_store() -> StepCheckpointStore:
+    """The shared checkpoint store in the data directory."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = StepCheckpointStore()
+        return _default_store
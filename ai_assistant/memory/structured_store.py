@@ -0,0 +1,318 @@
+# ai_assistant/memory/structured_store.py
+"""
+Shared SQLite (WAL) storage for the assistant's small record stores: projects,
+suggestions, notifications, goals and actionable insights.
+
+Each data directory has one database file (STRUCTURED_STORE_DB_FILENAME) with one
+table per entity. A row holds the record's id, a few indexed columns extracted from
+the record (status, type, created_at, ...) and the full record as JSON, so point
+lookups and status/type filters are index queries instead of parsing a whole JSON file,
+and changing one record writes one row.
+
+The stores reach their table through a Repository. The first time a repository is
+opened, the store's legacy JSON file (if any) is imported into the empty table and
+renamed to '<name>.migrated'. Reads never create the database file.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ai_assistant.config import STRUCTURED_STORE_DB_FILENAME
+
+ColumnExtractor = Callable[[Dict[str, Any]], Any]
+LegacyLoader = Callable[[str], Optional[List[Dict[str, Any]]]]
+
+_stores: Dict[str, "StructuredStore"] = {}
+_stores_lock = threading.Lock()
+
+
+def structured_store_path_for(legacy_path: str) -> str:
+    """Database file shared by the stores whose legacy JSON files live in the same directory as `legacy_path`."""
+    return os.path.join(os.path.dirname(legacy_path) or ".", STRUCTURED_STORE_DB_FILENAME)
+
+
+def get_structured_store(db_path: str) -> "StructuredStore":
+    """Returns the process-wide StructuredStore for `db_path`, reopening it if the file was deleted."""
+    path = os.path.abspath(db_path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None or (store.is_open and not os.path.exists(path)):
+            if store is not None:
+                store.close()
+            store = _stores[path] = StructuredStore(path)
+        return store
+
+
+def _column_value(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+class StructuredStore:
+    """One SQLite database in WAL mode, shared by the repositories (tables) in it."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._repositories: Dict[str, "Repository"] = {}
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    def _get_conn(self, create: bool = True) -> Optional[sqlite3.Connection]:
+        """Opens the database lazily. With create=False a missing file gives None. Must hold self._lock."""
+        if self._conn is None:
+            if not create and not os.path.exists(self.db_path):
+                return None
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the enclosed statements as one write transaction."""
+        with self._lock:
+            conn = self._get_conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def repository(
+        self,
+        table: str,
+        id_field: str,
+        columns: Optional[Dict[str, ColumnExtractor]] = None,
+        legacy_path: Optional[str] = None,
+        legacy_loader: Optional[LegacyLoader] = None
+    ) -> "Repository":
+        """Returns the repository for `table`, creating it on first use."""
+        with self._lock:
+            repository = self._repositories.get(table)
+            if repository is None:
+                repository = Repository(self, table, id_field, columns, legacy_path, legacy_loader)
+                self._repositories[table] = repository
+            return repository
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._repositories.clear()
+
+
+class Repository:
+    """
+    Access to one entity table. Records are dicts; `id_field` names the key holding the
+    record id and `columns` maps each indexed column to a function extracting its value
+    from a record. Records are returned in insertion order unless `order_by` is given.
+    """
+
+    def __init__(
+        self,
+        store: StructuredStore,
+        table: str,
+        id_field: str,
+        columns: Optional[Dict[str, ColumnExtractor]] = None,
+        legacy_path: Optional[str] = None,
+        legacy_loader: Optional[LegacyLoader] = None
+    ):
+        self.store = store
+        self.table = table
+        self.id_field = id_field
+        self.columns: Dict[str, ColumnExtractor] = dict(columns or {})
+        self.legacy_path = legacy_path
+        self.legacy_loader = legacy_loader
+        self._ready = False
+
+    # --- Connection and schema ---
+
+    def _conn(self, create: bool = False) -> Optional[sqlite3.Connection]:
+        """Opens the table, importing the legacy file on first use. Must hold self.store._lock."""
+        if not self._ready and self.legacy_path and os.path.exists(self.legacy_path):
+            create = True
+        conn = self.store._get_conn(create=create)
+        if conn is None or self._ready:
+            return conn
+        column_defs = "".join(f", {name}" for name in self.columns)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id TEXT PRIMARY KEY{column_defs}, data TEXT NOT NULL)")
+        for name in self.columns:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{name} ON {self.table} ({name})")
+        self._ready = True
+        self._import_legacy(conn)
+        return conn
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        """One-shot import of the legacy JSON file into an empty table. Must hold self.store._lock."""
+        if not self.legacy_path or not self.legacy_loader or not os.path.exists(self.legacy_path):
+            return
+        if conn.execute(f"SELECT 1 FROM {self.table} LIMIT 1").fetchone() is not None:
+            print(f"StructuredStore: Warning - Table '{self.table}' in '{self.store.db_path}' already has records; "
+                  f"not importing legacy file '{self.legacy_path}'.")
+            return
+        records = self.legacy_loader(self.legacy_path)
+        if records is None:
+            return # The loader reported the error; keep the file for inspection.
+        with self.store.transaction():
+            for record in records:
+                if isinstance(record, dict) and record.get(self.id_field):
+                    self._write(conn, record)
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        if records:
+            print(f"StructuredStore: Migrated {len(records)} records from '{self.legacy_path}' to table '{self.table}'.")
+
+    def _row(self, record: Dict[str, Any]) -> List[Any]:
+        values = [str(record[self.id_field])]
+        values.extend(_column_value(extract(record)) for extract in self.columns.values())
+        values.append(json.dumps(record, ensure_ascii=False))
+        return values
+
+    def _write(self, conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        names = ["id", *self.columns, "data"]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        conn.execute(
+            f"INSERT INTO {self.table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+            f" ON CONFLICT(id) DO UPDATE SET {updates}",
+            self._row(record)
+        )
+
+    def _where(self, where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        if not where:
+            return "", []
+        clauses, params = [], []
+        for name, value in where.items():
+            if name != "id" and name not in self.columns:
+                raise ValueError(f"'{name}' is not an indexed column of table '{self.table}'.")
+            if isinstance(value, (list, tuple, set, frozenset)):
+                values = [_column_value(v) for v in value]
+                clauses.append(f"{name} IN ({', '.join('?' * len(values))})" if values else "0")
+                params.extend(values)
+            elif value is None:
+                clauses.append(f"{name} IS NULL")
+            else:
+                clauses.append(f"{name} = ?")
+                params.append(_column_value(value))
+        return " WHERE " + " AND ".join(clauses), params
+
+    def _read(self, query: Callable[[sqlite3.Connection], Any], default: Any) -> Any:
+        with self.store._lock:
+            try:
+                conn = self._conn()
+                return default if conn is None else query(conn)
+            except sqlite3.Error as e:
+                print(f"StructuredStore: Error reading table '{self.table}' from '{self.store.db_path}': {e}")
+                return default
+
+    def _modify(self, change: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Runs `change` in a write transaction. Returns its result, or False if the database failed."""
+        with self.store._lock:
+            try:
+                conn = self._conn(create=True)
+                with self.store.transaction():
+                    return change(conn)
+            except sqlite3.Error as e:
+                print(f"StructuredStore: Error writing table '{self.table}' in '{self.store.db_path}': {e}")
+                return False
+
+    # --- Queries ---
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the record with `record_id`, or None."""
+        row = self._read(
+            lambda conn: conn.execute(f"SELECT data FROM {self.table} WHERE id = ?", (str(record_id),)).fetchone(),
+            None
+        )
+        return json.loads(row[0]) if row else None
+
+    def find(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns the records matching `where` ({column: value}; a list/tuple value matches any
+        of its items). Ordered by `order_by` (an indexed column), else by insertion.
+        """
+        clause, params = self._where(where)
+        if order_by is not None and order_by not in self.columns and order_by != "id":
+            raise ValueError(f"'{order_by}' is not an indexed column of table '{self.table}'.")
+        query = f"SELECT data FROM {self.table}{clause} ORDER BY {order_by or 'rowid'}{' DESC' if descending else ''}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        rows = self._read(lambda conn: conn.execute(query, params).fetchall(), [])
+        return [json.loads(row[0]) for row in rows]
+
+    def find_one(self, where: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        records = self.find(where, limit=1)
+        return records[0] if records else None
+
+    def count(self, where: Optional[Dict[str, Any]] = None) -> int:
+        clause, params = self._where(where)
+        row = self._read(lambda conn: conn.execute(f"SELECT COUNT(*) FROM {self.table}{clause}", params).fetchone(), None)
+        return row[0] if row else 0
+
+    def count_by(self, column: str) -> Dict[Any, int]:
+        """Returns {value: number of records} for an indexed column, in first-seen order."""
+        if column not in self.columns:
+            raise ValueError(f"'{column}' is not an indexed column of table '{self.table}'.")
+        rows = self._read(
+            lambda conn: conn.execute(
+                f"SELECT {column}, COUNT(*) FROM {self.table} GROUP BY {column} ORDER BY MIN(rowid)"
+            ).fetchall(),
+            []
+        )
+        return {value: count for value, count in rows}
+
+    # --- Changes ---
+
+    def upsert(self, record: Dict[str, Any]) -> bool:
+        """Inserts or replaces one record, keeping its position in insertion order."""
+        return self._modify(lambda conn: self._write(conn, record) or True)
+
+    def upsert_many(self, records: Iterable[Dict[str, Any]]) -> bool:
+        def change(conn):
+            for record in records:
+                self._write(conn, record)
+            return True
+        return self._modify(change)
+
+    def replace_all(self, records: Iterable[Dict[str, Any]]) -> bool:
+        """Replaces the table's contents with `records` in one transaction."""
+        def change(conn):
+            conn.execute(f"DELETE FROM {self.table}")
+            for record in records:
+                self._write(conn, record)
+            return True
+        return self._modify(change)
+
+    def delete(self, record_id: str) -> bool:
+        """Deletes one record. Returns True if it existed."""
+        return self._modify(
+            lambda conn: conn.execute(f"DELETE FROM {self.table} WHERE id = ?", (str(record_id),)).rowcount > 0
+        )
+
+    def delete_where(self, where: Dict[str, Any]) -> int:
+        """Deletes the records matching `where` (as in find). Returns the number deleted."""
+        clause, params = self._where(where)
+        if not clause:
+            raise ValueError("delete_where needs at least one condition; use replace_all([]) to empty a table.")
+        deleted = self._modify(lambda conn: conn.execute(f"DELETE FROM {self.table}{clause}", params).rowcount)
+        return deleted or 0
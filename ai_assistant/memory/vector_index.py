@@ -0,0 +1,374 @@
+# ai_assistant/memory/vector_index.py
+"""
+Persistent cosine-similarity index over embedded texts.
+
+Vectors live in a float32 matrix that is memory-mapped from
+`<data dir>/vector_indexes/<name>.f32`, with ids, content hashes and the
+embedding backend recorded in `<name>.json`. Items can be added, replaced and
+deleted incrementally; `sync()` re-embeds only texts whose content changed,
+without blocking queries while it waits for the embedding backend.
+`query()` is batched: several query texts are scored against the matrix with
+one matrix product and the top-k rows are selected with argpartition.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_assistant.config import get_data_dir, is_debug_mode, VECTOR_INDEX_SUBDIR
+from ai_assistant.llm_interface.embeddings import EmbeddingBackend, get_embedding_backend
+
+_INITIAL_CAPACITY = 64
+_EMBED_BATCH_SIZE = 64
+
+
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_vector_index_dir() -> str:
+    path = os.path.join(get_data_dir(), VECTOR_INDEX_SUBDIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class VectorIndex:
+    """Incrementally updated top-k cosine index; rows are unit vectors from an EmbeddingBackend."""
+
+    def __init__(
+        self,
+        name: str,
+        backend: Optional[EmbeddingBackend] = None,
+        directory: Optional[str] = None,
+        persist: bool = True
+    ):
+        self.name = name
+        self.backend = backend or get_embedding_backend()
+        self.persist = persist
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock() # Serializes sync(); queries only need self._lock
+        self._reset_state()
+        if self.persist:
+            self._load()
+
+    # --- Storage ---
+
+    def _paths(self) -> Tuple[str, str]:
+        directory = self.directory or get_vector_index_dir()
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, f"{self.name}.f32"), os.path.join(directory, f"{self.name}.json")
+
+    def _reset_state(self) -> None:
+        self._ids: List[Optional[str]] = []      # Row -> id (None for deleted rows)
+        self._rows: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+        self._matrix: Optional[np.ndarray] = None
+        self._live: np.ndarray = np.zeros(0, dtype=bool)
+        self._dimension = 0
+        self._backend_name: Optional[str] = None
+
+    def _load(self) -> None:
+        vectors_path, meta_path = self._paths()
+        if not (os.path.exists(vectors_path) and os.path.exists(meta_path)):
+            return
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            capacity, dimension = int(meta["capacity"]), int(meta["dimension"])
+            if dimension <= 0 or os.path.getsize(vectors_path) != capacity * dimension * 4:
+                raise ValueError("vector file size does not match metadata")
+            self._matrix = np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, dimension))
+            self._ids = list(meta["ids"])
+            self._hashes = dict(meta["hashes"])
+            self._dimension = dimension
+            self._backend_name = meta["backend"]
+            self._rows = {item_id: row for row, item_id in enumerate(self._ids) if item_id is not None}
+            self._live = np.zeros(capacity, dtype=bool)
+            self._live[list(self._rows.values())] = True
+        except (OSError, ValueError, KeyError, TypeError, json.JSONDecodeError) as e:
+            print(f"Warning: Vector index '{self.name}' could not be loaded ({e}). It will be rebuilt.")
+            self._reset_state()
+
+    def _allocate(self, capacity: int, dimension: int) -> np.ndarray:
+        if not self.persist:
+            return np.zeros((capacity, dimension), dtype=np.float32)
+        vectors_path, _ = self._paths()
+        temp_path = vectors_path + ".tmp"
+        matrix = np.memmap(temp_path, dtype=np.float32, mode='w+', shape=(capacity, dimension))
+        if self._matrix is not None and len(self._ids):
+            matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        matrix.flush()
+        del matrix
+        self._matrix = None # Release the old mapping before replacing its file
+        os.replace(temp_path, vectors_path)
+        return np.memmap(vectors_path, dtype=np.float32, mode='r+', shape=(capacity, dimension))
+
+    def _ensure_capacity(self, needed_rows: int, dimension: int) -> None:
+        if self._matrix is not None and dimension != self._dimension:
+            raise ValueError(f"Embedding dimension changed from {self._dimension} to {dimension}.")
+        capacity = 0 if self._matrix is None else self._matrix.shape[0]
+        if needed_rows <= capacity:
+            return
+        new_capacity = max(_INITIAL_CAPACITY, capacity * 2, needed_rows)
+        if not self.persist and self._matrix is not None:
+            grown = np.zeros((new_capacity, dimension), dtype=np.float32)
+            grown[:len(self._ids)] = self._matrix[:len(self._ids)]
+            self._matrix = grown
+        else:
+            self._matrix = self._allocate(new_capacity, dimension)
+        live = np.zeros(new_capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+        self._dimension = dimension
+
+    def flush(self) -> None:
+        """Writes the vectors and metadata to disk (no-op for non-persistent indexes)."""
+        if not self.persist:
+            return
+        with self._lock:
+            vectors_path, meta_path = self._paths()
+            if self._matrix is None:
+                for path in (vectors_path, meta_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                return
+            if isinstance(self._matrix, np.memmap):
+                self._matrix.flush()
+            meta = {
+                "backend": self._backend_name,
+                "dimension": self._dimension,
+                "capacity": int(self._matrix.shape[0]),
+                "ids": self._ids,
+                "hashes": self._hashes
+            }
+            temp_path = meta_path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(temp_path, meta_path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset_state()
+            self.flush()
+
+    # --- Mutation ---
+
+    def _embed(self, texts: Sequence[str]) -> Tuple[Optional[str], np.ndarray]:
+        """Embeds in batches. Returns (backend name, vectors); the name is None if the backend changed between batches."""
+        names, batches = set(), []
+        for i in range(0, len(texts), _EMBED_BATCH_SIZE):
+            name, vectors = self.backend.embed_with_name(texts[i:i + _EMBED_BATCH_SIZE])
+            names.add(name)
+            batches.append(vectors)
+        if not batches:
+            return self.backend.name, np.zeros((0, self._dimension), dtype=np.float32)
+        return (names.pop() if len(names) == 1 else None), np.vstack(batches)
+
+    @property
+    def backend_changed(self) -> bool:
+        """Whether the index was built with another embedding backend than the active one (the next sync rebuilds it)."""
+        return self._backend_name is not None and self._backend_name != self.backend.name
+
+    def _check_backend(self) -> None:
+        """Drops the index if it was built with a different embedding backend. Must hold self._lock."""
+        if self._backend_name is not None and self._backend_name != self.backend.name:
+            if is_debug_mode():
+                print(f"[DEBUG] Vector index '{self.name}' was built with '{self._backend_name}'; rebuilding with '{self.backend.name}'.")
+            self._reset_state()
+
+    def _upsert(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        hashes: Sequence[Optional[str]],
+        backend_name: Optional[str] = None
+    ) -> None:
+        """Must hold self._lock."""
+        if not len(ids):
+            return
+        self._backend_name = backend_name or self.backend.name
+        new_ids = [item_id for item_id in dict.fromkeys(ids) if item_id not in self._rows]
+        self._ensure_capacity(len(self._ids) + len(new_ids), vectors.shape[1])
+        for item_id in new_ids:
+            self._rows[item_id] = len(self._ids)
+            self._ids.append(item_id)
+        for item_id, vector, content_hash in zip(ids, vectors, hashes):
+            row = self._rows[item_id]
+            self._matrix[row] = vector
+            self._live[row] = True
+            if content_hash is not None:
+                self._hashes[item_id] = content_hash
+
+    def add(self, items: Dict[str, str]) -> None:
+        """Embeds and inserts (or replaces) the given {id: text} items."""
+        if not items:
+            return
+        with self._lock:
+            self._check_backend()
+            ids, texts = list(items.keys()), list(items.values())
+            backend_name, vectors = self._embed(texts)
+            if backend_name is None:
+                return # The backend switched while embedding; sync() fills the index later
+            if self._backend_name is not None and self._backend_name != backend_name:
+                self._reset_state() # The backend fell back (or recovered) while embedding
+            self._upsert(ids, vectors, [_content_hash(text) for text in texts], backend_name)
+            self._compact_if_sparse()
+            self.flush()
+
+    def add_vectors(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """Inserts precomputed unit vectors (they must come from `self.backend`)."""
+        with self._lock:
+            self._check_backend()
+            self._upsert(list(ids), np.asarray(vectors, dtype=np.float32), [None] * len(ids))
+            self.flush()
+
+    def delete(self, ids: Iterable[str]) -> int:
+        with self._lock:
+            removed = self._delete_rows(ids)
+            if removed:
+                self._compact_if_sparse()
+                self.flush()
+            return removed
+
+    def _delete_rows(self, ids: Iterable[str]) -> int:
+        """Must hold self._lock."""
+        removed = 0
+        for item_id in ids:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                continue
+            self._ids[row] = None
+            self._live[row] = False
+            self._matrix[row] = 0.0
+            self._hashes.pop(item_id, None)
+            removed += 1
+        return removed
+
+    def _compact_if_sparse(self) -> None:
+        """Rewrites the matrix without deleted rows once more than half of the rows are dead. Must hold self._lock."""
+        used_rows = len(self._ids)
+        if used_rows < _INITIAL_CAPACITY or len(self._rows) * 2 >= used_rows:
+            return
+        live_rows = [row for row, item_id in enumerate(self._ids) if item_id is not None]
+        vectors = np.array(self._matrix[live_rows], dtype=np.float32)
+        ids = [self._ids[row] for row in live_rows]
+        hashes, backend_name, dimension = self._hashes, self._backend_name, self._dimension
+        self._reset_state()
+        self._backend_name = backend_name
+        self._ensure_capacity(max(len(ids), 1), dimension)
+        self._upsert(ids, vectors, [hashes.get(item_id) for item_id in ids], backend_name)
+
+    def sync(self, items: Dict[str, str]) -> int:
+        """
+        Makes the index contain exactly `items` ({id: text}): embeds new or changed texts
+        and deletes ids that are no longer present. Returns the number of texts embedded.
+        Texts are embedded without holding the query lock, so queries keep being answered
+        from the rows already indexed while the embedding backend works.
+        """
+        with self._sync_lock:
+            embedded = 0
+            for _ in range(3): # Started over if the backend switches while embedding
+                with self._lock:
+                    self._check_backend()
+                    stale_ids = [item_id for item_id in self._rows if item_id not in items]
+                    changed = {
+                        item_id: text for item_id, text in items.items()
+                        if self._hashes.get(item_id) != _content_hash(text) or item_id not in self._rows
+                    }
+                    if stale_ids:
+                        self._delete_rows(stale_ids)
+                    if not changed:
+                        if stale_ids:
+                            self._compact_if_sparse()
+                            self.flush()
+                        return embedded
+                ids, texts = list(changed.keys()), list(changed.values())
+                backend_name, vectors = self._embed(texts)
+                embedded += len(texts)
+                with self._lock:
+                    if backend_name is None or (self._backend_name is not None and self._backend_name != backend_name):
+                        # The backend fell back (or recovered) mid-sync; rebuild everything with the active one.
+                        self._reset_state()
+                        continue
+                    self._upsert(ids, vectors, [_content_hash(text) for text in texts], backend_name)
+                    self._compact_if_sparse()
+                    self.flush()
+                    return embedded
+            print(f"Warning: Vector index '{self.name}' could not be synced: the embedding backend kept changing.")
+            return embedded
+
+    # --- Queries ---
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    def query_vectors(
+        self,
+        query_vectors: np.ndarray,
+        top_k: int = 5,
+        allowed_ids: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Returns, for each query vector, up to `top_k` (id, cosine similarity) pairs, best first."""
+        query_vectors = np.atleast_2d(np.asarray(query_vectors, dtype=np.float32))
+        with self._lock:
+            used_rows = len(self._ids)
+            if self._matrix is None or not self._rows or top_k <= 0:
+                return [[] for _ in range(len(query_vectors))]
+            mask = self._live[:used_rows].copy()
+            if allowed_ids is not None:
+                allowed_mask = np.zeros(used_rows, dtype=bool)
+                allowed_rows = [self._rows[item_id] for item_id in allowed_ids if item_id in self._rows]
+                allowed_mask[allowed_rows] = True
+                mask &= allowed_mask
+            scores = query_vectors @ self._matrix[:used_rows].T
+            scores[:, ~mask] = -np.inf
+            ids = self._ids[:used_rows] # A snapshot: deletes null out self._ids in place
+
+        k = min(top_k, int(mask.sum()))
+        results: List[List[Tuple[str, float]]] = []
+        for row_scores in scores:
+            if k == 0:
+                results.append([])
+                continue
+            candidates = np.argpartition(-row_scores, k - 1)[:k]
+            candidates = candidates[np.argsort(-row_scores[candidates], kind="stable")]
+            results.append([
+                (ids[row], float(row_scores[row])) for row in candidates
+                if min_score is None or row_scores[row] >= min_score
+            ])
+        return results
+
+    def query(
+        self,
+        texts: Sequence[str],
+        top_k: int = 5,
+        allowed_ids: Optional[Iterable[str]] = None,
+        min_score: Optional[float] = None
+    ) -> List[List[Tuple[str, float]]]:
+        """Batched semantic search: one result list per query text (see `query_vectors`)."""
+        if not texts:
+            return []
+        backend_name, query_vectors = self.backend.embed_with_name(list(texts))
+        if self._backend_name is not None and self._backend_name != backend_name:
+            # Queries and rows must come from the same embedding space; the next sync() rebuilds.
+            return [[] for _ in texts]
+        return self.query_vectors(query_vectors, top_k=top_k, allowed_ids=allowed_ids, min_score=min_score)
+
+
+_indexes: Dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_vector_index(name: str) -> VectorIndex:
+    """Returns the shared persistent index called `name`, using the configured embedding backend."""
+    with _indexes_lock:
+        if name not in _indexes:
+            _indexes[name] = VectorIndex(name)
+        return _indexes[name]
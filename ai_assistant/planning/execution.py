@@ -2,11 +2,17 @@
 import traceback
 from typing import List, Dict, Any, Optional, Tuple
 import ai_assistant.tools.tool_system as ts_module_type
-import re
 import asyncio
+import time
+from ai_assistant.config import PLAN_MAX_CONCURRENT_STEPS, PLAN_INCREMENTAL_REPLANNING
+from ai_assistant.core.deadline import DeadlineExceededError, deadline_expired
+from ai_assistant.planning.step_scheduler import (
+    StepOutcome, STEP_OUTPUT_PLACEHOLDER, build_step_dependencies, run_plan_steps
+)
 from ..core.reflection import global_reflection_log, analyze_last_failure
 from ai_assistant.memory.awareness import record_tool_goal_association
 from ai_assistant.memory.event_logger import log_event
+from ai_assistant.memory.blob_store import BlobRef, BlobStore, get_blob_store, resolve_blob_refs
 from ai_assistant.learning.learning import LearningAgent # Import LearningAgent
 from ai_assistant.planning.planning import PlannerAgent # Added for re-planning
 from ..core.task_manager import TaskManager # Added for TaskManager
@@ -19,6 +25,9 @@ class ExecutionAgent:
     """
     MAX_RETRIES_PER_STEP = 1 # Results in 1 initial attempt + 1 retry = 2 total attempts
     MAX_REPLAN_ATTEMPTS = 1  # Max number of times to attempt re-planning
+    MAX_CONCURRENT_STEPS = PLAN_MAX_CONCURRENT_STEPS # Independent read-only steps run in parallel up to this limit
+    INCREMENTAL_REPLANNING = PLAN_INCREMENTAL_REPLANNING # Re-plan only the failed step onwards, keeping completed outputs
+    blob_store: Optional[BlobStore] = None # Large step results are kept here by reference; None uses the shared store
 
     async def execute_plan(
         self, 
@@ -46,6 +55,9 @@ class ExecutionAgent:
 
         current_plan = list(initial_plan) # Make a mutable copy
         replan_attempts = 0
+        # Completed steps carried over by an incremental re-plan (index -> outcome), and what reusing them saved
+        reused_outcomes: Dict[int, StepOutcome] = {}
+        reuse_note = ""
 
         while replan_attempts <= self.MAX_REPLAN_ATTEMPTS:
             if not current_plan:
@@ -62,159 +74,93 @@ class ExecutionAgent:
             print(f"\nExecutionAgent: Starting execution of {'re-plan' if replan_attempts > 0 else 'plan'} for goal '{goal_description}' (Attempt {replan_attempts + 1}) with {len(current_plan)} steps.")
             
             # Reset per-plan state for each new plan (or re-plan)
-            plan_results: List[Any] = []
-            plan_step_notes: List[str] = []
-            # plan_step_errors_details: List[Dict[str, Any]] = [] # Not directly used for re-planning logic, but for logging
-            
             first_critical_error_details: Dict[str, Optional[str]] = {
                 "error_type": None, "error_message": None, "traceback_snippet": None
             }
             
             plan_failed_critically = False
+            new_plan: Optional[List[Dict[str, Any]]] = None
 
-            for i, step in enumerate(current_plan):
-                tool_name = step.get("tool_name")
-                args = step.get("args", ())
-                kwargs = step.get("kwargs", {})
-
-                step_result: Any = None
-                current_step_error_details: Dict[str, Any] = {}
-                step_attempt_note: str = ""
-
-                if not tool_name:
-                    err_msg = f"Step {i+1} is missing 'tool_name'. Skipping."
-                    print(f"ExecutionAgent: {err_msg}")
-                    step_result = RuntimeError(err_msg)
-                    current_step_error_details = {'error_type': type(step_result).__name__, 'error_message': err_msg, 'traceback_snippet': None}
-                    step_attempt_note = "Skipped due to missing tool name."
-                else:
-                    if not isinstance(args, tuple): args = tuple(args) if isinstance(args, list) else (args,)
-                    if not isinstance(kwargs, dict): kwargs = {}
-
-                    processed_args = list(args)
-                    for i_arg, arg_val in enumerate(processed_args):
-                        if isinstance(arg_val, str):
-                            match = re.fullmatch(r"\[\[step_(\d+)_output\]\]", arg_val)
-                            if match:
-                                ref_step_num = int(match.group(1))
-                                if 1 <= ref_step_num <= len(plan_results):
-                                    plan_result_to_sub = plan_results[ref_step_num - 1]
-                                    if not isinstance(plan_result_to_sub, str):
-                                        print(f"Warning: Step {ref_step_num} result is not a string ('{type(plan_result_to_sub).__name__}'). Using its string representation for placeholder '{arg_val}'.")
-                                        processed_args[i_arg] = str(plan_result_to_sub)
-                                    else:
-                                        processed_args[i_arg] = plan_result_to_sub
-                                else:
-                                    print(f"ExecutionAgent: Warning - Invalid step reference {arg_val} for step {i+1}. Placeholder passed as is.")
-                    final_args_for_tool = tuple(processed_args)
-
-                    processed_kwargs = kwargs.copy()
-                    for kw_key, kw_val in processed_kwargs.items():
-                        if isinstance(kw_val, str):
-                            match = re.fullmatch(r"\[\[step_(\d+)_output\]\]", kw_val)
-                            if match:
-                                ref_step_num = int(match.group(1))
-                                if 1 <= ref_step_num <= len(plan_results):
-                                    kw_plan_result_to_sub = plan_results[ref_step_num-1]
-                                    if not isinstance(kw_plan_result_to_sub, str):
-                                        print(f"Warning: Step {ref_step_num} result for kwarg '{kw_key}' is not str. Using str().")
-                                        processed_kwargs[kw_key] = str(kw_plan_result_to_sub)
-                                    else:
-                                        processed_kwargs[kw_key] = kw_plan_result_to_sub
-                                else:
-                                    print(f"ExecutionAgent: Warning - Invalid step reference {kw_val} for kwarg '{kw_key}' in step {i+1}. Placeholder passed as is.")
-                    final_kwargs_for_tool = processed_kwargs
-
-                    for attempt in range(self.MAX_RETRIES_PER_STEP + 1):
-                        try:
-                            print(f"ExecutionAgent: Executing step {i+1}/{len(current_plan)} - Tool: {tool_name} (Args: {final_args_for_tool}, Kwargs: {final_kwargs_for_tool}), Attempt: {attempt+1}/{self.MAX_RETRIES_PER_STEP + 1}")
-                            step_result = await tool_system.execute_tool(
-                                tool_name,
-                                args=final_args_for_tool,
-                                kwargs=final_kwargs_for_tool,
-                                task_manager=task_manager,
-                                notification_manager=notification_manager # Pass notification_manager
+            # Independent read-only steps run concurrently; results stay in plan order
+            outcomes, failed_step_index = await self._run_plan_steps(
+                current_plan, tool_system, task_manager, notification_manager, completed=reused_outcomes
+            )
+            plan_results = [outcome.result for outcome in outcomes]
+            plan_step_notes = [outcome.note for outcome in outcomes]
+
+            if failed_step_index is not None:
+                i = failed_step_index
+                tool_name = current_plan[i].get("tool_name")
+                step_attempt_note = outcomes[i].note
+                current_step_error_details = outcomes[i].error_details
+                if first_critical_error_details["error_type"] is None: # Capture first critical error of this plan attempt
+                    first_critical_error_details = current_step_error_details
+
+                # Log this specific plan attempt's failure before trying to re-plan
+                reflection_entry_obj_fail = global_reflection_log.log_execution(
+                    goal_description=goal_description,
+                    plan=current_plan, # Log the plan that just failed
+                    execution_results=plan_results,
+                    overall_success=False, # This specific plan attempt failed
+                    notes=f"Plan attempt {replan_attempts + 1} failed at step {i+1} ({tool_name}). {step_attempt_note}" + reuse_note,
+                    first_error_type=first_critical_error_details["error_type"],
+                    first_error_message=first_critical_error_details["error_message"],
+                    first_traceback_snippet=first_critical_error_details["traceback_snippet"]
+                )
+                if learning_agent:
+                    learning_agent.process_reflection_entry(reflection_entry_obj_fail)
+                plan_failed_critically = True # Mark that this plan attempt had a critical failure
+
+                if deadline_expired():
+                    print("ExecutionAgent: The prompt's time budget is used up. Not re-planning; plan execution failed.")
+                elif replan_attempts < self.MAX_REPLAN_ATTEMPTS:
+                    print(f"ExecutionAgent: Critical failure in plan attempt {replan_attempts + 1}. Attempting to analyze failure and re-plan...")
+                    tool_registry = tool_system.list_tools()
+                    failure_analysis = analyze_last_failure(tool_registry, ollama_model_name=ollama_model_name)
+
+                    if failure_analysis and failure_analysis.strip():
+                        print(f"ExecutionAgent: Failure analysis obtained:\n{failure_analysis}")
+                        replan_suffix = getattr(planner_agent, "replan_remaining_steps", None)
+                        resume_index = 0
+                        if self.INCREMENTAL_REPLANNING and i > 0 and callable(replan_suffix):
+                            # Keep steps 1..i and their outputs; only the failed step onwards is re-planned
+                            new_suffix = await replan_suffix(
+                                original_goal=goal_description,
+                                completed_steps=[(current_plan[k], outcomes[k].result) for k in range(i)],
+                                failed_step=current_plan[i],
+                                failure_analysis=failure_analysis,
+                                available_tools=tool_registry,
+                                ollama_model_name=ollama_model_name
                             )
-                            current_step_error_details = {} 
-                            if attempt > 0:
-                                step_attempt_note = f"Succeeded on retry (attempt {attempt+1})."
-                            print(f"ExecutionAgent: Step {i+1} completed. Result: {str(step_result)[:200] + '...' if len(str(step_result)) > 200 else step_result}")
-                            break 
-                        except Exception as e:
-                            step_result = e 
-                            tb_snippet = traceback.format_exc(limit=3)
-                            current_step_error_details = {'error_type': type(e).__name__, 'error_message': str(e), 'traceback_snippet': tb_snippet}
-                            
-                            if attempt < self.MAX_RETRIES_PER_STEP:
-                                print(f"ExecutionAgent: Tool '{tool_name}' failed (Attempt {attempt+1}). Error: {str(e)}. Retrying...")
-                            else: 
-                                step_attempt_note = f"Failed after {self.MAX_RETRIES_PER_STEP + 1} attempt(s). Last error: {str(e)}"
-                                print(f"ExecutionAgent: Tool '{tool_name}' also failed on last retry (Attempt {attempt+1}). Error: {str(e)}")
-
-                plan_results.append(step_result)
-                plan_step_notes.append(step_attempt_note)
-                # plan_step_errors_details.append(current_step_error_details) # For detailed step-by-step logging if needed
-
-                # Check for failure: either an exception or a dictionary indicating failure
-                step_failed = False
-                if isinstance(step_result, Exception):
-                    step_failed = True
-                elif isinstance(step_result, dict):
-                    # Check for common failure indicators in dictionary results
-                    if step_result.get("ran_successfully") is False or step_result.get("error") is not None:
-                        step_failed = True
-                        # Populate current_step_error_details if it's a dict-reported error and not already set by an exception
-                        if not current_step_error_details:
-                            current_step_error_details = {'error_type': 'ToolReportedError', 'error_message': step_result.get("error", str(step_result.get("stderr","Unknown tool error"))), 'traceback_snippet': None}
-
-                if step_failed:
-                    if first_critical_error_details["error_type"] is None: # Capture first critical error of this plan attempt
-                        first_critical_error_details = current_step_error_details
-                    
-                    # Log this specific plan attempt's failure before trying to re-plan
-                    reflection_entry_obj_fail = global_reflection_log.log_execution(
-                        goal_description=goal_description,
-                        plan=current_plan, # Log the plan that just failed
-                        execution_results=plan_results, 
-                        overall_success=False, # This specific plan attempt failed
-                        notes=f"Plan attempt {replan_attempts + 1} failed at step {i+1} ({tool_name}). {step_attempt_note}",
-                        first_error_type=first_critical_error_details["error_type"],
-                        first_error_message=first_critical_error_details["error_message"],
-                        first_traceback_snippet=first_critical_error_details["traceback_snippet"]
-                    )
-                    if learning_agent:
-                        learning_agent.process_reflection_entry(reflection_entry_obj_fail)
-                    plan_failed_critically = True # Mark that this plan attempt had a critical failure
-
-                    if replan_attempts < self.MAX_REPLAN_ATTEMPTS:
-                        print(f"ExecutionAgent: Critical failure in plan attempt {replan_attempts + 1}. Attempting to analyze failure and re-plan...")
-                        tool_registry = tool_system.list_tools()
-                        failure_analysis = analyze_last_failure(tool_registry, ollama_model_name=ollama_model_name)
-
-                        if failure_analysis and failure_analysis.strip():
-                            print(f"ExecutionAgent: Failure analysis obtained:\n{failure_analysis}")
+                            if new_suffix:
+                                new_plan = current_plan[:i] + list(new_suffix)
+                                resume_index = i
+                        else:
                             new_plan = await planner_agent.replan_after_failure(
                                 original_goal=goal_description,
                                 failure_analysis=failure_analysis,
                                 available_tools=tool_registry,
                                 ollama_model_name=ollama_model_name
                             )
-                            if new_plan:
-                                print(f"ExecutionAgent: Successfully re-planned. New plan has {len(new_plan)} steps. Resetting and retrying.")
-                                current_plan = new_plan
-                                replan_attempts += 1 # Increment before breaking to restart loop
-                                break # Break from step loop to restart with new plan in the outer while loop
+                        if new_plan:
+                            reused_outcomes = {k: outcomes[k] for k in range(resume_index)}
+                            if resume_index:
+                                saved_seconds = sum(outcome.duration_seconds for outcome in reused_outcomes.values())
+                                reuse_note = (f" Incremental re-plan resumed at step {resume_index+1}, reusing {resume_index} completed step(s):"
+                                              f" saved {resume_index} tool call(s) and ~{saved_seconds:.2f}s of step execution.")
+                                print(f"ExecutionAgent: Successfully re-planned steps {resume_index+1} onwards. New plan has {len(new_plan)} steps. Resuming at step {resume_index+1}.")
                             else:
-                                print("ExecutionAgent: Re-planning attempt failed to produce a new plan. Proceeding with original failure.")
-                                # Fall through to normal failure handling outside the step loop as plan_failed_critically is True
+                                reuse_note = ""
+                                print(f"ExecutionAgent: Successfully re-planned. New plan has {len(new_plan)} steps. Resetting and retrying.")
+                            current_plan = new_plan
+                            replan_attempts += 1
+                            continue # Restart the outer while loop with the new plan (reused steps are not run again)
                         else:
-                            print("ExecutionAgent: Failure analysis did not yield significant results. Proceeding with original failure.")
-                            # Fall through
+                            print("ExecutionAgent: Re-planning attempt failed to produce a new plan. Proceeding with original failure.")
                     else:
-                        print(f"ExecutionAgent: Maximum re-plan attempts ({self.MAX_REPLAN_ATTEMPTS}) reached. Plan execution failed.")
-                        # Fall through
-                    
-                    break # Break from step loop (current plan execution stops due to critical error)
+                        print("ExecutionAgent: Failure analysis did not yield significant results. Proceeding with original failure.")
+                else:
+                    print(f"ExecutionAgent: Maximum re-plan attempts ({self.MAX_REPLAN_ATTEMPTS}) reached. Plan execution failed.")
 
             # After iterating through all steps of the current_plan or breaking due to critical failure
             if not plan_failed_critically: # Plan completed all steps without critical error
@@ -225,7 +171,7 @@ class ExecutionAgent:
                     plan=current_plan,
                     execution_results=plan_results,
                     overall_success=True, # This specific plan attempt was successful
-                    notes=f"Plan attempt {replan_attempts + 1} succeeded. " + ". ".join(filter(None, plan_step_notes)),
+                    notes=f"Plan attempt {replan_attempts + 1} succeeded. " + ". ".join(filter(None, plan_step_notes)) + reuse_note,
                     first_error_type=None, first_error_message=None, first_traceback_snippet=None
                 )
                 if learning_agent:
@@ -248,9 +194,10 @@ class ExecutionAgent:
                         "num_steps_in_final_plan": len(current_plan),
                         "tools_used_in_final_plan": tools_used_in_final_plan,
                         "replan_attempts_made": replan_attempts,
+                        "reused_completed_steps": len(reused_outcomes),
                     }
                 )
-                return current_plan, plan_results # MODIFIED: Return successful plan and its results
+                return current_plan, resolve_blob_refs(plan_results) # MODIFIED: Return successful plan and its results
 
             # If plan_failed_critically is True and we are here, it means either re-planning didn't happen,
             # or re-planning failed to produce a new plan, or re-plan limit was reached.
@@ -275,14 +222,153 @@ class ExecutionAgent:
                             "first_error_message_in_last_plan": first_critical_error_details.get("error_message")
                         }
                     )
-                    return current_plan, plan_results # MODIFIED: Return last attempted plan and its (failed) results
+                    return current_plan, resolve_blob_refs(plan_results) # MODIFIED: Return last attempted plan and its (failed) results
             # If we are here and plan_failed_critically is true, but replan_attempts < MAX_REPLAN_ATTEMPTS and new_plan was generated,
             # the outer while loop will continue with the new_plan.
         
         # Should ideally be covered by returns inside the loop.
         # This path implies MAX_REPLAN_ATTEMPTS was 0 and the first plan failed, or some other edge case.
         print(f"ExecutionAgent: Exiting execute_plan for goal '{goal_description}' after exhausting plan attempts.")
-        return current_plan, plan_results # MODIFIED: Return the last plan and its results, even if loop exhausted
+        return current_plan, resolve_blob_refs(plan_results) # MODIFIED: Return the last plan and its results, even if loop exhausted
+
+    def _blobs(self) -> BlobStore:
+        return self.blob_store or get_blob_store()
+
+    def _store_large_result(self, step_result: Any) -> Any:
+        """Keeps a large string/list/dict result in the blob store, returning its BlobRef (the result itself otherwise)."""
+        try:
+            return self._blobs().store_if_large(step_result)
+        except OSError as e:
+            print(f"ExecutionAgent: Warning - Could not store large step result in the blob store ({e}). Keeping it inline.")
+            return step_result
+
+    def _is_read_only_step(self, tool_system: Any, step: Dict[str, Any]) -> bool:
+        """Whether the step's tool is declared free of side effects (tool systems without the query count as mutating)."""
+        is_read_only_tool = getattr(tool_system, "is_read_only_tool", None)
+        tool_name = step.get("tool_name")
+        return bool(tool_name and callable(is_read_only_tool) and is_read_only_tool(tool_name))
+
+    async def _run_plan_steps(
+        self,
+        plan: List[Dict[str, Any]],
+        tool_system: Any,
+        task_manager: Optional[TaskManager],
+        notification_manager: Optional[NotificationManager],
+        completed: Optional[Dict[int, StepOutcome]] = None
+    ) -> Tuple[List[StepOutcome], Optional[int]]:
+        """
+        Runs the plan's steps as their dependencies allow, skipping the `completed` ones.
+        Returns the outcomes up to the first failed step and its index.
+        """
+        dependencies = build_step_dependencies(plan, [self._is_read_only_step(tool_system, step) for step in plan])
+
+        async def run_step(index: int, completed: Dict[int, StepOutcome]) -> StepOutcome:
+            return await self._run_step(index, plan, completed, tool_system, task_manager, notification_manager)
+
+        return await run_plan_steps(dependencies, run_step, self.MAX_CONCURRENT_STEPS, completed)
+
+    @staticmethod
+    def _substitute_placeholder(value: Any, index: int, completed: Dict[int, StepOutcome], description: str) -> Any:
+        """Replaces a `[[step_N_output]]` value with the output of an earlier step N."""
+        if not isinstance(value, str):
+            return value
+        match = STEP_OUTPUT_PLACEHOLDER.fullmatch(value)
+        if not match:
+            return value
+        ref_step_num = int(match.group(1))
+        if 1 <= ref_step_num <= index and (ref_step_num - 1) in completed:
+            result_to_sub = completed[ref_step_num - 1].result
+            if isinstance(result_to_sub, BlobRef): # Read the stored content only now that a tool needs it
+                result_to_sub = result_to_sub.read()
+            if not isinstance(result_to_sub, str):
+                print(f"Warning: Step {ref_step_num} result for {description} is not a string ('{type(result_to_sub).__name__}'). Using its string representation for placeholder '{value}'.")
+                return str(result_to_sub)
+            return result_to_sub
+        print(f"ExecutionAgent: Warning - Invalid step reference {value} for {description} in step {index+1}. Placeholder passed as is.")
+        return value
+
+    async def _run_step(
+        self,
+        index: int,
+        plan: List[Dict[str, Any]],
+        completed: Dict[int, StepOutcome],
+        tool_system: Any,
+        task_manager: Optional[TaskManager],
+        notification_manager: Optional[NotificationManager]
+    ) -> StepOutcome:
+        """Runs one step with its retries and decides whether it failed."""
+        step = plan[index]
+        tool_name = step.get("tool_name")
+        args = step.get("args", ())
+        kwargs = step.get("kwargs", {})
+
+        if not tool_name:
+            err_msg = f"Step {index+1} is missing 'tool_name'. Skipping."
+            print(f"ExecutionAgent: {err_msg}")
+            step_result: Any = RuntimeError(err_msg)
+            error_details = {'error_type': type(step_result).__name__, 'error_message': err_msg, 'traceback_snippet': None}
+            return StepOutcome(step_result, error_details, "Skipped due to missing tool name.", failed=True)
+
+        if not isinstance(args, tuple): args = tuple(args) if isinstance(args, list) else (args,)
+        if not isinstance(kwargs, dict): kwargs = {}
+
+        final_args_for_tool = tuple(
+            self._substitute_placeholder(arg_val, index, completed, "an argument") for arg_val in args
+        )
+        final_kwargs_for_tool = {
+            kw_key: self._substitute_placeholder(kw_val, index, completed, f"kwarg '{kw_key}'")
+            for kw_key, kw_val in kwargs.items()
+        }
+
+        step_result = None
+        current_step_error_details: Dict[str, Any] = {}
+        step_attempt_note = ""
+        step_start = time.perf_counter()
+        for attempt in range(self.MAX_RETRIES_PER_STEP + 1):
+            try:
+                print(f"ExecutionAgent: Executing step {index+1}/{len(plan)} - Tool: {tool_name} (Args: {final_args_for_tool}, Kwargs: {final_kwargs_for_tool}), Attempt: {attempt+1}/{self.MAX_RETRIES_PER_STEP + 1}")
+                step_result = await tool_system.execute_tool(
+                    tool_name,
+                    args=final_args_for_tool,
+                    kwargs=final_kwargs_for_tool,
+                    task_manager=task_manager,
+                    notification_manager=notification_manager # Pass notification_manager
+                )
+                current_step_error_details = {}
+                if attempt > 0:
+                    step_attempt_note = f"Succeeded on retry (attempt {attempt+1})."
+                print(f"ExecutionAgent: Step {index+1} completed. Result: {str(step_result)[:200] + '...' if len(str(step_result)) > 200 else step_result}")
+                break
+            except Exception as e:
+                step_result = e
+                tb_snippet = traceback.format_exc(limit=3)
+                current_step_error_details = {'error_type': type(e).__name__, 'error_message': str(e), 'traceback_snippet': tb_snippet}
+
+                if isinstance(e, DeadlineExceededError) or deadline_expired():
+                    step_attempt_note = f"Stopped after {attempt + 1} attempt(s): the prompt's time budget is used up. Last error: {str(e)}"
+                    print(f"ExecutionAgent: Tool '{tool_name}' failed (Attempt {attempt+1}) and the time budget is used up; not retrying. Error: {str(e)}")
+                    break
+                if attempt < self.MAX_RETRIES_PER_STEP:
+                    print(f"ExecutionAgent: Tool '{tool_name}' failed (Attempt {attempt+1}). Error: {str(e)}. Retrying...")
+                else:
+                    step_attempt_note = f"Failed after {self.MAX_RETRIES_PER_STEP + 1} attempt(s). Last error: {str(e)}"
+                    print(f"ExecutionAgent: Tool '{tool_name}' also failed on last retry (Attempt {attempt+1}). Error: {str(e)}")
+
+        # Check for failure: either an exception or a dictionary indicating failure
+        step_failed = False
+        if isinstance(step_result, Exception):
+            step_failed = True
+        elif isinstance(step_result, dict):
+            # Check for common failure indicators in dictionary results
+            if step_result.get("ran_successfully") is False or step_result.get("error") is not None:
+                step_failed = True
+                # Populate the error details if it's a dict-reported error and not already set by an exception
+                if not current_step_error_details:
+                    current_step_error_details = {'error_type': 'ToolReportedError', 'error_message': step_result.get("error", str(step_result.get("stderr","Unknown tool error"))), 'traceback_snippet': None}
+        if not step_failed:
+            step_result = self._store_large_result(step_result)
+        return StepOutcome(step_result, current_step_error_details, step_attempt_note, failed=step_failed,
+                           duration_seconds=time.perf_counter() - step_start)
 
 
 if __name__ == '__main__':
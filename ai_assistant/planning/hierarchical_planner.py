@@ -1,9 +1,15 @@
 # ai_assistant/planning/hierarchical_planner.py
 import re
 import json # Added for __main__ printing
-from typing import List, Any, Optional, Dict # Added Dict
+import asyncio
+import contextlib
+from typing import List, Any, Optional, Dict, Callable, Tuple # Added Dict
+from ai_assistant.config import HIERARCHICAL_PLAN_CONCURRENCY, HIERARCHICAL_PLAN_TIMEOUT_SECONDS
+from ai_assistant.core.deadline import shrink_timeout
 # Assuming a generic LLM service interface or a specific one like OllamaProvider
-from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.llm_interface.errors import LLMClientError
+from ai_assistant.llm_interface.ollama_client import OllamaProvider, STREAM_CHUNK_CONTENT
+from ai_assistant.llm_interface.stream_parsing import IncrementalLineListParser
 # For __main__ example, we'll mock this.
 
 # TypedDict for ProjectPlanStep can be formally defined if preferred,
@@ -119,7 +125,54 @@ class HierarchicalPlanner:
         """
         self.llm_provider = llm_provider
 
-    async def generate_high_level_outline(self, user_goal: str, project_context: Optional[str] = None) -> List[str]:
+    async def _invoke_llm_for_list(
+        self,
+        prompt: str,
+        model_name: str,
+        temperature: float,
+        max_tokens: int,
+        on_item: Optional[Callable[[str], None]] = None
+    ) -> Optional[str]:
+        """
+        Invokes the LLM for a line-based list response. With `on_item`, the response is
+        streamed and each list item is reported as soon as its line is complete.
+        Returns the full response text either way, or None if the request failed; a
+        stream that broke off counts as failed, so its last line is never reported.
+        """
+        if on_item is None:
+            return await self.llm_provider.invoke_ollama_model_async(
+                prompt,
+                model_name=model_name,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+
+        parser = IncrementalLineListParser()
+        response_parts: List[str] = []
+        stream = self.llm_provider.stream_async(
+            prompt, model_name=model_name, temperature=temperature, max_tokens=max_tokens
+        )
+        try:
+            async with contextlib.aclosing(stream) as chunks:
+                async for chunk in chunks:
+                    if chunk.kind != STREAM_CHUNK_CONTENT:
+                        continue
+                    response_parts.append(chunk.text)
+                    for item in parser.feed(chunk.text):
+                        on_item(item)
+        except LLMClientError as e:
+            print(f"[HP] List stream did not complete ({e}); treating the response as failed.")
+            return None
+        for item in parser.close():
+            on_item(item)
+        return "".join(response_parts)
+
+    async def generate_high_level_outline(
+        self,
+        user_goal: str,
+        project_context: Optional[str] = None,
+        on_item: Optional[Callable[[str], None]] = None
+    ) -> List[str]:
         """
         Generates a high-level outline (list of main functional blocks or phases)
         for a given user goal.
@@ -127,6 +180,8 @@ class HierarchicalPlanner:
         Args:
             user_goal: The user's complex goal description.
             project_context: Optional. Existing project context to provide to the LLM.
+            on_item: Optional. If given, the response is streamed and each outline
+                     item is passed to this callback as soon as it is generated.
 
         Returns:
             A list of strings, where each string is a high-level component/phase.
@@ -149,11 +204,12 @@ class HierarchicalPlanner:
             model_name = get_model_for_task("hierarchical_planning_outline")
 
 
-            response_text = await self.llm_provider.invoke_ollama_model_async(
+            response_text = await self._invoke_llm_for_list(
                 prompt,
                 model_name=model_name,
                 temperature=0.6, # Slightly higher for some creativity in breakdown
-                max_tokens=500 # Should be enough for an outline
+                max_tokens=500, # Should be enough for an outline
+                on_item=on_item
             )
 
             if not response_text or not response_text.strip():
@@ -183,7 +239,8 @@ class HierarchicalPlanner:
         self,
         outline_item: str,
         user_goal: str,
-        project_context: Optional[str] = None
+        project_context: Optional[str] = None,
+        on_item: Optional[Callable[[str], None]] = None
     ) -> List[str]:
         """
         Generates a list of detailed, actionable sub-tasks for a given high-level outline item.
@@ -192,6 +249,8 @@ class HierarchicalPlanner:
             outline_item: The high-level component/phase to break down.
             user_goal: The original user goal for overall context.
             project_context: Optional. Existing project context.
+            on_item: Optional. If given, the response is streamed and each sub-task
+                     is passed to this callback as soon as it is generated.
 
         Returns:
             A list of strings, where each string is a detailed sub-task.
@@ -214,11 +273,12 @@ class HierarchicalPlanner:
             from ai_assistant.config import get_model_for_task # Local import
             model_name = get_model_for_task("hierarchical_planning_tasks")
 
-            response_text = await self.llm_provider.invoke_ollama_model_async(
+            response_text = await self._invoke_llm_for_list(
                 prompt,
                 model_name=model_name,
                 temperature=0.5, # Slightly less creative for more direct task breakdown
-                max_tokens=700 # Enough for a list of tasks
+                max_tokens=700, # Enough for a list of tasks
+                on_item=on_item
             )
 
             if not response_text or not response_text.strip():
@@ -316,61 +376,163 @@ class HierarchicalPlanner:
     async def generate_full_project_plan(
         self,
         user_goal: str,
-        project_context: Optional[str] = None
+        project_context: Optional[str] = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+        timeout: Optional[float] = None
     ) -> List[Dict[str, Any]]: # Effectively List[ProjectPlanStep]
         """
         Generates a complete, multi-level project plan based on the user's goal.
         This orchestrates calls to outline, detailed task, and step elaboration methods.
+
+        After the outline is generated, every outline item is broken down into detailed
+        tasks concurrently and each detailed task is elaborated as soon as it is known,
+        with at most HIERARCHICAL_PLAN_CONCURRENCY LLM requests in flight. Steps are
+        returned in "{outline}.{task}" step_id order regardless of completion order.
+        If `on_progress` is given, outline items and detailed tasks are streamed to it
+        as {"stage": "outline_item" | "detailed_task", "text": ...} events while the
+        model generates them (detailed tasks are elaborated while their list is still
+        streaming), followed by a "project_step" event per elaborated step, in
+        completion order.
+
+        `timeout` (seconds, default HIERARCHICAL_PLAN_TIMEOUT_SECONDS, 0 for none) bounds
+        the whole plan: outstanding requests are cancelled and the steps elaborated so
+        far are returned. It is capped to what is left of the current prompt's deadline.
+        Cancelling the call cancels all outstanding requests.
         """
-        full_plan: List[Dict[str, Any]] = []
+        def _report(stage: str, **fields: Any) -> None:
+            if on_progress:
+                try:
+                    on_progress({"stage": stage, **fields})
+                except Exception as e_callback: # pragma: no cover
+                    print(f"[HP] Progress callback failed: {e_callback}")
+
+        if timeout is None:
+            timeout = HIERARCHICAL_PLAN_TIMEOUT_SECONDS
+        timeout = shrink_timeout(timeout)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout and timeout > 0 else None
+
+        def _remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - loop.time())
 
         print(f"\n[HP] Generating full project plan for goal: '{user_goal}'")
 
         # 1. Generate High-Level Outline
-        outline_items = await self.generate_high_level_outline(user_goal, project_context)
+        outline_stream_kwargs: Dict[str, Any] = {}
+        if on_progress:
+            outline_stream_kwargs["on_item"] = lambda item: _report("outline_item", text=item)
+        try:
+            outline_items = await asyncio.wait_for(
+                self.generate_high_level_outline(user_goal, project_context, **outline_stream_kwargs),
+                timeout=_remaining()
+            )
+        except asyncio.TimeoutError:
+            print(f"[HP] Timed out after {timeout}s generating the high-level outline. Returning empty plan.")
+            return []
         if not outline_items:
             print("[HP] Failed to generate a high-level outline. Returning empty plan.")
             return []
         print(f"[HP] Generated {len(outline_items)} high-level outline items.")
 
-        outline_idx_counter = 0 # Use 0-based for internal consistency, adjust for display if needed
-        for outline_item in outline_items:
-            outline_idx_counter += 1 # 1-based for step_id
-            print(f"[HP] Processing outline item {outline_idx_counter}: '{outline_item}'")
-
+        semaphore = asyncio.Semaphore(max(1, HIERARCHICAL_PLAN_CONCURRENCY))
+        steps: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        # (outline_idx, task_idx) -> (detailed task description, elaboration task); both 1-based
+        elaborations: Dict[Tuple[int, int], Tuple[str, asyncio.Task]] = {}
+
+        async def elaborate(outline_idx: int, task_idx: int, outline_item: str, detailed_task_description: str) -> None:
+            # 3. Elaborate each Detailed Task into a Project Plan Step
+            async with semaphore:
+                print(f"[HP]   Elaborating detailed task {outline_idx}.{task_idx}: '{detailed_task_description}'")
+                try:
+                    elaborated_step_dict = await self.generate_project_plan_step_for_task(
+                        detailed_task_description, user_goal, project_context
+                    )
+                except Exception as e:
+                    print(f"[HP]   Error elaborating detailed task '{detailed_task_description}': {e}")
+                    elaborated_step_dict = None
+
+            if elaborated_step_dict is None:
+                print(f"[HP]   Failed to elaborate step for detailed task: '{detailed_task_description}'. Skipping this task.")
+                return
+
+            project_plan_step: Dict[str, Any] = {
+                "step_id": f"{outline_idx}.{task_idx}",
+                "description": detailed_task_description, # Use the detailed task as the description
+                "type": elaborated_step_dict["type"],
+                "details": elaborated_step_dict["details"],
+                "outline_group": outline_item # Link back to the high-level outline item
+            }
+            steps[(outline_idx, task_idx)] = project_plan_step
+            _report("project_step", step=project_plan_step)
+            print(f"[HP]   Successfully elaborated step {project_plan_step['step_id']} of type '{project_plan_step['type']}'.")
+
+        def start_elaboration(outline_idx: int, task_idx: int, outline_item: str, detailed_task_description: str) -> None:
+            task = asyncio.create_task(elaborate(outline_idx, task_idx, outline_item, detailed_task_description))
+            elaborations[(outline_idx, task_idx)] = (detailed_task_description, task)
+
+        async def expand(outline_idx: int, outline_item: str) -> None:
             # 2. Generate Detailed Tasks for each Outline Item
-            detailed_tasks = await self.generate_detailed_tasks_for_outline_item(
-                outline_item, user_goal, project_context
-            )
+            streamed_count = 0
+            task_stream_kwargs: Dict[str, Any] = {}
+            if on_progress:
+                def on_detailed_task(item: str) -> None:
+                    nonlocal streamed_count
+                    streamed_count += 1
+                    _report("detailed_task", text=item, outline_group=outline_item)
+                    start_elaboration(outline_idx, streamed_count, outline_item, item)
+                task_stream_kwargs["on_item"] = on_detailed_task
+
+            async with semaphore:
+                print(f"[HP] Processing outline item {outline_idx}: '{outline_item}'")
+                try:
+                    detailed_tasks = await self.generate_detailed_tasks_for_outline_item(
+                        outline_item, user_goal, project_context, **task_stream_kwargs
+                    )
+                except Exception as e:
+                    print(f"[HP] Error generating detailed tasks for outline item '{outline_item}': {e}")
+                    detailed_tasks = []
+
+            # The parsed list is authoritative; drop streamed tasks that did not make it into it.
+            for task_idx in range(1, streamed_count + 1):
+                streamed_description, task = elaborations[(outline_idx, task_idx)]
+                if task_idx > len(detailed_tasks) or detailed_tasks[task_idx - 1] != streamed_description:
+                    task.cancel()
+                    del elaborations[(outline_idx, task_idx)]
+                    steps.pop((outline_idx, task_idx), None)
+
             if not detailed_tasks:
                 print(f"[HP] No detailed tasks generated for outline item '{outline_item}'. Skipping.")
-                continue
+                return
             print(f"[HP] Generated {len(detailed_tasks)} detailed tasks for '{outline_item}'.")
+            for task_idx, detailed_task_description in enumerate(detailed_tasks, start=1):
+                if (outline_idx, task_idx) not in elaborations:
+                    start_elaboration(outline_idx, task_idx, outline_item, detailed_task_description)
+
+        expansions = [
+            asyncio.create_task(expand(outline_idx, outline_item))
+            for outline_idx, outline_item in enumerate(outline_items, start=1)
+        ]
+
+        async def run_pipeline() -> None:
+            await asyncio.gather(*expansions)
+            pending = [task for _, task in elaborations.values() if not task.done()]
+            while pending:
+                await asyncio.wait(pending)
+                pending = [task for _, task in elaborations.values() if not task.done()]
 
-            detailed_task_idx_counter = 0
-            for detailed_task_description in detailed_tasks:
-                detailed_task_idx_counter += 1 # 1-based for sub-step_id
-                print(f"[HP]   Elaborating detailed task {outline_idx_counter}.{detailed_task_idx_counter}: '{detailed_task_description}'")
-
-                # 3. Elaborate each Detailed Task into a Project Plan Step
-                elaborated_step_dict = await self.generate_project_plan_step_for_task(
-                    detailed_task_description, user_goal, project_context
-                )
-
-                if elaborated_step_dict is None:
-                    print(f"[HP]   Failed to elaborate step for detailed task: '{detailed_task_description}'. Skipping this task.")
-                    continue
-
-                project_plan_step: Dict[str, Any] = {
-                    "step_id": f"{outline_idx_counter}.{detailed_task_idx_counter}",
-                    "description": detailed_task_description, # Use the detailed task as the description
-                    "type": elaborated_step_dict["type"],
-                    "details": elaborated_step_dict["details"],
-                    "outline_group": outline_item # Link back to the high-level outline item
-                }
-                full_plan.append(project_plan_step)
-                print(f"[HP]   Successfully elaborated step {project_plan_step['step_id']} of type '{project_plan_step['type']}'.")
-
+        try:
+            await asyncio.wait_for(run_pipeline(), timeout=_remaining())
+        except asyncio.TimeoutError:
+            print(f"[HP] Timed out after {timeout}s; returning the {len(steps)} steps elaborated so far.")
+        finally:
+            outstanding = [task for task in expansions if not task.done()]
+            outstanding += [task for _, task in elaborations.values() if not task.done()]
+            for task in outstanding:
+                task.cancel()
+            if outstanding:
+                await asyncio.gather(*outstanding, return_exceptions=True)
+
+        full_plan = [steps[key] for key in sorted(steps)]
         print(f"[HP] Finished generating full project plan. Total steps: {len(full_plan)}")
         return full_plan
 
@@ -1,16 +1,34 @@
 # Code for task planning.
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Tuple
+import asyncio
+import contextlib
 import re
 import json # For parsing LLM plan string
 from ai_assistant.planning.llm_argument_parser import populate_tool_arguments_with_llm
-from ai_assistant.config import get_model_for_task
+from ai_assistant.config import get_model_for_task, REPLAN_STEP_OUTPUT_PREVIEW_CHARS
+from ai_assistant.core.deadline import deadline_expired
 from ai_assistant.llm_interface.ollama_client import invoke_ollama_model_async # For re-planning
+from ai_assistant.llm_interface.ollama_client import stream_ollama_model_async, STREAM_CHUNK_CONTENT
+from ai_assistant.llm_interface.errors import LLMClientError
+from ai_assistant.llm_interface.stream_parsing import IncrementalJSONArrayParser
+from ai_assistant.planning.tool_retrieval import ToolRetriever, get_tool_retriever
+from ai_assistant.tools.tool_catalog import render_tools_json
 
 class PlannerAgent:
     """
     Responsible for creating a sequence of tool invocations (a plan)
     to achieve a given goal.
     """
+    # Ranks tools for the LLM planning prompts; None uses the shared retriever.
+    tool_retriever: Optional[ToolRetriever] = None
+
+    async def _shortlist_tools(self, query: str, available_tools: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Returns the tools to describe in an LLM planning prompt for `query` (all of them for small registries).
+        Ranking may embed the tool catalog (blocking HTTP calls), so it runs off the event loop.
+        """
+        retriever = self.tool_retriever or get_tool_retriever()
+        return await asyncio.to_thread(retriever.shortlist, query, available_tools)
 
     def _extract_numbers(self, text: str, count: int = 2) -> List[str]:
         """Extracts up to 'count' numbers from the text using regex."""
@@ -184,16 +202,66 @@ class PlannerAgent:
         print(f"PlannerAgent: Generated plan for '{main_goal_description}': {full_plan}")
         return full_plan
 
+    def _validate_streamed_step(self, index: int, step: Any, available_tools: Dict[str, Any]) -> Optional[str]:
+        """Returns an error description if a streamed plan step is unusable, else None."""
+        if not isinstance(step, dict):
+            return f"Step {index+1} is not a dictionary. Content: {step}"
+        tool_name = step.get("tool_name")
+        if not tool_name or not isinstance(tool_name, str):
+            return f"Step {index+1} has missing or invalid 'tool_name'. Content: {step}"
+        if tool_name not in available_tools:
+            return f"Step {index+1} uses unavailable tool '{tool_name}'. Content: {step}"
+        return None
+
+    async def _stream_plan_response(
+        self,
+        prompt: str,
+        model_name: str,
+        available_tools: Dict[str, Any],
+        on_step: Callable[[Dict[str, Any]], None]
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Streams a planning response, validating each step as soon as the incremental
+        parser completes it. Returns (response_text, step_error); on the first invalid
+        step the stream is abandoned and step_error describes the problem. A stream
+        that fails or breaks off yields no response text, like a failed non-streamed call.
+        """
+        parser = IncrementalJSONArrayParser()
+        response_parts: List[str] = []
+        try:
+            async with contextlib.aclosing(stream_ollama_model_async(prompt, model_name=model_name)) as chunks:
+                async for chunk in chunks:
+                    if chunk.kind != STREAM_CHUNK_CONTENT:
+                        continue
+                    response_parts.append(chunk.text)
+                    for step in parser.feed(chunk.text):
+                        step_index = parser.items_emitted - 1
+                        step_error = self._validate_streamed_step(step_index, step, available_tools)
+                        if step_error:
+                            return "".join(response_parts), step_error
+                        try:
+                            on_step({"index": step_index, "step": step})
+                        except Exception as e_callback: # pragma: no cover
+                            print(f"PlannerAgent (LLM): Partial step callback failed: {e_callback}")
+        except LLMClientError as e:
+            print(f"PlannerAgent (LLM): Plan stream did not complete ({e}); discarding the partial response.")
+            return None, None
+        return "".join(response_parts) or None, None
+
     async def create_plan_with_llm(
         self, 
         goal_description: str, 
         available_tools: Dict[str, str], # This will be Dict[str, Dict[str, Any]] from ToolSystem.list_tools_with_sources()
         project_context_summary: Optional[str] = None,
-        project_name_for_context: Optional[str] = None
+        project_name_for_context: Optional[str] = None,
+        on_step: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
         """ (Async)
         Creates a plan to achieve the goal_description using an LLM to generate the plan steps.
         Optionally includes project context if provided.
+        If `on_step` is given, the LLM response is streamed: each step is validated and
+        passed to `on_step` as soon as it is complete, and generation is abandoned
+        early if a step is invalid.
         """
         import json 
 
@@ -205,23 +273,9 @@ class PlannerAgent:
 
         print(f"\nPlannerAgent (LLM): Attempting to create plan for goal: '{goal_description}'")
 
-        # Prepare tools description for the LLM, including parameters from schema
-        tools_for_prompt = {}
-        for tool_name, tool_data in available_tools.items(): # available_tools is now richer
-            desc_for_prompt = tool_data.get('description', 'No description.')
-            schema = tool_data.get('schema_details')
-            if schema and isinstance(schema.get('parameters'), list): # Check if parameters is a list
-                param_descs = []
-                for p_data in schema['parameters']:
-                    if isinstance(p_data, dict): # Ensure p_data is a dictionary
-                        p_name = p_data.get('name')
-                        p_type = p_data.get('type')
-                        p_desc = p_data.get('description')
-                        param_descs.append(f"{p_name} ({p_type}): {p_desc}")
-                if param_descs:
-                    desc_for_prompt += " Parameters: [" + "; ".join(param_descs) + "]"
-            tools_for_prompt[tool_name] = desc_for_prompt
-        tools_json_string = json.dumps(tools_for_prompt, indent=2)
+        # Describe only the tools relevant to the goal (plus core tools), including parameters from schema
+        prompt_tools = await self._shortlist_tools(goal_description, available_tools)
+        tools_json_string = render_tools_json(prompt_tools, annotated=True)
 
 
         PROJECT_CONTEXT_SECTION_TEMPLATE = """
@@ -350,11 +404,11 @@ Example:
 User goal: "That idea about improving the calculator (sugg_calc123) is great, approve it."
 Plan:
 [
-  {
+  {{
     "tool_name": "manage_suggestion_status",
     "args": ["sugg_calc123", "approve", "User stated it's a great idea."],
-    "kwargs": {}
-  }
+    "kwargs": {{}}
+  }}
 ]
 
 **Guidance for Iterating on User Projects (Based on Feedback):**
@@ -381,27 +435,27 @@ If the user provides feedback on a project they are working on (e.g., "My 'WebAp
 
 Conceptual Schema for `propose_project_file_update` (for your understanding when planning):
 ```json
-// "propose_project_file_update": {
+// "propose_project_file_update": {{
 //   "description": "Proposes changes to a user's project file. Initiates a backup, diff generation, and a two-critic review process. Changes are only applied if approved.",
 //   "parameters": [
-//     {"name": "absolute_target_filepath", "type": "str", "description": "The full, absolute path to the file to be modified or created."},
-//     {"name": "new_file_content", "type": "str", "description": "The complete new content for the file."},
-//     {"name": "change_description", "type": "str", "description": "A description of why this change is being proposed (e.g., user's request, bug fix details). This is used for the review context."}
+//     {{"name": "absolute_target_filepath", "type": "str", "description": "The full, absolute path to the file to be modified or created."}},
+//     {{"name": "new_file_content", "type": "str", "description": "The complete new content for the file."}},
+//     {{"name": "change_description", "type": "str", "description": "A description of why this change is being proposed (e.g., user's request, bug fix details). This is used for the review context."}}
 //   ],
-//   "returns": {"type": "dict", "description": "{'status': 'success'/'error'/'rejected', 'message': str}"}
-// }
+//   "returns": {{"type": "dict", "description": "{{'status': 'success'/'error'/'rejected', 'message': str}}"}}
+// }}
 ```
 
 Example for Iterating on a User Project:
 User goal: "In my 'WebAppX' project, the `handle_request` function in `api/routes.py` has a bug when the input is empty. Fix it to return a 400 error."
 Assumed Plan (tool names are illustrative; ensure they match available tools):
 [
-  {
+  {{
     "tool_name": "get_project_file_content",
     "args": ["WebAppX", "api/routes.py"],
-    "kwargs": {}
-  },
-  {
+    "kwargs": {{}}
+  }},
+  {{
     "tool_name": "call_code_service_modify_code",
     "args": [
         null, // module_path (can be null if full file content is provided as existing_code)
@@ -410,17 +464,17 @@ Assumed Plan (tool names are illustrative; ensure they match available tools):
         "Fix the handle_request function to return a 400 error when input is empty.", // modification_instruction
         "SELF_FIX_TOOL" // context for CodeService
     ],
-    "kwargs": {}
-  },
-  {
+    "kwargs": {{}}
+  }},
+  {{
     "tool_name": "propose_project_file_update",
     "args": [
         "[[step_1_output.file_path]]",
         "[[step_2_output.modified_code_string]]",
         "User request: Fix bug in handle_request in api/routes.py for WebAppX project regarding empty input."
     ],
-    "kwargs": {}
-  }
+    "kwargs": {{}}
+  }}
 ]
 Note: The `propose_project_file_update` tool initiates a process that includes backing up the original file (if it exists), generating a diff of the changes, subjecting the changes to a two-critic review, and only applying the changes if unanimously approved. This ensures safety and quality for modifications to user project files. The `[[step_1_output.file_path]]` from `get_project_file_content` provides the absolute path, suitable for `propose_project_file_update`.
 
@@ -444,7 +498,7 @@ Example 2 (Specific Task Status):
 User goal: "Tell me about task task_abc123."
 Plan:
 [
-  {{"tool_name": "get_item_details_by_id", "args": ["task_abc123", "task"], "kwargs": {}}}
+  {{"tool_name": "get_item_details_by_id", "args": ["task_abc123", "task"], "kwargs": {{}}}}
 ]
 
 Example 3 (Specific Project by Name - requires ID lookup first if tool expects ID):
@@ -551,12 +605,34 @@ JSON Plan:
         )
 
         while current_attempt <= MAX_CORRECTION_ATTEMPTS:
+            if deadline_expired(): # No (further) correction attempts once the prompt's time budget is used up
+                last_error_description = "The time budget for this prompt was used up before a valid plan was generated."
+                break
             model_for_planning = get_model_for_task("planning")
             print(f"PlannerAgent (LLM): Attempt {current_attempt + 1}/{MAX_CORRECTION_ATTEMPTS + 1}. Sending prompt to LLM (model: {model_for_planning})...")
             if current_attempt > 0 :
                  print(f"PlannerAgent (LLM): Correction prompt (first 500 chars):\n{current_prompt[:500]}...\n")
             
-            llm_response_str = await invoke_ollama_model_async(current_prompt, model_name=model_for_planning)
+            streamed_step_error: Optional[str] = None
+            if on_step:
+                llm_response_str, streamed_step_error = await self._stream_plan_response(
+                    current_prompt, model_for_planning, available_tools, on_step
+                )
+            else:
+                llm_response_str = await invoke_ollama_model_async(current_prompt, model_name=model_for_planning)
+
+            if streamed_step_error:
+                last_error_description = streamed_step_error
+                print(f"PlannerAgent (LLM): {last_error_description}")
+                current_attempt += 1
+                if current_attempt <= MAX_CORRECTION_ATTEMPTS:
+                    current_prompt = CORRECTION_PROMPT_TEMPLATE.format(
+                        goal=goal_description,
+                        tools_json_string=tools_json_string,
+                        previous_llm_response=llm_response_str or "",
+                        error_description=last_error_description
+                    )
+                continue
 
             if not llm_response_str:
                 last_error_description = f"Received no response or empty response from LLM ({model_for_planning})."
@@ -696,43 +772,109 @@ Respond ONLY with the JSON plan. Do not include any other text, comments, or exp
 The entire response must be a single, valid JSON object (a list of steps).
 JSON Plan:
 """
-        MAX_CORRECTION_ATTEMPTS = 1
-        current_attempt = 0
-        llm_response_str: Optional[str] = None
-        last_error_description: str = "No response from LLM for re-planning."
-
         print(f"\nPlannerAgent (Re-plan): Attempting to re-plan for goal: '{original_goal}'")
         
-        # Prepare tools description for the LLM, including parameters from schema if available_tools is rich
-        tools_for_prompt_replan = {}
-        if available_tools and isinstance(next(iter(available_tools.values())), dict): # Check if it's rich format
-            for tool_name, tool_data in available_tools.items():
-                desc_for_prompt = tool_data.get('description', 'No description.')
-                schema = tool_data.get('schema_details')
-                if schema and isinstance(schema.get('parameters'), list):
-                    param_descs = []
-                    for p_data in schema['parameters']:
-                        if isinstance(p_data, dict):
-                            p_name = p_data.get('name')
-                            p_type = p_data.get('type')
-                            p_desc = p_data.get('description')
-                            param_descs.append(f"{p_name} ({p_type}): {p_desc}")
-                    if param_descs:
-                        desc_for_prompt += " Parameters: [" + "; ".join(param_descs) + "]"
-                tools_for_prompt_replan[tool_name] = desc_for_prompt
-        else: # Fallback to old format if not rich
-            tools_for_prompt_replan = available_tools
-
-        tools_json_string = json.dumps(tools_for_prompt_replan, indent=2)
-
-        model_for_replan = ollama_model_name or get_model_for_task("planning")
-
-        current_prompt = LLM_REPLANNING_PROMPT_TEMPLATE.format(
+        # Describe only the tools relevant to the goal and failure (plus core tools), including parameters from schema
+        prompt_tools = await self._shortlist_tools(f"{original_goal}\n{failure_analysis}", available_tools)
+        tools_json_string = render_tools_json(prompt_tools, annotated=True)
+
+        initial_prompt = LLM_REPLANNING_PROMPT_TEMPLATE.format(
+            original_goal=original_goal,
+            failure_analysis=failure_analysis,
+            tools_json_string=tools_json_string
+        )
+        return await self._request_validated_replan(
+            initial_prompt, original_goal, failure_analysis, tools_json_string, available_tools,
+            ollama_model_name or get_model_for_task("planning"), "Re-plan"
+        )
+
+    async def replan_remaining_steps(
+        self,
+        original_goal: str,
+        completed_steps: List[Tuple[Dict[str, Any], Any]],
+        failed_step: Dict[str, Any],
+        failure_analysis: str,
+        available_tools: Dict[str, str],
+        ollama_model_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Incremental re-planning: `completed_steps` ((step, output) pairs) already ran
+        successfully and are kept. Asks the LLM only for the steps that replace
+        `failed_step` and everything after it. The returned steps are numbered from
+        len(completed_steps) + 1 and may reference completed outputs via [[step_X_output]].
+        Returns [] if no valid suffix could be generated.
+        """
+
+        LLM_SUFFIX_REPLANNING_PROMPT_TEMPLATE = """A plan to achieve a goal failed part-way through. You need to re-plan only the remaining steps.
+Original Goal: "{original_goal}"
+
+Steps 1 to {num_completed} already completed successfully and will NOT be run again. Their outputs:
+{completed_steps_text}
+
+Step {failed_step_number} failed: {failed_step_json}
+
+Analysis of the failure:
+---
+{failure_analysis}
+---
+
+Available Tools (tool_name: description):
+{tools_json_string}
+
+Generate ONLY the steps that still need to run to achieve the goal, replacing step {failed_step_number} and everything after it.
+Your first step will be step {failed_step_number}. To use the output of a completed step, or of one of your own earlier steps, pass "[[step_X_output]]" as an argument, where X is its step number.
+Do not repeat the completed steps.
+The plan *MUST* be a JSON list of step dictionaries.
+Each step dictionary *MUST* contain "tool_name" (string), "args" (list of strings), and "kwargs" (dictionary of string:string).
+If an argument value cannot be inferred, use an empty string "" or a placeholder like "TODO_infer_arg_value".
+If you use 'search_duckduckgo', you *MUST* add a subsequent step 'process_search_results_for_answer' with "[[step_X_output]]" as an argument.
+
+Consider the failure analysis carefully. Try to use different tools or different arguments if the failed step misused its tool.
+If the goal seems unachievable with the available tools even considering the failure, return an empty JSON list [].
+
+Respond ONLY with the JSON plan. Do not include any other text, comments, or explanations outside the JSON structure.
+The entire response must be a single, valid JSON object (a list of steps).
+JSON Plan:
+"""
+        num_completed = len(completed_steps)
+        print(f"\nPlannerAgent (Re-plan suffix): Re-planning from step {num_completed + 1} for goal: '{original_goal}'")
+
+        completed_lines = []
+        for number, (step, output) in enumerate(completed_steps, start=1):
+            output_text = str(output)
+            if len(output_text) > REPLAN_STEP_OUTPUT_PREVIEW_CHARS:
+                output_text = output_text[:REPLAN_STEP_OUTPUT_PREVIEW_CHARS] + "... (truncated)"
+            step_json = json.dumps({"tool_name": step.get("tool_name"), "args": list(step.get("args", ())), "kwargs": step.get("kwargs", {})}, default=str)
+            completed_lines.append(f"Step {number}: {step_json}\n  Output: {output_text}")
+
+        prompt_tools = await self._shortlist_tools(f"{original_goal}\n{failure_analysis}", available_tools)
+        tools_json_string = render_tools_json(prompt_tools, annotated=True)
+
+        initial_prompt = LLM_SUFFIX_REPLANNING_PROMPT_TEMPLATE.format(
             original_goal=original_goal,
+            num_completed=num_completed,
+            completed_steps_text="\n".join(completed_lines),
+            failed_step_number=num_completed + 1,
+            failed_step_json=json.dumps({"tool_name": failed_step.get("tool_name"), "args": list(failed_step.get("args", ())), "kwargs": failed_step.get("kwargs", {})}, default=str),
             failure_analysis=failure_analysis,
             tools_json_string=tools_json_string
         )
+        return await self._request_validated_replan(
+            initial_prompt, original_goal, failure_analysis, tools_json_string, available_tools,
+            ollama_model_name or get_model_for_task("planning"), "Re-plan suffix"
+        )
 
+    async def _request_validated_replan(
+        self,
+        initial_prompt: str,
+        original_goal: str,
+        failure_analysis: str,
+        tools_json_string: str,
+        available_tools: Dict[str, str],
+        model_for_replan: str,
+        log_label: str
+    ) -> List[Dict[str, Any]]:
+        """Sends a re-planning prompt, validating the JSON plan and asking the LLM to correct it once if needed."""
         CORRECTION_PROMPT_TEMPLATE_REPLAN = """Your previous attempt to generate a JSON re-plan had issues.
 Original Goal: "{goal}"
 Failure Analysis: {failure_analysis}
@@ -742,110 +884,81 @@ Error Description: {error_description}
 Please try again. Respond ONLY with the corrected JSON plan.
 JSON Plan:
 """
+        MAX_CORRECTION_ATTEMPTS = 1
+        current_attempt = 0
+        llm_response_str: Optional[str] = None
+        last_error_description: str = "No response from LLM for re-planning."
+        current_prompt = initial_prompt
 
         while current_attempt <= MAX_CORRECTION_ATTEMPTS:
-            print(f"PlannerAgent (Re-plan): Attempt {current_attempt + 1}/{MAX_CORRECTION_ATTEMPTS + 1}. Sending prompt to LLM (model: {model_for_replan})...")
+            if deadline_expired():
+                last_error_description = "The time budget for this prompt was used up before a valid re-plan was generated."
+                break
+            print(f"PlannerAgent ({log_label}): Attempt {current_attempt + 1}/{MAX_CORRECTION_ATTEMPTS + 1}. Sending prompt to LLM (model: {model_for_replan})...")
             if current_attempt > 0:
-                 print(f"PlannerAgent (Re-plan): Correction prompt (first 500 chars):\n{current_prompt[:500]}...\n")
+                 print(f"PlannerAgent ({log_label}): Correction prompt (first 500 chars):\n{current_prompt[:500]}...\n")
 
             llm_response_str = await invoke_ollama_model_async(current_prompt, model_name=model_for_replan)
 
+            validated_plan: Optional[List[Dict[str, Any]]] = None
             if not llm_response_str:
                 last_error_description = f"Received no response or empty response from LLM ({model_for_replan}) during re-planning."
-                print(f"PlannerAgent (Re-plan): {last_error_description}")
-                current_attempt += 1
-                if current_attempt <= MAX_CORRECTION_ATTEMPTS:
-                    current_prompt = CORRECTION_PROMPT_TEMPLATE_REPLAN.format(
-                        goal=original_goal,
-                        failure_analysis=failure_analysis,
-                        tools_json_string=tools_json_string,
-                        previous_llm_response=llm_response_str or "",
-                        error_description=last_error_description
-                    )
-                continue
-
-            print(f"PlannerAgent (Re-plan): Raw response from LLM (Attempt {current_attempt + 1}):\n---\n{llm_response_str}\n---")
-            
-            json_str_to_parse = llm_response_str
-            match = re.search(r"```json\s*([\s\S]*?)\s*```", json_str_to_parse)
-            if match:
-                json_str_to_parse = match.group(1)
-            json_str_to_parse = re.sub(r"^\s*JSON Plan:?\s*", "", json_str_to_parse.strip(), flags=re.IGNORECASE).strip()
-
-            try:
-                parsed_plan = json.loads(json_str_to_parse)
-            except json.JSONDecodeError as e:
-                last_error_description = f"Failed to parse JSON response for re-plan. Error: {e}. Response: '{json_str_to_parse}'"
-                print(f"PlannerAgent (Re-plan): {last_error_description}")
-                current_attempt += 1
-                if current_attempt <= MAX_CORRECTION_ATTEMPTS:
-                    current_prompt = CORRECTION_PROMPT_TEMPLATE_REPLAN.format(
-                        goal=original_goal,
-                        failure_analysis=failure_analysis,
-                        tools_json_string=tools_json_string,
-                        previous_llm_response=llm_response_str,
-                        error_description=f"Response was not valid JSON. Error: {e}"
-                    )
-                continue
-
-            if not isinstance(parsed_plan, list):
-                last_error_description = f"LLM returned an invalid re-plan format - not a list. Got: {type(parsed_plan)}"
-                print(f"PlannerAgent (Re-plan): {last_error_description}")
-                current_attempt += 1
-                if current_attempt <= MAX_CORRECTION_ATTEMPTS:
-                     current_prompt = CORRECTION_PROMPT_TEMPLATE_REPLAN.format(
-                        goal=original_goal,
-                        failure_analysis=failure_analysis,
-                        tools_json_string=tools_json_string,
-                        previous_llm_response=llm_response_str,
-                        error_description=last_error_description
-                    )
-                parsed_plan = None 
-                continue
-
-            validated_plan: List[Dict[str, Any]] = []
-            valid_plan_overall = True
-            for i, step in enumerate(parsed_plan):
-                if not isinstance(step, dict) or \
-                   not step.get("tool_name") or not isinstance(step.get("tool_name"), str) or \
-                   step.get("tool_name") not in available_tools: # Check against keys of available_tools (which is tools_for_prompt_replan)
-                    last_error_description = f"Re-plan step {i+1} is invalid (not a dict, missing/invalid tool_name, or tool not available). Content: {step}"
-                    print(f"PlannerAgent (Re-plan): {last_error_description}")
-                    valid_plan_overall = False; break
-                
-                args = step.get("args", [])
-                kwargs = step.get("kwargs", {})
-                if not isinstance(args, list): args = []
-                if not isinstance(kwargs, dict): kwargs = {}
-                
-                validated_args = [str(arg) for arg in args]
-                validated_kwargs = {str(k): str(v) for k, v in kwargs.items()}
-
-                validated_plan.append({
-                    "tool_name": step["tool_name"],
-                    "args": tuple(validated_args),
-                    "kwargs": validated_kwargs
-                })
-            
-            if valid_plan_overall:
-                print(f"PlannerAgent (Re-plan): Successfully parsed and validated LLM re-plan (Attempt {current_attempt + 1}): {validated_plan}")
-                return validated_plan
+                print(f"PlannerAgent ({log_label}): {last_error_description}")
             else:
-                current_attempt += 1
-                if current_attempt <= MAX_CORRECTION_ATTEMPTS:
-                    current_prompt = CORRECTION_PROMPT_TEMPLATE_REPLAN.format(
-                        goal=original_goal,
-                        failure_analysis=failure_analysis,
-                        tools_json_string=tools_json_string,
-                        previous_llm_response=llm_response_str,
-                        error_description=last_error_description
-                    )
-                parsed_plan = None
-                continue
+                print(f"PlannerAgent ({log_label}): Raw response from LLM (Attempt {current_attempt + 1}):\n---\n{llm_response_str}\n---")
+                validated_plan, last_error_description = self._validate_replan_response(llm_response_str, available_tools)
+                if validated_plan is not None:
+                    print(f"PlannerAgent ({log_label}): Successfully parsed and validated LLM re-plan (Attempt {current_attempt + 1}): {validated_plan}")
+                    return validated_plan
+                print(f"PlannerAgent ({log_label}): {last_error_description}")
+
+            current_attempt += 1
+            if current_attempt <= MAX_CORRECTION_ATTEMPTS:
+                current_prompt = CORRECTION_PROMPT_TEMPLATE_REPLAN.format(
+                    goal=original_goal,
+                    failure_analysis=failure_analysis,
+                    tools_json_string=tools_json_string,
+                    previous_llm_response=llm_response_str or "",
+                    error_description=last_error_description
+                )
         
-        print(f"PlannerAgent (Re-plan): All {MAX_CORRECTION_ATTEMPTS + 1} attempts to generate a valid re-plan failed. Last error: {last_error_description}")
+        print(f"PlannerAgent ({log_label}): All {MAX_CORRECTION_ATTEMPTS + 1} attempts to generate a valid re-plan failed. Last error: {last_error_description}")
         return []
 
+    def _validate_replan_response(self, llm_response_str: str, available_tools: Dict[str, str]) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+        """Parses an LLM re-plan response. Returns (validated plan, "") or (None, error description)."""
+        json_str_to_parse = llm_response_str
+        match = re.search(r"```json\s*([\s\S]*?)\s*```", json_str_to_parse)
+        if match:
+            json_str_to_parse = match.group(1)
+        json_str_to_parse = re.sub(r"^\s*JSON Plan:?\s*", "", json_str_to_parse.strip(), flags=re.IGNORECASE).strip()
+
+        try:
+            parsed_plan = json.loads(json_str_to_parse)
+        except json.JSONDecodeError as e:
+            return None, f"Response was not valid JSON. Error: {e}. Response: '{json_str_to_parse}'"
+
+        if not isinstance(parsed_plan, list):
+            return None, f"LLM returned an invalid re-plan format - not a list. Got: {type(parsed_plan)}"
+
+        validated_plan: List[Dict[str, Any]] = []
+        for i, step in enumerate(parsed_plan):
+            if not isinstance(step, dict) or \
+               not step.get("tool_name") or not isinstance(step.get("tool_name"), str) or \
+               step.get("tool_name") not in available_tools:
+                return None, f"Re-plan step {i+1} is invalid (not a dict, missing/invalid tool_name, or tool not available). Content: {step}"
+
+            args = step.get("args", [])
+            kwargs = step.get("kwargs", {})
+            if not isinstance(args, list): args = []
+            if not isinstance(kwargs, dict): kwargs = {}
+
+            validated_plan.append({
+                "tool_name": step["tool_name"],
+                "args": tuple(str(arg) for arg in args),
+                "kwargs": {str(k): str(v) for k, v in kwargs.items()}
+            })
+        return validated_plan, ""
 
 if __name__ == '__main__':
     # Example Usage and Test
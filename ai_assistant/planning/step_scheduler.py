@@ -0,0 +1,116 @@
+# ai_assistant/planning/step_scheduler.py
+"""
+Dependency-aware scheduling of plan steps.
+
+A step depends on every earlier step whose output it references through a
+`[[step_N_output]]` placeholder (anywhere in its args or kwargs). Steps whose tool
+is not declared read-only (see ToolSystem.is_read_only_tool) are barriers: they
+wait for every earlier step, and every later step waits for them. Independent
+read-only steps therefore run concurrently, while writes keep their plan order.
+
+Results are always reported in plan order. A plan fails at its lowest-numbered
+failed step, exactly as it would have run sequentially: later read-only steps that
+were already running are cancelled and their results discarded.
+
+Outcomes passed in as `completed` (the reused prefix of an incremental re-plan) count
+as done and are not run again.
+"""
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+STEP_OUTPUT_PLACEHOLDER = re.compile(r"\[\[step_(\d+)_output\]\]")
+
+
+class StepOutcome:
+    """The result of running one plan step (after its retries)."""
+
+    def __init__(self, result: Any, error_details: Optional[Dict[str, Any]] = None, note: str = "",
+                 failed: bool = False, duration_seconds: float = 0.0):
+        self.result = result
+        self.error_details = error_details or {}
+        self.note = note
+        self.failed = failed
+        self.duration_seconds = duration_seconds
+
+
+def referenced_steps(value: Any) -> Set[int]:
+    """The (1-based) step numbers referenced by placeholders anywhere in `value`."""
+    if isinstance(value, str):
+        return {int(number) for number in STEP_OUTPUT_PLACEHOLDER.findall(value)}
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        numbers: Set[int] = set()
+        for item in value:
+            numbers |= referenced_steps(item)
+        return numbers
+    return set()
+
+
+def build_step_dependencies(plan: List[Dict[str, Any]], read_only: List[bool]) -> List[Set[int]]:
+    """For each step, the (0-based) indices of the steps that must complete before it starts."""
+    dependencies: List[Set[int]] = []
+    last_barrier: Optional[int] = None
+    for index, step in enumerate(plan):
+        step_dependencies = {
+            number - 1 for number in referenced_steps([step.get("args"), step.get("kwargs")]) if 1 <= number <= index
+        }
+        if read_only[index]:
+            if last_barrier is not None:
+                step_dependencies.add(last_barrier)
+        else:
+            step_dependencies.update(range(index))
+            last_barrier = index
+        dependencies.append(step_dependencies)
+    return dependencies
+
+
+async def run_plan_steps(
+    dependencies: List[Set[int]],
+    run_step: Callable[[int, Dict[int, StepOutcome]], Awaitable[StepOutcome]],
+    max_concurrency: int,
+    completed: Optional[Dict[int, StepOutcome]] = None
+) -> Tuple[List[StepOutcome], Optional[int]]:
+    """
+    Runs the steps as their dependencies complete, at most `max_concurrency` at a time.
+    `run_step(index, outcomes)` runs one step; `outcomes` holds every completed step,
+    starting with the `completed` ones, which are not run.
+    Returns the outcomes in plan order up to and including the first failed step,
+    and the index of that step (None if every step succeeded).
+    """
+    num_steps = len(dependencies)
+    max_concurrency = max(1, max_concurrency)
+    outcomes: Dict[int, StepOutcome] = dict(completed or {})
+    running: Dict["asyncio.Future[StepOutcome]", int] = {}
+    started: Set[int] = set(outcomes)
+    committed = 0 # Steps before this index all succeeded
+    try:
+        while True:
+            while committed < num_steps and committed in outcomes:
+                if outcomes[committed].failed:
+                    return [outcomes[index] for index in range(committed + 1)], committed
+                committed += 1
+            if committed >= num_steps:
+                break
+
+            for index in range(committed, num_steps):
+                if len(running) >= max_concurrency:
+                    break
+                if index in started:
+                    continue
+                if all(dep in outcomes and not outcomes[dep].failed for dep in dependencies[index]):
+                    started.add(index)
+                    running[asyncio.ensure_future(run_step(index, outcomes))] = index
+            if not running: # pragma: no cover - every step's dependencies come before it
+                raise RuntimeError(f"Plan step {committed + 1} can never start; its dependencies did not complete.")
+
+            done, _ = await asyncio.wait(list(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                outcomes[running.pop(task)] = task.result()
+        return [outcomes[index] for index in range(num_steps)], None
+    finally:
+        for task in running: # Later read-only steps still running when an earlier step failed
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
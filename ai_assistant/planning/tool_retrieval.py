@@ -0,0 +1,151 @@
+# ai_assistant/planning/tool_retrieval.py
+"""
+Tool shortlisting for planning prompts.
+
+Sending every registered tool (with its parameter schema) to the planner makes the
+prompt grow linearly with the registry. `ToolRetriever` ranks the tools against the
+goal instead: BM25 over each tool's name, description and schema parameters, fused
+with embedding similarity from a VectorIndex, and only the top-k tools plus the
+always-included core tools (PLANNER_CORE_TOOLS) are described in the prompt.
+Small registries are passed through unchanged.
+"""
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_assistant.config import (
+    is_debug_mode,
+    PLANNER_TOOL_SHORTLIST_SIZE,
+    PLANNER_CORE_TOOLS
+)
+from ai_assistant.memory.fact_store import tokenize, BM25_K1, BM25_B, RRF_K
+from ai_assistant.memory.vector_index import VectorIndex, get_vector_index
+from ai_assistant.tools.tool_catalog import describe_tools_for_prompt
+
+TOOL_CATALOG_VECTOR_INDEX_NAME = "tool_catalog"
+# Name terms are repeated so a goal mentioning "search" favours `search_*` tools over
+# tools that merely mention searching in a parameter description.
+_NAME_TERM_WEIGHT = 2
+
+
+def _tool_terms(tool_name: str, description: str) -> List[str]:
+    name_terms = tokenize(tool_name.replace("_", " ")) + [tool_name.lower()]
+    return name_terms * _NAME_TERM_WEIGHT + tokenize(description)
+
+
+class ToolRetriever:
+    """Ranks registered tools against a goal and selects the subset to describe in a planning prompt."""
+
+    def __init__(
+        self,
+        vector_index: Optional[VectorIndex] = None,
+        shortlist_size: int = PLANNER_TOOL_SHORTLIST_SIZE,
+        core_tools: Optional[List[str]] = None,
+        use_embeddings: bool = True
+    ):
+        self.shortlist_size = shortlist_size
+        self.core_tools = list(PLANNER_CORE_TOOLS if core_tools is None else core_tools)
+        self.use_embeddings = use_embeddings
+        self._vector_index = vector_index
+        self._lock = threading.Lock()
+        # BM25 index over the last catalog seen; rebuilt when any tool's description changes.
+        self._catalog: Dict[str, str] = {}
+        self._postings: Dict[str, List[Tuple[str, float]]] = {}
+        self._vectors_synced_catalog: Optional[Dict[str, str]] = None
+
+    def _ensure_index(self, catalog: Dict[str, str]) -> None:
+        """Rebuilds the BM25 postings if `catalog` differs from the indexed one. Must hold self._lock."""
+        if catalog == self._catalog:
+            return
+        documents = {name: _tool_terms(name, description) for name, description in catalog.items()}
+        doc_count = len(documents)
+        avg_length = (sum(len(terms) for terms in documents.values()) / doc_count) if doc_count else 0.0
+        term_freqs: Dict[str, Dict[str, int]] = {}
+        for name, terms in documents.items():
+            for term in terms:
+                per_doc = term_freqs.setdefault(term, {})
+                per_doc[name] = per_doc.get(name, 0) + 1
+        postings: Dict[str, List[Tuple[str, float]]] = {}
+        for term, per_doc in term_freqs.items():
+            idf = math.log(1.0 + (doc_count - len(per_doc) + 0.5) / (len(per_doc) + 0.5))
+            postings[term] = [
+                (name, idf * freq * (BM25_K1 + 1) / (
+                    freq + BM25_K1 * (1 - BM25_B + BM25_B * len(documents[name]) / (avg_length or 1.0))
+                ))
+                for name, freq in per_doc.items()
+            ]
+        self._catalog = dict(catalog)
+        self._postings = postings
+
+    def _keyword_ranking(self, query: str) -> List[str]:
+        """Tool names sharing terms with `query`, best BM25 score first. Must hold self._lock."""
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query.replace("_", " ")) + tokenize(query)):
+            for name, weight in self._postings.get(term, ()):
+                scores[name] = scores.get(name, 0.0) + weight
+        return sorted(scores, key=lambda name: (-scores[name], name))
+
+    def _semantic_ranking(self, query: str, limit: int) -> List[str]:
+        """Tool names by embedding similarity to `query`. Must hold self._lock."""
+        if self._vector_index is None:
+            self._vector_index = get_vector_index(TOOL_CATALOG_VECTOR_INDEX_NAME)
+        if self._vectors_synced_catalog != self._catalog:
+            self._vector_index.sync({name: f"{name}: {description}" for name, description in self._catalog.items()})
+            self._vectors_synced_catalog = dict(self._catalog)
+        return [name for name, _ in self._vector_index.query([query], top_k=limit)[0]]
+
+    def rank(self, query: str, available_tools: Dict[str, Any], limit: Optional[int] = None) -> List[str]:
+        """Returns up to `limit` tool names (all matches if None) ranked by fused keyword and semantic relevance."""
+        catalog = describe_tools_for_prompt(available_tools)
+        limit = len(catalog) if limit is None else limit
+        with self._lock:
+            self._ensure_index(catalog)
+            rankings = [self._keyword_ranking(query)]
+            if self.use_embeddings and query.strip():
+                try:
+                    rankings.append(self._semantic_ranking(query, max(limit * 2, 20)))
+                except Exception as e: # Keyword ranking alone still gives a usable shortlist
+                    print(f"ToolRetriever: Semantic tool ranking failed ({type(e).__name__}: {e}). Using keyword ranking only.")
+        fused_scores: Dict[str, float] = {}
+        for ranking in rankings:
+            for position, name in enumerate(ranking):
+                if name in catalog:
+                    fused_scores[name] = fused_scores.get(name, 0.0) + 1.0 / (RRF_K + position + 1)
+        return sorted(fused_scores, key=lambda name: (-fused_scores[name], name))[:limit]
+
+    def shortlist(self, query: str, available_tools: Dict[str, Any], top_k: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the subset of `available_tools` to offer the planner for `query`: the core tools
+        that are registered plus the `top_k` (default: shortlist_size) most relevant others,
+        in registry order. Registries no larger than that are returned unchanged.
+        """
+        top_k = self.shortlist_size if top_k is None else top_k
+        core = [name for name in self.core_tools if name in available_tools]
+        if top_k <= 0 or len(available_tools) <= top_k + len(core):
+            return available_tools
+        ranked = self.rank(query, available_tools, limit=top_k + len(core))
+        if not ranked: # Nothing to judge relevance by; let the planner see everything
+            return available_tools
+        core_set = set(core)
+        selected = set(core)
+        for name in ranked:
+            if len(selected) >= top_k + len(core):
+                break
+            if name not in core_set:
+                selected.add(name)
+        if is_debug_mode():
+            print(f"[DEBUG] ToolRetriever: Shortlisted {len(selected)} of {len(available_tools)} tools for the planning prompt.")
+        return {name: tool_data for name, tool_data in available_tools.items() if name in selected}
+
+
+_tool_retriever: Optional[ToolRetriever] = None
+_tool_retriever_lock = threading.Lock()
+
+def get_tool_retriever() -> ToolRetriever:
+    """Returns the process-wide ToolRetriever backed by the shared tool catalog vector index."""
+    global _tool_retriever
+    if _tool_retriever is None:
+        with _tool_retriever_lock:
+            if _tool_retriever is None:
+                _tool_retriever = ToolRetriever()
+    return _tool_retriever
@@ -0,0 +1,199 @@
+# ai_assistant/tools/tool_catalog.py
+"""
+Prompt renderings of the tool registry.
+
+Several prompts (planning, re-planning, failure analysis, self-reflection and
+missed-tool detection) embed the tool catalog as JSON. ToolSystem keeps a version
+counter that changes whenever a tool is registered, removed or has its metadata
+updated, and a `ToolCatalogFragments` for the current version that renders each
+variant (annotated with parameters or not, indented or compact, braces escaped
+for str.format or not) once and then reuses the string.
+
+`render_tools_json(tools, ...)` is what prompt builders call with the tools they
+were given. If `tools` is the current registry listing the memoized fragment is
+returned; otherwise (a subset, a test registry, ...) it is rendered directly.
+ToolSystem's listings are `ToolListing`s tagged with the registry version they
+were taken at, so recognising the current listing is a key comparison; plain
+dicts fall back to comparing them with the cached listing.
+"""
+import json
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+LISTING_DESCRIPTIONS = "descriptions"   # ToolSystem.list_tools()
+LISTING_WITH_SOURCES = "with_sources"   # ToolSystem.list_tools_with_sources()
+
+
+def format_tool_description(tool_data: Any) -> str:
+    """
+    Returns the planner-prompt description of a tool: its description plus a
+    "Parameters: [...]" summary when `schema_details` lists parameters.
+    Accepts the rich ToolSystem.list_tools_with_sources() entries or plain description strings.
+    """
+    if not isinstance(tool_data, dict):
+        return str(tool_data)
+    desc_for_prompt = tool_data.get('description', 'No description.')
+    schema = tool_data.get('schema_details')
+    if schema and isinstance(schema.get('parameters'), list):
+        param_descs = []
+        for p_data in schema['parameters']:
+            if isinstance(p_data, dict):
+                p_name = p_data.get('name')
+                p_type = p_data.get('type')
+                p_desc = p_data.get('description')
+                param_descs.append(f"{p_name} ({p_type}): {p_desc}")
+        if param_descs:
+            desc_for_prompt += " Parameters: [" + "; ".join(param_descs) + "]"
+    return desc_for_prompt
+
+
+def _dumps(data: Any, compact: bool, escape_braces: bool) -> str:
+    rendered = json.dumps(data, separators=(",", ":")) if compact else json.dumps(data, indent=2)
+    if escape_braces:
+        rendered = rendered.replace('{', '{{').replace('}', '}}')
+    return rendered
+
+
+class ToolListing(dict):
+    """
+    A registry listing tagged with `catalog_key` (registry, version, kind of listing), which
+    identifies the memoized fragments it matches. Modifying the listing drops the tag.
+    """
+
+    def __init__(self, entries: Any = (), catalog_key: Optional[Tuple[Hashable, int, str]] = None):
+        super().__init__(entries)
+        self.catalog_key = catalog_key
+
+    def _modified(self) -> None:
+        self.catalog_key = None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self._modified()
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        self._modified()
+        super().__delitem__(key)
+
+    def __ior__(self, other: Any) -> "ToolListing":
+        self._modified()
+        return super().__ior__(other)
+
+    def clear(self) -> None:
+        self._modified()
+        super().clear()
+
+    def pop(self, *args: Any) -> Any:
+        self._modified()
+        return super().pop(*args)
+
+    def popitem(self) -> Tuple[Any, Any]:
+        self._modified()
+        return super().popitem()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._modified()
+        return super().setdefault(key, default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        self._modified()
+        super().update(*args, **kwargs)
+
+
+class ToolCatalogFragments:
+    """Memoized prompt renderings of one version of the tool registry. Treat returned values as read-only."""
+
+    def __init__(self, version: int, tools_with_sources: Dict[str, Dict[str, Any]], registry_id: Hashable = None):
+        self.version = version
+        self.registry_id = registry_id
+        self.tools_with_sources = tools_with_sources
+        self._descriptions: Optional[Dict[str, str]] = None
+        self._annotated_descriptions: Optional[Dict[str, str]] = None
+        self._rendered: Dict[Tuple[bool, bool, bool], str] = {}
+
+    @property
+    def descriptions(self) -> Dict[str, str]:
+        """tool_name -> description, as returned by ToolSystem.list_tools()."""
+        if self._descriptions is None:
+            self._descriptions = {name: data["description"] for name, data in self.tools_with_sources.items()}
+        return self._descriptions
+
+    @property
+    def annotated_descriptions(self) -> Dict[str, str]:
+        """tool_name -> description with its schema parameters (see format_tool_description)."""
+        if self._annotated_descriptions is None:
+            self._annotated_descriptions = {
+                name: format_tool_description(data) for name, data in self.tools_with_sources.items()
+            }
+        return self._annotated_descriptions
+
+    def listing_key(self, kind: str) -> Tuple[Hashable, int, str]:
+        """The `catalog_key` of this version's listings of the given kind."""
+        return (self.registry_id, self.version, kind)
+
+    def is_listing(self, tools: Dict[str, Any], kind: str) -> bool:
+        """Whether `tools` is this version's listing of the given kind (deep comparison only for untagged dicts)."""
+        catalog_key = getattr(tools, "catalog_key", None)
+        if catalog_key is not None:
+            return catalog_key == self.listing_key(kind)
+        cached = self.tools_with_sources if kind == LISTING_WITH_SOURCES else self.descriptions
+        return tools is cached or tools == cached
+
+    def render(self, annotated: bool = False, compact: bool = False, escape_braces: bool = False) -> str:
+        """Returns the catalog as JSON (tool_name -> description), rendering each variant only once."""
+        key = (annotated, compact, escape_braces)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            rendered = _dumps(self.annotated_descriptions if annotated else self.descriptions, compact, escape_braces)
+            self._rendered[key] = rendered
+        return rendered
+
+
+# Returns the fragments for the current registry version; set by ToolSystem.
+_active_catalog_provider: Optional[Callable[[], ToolCatalogFragments]] = None
+
+def set_active_catalog_provider(provider: Optional[Callable[[], ToolCatalogFragments]]) -> None:
+    """Registers the callable that returns the live registry's fragments (ToolSystem.get_catalog_fragments)."""
+    global _active_catalog_provider
+    _active_catalog_provider = provider
+
+
+def _active_fragments() -> Optional[ToolCatalogFragments]:
+    return _active_catalog_provider() if _active_catalog_provider is not None else None
+
+
+def describe_tools_for_prompt(available_tools: Dict[str, Any]) -> Dict[str, str]:
+    """Maps tool names to their prompt descriptions (see format_tool_description). Treat the result as read-only."""
+    fragments = _active_fragments()
+    if fragments is None:
+        return {tool_name: format_tool_description(tool_data) for tool_name, tool_data in available_tools.items()}
+    if fragments.is_listing(available_tools, LISTING_WITH_SOURCES):
+        return fragments.annotated_descriptions
+    # A subset of the registry (e.g. a planner shortlist): reuse the descriptions of unchanged tools.
+    cached_tools = fragments.tools_with_sources
+    cached_descriptions = fragments.annotated_descriptions
+    return {
+        tool_name: cached_descriptions[tool_name] if cached_tools.get(tool_name) == tool_data
+        else format_tool_description(tool_data)
+        for tool_name, tool_data in available_tools.items()
+    }
+
+
+def render_tools_json(
+    tools: Dict[str, Any],
+    annotated: bool = False,
+    compact: bool = False,
+    escape_braces: bool = False
+) -> str:
+    """
+    Renders `tools` as prompt JSON. With `annotated`, rich tool entries are rendered as
+    descriptions with their parameters; otherwise `tools` is serialized as given.
+    Uses the memoized fragment when `tools` is the current registry listing.
+    Raises TypeError if `tools` is not JSON-serializable.
+    """
+    fragments = _active_fragments()
+    if fragments is not None:
+        if annotated and fragments.is_listing(tools, LISTING_WITH_SOURCES):
+            return fragments.render(annotated=True, compact=compact, escape_braces=escape_braces)
+        if not annotated and fragments.is_listing(tools, LISTING_DESCRIPTIONS):
+            return fragments.render(annotated=False, compact=compact, escape_braces=escape_braces)
+    return _dumps(describe_tools_for_prompt(tools) if annotated else tools, compact, escape_braces)
@@ -0,0 +1,215 @@
+# ai_assistant/tools/tool_invoker.py
+"""
+Per-tool invocation plans for ToolSystem.execute_tool.
+
+A ToolInvoker is built once, when a tool's callable is loaded, and holds everything
+execute_tool used to recompute on every call:
+
+  * the signature, and whether the tool accepts `task_manager` / `notification_manager`;
+  * argument coercers compiled from the parameter annotations. LLM plans pass numbers
+    and booleans as strings, so a str argument for an int/float/bool parameter is
+    converted; a value that does not parse is passed through unchanged;
+  * where the tool runs: coroutine functions are awaited; sync tools run "inline" on the
+    event loop (only for trivially fast tools), on a shared "thread" pool, or on a shared
+    "process" pool (CPU-bound, picklable module-level functions only);
+  * the tool's result-cache policy, if its schema declares it cacheable (see tool_result_cache).
+
+The executor is declared with `executor` on the registry entry or in `schema_details`.
+Sync tools default to the thread pool. An inline tool whose call takes longer than
+TOOL_INLINE_MAX_SECONDS is moved to the thread pool.
+"""
+import asyncio
+import contextvars
+import functools
+import inspect
+import reprlib
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ai_assistant.config import (
+    is_debug_mode, TOOL_THREAD_POOL_WORKERS, TOOL_PROCESS_POOL_WORKERS, TOOL_INLINE_MAX_SECONDS
+)
+from ai_assistant.tools.tool_result_cache import ToolCachePolicy
+
+EXECUTOR_INLINE = "inline"
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+EXECUTORS = (EXECUTOR_INLINE, EXECUTOR_THREAD, EXECUTOR_PROCESS)
+
+_INJECTABLE = ("task_manager", "notification_manager")
+
+_debug_repr = reprlib.Repr()
+_debug_repr.maxstring = 200
+_debug_repr.maxother = 200
+
+_pools: Dict[str, Executor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str) -> Executor:
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            if kind == EXECUTOR_PROCESS:
+                pool = ProcessPoolExecutor(max_workers=TOOL_PROCESS_POOL_WORKERS)
+            else:
+                pool = ThreadPoolExecutor(max_workers=TOOL_THREAD_POOL_WORKERS, thread_name_prefix="tool")
+            _pools[kind] = pool
+        return pool
+
+
+def shutdown_pools(wait: bool = True) -> None:
+    """Shuts down the shared tool thread and process pools (they are recreated on demand)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+_TRUE_STRINGS = frozenset({"true", "yes", "y", "1", "on"})
+_FALSE_STRINGS = frozenset({"false", "no", "n", "0", "off"})
+
+
+def _coerce_int(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce_float(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return value
+    return value
+
+
+def _coerce_bool(value: Any) -> Any:
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    return value
+
+
+_COERCERS: Dict[Any, Callable[[Any], Any]] = {
+    int: _coerce_int, "int": _coerce_int,
+    float: _coerce_float, "float": _coerce_float,
+    bool: _coerce_bool, "bool": _coerce_bool,
+}
+
+
+class ToolInvoker:
+    """The precomputed invocation plan of one tool callable."""
+
+    def __init__(self, tool_name: str, func: Callable, executor: Optional[str] = None,
+                 cache_policy: Optional[ToolCachePolicy] = None):
+        self.tool_name = tool_name
+        self.func = func
+        self.cache_policy = cache_policy
+        self.parameter_names: List[str] = []
+        self.is_coroutine = inspect.iscoroutinefunction(func)
+        self.injected: Tuple[str, ...] = ()
+        self.positional_coercers: Tuple[Optional[Callable[[Any], Any]], ...] = ()
+        self.keyword_coercers: Dict[str, Callable[[Any], Any]] = {}
+        try:
+            self.signature: Optional[inspect.Signature] = inspect.signature(func)
+        except (ValueError, TypeError): # inspect.signature can fail for some built-ins or non-Python functions
+            self.signature = None
+            if is_debug_mode():
+                print(f"ToolSystem: Warning - Could not inspect signature for tool '{tool_name}'. Dependency injection might be limited.")
+        if self.signature is not None:
+            self._compile(self.signature)
+        self.executor = self._choose_executor(executor)
+        self._debug_prefix = f"ToolSystem: Executing tool '{tool_name}'"
+
+    def _compile(self, signature: inspect.Signature) -> None:
+        self.parameter_names = list(signature.parameters)
+        self.injected = tuple(name for name in _INJECTABLE if name in signature.parameters)
+        positional = []
+        for name, param in signature.parameters.items():
+            coercer = _COERCERS.get(param.annotation)
+            if param.kind in (param.POSITIONAL_ONLY, param.POSITIONAL_OR_KEYWORD):
+                positional.append(coercer)
+            if coercer is not None and param.kind in (param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY):
+                self.keyword_coercers[name] = coercer
+        # Trailing parameters without a coercer need no per-argument work.
+        while positional and positional[-1] is None:
+            positional.pop()
+        self.positional_coercers = tuple(positional)
+
+    def _choose_executor(self, requested: Optional[str]) -> Optional[str]:
+        if self.is_coroutine:
+            return None
+        if requested is not None and requested not in EXECUTORS:
+            print(f"ToolSystem: Warning - Unknown executor '{requested}' for tool '{self.tool_name}'. Using the thread pool.")
+            requested = None
+        if requested == EXECUTOR_PROCESS and (self.injected or not self._is_picklable_function()):
+            if is_debug_mode():
+                print(f"ToolSystem: Tool '{self.tool_name}' cannot run in a process pool (needs injection or is not a module-level function). Using the thread pool.")
+            requested = EXECUTOR_THREAD
+        return requested or EXECUTOR_THREAD
+
+    def _is_picklable_function(self) -> bool:
+        func = self.func
+        return (inspect.isfunction(func) and func.__qualname__ == func.__name__
+                and getattr(func, "__module__", None) not in (None, "__main__"))
+
+    def prepare(self, args: Tuple, kwargs: Dict[str, Any],
+                task_manager: Any = None, notification_manager: Any = None) -> Tuple[Tuple, Dict[str, Any]]:
+        """Returns the coerced (args, kwargs) with the accepted managers injected."""
+        if self.positional_coercers and args:
+            args = tuple(
+                coercer(value) if coercer is not None else value
+                for value, coercer in zip(args, self.positional_coercers)
+            ) + tuple(args[len(self.positional_coercers):])
+        if self.keyword_coercers and kwargs:
+            kwargs = {
+                key: self.keyword_coercers[key](value) if key in self.keyword_coercers else value
+                for key, value in kwargs.items()
+            }
+        if self.injected:
+            kwargs = dict(kwargs)
+            if task_manager and "task_manager" in self.injected:
+                kwargs["task_manager"] = task_manager
+            if notification_manager and "notification_manager" in self.injected:
+                kwargs["notification_manager"] = notification_manager
+        return args, kwargs
+
+    async def invoke(self, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None,
+                     task_manager: Any = None, notification_manager: Any = None) -> Any:
+        """Runs the tool with the prepared arguments on its executor and returns its result."""
+        args, kwargs = self.prepare(args, kwargs or {}, task_manager, notification_manager)
+        debug = is_debug_mode()
+        if debug:
+            print(f"{self._debug_prefix} with args={_debug_repr.repr(args)}, kwargs={_debug_repr.repr(kwargs)}")
+
+        if self.is_coroutine:
+            result = await self.func(*args, **kwargs)
+        elif self.executor == EXECUTOR_INLINE:
+            start = time.perf_counter()
+            result = self.func(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            if elapsed > TOOL_INLINE_MAX_SECONDS:
+                self.executor = EXECUTOR_THREAD
+                print(f"ToolSystem: Tool '{self.tool_name}' took {elapsed * 1000:.1f} ms inline; running it on the thread pool from now on.")
+        else:
+            loop = asyncio.get_running_loop()
+            if self.executor == EXECUTOR_PROCESS:
+                call = functools.partial(self.func, *args, **kwargs)
+            else:
+                call = functools.partial(contextvars.copy_context().run, self.func, *args, **kwargs)
+            result = await loop.run_in_executor(_get_pool(self.executor), call)
+
+        if debug:
+            print(f"ToolSystem: Tool '{self.tool_name}' executed successfully. Result (truncated): {_debug_repr.repr(result)}")
+        return result
@@ -0,0 +1,147 @@
+# ai_assistant/tools/tool_manifest.py
+"""
+Persisted results of custom tool discovery.
+
+ToolSystem discovers tools by importing each custom tool module and introspecting
+its public functions (name, first docstring line, `<NAME>_SCHEMA` dict). Some of
+those modules are slow to import, so the results are kept in a manifest file in
+the data directory. Each module's entry is keyed by a fingerprint of its source
+files (path, mtime, size and sha256). While the fingerprint matches, the module's
+tools are registered from the manifest without importing it, and the real import
+happens on the first execute_tool call.
+
+A file whose mtime or size changed but whose content hash did not (a checkout, a
+touch) still matches; its new mtime is recorded.
+"""
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+MANIFEST_FORMAT_VERSION = 1
+
+
+def module_source_files(module_import_path: str) -> Optional[List[str]]:
+    """
+    Source files that define `module_import_path`, found without importing it (its parent
+    packages are imported). For a package this is every .py file directly in its directory.
+    Returns None if the module cannot be located or has no Python source.
+    """
+    try:
+        spec = importlib.util.find_spec(module_import_path)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    if spec.submodule_search_locations:
+        package_dir = os.path.dirname(spec.origin)
+        return sorted(
+            os.path.join(package_dir, name) for name in os.listdir(package_dir) if name.endswith(".py")
+        )
+    return [spec.origin]
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def describe_module_tools(module: ModuleType) -> List[Dict[str, Any]]:
+    """
+    Introspects the public functions defined in `module` (not imported into it).
+    Returns one {"name", "docstring_first_line", "schema_details"} dict per function;
+    schema_details is the module's `<NAME>_SCHEMA` dict if it has "name" and "description".
+    """
+    tools = []
+    for name, func_object in inspect.getmembers(module, inspect.isfunction):
+        if name.startswith("_") or func_object.__module__ != module.__name__:
+            continue
+        docstring = inspect.getdoc(func_object) or "No description available."
+        schema = getattr(module, f"{name.upper()}_SCHEMA", None)
+        if not (isinstance(schema, dict) and "name" in schema and "description" in schema):
+            schema = None
+        tools.append({
+            "name": name,
+            "docstring_first_line": docstring.splitlines()[0] if docstring else "No description available.",
+            "schema_details": schema,
+        })
+    return tools
+
+
+class ToolDiscoveryManifest:
+    """The manifest file: {module import path: {"files": [fingerprint, ...], "tools": [...]}}."""
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._modules: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.filepath):
+            return
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"ToolDiscoveryManifest: Warning - Could not read '{self.filepath}': {e}. Tools will be rediscovered.")
+            return
+        if isinstance(data, dict) and data.get("version") == MANIFEST_FORMAT_VERSION:
+            self._modules = data.get("modules") or {}
+
+    def lookup(self, module_import_path: str, files: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """Returns the recorded tools of the module if `files` still match its fingerprint, else None."""
+        entry = self._modules.get(module_import_path)
+        if not entry or [fp.get("path") for fp in entry.get("files", [])] != files:
+            return None
+        for fingerprint in entry["files"]:
+            try:
+                stat = os.stat(fingerprint["path"])
+                if stat.st_mtime_ns == fingerprint.get("mtime_ns") and stat.st_size == fingerprint.get("size"):
+                    continue
+                if _file_sha256(fingerprint["path"]) != fingerprint.get("sha256"):
+                    return None
+            except OSError:
+                return None
+            fingerprint["mtime_ns"], fingerprint["size"] = stat.st_mtime_ns, stat.st_size
+            self._dirty = True
+        return entry["tools"]
+
+    def record(self, module_import_path: str, files: List[str], tools: List[Dict[str, Any]]) -> None:
+        """Records the tools introspected from the module's current `files`."""
+        try:
+            json.dumps(tools)
+            fingerprints = []
+            for path in files:
+                stat = os.stat(path)
+                fingerprints.append({
+                    "path": path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": _file_sha256(path)
+                })
+        except (TypeError, ValueError, OSError) as e:
+            # A schema that is not JSON serializable, or a file that vanished: rediscover next time.
+            print(f"ToolDiscoveryManifest: Warning - Not caching tools of '{module_import_path}': {e}")
+            self._modules.pop(module_import_path, None)
+            return
+        self._modules[module_import_path] = {"files": fingerprints, "tools": tools}
+        self._dirty = True
+
+    def save(self) -> bool:
+        """Writes the manifest if it changed, via a temp file and rename."""
+        if not self._dirty:
+            return True
+        temp_path = self.filepath + ".tmp"
+        try:
+            directory = os.path.dirname(self.filepath)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_FORMAT_VERSION, "modules": self._modules}, f, indent=2)
+            os.replace(temp_path, self.filepath)
+        except (IOError, OSError) as e:
+            print(f"ToolDiscoveryManifest: Error saving '{self.filepath}': {e}")
+            return False
+        self._dirty = False
+        return True
@@ -0,0 +1,230 @@
+# ai_assistant/tools/tool_result_cache.py
+"""
+Memoization of read-only tool results.
+
+A tool opts in through its `<NAME>_SCHEMA` dict (its schema_details):
+
+    "cacheable": True,             # results may be reused for identical arguments
+    "idempotent": True,            # repeating a call has no further effect (safe to retry);
+                                   # on its own this does not enable caching
+    "cache_ttl_seconds": 300,      # optional, defaults to TOOL_RESULT_CACHE_DEFAULT_TTL_SECONDS
+    "invalidation_keys": [         # optional
+        {"path_arg": "full_filepath"},  # the file or directory named by this argument
+        {"result_path": "file_path"},   # the path under this key of the (dict) result
+        {"tag": "facts"},               # a name that writers invalidate explicitly
+    ]
+
+For each path key the entry records the path's (mtime_ns, size) and is a miss once
+either changes. A result that lacks a `result_path` key (an error result) is not cached.
+Writers call invalidate_path() / invalidate_tag(), which reach every live cache;
+invalidating a path also drops entries that depend on its parent directory.
+"""
+import copy
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ai_assistant.config import TOOL_RESULT_CACHE_MAX_ENTRIES, TOOL_RESULT_CACHE_DEFAULT_TTL_SECONDS
+
+_live_caches: "weakref.WeakSet[ToolResultCache]" = weakref.WeakSet()
+_live_caches_lock = threading.Lock()
+
+
+def _path_fingerprint(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None # A missing file is part of the fingerprint: creating it is a change
+    return stat.st_mtime_ns, stat.st_size
+
+
+def fingerprint_paths(paths: List[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    """Returns {path: (mtime_ns, size) or None if missing}."""
+    return {path: _path_fingerprint(path) for path in paths}
+
+
+def _detached(result: Any) -> Any:
+    """A copy callers can mutate without changing the cached result (immutable scalars are shared)."""
+    if isinstance(result, (str, int, float, bool, type(None))):
+        return result
+    return copy.deepcopy(result)
+
+
+class ToolCachePolicy:
+    """The caching declaration of one tool, parsed once from its schema_details."""
+
+    def __init__(self, ttl_seconds: float, idempotent: bool = False,
+                 path_args: Tuple[str, ...] = (), result_paths: Tuple[str, ...] = (), tags: Tuple[str, ...] = ()):
+        self.ttl_seconds = ttl_seconds
+        self.idempotent = idempotent
+        self.path_args = path_args
+        self.result_paths = result_paths
+        self.tags = tags
+
+    @classmethod
+    def from_schema(cls, schema_details: Optional[Dict[str, Any]]) -> Optional["ToolCachePolicy"]:
+        """Returns the policy of a cacheable tool, or None if the tool is not cacheable."""
+        if not isinstance(schema_details, dict) or not schema_details.get("cacheable"):
+            return None
+        path_args, result_paths, tags = [], [], []
+        for key in schema_details.get("invalidation_keys") or []:
+            if not isinstance(key, dict):
+                continue
+            if key.get("path_arg"):
+                path_args.append(key["path_arg"])
+            if key.get("result_path"):
+                result_paths.append(key["result_path"])
+            if key.get("tag"):
+                tags.append(key["tag"])
+        ttl = schema_details.get("cache_ttl_seconds", TOOL_RESULT_CACHE_DEFAULT_TTL_SECONDS)
+        return cls(float(ttl), bool(schema_details.get("idempotent")), tuple(path_args), tuple(result_paths), tuple(tags))
+
+    @staticmethod
+    def make_key(args: Tuple, kwargs: Dict[str, Any]) -> Optional[str]:
+        """Canonical key of the call arguments, or None if they cannot be serialized."""
+        try:
+            return json.dumps([list(args), kwargs], sort_keys=True, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return None
+
+    def argument_paths(self, signature_params: Optional[List[str]], args: Tuple, kwargs: Dict[str, Any]) -> List[str]:
+        """The paths named by the `path_arg` arguments of a call (positional or keyword)."""
+        paths = []
+        for name in self.path_args:
+            value = kwargs.get(name)
+            if value is None and signature_params and name in signature_params:
+                index = signature_params.index(name)
+                if index < len(args):
+                    value = args[index]
+            if isinstance(value, str) and value:
+                paths.append(os.path.abspath(value))
+        return paths
+
+    def result_paths_of(self, result: Any) -> Optional[List[str]]:
+        """The paths named in the result, or None if a declared one is missing."""
+        if not self.result_paths:
+            return []
+        if not isinstance(result, dict):
+            return None
+        paths = []
+        for key in self.result_paths:
+            value = result.get(key)
+            if not isinstance(value, str) or not value:
+                return None
+            paths.append(os.path.abspath(value))
+        return paths
+
+
+class ToolResultCache:
+    """In-memory LRU of tool results with TTL expiry, path fingerprints and per-tool hit/miss counters."""
+
+    def __init__(self, max_entries: int = TOOL_RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (tool_name, key) -> (expires_at, {path: fingerprint}, tags, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any], Tuple[str, ...], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        with _live_caches_lock:
+            _live_caches.add(self)
+
+    def _tool_stats(self, tool_name: str) -> Dict[str, int]:
+        """Must be called with self._lock held."""
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = {"hits": 0, "misses": 0, "stores": 0, "invalidations": 0, "evictions": 0}
+        return stats
+
+    def get(self, tool_name: str, key: str) -> Tuple[bool, Any]:
+        """Returns (True, result) on a hit and (False, None) on a miss."""
+        entry_key = (tool_name, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            stats = self._tool_stats(tool_name)
+            if entry is not None:
+                expires_at, fingerprints, _, result = entry
+                if expires_at > time.time() and all(
+                    _path_fingerprint(path) == fingerprint for path, fingerprint in fingerprints.items()
+                ):
+                    self._entries.move_to_end(entry_key)
+                    stats["hits"] += 1
+                    return True, _detached(result)
+                del self._entries[entry_key]
+                stats["invalidations"] += 1
+            stats["misses"] += 1
+            return False, None
+
+    def put(self, tool_name: str, key: str, result: Any, ttl_seconds: float,
+            fingerprints: Dict[str, Any], tags: Tuple[str, ...] = ()) -> None:
+        """
+        Stores a result that stays valid while every path in `fingerprints` (see
+        fingerprint_paths) is unchanged. Fingerprints taken before the tool ran make
+        a change made during the call a miss later.
+        """
+        if ttl_seconds <= 0:
+            return
+        entry = (time.time() + ttl_seconds, dict(fingerprints), tuple(tags), _detached(result))
+        with self._lock:
+            self._entries[(tool_name, key)] = entry
+            self._entries.move_to_end((tool_name, key))
+            self._tool_stats(tool_name)["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                (evicted_tool, _), _ = self._entries.popitem(last=False)
+                self._tool_stats(evicted_tool)["evictions"] += 1
+
+    def _drop(self, matches) -> int:
+        with self._lock:
+            doomed = [entry_key for entry_key, entry in self._entries.items() if matches(entry_key[0], entry)]
+            for entry_key in doomed:
+                del self._entries[entry_key]
+                self._tool_stats(entry_key[0])["invalidations"] += 1
+        return len(doomed)
+
+    def invalidate_path(self, path: str) -> int:
+        """Drops entries that depend on `path` or on its parent directory. Returns the number dropped."""
+        path = os.path.abspath(path)
+        affected = {path, os.path.dirname(path)}
+        return self._drop(lambda tool, entry: not affected.isdisjoint(entry[1]))
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drops entries carrying `tag`. Returns the number dropped."""
+        return self._drop(lambda tool, entry: tag in entry[2])
+
+    def invalidate_tool(self, tool_name: str) -> int:
+        """Drops every entry of one tool (e.g. when it is re-registered)."""
+        return self._drop(lambda tool, entry: tool == tool_name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns per-tool counters, each with its hit ratio and current entry count."""
+        with self._lock:
+            snapshot = {tool: dict(counters) for tool, counters in self._stats.items()}
+            for tool, _ in self._entries:
+                snapshot[tool]["entries"] = snapshot[tool].get("entries", 0) + 1
+        for counters in snapshot.values():
+            counters.setdefault("entries", 0)
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_ratio"] = (counters["hits"] / lookups) if lookups else 0.0
+        return snapshot
+
+
+def invalidate_path(path: str) -> None:
+    """Called after a file is written: drops cached results that read it (or listed its directory)."""
+    with _live_caches_lock:
+        caches = list(_live_caches)
+    for cache in caches:
+        cache.invalidate_path(path)
+
+
+def invalidate_tag(tag: str) -> None:
+    """Drops cached results carrying `tag` from every live cache."""
+    with _live_caches_lock:
+        caches = list(_live_caches)
+    for cache in caches:
+        cache.invalidate_tag(tag)
@@ -3,12 +3,18 @@ import importlib
 import os
 import sys
 import json
-import inspect
 import asyncio
 # traceback removed - no longer needed for this specific issue
 from typing import Callable, Dict, Any, Optional, Tuple, List # TYPE_CHECKING removed
-from ai_assistant.config import is_debug_mode, get_data_dir # Import get_data_dir
+from ai_assistant.config import is_debug_mode, get_data_dir, TOOL_DISCOVERY_MANIFEST_FILENAME # Import get_data_dir
+from ai_assistant.core.deadline import DeadlineExceededError, check_deadline, run_within_deadline
 from ai_assistant.core.self_modification import get_function_source_code
+from ai_assistant.tools.tool_catalog import (
+    LISTING_DESCRIPTIONS, LISTING_WITH_SOURCES, ToolCatalogFragments, ToolListing, set_active_catalog_provider
+)
+from ai_assistant.tools.tool_manifest import ToolDiscoveryManifest, describe_module_tools, module_source_files
+from ai_assistant.tools.tool_invoker import ToolInvoker, EXECUTOR_INLINE
+from ai_assistant.tools.tool_result_cache import ToolCachePolicy, ToolResultCache, fingerprint_paths
 from ..core.task_manager import TaskManager # Added for type hinting
 from ..core.notification_manager import NotificationManager # Made unconditional
 
@@ -16,6 +22,32 @@ from ..core.notification_manager import NotificationManager # Made unconditional
 DEFAULT_TOOLS_FILE_DIR = get_data_dir() # Use centralized data directory from config
 DEFAULT_TOOL_REGISTRY_FILE = os.path.join(DEFAULT_TOOLS_FILE_DIR, "tool_registry.json") # Standardized name
 
+# Custom tool modules to discover.
+# Each tuple is (module_import_path, friendly_filename_for_logging)
+CUSTOM_TOOL_MODULES_TO_DISCOVER: List[Tuple[str, str]] = [
+    ("ai_assistant.custom_tools.my_extra_tools", "my_extra_tools.py"),
+    ("ai_assistant.custom_tools.awareness_tools", "awareness_tools.py"),
+    ("ai_assistant.custom_tools.config_management_tools", "config_management_tools.py"),
+    ("ai_assistant.custom_tools.conversational_tools", "conversational_tools.py"),
+    ("ai_assistant.custom_tools.project_management_tools", "project_management_tools.py"),
+    ("ai_assistant.custom_tools.project_execution_tools", "project_execution_tools.py"),
+    ("ai_assistant.custom_tools.code_execution_tools", "code_execution_tools.py"),
+    ("ai_assistant.custom_tools.file_system_tools", "file_system_tools.py"),
+    ("ai_assistant.custom_tools.git_tools", "git_tools.py"),
+    ("ai_assistant.custom_tools.knowledge_tools", "knowledge_tools.py"),
+    ("ai_assistant.custom_tools.meta_programming_tools", "meta_programming_tools.py"),
+    ("ai_assistant.custom_tools.suggestion_management_tools", "suggestion_management_tools.py"), # Added
+    ("ai_assistant.custom_tools.generated", "generated_tools_module"),
+]
+
+
+def _json_normalized(value: Any) -> Any:
+    """`value` as it reads back from the registry file (tuples become lists), for comparisons."""
+    try:
+        return json.loads(json.dumps(value))
+    except (TypeError, ValueError):
+        return value
+
 
 # --- Custom Exceptions ---
 class ToolNotFoundError(Exception):
@@ -33,6 +65,13 @@ class ToolExecutionError(Exception):
 class ToolSystem:
     def __init__(self, tool_registry_file: Optional[str] = None):
         self._tool_registry: Dict[str, Dict[str, Any]] = {}
+        # Incremented whenever a tool is registered, removed or has its metadata updated;
+        # prompt renderings of the catalog are memoized per version.
+        self._version = 0
+        self._catalog_id = object() # Tells this registry's listings apart from other ToolSystems'
+        self._catalog_fragments: Optional[ToolCatalogFragments] = None
+        # Memoized results of tools whose schema declares them cacheable
+        self._result_cache = ToolResultCache()
         # Import is_debug_mode here or ensure it's available if used in methods called by __init__
         self._persisted_tool_metadata_file = tool_registry_file or DEFAULT_TOOL_REGISTRY_FILE
 
@@ -41,31 +80,16 @@ class ToolSystem:
         self.load_persisted_tools()
         self._register_system_tools()
 
-        # Define a list of custom tool modules to discover
-        # Each tuple is (module_import_path, friendly_filename_for_logging)
-        custom_tool_modules_to_discover = [
-            ("ai_assistant.custom_tools.my_extra_tools", "my_extra_tools.py"),
-            ("ai_assistant.custom_tools.awareness_tools", "awareness_tools.py"),
-            ("ai_assistant.custom_tools.config_management_tools", "config_management_tools.py"),
-            ("ai_assistant.custom_tools.conversational_tools", "conversational_tools.py"),
-            ("ai_assistant.custom_tools.project_management_tools", "project_management_tools.py"),
-            ("ai_assistant.custom_tools.project_execution_tools", "project_execution_tools.py"),
-            ("ai_assistant.custom_tools.code_execution_tools", "code_execution_tools.py"),
-            ("ai_assistant.custom_tools.file_system_tools", "file_system_tools.py"),
-            ("ai_assistant.custom_tools.git_tools", "git_tools.py"),
-            ("ai_assistant.custom_tools.knowledge_tools", "knowledge_tools.py"),
-            ("ai_assistant.custom_tools.meta_programming_tools", "meta_programming_tools.py"),
-            ("ai_assistant.custom_tools.suggestion_management_tools", "suggestion_management_tools.py"), # Added
-            ("ai_assistant.custom_tools.generated", "generated_tools_module"),
-        ]
-
+        # Modules whose source is unchanged since the last discovery are registered from the
+        # manifest without being imported; execute_tool imports them on first use.
+        discovery_manifest = ToolDiscoveryManifest(
+            os.path.join(os.path.dirname(self._persisted_tool_metadata_file), TOOL_DISCOVERY_MANIFEST_FILENAME)
+        )
         any_new_tools_registered_overall = False
-        for module_import_path, module_filename in custom_tool_modules_to_discover:
+        for module_import_path, module_filename in CUSTOM_TOOL_MODULES_TO_DISCOVER:
             try:
-                # Attempt to import the module
-                module_to_inspect = importlib.import_module(module_import_path)
                 # Discover and register tools from this module
-                if self._discover_and_register_custom_tools(module_to_inspect, module_import_path):
+                if self._discover_custom_tools(module_import_path, discovery_manifest):
                     if is_debug_mode():
                         print(f"ToolSystem: New custom tools discovered from {module_filename}. Triggering save.")
                     any_new_tools_registered_overall = True
@@ -75,54 +99,67 @@ class ToolSystem:
             except Exception as e:
                 # Keep this as a regular print or change to logger.warning, as it's an unexpected error.
                 print(f"ToolSystem: Warning - Error during custom tool discovery from {module_filename} (path: {module_import_path}): {e}")
+        discovery_manifest.save()
 
         self.register_example_tools() # Register built-in example tools
 
         # Save the registry only if new tools were discovered and registered during this initialization
         if any_new_tools_registered_overall:
              self.save_registered_tools()
+        set_active_catalog_provider(self.get_catalog_fragments)
         if is_debug_mode():
             print(f"ToolSystem: Initialization complete. {len(self._tool_registry)} tools registered.")
 
-    def _discover_and_register_custom_tools(self, module_to_inspect, module_path_str: str) -> bool:
+    def _discover_custom_tools(self, module_import_path: str, manifest: ToolDiscoveryManifest) -> bool:
+        """
+        Registers the tools of a custom tool module, from the discovery manifest if the module's
+        source is unchanged, otherwise by importing and introspecting it (and updating the manifest).
+        Returns True if any new tools were registered.
+        """
+        source_files = module_source_files(module_import_path)
+        discovered_tools = manifest.lookup(module_import_path, source_files) if source_files else None
+        if discovered_tools is not None:
+            if is_debug_mode():
+                print(f"ToolSystem: Using discovery manifest for '{module_import_path}'; module not imported.")
+            return self._register_discovered_tools(discovered_tools, module_import_path)
+
+        module_to_inspect = importlib.import_module(module_import_path)
+        discovered_tools = describe_module_tools(module_to_inspect)
+        if source_files:
+            manifest.record(module_import_path, source_files, discovered_tools)
+        return self._register_discovered_tools(discovered_tools, module_import_path, module_to_inspect)
+
+    def _register_discovered_tools(self, discovered_tools: List[Dict[str, Any]], module_path_str: str, module_to_inspect=None) -> bool:
         """
-        Discovers and registers public functions from a given module as tools.
-        Skips functions starting with '_' or not defined directly in the module.
-        If a tool with the same name and module_path already exists, it's skipped.
+        Registers tools described by describe_module_tools(). Callables are cached when the
+        module was imported; otherwise they are loaded on first execution.
         Returns True if any new tools were registered from this module, False otherwise.
         """
         new_tools_registered_in_this_module = False
         if is_debug_mode():
             print(f"ToolSystem: Discovering custom tools from module: {module_path_str}")
-        for name, func_object in inspect.getmembers(module_to_inspect, inspect.isfunction):
-            if name.startswith("_"): # Skip private/internal functions
-                continue
-            # Ensure the function is defined in the module being inspected, not imported into it
-            if func_object.__module__ != module_to_inspect.__name__:
-                continue
-
+        for discovered in discovered_tools:
+            name = discovered["name"]
             # Check if this specific tool (name + module_path) is already registered (e.g., from persisted data)
             if name in self._tool_registry and self._tool_registry[name].get('module_path') == module_path_str:
-                # Tool already loaded, likely from tools.json. No need to re-register from discovery.
+                # Tool already loaded, likely from tools.json. No need to re-register from discovery,
+                # but pick up a changed *_SCHEMA (e.g. new caching or executor declarations).
+                existing_tool = self._tool_registry[name]
+                if _json_normalized(discovered.get("schema_details")) != _json_normalized(existing_tool.get('schema_details')):
+                    existing_tool['schema_details'] = discovered.get("schema_details")
+                    existing_tool.pop('invoker_cache', None)
+                    self._result_cache.invalidate_tool(name)
+                    self._bump_version()
+                    new_tools_registered_in_this_module = True # Persist the refreshed schema
                 continue
 
-            docstring = inspect.getdoc(func_object) or "No description available."
-            # Ensure description is a single line for brevity in some displays, or take first line.
-            first_line_of_docstring = docstring.splitlines()[0] if docstring else "No description available."
-
+            first_line_of_docstring = discovered["docstring_first_line"]
             tool_description_for_registration = first_line_of_docstring
-            discovered_schema_details = None
-            schema_variable_name = f"{name.upper()}_SCHEMA"
-            if hasattr(module_to_inspect, schema_variable_name):
-                potential_schema = getattr(module_to_inspect, schema_variable_name)
-                if isinstance(potential_schema, dict) and "name" in potential_schema and "description" in potential_schema:
-                    discovered_schema_details = potential_schema
-                    tool_description_for_registration = discovered_schema_details.get("description", first_line_of_docstring)
-                    if is_debug_mode():
-                        print(f"ToolSystem: Found schema '{schema_variable_name}' for tool '{name}'. Using schema description.")
-                elif is_debug_mode():
-                    print(f"ToolSystem: Found schema variable '{schema_variable_name}' for tool '{name}', but it's not a valid schema dict.")
-
+            discovered_schema_details = discovered.get("schema_details")
+            if discovered_schema_details:
+                tool_description_for_registration = discovered_schema_details.get("description", first_line_of_docstring)
+                if is_debug_mode():
+                    print(f"ToolSystem: Found schema '{name.upper()}_SCHEMA' for tool '{name}'. Using schema description.")
 
             if is_debug_mode():
                 print(f"ToolSystem: Attempting to register discovered custom tool '{name}' from '{module_path_str}'.")
@@ -133,7 +170,7 @@ class ToolSystem:
                     module_path=module_path_str,
                     function_name_in_module=name,
                     tool_type="custom_discovered",
-                    func_callable=func_object,
+                    func_callable=getattr(module_to_inspect, name, None) if module_to_inspect is not None else None,
                     schema_details=discovered_schema_details # Pass schema
                 )
                 new_tools_registered_in_this_module = True
@@ -169,7 +206,8 @@ class ToolSystem:
         updated = False
         if new_description is not None:
             if tool_entry.get('description') != new_description:
-                tool_entry['description'] = new_description                
+                tool_entry['description'] = new_description
+                self._bump_version()
                 if is_debug_mode():
                     print(f"SystemTool: Updated description for tool '{tool_name}'.")
                 updated = True
@@ -207,6 +245,7 @@ class ToolSystem:
         # Only register if not already present, or if re-registration is desired (e.g. to update cache)
         if "system_update_tool_metadata" not in self._tool_registry:
              self._tool_registry["system_update_tool_metadata"] = system_tool_entry
+             self._bump_version()
         # If it is already there, this ensures the callable_cache is for the current instance,
         # which is important if ToolSystem is re-instantiated.
         elif self._tool_registry["system_update_tool_metadata"].get('is_method_on_instance'):
@@ -223,11 +262,14 @@ class ToolSystem:
         function_name_in_module: str,
         tool_type: str = "dynamic",
         func_callable: Optional[Callable] = None,
-        schema_details: Optional[Dict[str, Any]] = None # New parameter
+        schema_details: Optional[Dict[str, Any]] = None, # New parameter
+        executor: Optional[str] = None
     ) -> bool:
         """
         Registers a new tool or updates an existing one.
         If func_callable is provided, it's cached. Otherwise, it's loaded on first execution.
+        `executor` ("inline", "thread" or "process") says where a synchronous tool runs; it
+        falls back to schema_details["executor"] and then to the thread pool (see tool_invoker).
         """
         if tool_name in self._tool_registry:
             existing_tool = self._tool_registry[tool_name]
@@ -261,13 +303,19 @@ class ToolSystem:
             "callable_cache": func_callable,
             "schema_details": schema_details # Store schema_details
         }
+        if executor:
+            tool_entry["executor"] = executor
         self._tool_registry[tool_name] = tool_entry
+        self._result_cache.invalidate_tool(tool_name)
+        self._bump_version()
         return True
 
     def remove_tool(self, name: str) -> bool:
         """Removes a registered tool. Returns True if successful."""
         if name in self._tool_registry:
             del self._tool_registry[name]
+            self._result_cache.invalidate_tool(name)
+            self._bump_version()
             if is_debug_mode():
                 print(f"ToolSystem: Tool '{name}' removed from registry.")
             return True
@@ -280,6 +328,23 @@ class ToolSystem:
         """Retrieves tool metadata from the registry."""
         return self._tool_registry.get(name)
 
+    @property
+    def version(self) -> int:
+        """Registry version; changes whenever a tool is registered, removed or has its metadata updated."""
+        return self._version
+
+    def _bump_version(self) -> None:
+        self._version += 1
+        self._catalog_fragments = None
+
+    def get_catalog_fragments(self) -> ToolCatalogFragments:
+        """Returns the memoized prompt renderings of the catalog for the current registry version."""
+        fragments = self._catalog_fragments
+        if fragments is None or fragments.version != self._version:
+            fragments = ToolCatalogFragments(self._version, self.list_tools_with_sources(), registry_id=self._catalog_id)
+            self._catalog_fragments = fragments
+        return fragments
+
     async def execute_tool(self, name: str, args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None,
                          task_manager: Optional[TaskManager] = None,
                          notification_manager: Optional[NotificationManager] = None) -> Any: # Type hint updated
@@ -288,10 +353,10 @@ class ToolSystem:
         Loads the tool function dynamically if not already cached.
         If task_manager or notification_manager is provided and the tool accepts them, they will be passed.
         Handles both synchronous and asynchronous tool functions.
+        Under a deadline (see core/deadline.py) the call is bounded by the remaining time and raises
+        DeadlineExceededError when it runs out; a synchronous tool's thread cannot be stopped and
+        finishes in the background.
         """
-        if kwargs is None:
-            kwargs = {}
-
         tool_info = self._tool_registry.get(name)
         if not tool_info:
             raise ToolNotFoundError(f"Tool '{name}' not found.")
@@ -319,49 +384,78 @@ class ToolSystem:
         if not callable(func_to_execute): # pragma: no cover
              raise ToolExecutionError(f"Tool '{name}': Loaded attribute '{tool_info['function_name']}' is not callable.")
 
-        final_kwargs = kwargs.copy()
-
-        # Try to get signature once for both injections
-        sig = None
-        try:
-            sig = inspect.signature(func_to_execute)
-        except (ValueError, TypeError): # inspect.signature can fail for some built-ins or non-Python functions
-            if is_debug_mode():
-                print(f"ToolSystem: Warning - Could not inspect signature for tool '{name}'. Dependency injection might be limited.")
-            pass # Proceed without signature-based injection if inspection fails
-
-        if sig:
-            if task_manager and 'task_manager' in sig.parameters:
-                final_kwargs['task_manager'] = task_manager
+        # The signature, injection plan, argument coercers and executor are worked out once per callable
+        invoker = tool_info.get('invoker_cache')
+        if invoker is None or invoker.func is not func_to_execute:
+            invoker = ToolInvoker(name, func_to_execute, executor=self._executor_for(tool_info),
+                                  cache_policy=ToolCachePolicy.from_schema(tool_info.get('schema_details')))
+            tool_info['invoker_cache'] = invoker
+
+        policy = invoker.cache_policy
+        cache_key = policy.make_key(args, kwargs or {}) if policy is not None else None
+        if cache_key is not None:
+            hit, cached_result = self._result_cache.get(name, cache_key)
+            if hit:
                 if is_debug_mode():
-                    print(f"ToolSystem: Injecting TaskManager into tool '{name}'.")
-
-            if notification_manager and 'notification_manager' in sig.parameters:
-                final_kwargs['notification_manager'] = notification_manager
-                if is_debug_mode():
-                    print(f"ToolSystem: Injecting NotificationManager into tool '{name}'.")
+                    print(f"ToolSystem: Tool '{name}' result served from the tool result cache.")
+                return cached_result
+            # Fingerprinted before the call, so a change made while the tool runs is a miss later
+            fingerprints = fingerprint_paths(policy.argument_paths(invoker.parameter_names, args, kwargs or {}))
 
+        check_deadline(f"running tool '{name}'")
         try:
-            if is_debug_mode():
-                print(f"ToolSystem: Executing tool '{name}' with args={args}, final_kwargs={final_kwargs}")
-            # Check if the function is an async function
-            if inspect.iscoroutinefunction(func_to_execute):
-                result = await func_to_execute(*args, **final_kwargs)
-            else:
-                # Run synchronous function in a separate thread to avoid blocking asyncio event loop
-                result = await asyncio.to_thread(func_to_execute, *args, **final_kwargs)
-            if is_debug_mode():
-                print(f"ToolSystem: Tool '{name}' executed successfully. Result (first 200 chars): {str(result)[:200]}")
-            return result
+            result = await run_within_deadline(
+                invoker.invoke(args, kwargs, task_manager=task_manager, notification_manager=notification_manager),
+                f"tool '{name}' finished"
+            )
+        except DeadlineExceededError:
+            print(f"ToolSystem: Tool '{name}' stopped: the prompt's time budget is used up.")
+            raise
         except Exception as e: # pragma: no cover
             print(f"ToolSystem: Error during execution of tool '{name}': {type(e).__name__} - {e}")
             # Consider re-raising a more specific ToolExecutionError or the original error
             raise ToolExecutionError(f"Error during execution of tool '{name}': {e}") from e
 
+        if cache_key is not None:
+            result_paths = policy.result_paths_of(result)
+            if result_paths is not None: # A result missing its declared path (an error) is not cached
+                fingerprints.update(fingerprint_paths(result_paths))
+                self._result_cache.put(name, cache_key, result, policy.ttl_seconds, fingerprints, policy.tags)
+        return result
+
+    def is_read_only_tool(self, name: str) -> bool:
+        """
+        Whether a tool is declared free of side effects: its schema sets "side_effects": "read_only"
+        or "cacheable" (memoized results imply no side effects). Undeclared tools count as mutating.
+        """
+        tool_info = self._tool_registry.get(name)
+        schema_details = tool_info.get('schema_details') if tool_info else None
+        if not isinstance(schema_details, dict):
+            return False
+        return schema_details.get('side_effects') == 'read_only' or bool(schema_details.get('cacheable'))
+
+    def tool_result_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool hit/miss counters of the tool result cache."""
+        return self._result_cache.stats()
+
+    @staticmethod
+    def _executor_for(tool_info: Dict[str, Any]) -> Optional[str]:
+        schema_details = tool_info.get('schema_details')
+        if tool_info.get('executor'):
+            return tool_info['executor']
+        if isinstance(schema_details, dict):
+            return schema_details.get('executor')
+        return None
 
     def list_tools(self) -> Dict[str, str]:
-        """Returns a dictionary of tool names to their descriptions."""
-        return {name: tool["description"] for name, tool in self._tool_registry.items()}
+        """
+        Returns a dictionary of tool names to their descriptions, tagged with the registry
+        version (see tool_catalog.ToolListing) so prompt renderings of it are memoized.
+        """
+        return ToolListing(
+            ((name, tool["description"]) for name, tool in self._tool_registry.items()),
+            catalog_key=(self._catalog_id, self._version, LISTING_DESCRIPTIONS)
+        )
 
     def list_tools_with_sources(self) -> Dict[str, Dict[str, str]]:
         """
@@ -370,8 +464,9 @@ class ToolSystem:
 
         The key of the outer dictionary is the tool_name (registry key).
         The inner dictionary contains 'module_path', 'function_name', 'description', and 'schema_details'.
+        Like list_tools(), the result is tagged with the registry version.
         """
-        detailed_tools = {}
+        detailed_tools = ToolListing(catalog_key=(self._catalog_id, self._version, LISTING_WITH_SOURCES))
         for tool_name, tool_data in self._tool_registry.items():
             detailed_tools[tool_name] = {
                 "module_path": tool_data.get("module_path", "N/A"),
@@ -396,6 +491,7 @@ class ToolSystem:
             # Create a copy and remove the non-serializable 'callable_cache'
             serializable_data = tool_data.copy()
             serializable_data.pop('callable_cache', None) # Remove if exists
+            serializable_data.pop('invoker_cache', None)
             serializable_data.pop('is_method_on_instance', None) # Remove helper flag if exists
             data_to_save[name] = serializable_data
 
@@ -476,7 +572,8 @@ class ToolSystem:
                     function_name_in_module=tool_data['function_name'],
                     tool_type=tool_data.get('type', 'dynamic'),
                     func_callable=None, # Callables are loaded on demand
-                    schema_details=tool_data.get('schema_details') # Load schema_details
+                    schema_details=tool_data.get('schema_details'), # Load schema_details
+                    executor=tool_data.get('executor')
                 )
                 loaded_count +=1
             except ToolAlreadyRegisteredError as e: # pragma: no cover
@@ -495,16 +592,17 @@ class ToolSystem:
         """Registers a set of example tools. Idempotent."""
         current_module_obj = sys.modules[self.__class__.__module__]
 
+        # (tool_name, description, function name, executor); the trivially fast ones run inline
         example_tools_data = [
-            ("greet_user", "Greets the user. Args: name (str)", "_example_greet_user"),
-            ("add_numbers", "Adds two integers. Args: a (int), b (int)", "_example_add_numbers"),
-            ("multiply_numbers", "Multiplies two floats. Args: x (float), y (float)", "_example_multiply_numbers"),
-            ("no_op_tool", "Does nothing, useful for default plans.", "_example_no_op_tool"),
-            ("view_function_code", "Retrieves the source code of a specified function. Inputs: module_path (str), function_name (str).", "_tool_view_function_code"),
-            ("simulate_edit_function_code", "Simulates editing source code. Inputs: module_path (str), function_name (str), new_code_block (str).", "_tool_simulate_edit_function_code"),
-            ("maybe_fail_tool", "A tool that fails on its 1st, 3rd, etc. call and succeeds on its 2nd, 4th, etc. call.", "_example_maybe_fail_tool"),
+            ("greet_user", "Greets the user. Args: name (str)", "_example_greet_user", EXECUTOR_INLINE),
+            ("add_numbers", "Adds two integers. Args: a (int), b (int)", "_example_add_numbers", EXECUTOR_INLINE),
+            ("multiply_numbers", "Multiplies two floats. Args: x (float), y (float)", "_example_multiply_numbers", EXECUTOR_INLINE),
+            ("no_op_tool", "Does nothing, useful for default plans.", "_example_no_op_tool", EXECUTOR_INLINE),
+            ("view_function_code", "Retrieves the source code of a specified function. Inputs: module_path (str), function_name (str).", "_tool_view_function_code", None),
+            ("simulate_edit_function_code", "Simulates editing source code. Inputs: module_path (str), function_name (str), new_code_block (str).", "_tool_simulate_edit_function_code", None),
+            ("maybe_fail_tool", "A tool that fails on its 1st, 3rd, etc. call and succeeds on its 2nd, 4th, etc. call.", "_example_maybe_fail_tool", EXECUTOR_INLINE),
         ]
-        for tool_name, description, func_name_str in example_tools_data:
+        for tool_name, description, func_name_str, executor in example_tools_data:
             try:
                 func_callable = getattr(current_module_obj, func_name_str, None)
                 if not func_callable or not callable(func_callable): # pragma: no cover
@@ -517,7 +615,8 @@ class ToolSystem:
                     module_path=current_module_obj.__name__,
                     function_name_in_module=func_name_str,
                     tool_type="builtin", # Mark as a built-in example tool
-                    func_callable=func_callable # Cache the callable
+                    func_callable=func_callable, # Cache the callable
+                    executor=executor
                 )
             except ToolAlreadyRegisteredError as e: # pragma: no cover
                 # This is expected if tools were loaded from persistence first
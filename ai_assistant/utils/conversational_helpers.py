@@ -188,7 +188,9 @@ async def rephrase_error_message_conversationally(
         llm_response_coro = llm_provider.invoke_ollama_model_async(
             prompt,
             model_name=target_model,
-            temperature=0.5
+            temperature=0.5,
+            task_name="error_rephrasing",
+            cache=True
         )
         llm_response = await llm_response_coro # Await the coroutine
 
@@ -207,7 +209,7 @@ if __name__ == '__main__': # pragma: no cover
     _mock_captured_code_gen_prompt_main: Optional[str] = None
 
     class MockOllamaProviderMain:
-        async def invoke_ollama_model_async(self, prompt: str, model_name: str, temperature: float) -> Optional[str]:
+        async def invoke_ollama_model_async(self, prompt: str, model_name: str, temperature: float, **kwargs: Any) -> Optional[str]:
             global _mock_captured_code_gen_prompt_main
             logger.info(f"\n--- Mock LLM Prompt (Model: {model_name}, Temp: {temperature}) ---")
             logger.info(prompt)
@@ -0,0 +1,96 @@
+# benchmarks/ollama_session_benchmark.py
+"""
+Compares per-call latency of the Ollama client against a local stub server:
+
+  * "per-call"  - the previous behaviour: a new aiohttp.ClientSession (async) or a
+                  bare requests.post (sync) for every LLM call.
+  * "pooled"    - OllamaProvider's long-lived pooled sessions.
+
+Run from the repository root:
+    python -m benchmarks.ollama_session_benchmark [--calls 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+import aiohttp
+import requests
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from tests.ollama_stub_server import OllamaStubServer
+
+PAYLOAD = {"model": "stub-model:latest", "prompt": "hello", "stream": False, "options": {}}
+
+
+def _report(label: str, samples: List[float]) -> None:
+    samples_ms = sorted(s * 1000 for s in samples)
+    p95 = samples_ms[int(len(samples_ms) * 0.95) - 1]
+    print(f"{label:<28} mean={statistics.mean(samples_ms):7.3f}ms  "
+          f"median={statistics.median(samples_ms):7.3f}ms  p95={p95:7.3f}ms")
+
+
+def _time_sync(call: Callable[[], None], calls: int) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _time_async(call, calls: int) -> List[float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(calls: int) -> None:
+    with OllamaStubServer() as server:
+        url = f"{server.base_url}/api/generate"
+        provider = OllamaProvider(base_url=server.base_url)
+
+        def per_call_sync():
+            requests.post(url, json=PAYLOAD, timeout=10).json()
+
+        def pooled_sync():
+            provider.get_sync_session().post(url, json=PAYLOAD, timeout=10).json()
+
+        async def per_call_async():
+            async with aiohttp.ClientSession() as session:
+                async with session.post(url, json=PAYLOAD) as response:
+                    await response.json()
+
+        async def pooled_async():
+            session = await provider.get_async_session()
+            async with session.post(url, json=PAYLOAD) as response:
+                await response.json()
+
+        async def run_async():
+            per_call = await _time_async(per_call_async, calls)
+            pooled = await _time_async(pooled_async, calls)
+            await provider.close()
+            return per_call, pooled
+
+        print(f"Ollama client session benchmark ({calls} sequential calls against {server.base_url})")
+        _report("sync  per-call requests.post", _time_sync(per_call_sync, calls))
+        _report("sync  pooled Session", _time_sync(pooled_sync, calls))
+        per_call_async_samples, pooled_async_samples = asyncio.run(run_async())
+        _report("async per-call ClientSession", per_call_async_samples)
+        _report("async pooled ClientSession", pooled_async_samples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    run(parser.parse_args().calls)
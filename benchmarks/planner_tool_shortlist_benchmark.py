@@ -0,0 +1,139 @@
+# benchmarks/planner_tool_shortlist_benchmark.py
+"""
+Measures PlannerAgent.create_plan_with_llm prompt size and planning latency versus
+tool registry size, with every tool described in the prompt ("all tools") and with
+top-k tool shortlisting (ToolRetriever).
+
+The LLM is the local stub server. To model the cost of a longer prompt it sleeps
+for (prompt tokens / --prefill-rate) before answering; tokens are approximated
+as characters / 4. The stub always returns the same one-step plan.
+
+Run from the repository root:
+    python -m benchmarks.planner_tool_shortlist_benchmark [--sizes 10 50 100 250 500] [--prefill-rate 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from ai_assistant.llm_interface.embeddings import HashingEmbeddingBackend
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.memory.vector_index import VectorIndex
+from ai_assistant.planning.planning import PlannerAgent
+from ai_assistant.planning.tool_retrieval import ToolRetriever
+from tests.ollama_stub_server import OllamaStubServer
+
+GOALS = [
+    "Search the web for the latest Python release and summarize it",
+    "Read the file notes.txt and write a cleaned-up copy to notes_clean.txt",
+    "Convert 250 US dollars to euros",
+]
+PLAN = [{"tool_name": "search_duckduckgo", "args": ["python release"], "kwargs": {}}]
+_TOPICS = ["invoice", "weather", "calendar", "image", "email", "database", "csv", "translation", "audio", "git"]
+_VERBS = ["create", "update", "delete", "summarize", "validate", "export", "fetch", "analyze"]
+
+
+def approx_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def build_registry(size: int) -> Dict[str, Dict[str, Any]]:
+    """A registry of `size` tools: a few realistic ones plus generated tools with schema parameters."""
+    tools: Dict[str, Dict[str, Any]] = {
+        "search_duckduckgo": {"description": "Searches the internet using DuckDuckGo.",
+                              "schema_details": {"parameters": [{"name": "query", "type": "str", "description": "The search query."}]}},
+        "process_search_results": {"description": "Processes JSON search results to answer a query or summarize them.",
+                                   "schema_details": {"parameters": [{"name": "search_results_json", "type": "str", "description": "Search results."}]}},
+        "request_user_clarification": {"description": "Asks the user a clarifying question.",
+                                       "schema_details": {"parameters": [{"name": "question_text", "type": "str", "description": "The question."}]}},
+        "no_op_tool": {"description": "Does nothing.", "schema_details": {"parameters": []}},
+        "read_text_file": {"description": "Reads the contents of a text file.",
+                           "schema_details": {"parameters": [{"name": "file_path", "type": "str", "description": "Path of the file."}]}},
+        "write_text_file": {"description": "Writes text to a file.",
+                            "schema_details": {"parameters": [{"name": "file_path", "type": "str", "description": "Path of the file."},
+                                                              {"name": "content", "type": "str", "description": "Text to write."}]}},
+        "convert_currency": {"description": "Converts an amount between currencies using current exchange rates.",
+                             "schema_details": {"parameters": [{"name": "amount", "type": "float", "description": "Amount to convert."},
+                                                               {"name": "to_currency", "type": "str", "description": "Target currency code."}]}},
+    }
+    i = 0
+    while len(tools) < size:
+        verb, topic = _VERBS[i % len(_VERBS)], _TOPICS[(i // len(_VERBS)) % len(_TOPICS)]
+        tools[f"{verb}_{topic}_tool_{i}"] = {
+            "description": f"Generated tool that can {verb} {topic} records (variant {i}).",
+            "schema_details": {"parameters": [
+                {"name": f"{topic}_id", "type": "str", "description": f"Identifier of the {topic} record."},
+                {"name": "options", "type": "dict", "description": f"Options controlling how to {verb} the record."},
+            ]}
+        }
+        i += 1
+    return dict(list(tools.items())[:size])
+
+
+def run(sizes: List[int], prefill_rate: float, repeats: int) -> None:
+    prompt_tokens_seen: List[int] = []
+
+    def responder(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        tokens = approx_tokens(payload.get("prompt", ""))
+        time.sleep(tokens / prefill_rate)
+        return {"response": json.dumps(PLAN), "done": True}
+
+    with OllamaStubServer(responder=responder) as server:
+        provider = OllamaProvider(base_url=server.base_url)
+
+        async def stub_invoke(prompt: str, model_name: str = None, **kwargs) -> str:
+            prompt_tokens_seen.append(approx_tokens(prompt))
+            session = await provider.get_async_session()
+            async with session.post(f"{server.base_url}/api/generate", json={"prompt": prompt}) as response:
+                return (await response.json())["response"]
+
+        async def measure(planner: PlannerAgent, tools: Dict[str, Any]):
+            latencies, tokens = [], []
+            for _ in range(repeats):
+                for goal in GOALS:
+                    start = time.perf_counter()
+                    await planner.create_plan_with_llm(goal, tools)
+                    latencies.append(time.perf_counter() - start)
+                    tokens.append(prompt_tokens_seen[-1])
+            return statistics.mean(tokens), statistics.median(latencies) * 1000
+
+        async def run_async():
+            rows = []
+            for size in sizes:
+                tools = build_registry(size)
+                full = PlannerAgent()
+                full.tool_retriever = ToolRetriever(shortlist_size=0) # 0 disables shortlisting
+                shortlisted = PlannerAgent()
+                shortlisted.tool_retriever = ToolRetriever(
+                    vector_index=VectorIndex("benchmark_tools", backend=HashingEmbeddingBackend(), persist=False)
+                )
+                rows.append((size, await measure(full, tools), await measure(shortlisted, tools)))
+            await provider.close()
+            return rows
+
+        with patch("ai_assistant.planning.planning.invoke_ollama_model_async", stub_invoke), \
+             patch("builtins.print"): # The planner logs every attempt
+            rows = asyncio.run(run_async())
+
+    print(f"Planner prompt size and latency vs registry size (modelled prefill: {prefill_rate:.0f} tokens/s)")
+    print(f"{'tools':>6} | {'all: tokens':>11} {'median ms':>10} | {'top-k: tokens':>13} {'median ms':>10}")
+    for size, (full_tokens, full_ms), (short_tokens, short_ms) in rows:
+        print(f"{size:>6} | {full_tokens:>11.0f} {full_ms:>10.1f} | {short_tokens:>13.0f} {short_ms:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 250, 500])
+    parser.add_argument("--prefill-rate", type=float, default=2000.0, help="Modelled prompt tokens per second")
+    parser.add_argument("--repeats", type=int, default=1)
+    args = parser.parse_args()
+    run(args.sizes, args.prefill_rate, args.repeats)
@@ -0,0 +1,79 @@
+# benchmarks/tool_discovery_startup_benchmark.py
+"""
+Measures ToolSystem startup with and without the tool discovery manifest.
+
+Each measurement runs in a fresh interpreter whose data directory is a temporary
+directory, and times `import ai_assistant.tools.tool_system`, which builds the
+global ToolSystem (loading the registry and discovering the custom tool modules).
+
+  * "cold"          - empty data directory: every custom tool module is imported
+                      and introspected, and the registry and manifest are written.
+  * "registry only" - tool_registry.json present but no manifest: every module is
+                      still imported (the behaviour before the manifest existed).
+  * "warm"          - registry and manifest present: unchanged modules are
+                      registered without being imported.
+
+Run from the repository root:
+    python -m benchmarks.tool_discovery_startup_benchmark [--repeats 5]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_CHILD = """
+import json, sys, time
+sys.path.insert(0, {project_root!r})
+import ai_assistant.config as config
+config.get_data_dir = lambda: {data_dir!r}
+start = time.perf_counter()
+import ai_assistant.tools.tool_system as tool_system
+elapsed = time.perf_counter() - start
+imported = [m for m, _ in tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "tools": len(tool_system.tool_system_instance.list_tools()), "imported": len(imported)}}))
+"""
+
+
+def measure_once(data_dir: str) -> Dict[str, float]:
+    """Runs one ToolSystem startup in a child interpreter and returns its measurements."""
+    code = _CHILD.format(project_root=project_root, data_dir=data_dir)
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1]) # The ToolSystem logs before the result
+
+
+def run(repeats: int) -> None:
+    from ai_assistant.config import TOOL_DISCOVERY_MANIFEST_FILENAME
+
+    rows = {"cold": [], "registry only": [], "warm": []}
+    for _ in range(repeats):
+        data_dir = tempfile.mkdtemp(prefix="tool_discovery_benchmark_")
+        try:
+            rows["cold"].append(measure_once(data_dir))
+            os.remove(os.path.join(data_dir, TOOL_DISCOVERY_MANIFEST_FILENAME))
+            rows["registry only"].append(measure_once(data_dir)) # Rewrites the manifest
+            rows["warm"].append(measure_once(data_dir))
+        finally:
+            shutil.rmtree(data_dir)
+
+    print(f"ToolSystem startup (import of ai_assistant.tools.tool_system), median of {repeats} fresh interpreters")
+    print(f"{'scenario':>14} | {'median ms':>10} {'min ms':>8} | {'tools':>5} {'modules imported':>16}")
+    for scenario, samples in rows.items():
+        times: List[float] = [s["seconds"] * 1000 for s in samples]
+        print(f"{scenario:>14} | {statistics.median(times):>10.1f} {min(times):>8.1f} | "
+              f"{samples[-1]['tools']:>5} {samples[-1]['imported']:>16}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    run(args.repeats)
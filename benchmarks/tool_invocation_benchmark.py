@@ -0,0 +1,110 @@
+# benchmarks/tool_invocation_benchmark.py
+"""
+Measures the per-call overhead of ToolSystem.execute_tool for the built-in example tools.
+
+  * "per-call" - the steps execute_tool used to run on every call: inspect.signature,
+                 the injection checks, a kwargs copy, iscoroutinefunction and
+                 asyncio.to_thread on the default executor.
+  * "invoker"  - the current execute_tool, which reuses the tool's cached ToolInvoker
+                 (the example tools are registered to run inline).
+
+Debug logging is switched off unless --debug is given, so the numbers are the
+dispatch overhead rather than the cost of printing.
+
+Run from the repository root:
+    python -m benchmarks.tool_invocation_benchmark [--calls 5000] [--debug]
+"""
+import argparse
+import asyncio
+import contextlib
+import inspect
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Tuple
+from unittest.mock import patch
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CASES = [
+    ("greet_user", ("World",), {}),
+    ("add_numbers", ("2", "3"), {}),
+    ("multiply_numbers", (1.5, 4), {}),
+    ("no_op_tool", (), {}),
+]
+
+
+async def per_call_execute(tool_system, name: str, args: Tuple = (), kwargs: Dict[str, Any] = None,
+                           task_manager=None, notification_manager=None) -> Any:
+    """The execute_tool dispatch path from before the invoker cache."""
+    from ai_assistant.config import is_debug_mode
+
+    if kwargs is None:
+        kwargs = {}
+    func = tool_system.get_tool(name)['callable_cache']
+    final_kwargs = kwargs.copy()
+    sig = inspect.signature(func)
+    if task_manager and 'task_manager' in sig.parameters:
+        final_kwargs['task_manager'] = task_manager
+    if notification_manager and 'notification_manager' in sig.parameters:
+        final_kwargs['notification_manager'] = notification_manager
+    if is_debug_mode():
+        print(f"ToolSystem: Executing tool '{name}' with args={args}, final_kwargs={final_kwargs}")
+    if inspect.iscoroutinefunction(func):
+        result = await func(*args, **final_kwargs)
+    else:
+        result = await asyncio.to_thread(func, *args, **final_kwargs)
+    if is_debug_mode():
+        print(f"ToolSystem: Tool '{name}' executed successfully. Result (first 200 chars): {str(result)[:200]}")
+    return result
+
+
+async def time_calls(execute, name: str, args: Tuple, kwargs: Dict[str, Any], calls: int) -> float:
+    """Returns the mean microseconds per call."""
+    for _ in range(min(calls, 100)): # Warm up (builds the invoker, starts the pool threads)
+        await execute(name, args=args, kwargs=kwargs)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await execute(name, args=args, kwargs=kwargs)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+async def run(calls: int) -> None:
+    from ai_assistant.tools.tool_system import ToolSystem
+
+    data_dir = tempfile.mkdtemp(prefix="tool_invocation_benchmark_")
+    try:
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", []):
+            tool_system = ToolSystem(tool_registry_file=os.path.join(data_dir, "tool_registry.json"))
+
+        async def legacy(name, args=(), kwargs=None):
+            return await per_call_execute(tool_system, name, args, kwargs)
+
+        rows = []
+        for name, args, kwargs in CASES:
+            with contextlib.redirect_stdout(io.StringIO()): # Debug output is measured, not shown
+                before = await time_calls(legacy, name, args, kwargs, calls)
+                after = await time_calls(tool_system.execute_tool, name, args, kwargs, calls)
+            rows.append((name, before, after))
+    finally:
+        shutil.rmtree(data_dir)
+
+    print(f"execute_tool overhead, mean of {calls} calls per tool")
+    print(f"{'tool':>18} | {'per-call us':>11} {'invoker us':>10} | {'speedup':>7}")
+    for name, before, after in rows:
+        print(f"{name:>18} | {before:>11.1f} {after:>10.1f} | {before / after:>6.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--debug", action="store_true", help="Keep debug logging on (as with DEBUG_MODE).")
+    args = parser.parse_args()
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
+    import ai_assistant.config as config
+    config.DEBUG_MODE = args.debug
+    asyncio.run(run(args.calls))
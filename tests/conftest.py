@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from ai_assistant.memory import event_logger
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_event_log():
+    """Keeps events logged by the code under test out of the real data directory.
+
+    Without this, the first logged event migrates a developer's legacy event_log.json
+    to '.migrated' and the suite's events rotate their history into event_log.<n>.jsonl.
+    """
+    temp_dir = tempfile.mkdtemp()
+    event_logger.close_event_log()
+    with patch.object(event_logger, "EVENT_LOG_FILE", os.path.join(temp_dir, event_logger.EVENT_LOG_FILENAME)), \
+         patch.object(event_logger, "LEGACY_EVENT_LOG_FILE", os.path.join(temp_dir, event_logger.LEGACY_EVENT_LOG_FILENAME)):
+        yield temp_dir
+        event_logger.close_event_log()
+    shutil.rmtree(temp_dir, ignore_errors=True)
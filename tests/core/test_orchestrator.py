@@ -64,9 +64,11 @@ class TestDynamicOrchestrator(unittest.IsolatedAsyncioTestCase):
         self.tool_system_patcher = patch('ai_assistant.core.orchestrator.tool_system_instance', MagicMock(spec=ToolSystem))
         self.mock_tool_system = self.tool_system_patcher.start()
         self.mock_tool_system.list_tools_with_sources.return_value = {"mock_tool": {"description": "A mock tool"}}
-        # Patch load_learned_facts used in orchestrator
-        self.load_facts_patcher = patch('ai_assistant.core.orchestrator.load_learned_facts', MagicMock(return_value=[]))
-        self.mock_load_facts = self.load_facts_patcher.start()
+        # Patch the fact store used in orchestrator
+        self.load_facts_patcher = patch('ai_assistant.core.orchestrator.get_fact_store')
+        self.mock_fact_store = self.load_facts_patcher.start().return_value
+        self.mock_fact_store.hybrid_search.return_value = []
+        self.mock_fact_store.recent.return_value = []
 
 
     def tearDown(self):
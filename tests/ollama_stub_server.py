@@ -0,0 +1,171 @@
+# tests/ollama_stub_server.py
+"""
+A tiny in-process HTTP server that mimics the parts of the Ollama API used by
+`ai_assistant.llm_interface.ollama_client` (/api/generate, /api/chat, /api/tags)
+and `ai_assistant.llm_interface.embeddings` (/api/embed).
+
+Used by the LLM client tests and by the benchmarks in `benchmarks/`.
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+
+def default_responder(path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Echo-style responses in the shape Ollama returns for non-streaming requests."""
+    if path == "/api/chat":
+        messages = payload.get("messages") or [{}]
+        content = messages[-1].get("content", "")
+        return {"message": {"role": "assistant", "content": f"stub:{content}", "thinking": ""}, "done": True}
+    if path == "/api/embed":
+        # Deterministic 4-d "embedding" per input: letter counts of a, e, i, o (+1 so none is zero).
+        inputs = payload.get("input") or []
+        return {"embeddings": [[float(text.count(ch) + 1) for ch in "aeio"] for text in inputs]}
+    return {"response": f"stub:{payload.get('prompt', '')}", "done": True}
+
+
+def stream_lines_for(body: Dict[str, Any], chunk_size: int) -> List[Dict[str, Any]]:
+    """Splits a complete response body into the NDJSON lines a streaming request would return."""
+    message = body.get("message")
+    text = message.get("content", "") if isinstance(message, dict) else body.get("response", "")
+    pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+    lines = []
+    for piece in pieces:
+        if isinstance(message, dict):
+            lines.append({"message": {"role": "assistant", "content": piece}, "done": False})
+        else:
+            lines.append({"response": piece, "done": False})
+    lines.append({"message": {"role": "assistant", "content": ""}, "done": True} if isinstance(message, dict)
+                 else {"response": "", "done": True})
+    return lines
+
+
+class OllamaStubServer:
+    """
+    Threaded stub server. Records every request it receives and the distinct
+    client connections it has seen, so tests can assert on connection reuse.
+    """
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[str, Dict[str, Any]], Dict[str, Any]]] = None,
+        delay_seconds: float = 0.0,
+        models: Optional[List[Dict[str, Any]]] = None,
+        port: int = 0
+    ):
+        self.port = port                        # 0 picks a free port; a fixed one lets a test restart a "crashed" server
+        self.responder = responder or default_responder
+        self.delay_seconds = delay_seconds
+        self.models = models if models is not None else [{"name": "stub-model:latest", "size": 1}]
+        self.stream_chunk_size = 4              # Characters per streamed NDJSON line
+        self.stream_token_delay_seconds = 0.0   # Pause between streamed lines
+        self.stream_cut_after_lines: Optional[int] = None # End streams after this many lines, before "done"
+        self.fail_requests = 0                  # The next this-many POSTs are answered with fail_status
+        self.fail_status = 503
+        self.requests: List[Tuple[str, Dict[str, Any]]] = []
+        self.client_connections: Set[Tuple[str, int]] = set()
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real server
+
+            def setup(self):
+                super().setup()
+                # Like Go's net/http (which Ollama uses): no Nagle delay on keep-alive sockets.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, format, *args):  # Keep test output quiet
+                pass
+
+            def _send_json(self, status: int, body: Dict[str, Any]) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.client_connections.add(self.client_address)
+                    stub.requests.append((self.path, {}))
+                if self.path == "/api/tags":
+                    self._send_json(200, {"models": stub.models})
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                raw = self.rfile.read(length) if length else b"{}"
+                try:
+                    payload = json.loads(raw.decode("utf-8"))
+                except json.JSONDecodeError:
+                    payload = {}
+                with stub._lock:
+                    stub.client_connections.add(self.client_address)
+                    stub.requests.append((self.path, payload))
+                with stub._lock:
+                    fail = stub.fail_requests > 0
+                    if fail:
+                        stub.fail_requests -= 1
+                if fail:
+                    self._send_json(stub.fail_status, {"error": "stub failure"})
+                    return
+                if stub.delay_seconds:
+                    time.sleep(stub.delay_seconds)
+                body = stub.responder(self.path, payload)
+                if payload.get("stream"):
+                    self._send_ndjson_stream(body)
+                else:
+                    self._send_json(200, body)
+
+            def _send_ndjson_stream(self, body: Dict[str, Any]) -> None:
+                """Replays a non-streaming body as Ollama-style NDJSON chunks, one token per line."""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                lines = stream_lines_for(body, stub.stream_chunk_size)
+                if stub.stream_cut_after_lines is not None:
+                    lines = lines[:stub.stream_cut_after_lines]
+                for line in lines:
+                    data = (json.dumps(line) + "\n").encode("utf-8")
+                    self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+                    if stub.stream_token_delay_seconds:
+                        time.sleep(stub.stream_token_delay_seconds)
+                self.wfile.write(b"0\r\n\r\n")
+
+        return _Handler
+
+    def start(self) -> "OllamaStubServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "OllamaStubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
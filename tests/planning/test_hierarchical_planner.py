@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import AsyncMock, patch, MagicMock
+import asyncio
 import os
+import time
 import sys
 from typing import List
 
@@ -10,7 +12,8 @@ if project_root not in sys.path: # pragma: no cover
     sys.path.insert(0, project_root)
 
 from ai_assistant.planning.hierarchical_planner import HierarchicalPlanner, LLM_HP_OUTLINE_GENERATION_PROMPT_TEMPLATE
-from ai_assistant.llm_interface.ollama_client import OllamaProvider # For spec in mock
+from ai_assistant.llm_interface.ollama_client import OllamaProvider, LLMStreamChunk, STREAM_CHUNK_CONTENT # For spec in mock
+from ai_assistant.llm_interface.errors import LLMConnectionError
 
 class TestHierarchicalPlannerOutline(unittest.IsolatedAsyncioTestCase):
 
@@ -150,6 +153,16 @@ class TestHierarchicalPlannerOutline(unittest.IsolatedAsyncioTestCase):
                 break
         self.assertTrue(error_logged, "Error message from LLM exception was not printed.")
 
+    async def test_streamed_outline_that_breaks_off_fails(self):
+        async def broken_stream(prompt, model_name=None, temperature=0.7, max_tokens=1500):
+            yield LLMStreamChunk(STREAM_CHUNK_CONTENT, "- Complete item\n- Cut o")
+            raise LLMConnectionError("connection lost")
+        self.mock_llm_provider.stream_async = broken_stream
+        items = []
+        outline = await self.planner.generate_high_level_outline("goal", on_item=items.append)
+        self.assertEqual(outline, [])
+        self.assertEqual(items, ["Complete item"]) # The cut-off last line is not reported
+
 
 if __name__ == '__main__': # pragma: no cover
     unittest.main()
@@ -465,6 +478,112 @@ class TestHierarchicalPlannerFullPlan(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(mock_gen_step_elaboration.call_count, 2) # Attempted for both
 
 
+
+class TestHierarchicalPlannerPipeline(unittest.IsolatedAsyncioTestCase):
+    """Outline items are expanded and detailed tasks elaborated concurrently, with ordered output."""
+
+    def setUp(self):
+        self.planner = HierarchicalPlanner(llm_provider=MagicMock(spec=OllamaProvider))
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.print_patcher = patch('builtins.print')
+        self.print_patcher.start()
+        self.addCleanup(self.print_patcher.stop)
+
+    async def _llm_call(self, delay):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+
+    def _patch_planner(self, outline, tasks_per_item, elaboration_delays):
+        async def detailed_tasks(outline_item, ug, pc, on_item=None):
+            await self._llm_call(0.05)
+            tasks = [f"{outline_item} task {i}" for i in range(1, tasks_per_item + 1)]
+            for task in tasks:
+                if on_item:
+                    on_item(task)
+            return tasks
+
+        async def elaborate(detailed_task, ug, pc):
+            await self._llm_call(elaboration_delays(detailed_task))
+            return {"type": "informational", "details": {"message": detailed_task}}
+
+        return (
+            patch.object(self.planner, 'generate_high_level_outline', AsyncMock(return_value=outline)),
+            patch.object(self.planner, 'generate_detailed_tasks_for_outline_item', side_effect=detailed_tasks),
+            patch.object(self.planner, 'generate_project_plan_step_for_task', side_effect=elaborate),
+        )
+
+    async def test_plan_is_built_concurrently_in_step_id_order(self):
+        outline = ["A", "B", "C"]
+        # Later tasks finish first; the plan must still follow outline and task order.
+        delays = lambda task: 0.1 / int(task[-1])
+        p_outline, p_tasks, p_elaborate = self._patch_planner(outline, 3, delays)
+        with p_outline, p_tasks, p_elaborate, \
+             patch('ai_assistant.planning.hierarchical_planner.HIERARCHICAL_PLAN_CONCURRENCY', 20):
+            start = time.perf_counter()
+            full_plan = await self.planner.generate_full_project_plan("Goal")
+            elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.5) # Serially: 3 * 0.05 + 3 * (0.1 + 0.05 + 0.033) ~= 0.7s
+        self.assertEqual(self.max_in_flight, 9)
+        self.assertEqual([step["step_id"] for step in full_plan],
+                         ["1.1", "1.2", "1.3", "2.1", "2.2", "2.3", "3.1", "3.2", "3.3"])
+        self.assertEqual(full_plan[4]["description"], "B task 2")
+        self.assertEqual(full_plan[4]["outline_group"], "B")
+
+    async def test_llm_requests_are_bounded(self):
+        p_outline, p_tasks, p_elaborate = self._patch_planner(["A", "B", "C", "D"], 4, lambda task: 0.01)
+        with p_outline, p_tasks, p_elaborate, \
+             patch('ai_assistant.planning.hierarchical_planner.HIERARCHICAL_PLAN_CONCURRENCY', 3):
+            full_plan = await self.planner.generate_full_project_plan("Goal")
+        self.assertEqual(len(full_plan), 16)
+        self.assertEqual(self.max_in_flight, 3)
+
+    async def test_streamed_tasks_are_elaborated_before_their_list_completes(self):
+        elaborated_while_streaming = []
+
+        async def detailed_tasks(outline_item, ug, pc, on_item=None):
+            on_item("Task 1")
+            await asyncio.sleep(0.05) # The model is still generating the rest of the list
+            elaborated_while_streaming.append(mock_elaborate.await_count)
+            on_item("Task 2 (dropped from the final parse)")
+            return ["Task 1", "Task 2"]
+
+        events = []
+        with patch.object(self.planner, 'generate_high_level_outline', AsyncMock(return_value=["A"])), \
+             patch.object(self.planner, 'generate_detailed_tasks_for_outline_item', side_effect=detailed_tasks), \
+             patch.object(self.planner, 'generate_project_plan_step_for_task', new_callable=AsyncMock,
+                          return_value={"type": "informational", "details": {"message": "m"}}) as mock_elaborate:
+            full_plan = await self.planner.generate_full_project_plan("Goal", on_progress=events.append)
+
+        self.assertEqual(elaborated_while_streaming, [1])
+        self.assertEqual([(step["step_id"], step["description"]) for step in full_plan], [("1.1", "Task 1"), ("1.2", "Task 2")])
+        project_steps = [event["step"]["description"] for event in events if event["stage"] == "project_step"]
+        self.assertEqual(project_steps, ["Task 1", "Task 2"])
+
+    async def test_timeout_returns_partial_plan_and_cancels_outstanding_requests(self):
+        delays = lambda task: 10 if task == "B task 2" else 0.01
+        p_outline, p_tasks, p_elaborate = self._patch_planner(["A", "B"], 2, delays)
+        with p_outline, p_tasks, p_elaborate:
+            full_plan = await self.planner.generate_full_project_plan("Goal", timeout=0.3)
+        self.assertEqual([step["step_id"] for step in full_plan], ["1.1", "1.2", "2.1"])
+        self.assertEqual(self.in_flight, 0)
+
+    async def test_cancellation_cancels_outstanding_requests(self):
+        p_outline, p_tasks, p_elaborate = self._patch_planner(["A", "B"], 2, lambda task: 10)
+        with p_outline, p_tasks, p_elaborate:
+            plan_task = asyncio.create_task(self.planner.generate_full_project_plan("Goal"))
+            await asyncio.sleep(0.1)
+            self.assertGreater(self.in_flight, 0)
+            plan_task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await plan_task
+        self.assertEqual(self.in_flight, 0)
+
 class TestHierarchicalPlannerStepElaboration(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
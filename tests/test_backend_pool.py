@@ -0,0 +1,110 @@
+import unittest
+import asyncio
+import time
+from collections import Counter
+
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.llm_interface.backend_pool import BackendPool
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from tests.ollama_stub_server import OllamaStubServer
+
+MODEL = THINKING_SUPPORTED_MODELS[0] # Routed to /api/chat, single request
+
+
+class BackendPoolTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.servers = [OllamaStubServer(delay_seconds=0.05).start() for _ in range(2)]
+        self.provider = self._provider(self.servers)
+
+    async def asyncTearDown(self):
+        await self.provider.close()
+        for server in self.servers:
+            server.stop()
+
+    def _provider(self, servers):
+        provider = OllamaProvider(model_name=MODEL, base_urls=[s.base_url for s in servers])
+        provider.backend_pool.health_check_interval = 0 # Tests run health checks explicitly
+        return provider
+
+    def _generations(self, server):
+        return sum(1 for path, _ in server.requests if path == "/api/chat")
+
+
+class TestBackendPoolRouting(BackendPoolTestCase):
+    async def test_concurrent_requests_go_to_the_least_loaded_backend(self):
+        results = await asyncio.gather(*(self.provider.invoke_ollama_model_async(f"p{i}") for i in range(6)))
+        self.assertEqual(sorted(results), sorted(f"stub:p{i}" for i in range(6)))
+        self.assertEqual([self._generations(s) for s in self.servers], [3, 3])
+        stats = self.provider.get_backend_stats()["backends"]
+        self.assertTrue(all(b["outstanding"] == 0 and b["requests"] == 3 for b in stats.values()))
+
+    async def test_requests_prefer_backends_that_have_the_model(self):
+        self.servers[0].models = [{"name": "other-model:latest"}]
+        self.servers[1].models = [{"name": MODEL}]
+        self.assertEqual(await self.provider.check_backends_async(), {s.base_url: True for s in self.servers})
+        await asyncio.gather(*(self.provider.invoke_ollama_model_async(f"p{i}") for i in range(4)))
+        self.assertEqual([self._generations(s) for s in self.servers], [0, 4])
+
+    def test_sync_requests_are_routed_too(self):
+        for i in range(4):
+            self.assertEqual(self.provider.invoke_ollama_model(f"sync {i}"), f"stub:sync {i}")
+        self.assertEqual([self._generations(s) for s in self.servers], [2, 2])
+        self.provider.close_sync()
+
+    async def test_streams_are_routed_and_tracked(self):
+        chunks = [c.text async for c in self.provider.stream_async("streamed")]
+        self.assertEqual("".join(chunks), "stub:streamed")
+        self.assertEqual(sum(b["requests"] for b in self.provider.get_backend_stats()["backends"].values()), 1)
+
+
+class TestBackendPoolHealth(BackendPoolTestCase):
+    async def test_failing_backend_is_ejected_and_readmitted_by_a_health_check(self):
+        down = self.servers[1]
+        down_url = down.base_url
+        down.stop()
+        results = [await self.provider.invoke_ollama_model_async(f"p{i}") for i in range(8)]
+        self.assertEqual(results.count(None), 3) # Max consecutive failures, then no more requests to it
+        backends = self.provider.get_backend_stats()["backends"]
+        self.assertFalse(backends[down_url]["healthy"])
+
+        self.servers[1] = OllamaStubServer(port=int(down_url.rsplit(":", 1)[1])).start()
+        self.assertEqual(await self.provider.check_backends_async(), {self.servers[0].base_url: True, down_url: True})
+        await asyncio.gather(*(self.provider.invoke_ollama_model_async(f"q{i}") for i in range(2)))
+        self.assertEqual(self._generations(self.servers[1]), 1)
+
+    async def test_health_check_ejects_unreachable_backends(self):
+        self.servers[0].stop()
+        health = await self.provider.check_backends_async()
+        self.assertEqual(list(health.values()), [False, True])
+        await asyncio.gather(*(self.provider.invoke_ollama_model_async(f"p{i}") for i in range(3)))
+        self.assertEqual(self._generations(self.servers[1]), 3)
+
+    def test_choose_falls_back_to_ejected_backends_when_none_is_healthy(self):
+        pool = BackendPool(["http://a:1", "http://b:2"])
+        for backend in pool.backends:
+            backend.healthy = False
+        self.assertIsNotNone(pool.choose(MODEL))
+        self.assertIsNone(pool.choose(MODEL, exclude=pool.backends))
+
+
+class TestBackendPoolHedging(BackendPoolTestCase):
+    async def test_slow_backend_is_hedged_and_the_first_answer_wins(self):
+        self.servers[0].delay_seconds = 1.0
+        self.provider.backend_pool.hedge_after_seconds = 0.1
+        started = time.monotonic()
+        result = await self.provider.invoke_ollama_model_async("hedged")
+        self.assertEqual(result, "stub:hedged")
+        self.assertLess(time.monotonic() - started, 0.8)
+        stats = self.provider.get_backend_stats()
+        self.assertEqual((stats["hedged_requests"], stats["hedge_wins"]), (1, 1))
+        self.assertEqual(Counter(self._generations(s) for s in self.servers), Counter([1, 1]))
+
+    async def test_fast_answers_are_not_hedged(self):
+        self.provider.backend_pool.hedge_after_seconds = 0.5
+        await self.provider.invoke_ollama_model_async("fast")
+        self.assertEqual(self.provider.get_backend_stats()["hedged_requests"], 0)
+        self.assertEqual(sum(self._generations(s) for s in self.servers), 1)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
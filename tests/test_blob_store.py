@@ -0,0 +1,110 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock
+
+from ai_assistant.core.reflection import ReflectionLogEntry
+from ai_assistant.memory.blob_store import BlobRef, BlobStore, BLOB_REF_MARKER, as_blob_ref, resolve_blob_refs
+from ai_assistant.memory.structured_store import get_structured_store
+from ai_assistant.planning.execution import ExecutionAgent
+
+BIG_TEXT = "line of search results\n" * 2000 # About 46 KB
+
+
+class BlobStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = BlobStore(os.path.join(self.temp_dir, "blobs"), inline_max_bytes=1024)
+
+    def tearDown(self):
+        get_structured_store(self.store.db_path).close()
+        shutil.rmtree(self.temp_dir)
+
+    def _blob_files(self):
+        return [name for _, _, names in os.walk(self.store.root) for name in names]
+
+
+class TestBlobStore(BlobStoreTestCase):
+    def test_put_is_content_addressed_compressed_and_readable(self):
+        ref = self.store.put(BIG_TEXT)
+        self.assertEqual(self.store.put(BIG_TEXT), ref) # Stored once
+        self.assertEqual(len(self._blob_files()), 1)
+        self.assertLess(os.path.getsize(self.store._path(ref.sha256)), ref.size // 10)
+        self.assertEqual(ref.read(), BIG_TEXT)
+        with ref.open_text() as stream:
+            self.assertEqual(stream.readline(), "line of search results\n")
+        self.assertIn(ref.handle[:19], str(ref))
+
+        json_ref = self.store.put({"files": ["a"] * 10})
+        self.assertEqual((json_ref.kind, json_ref.read()), ("json", {"files": ["a"] * 10}))
+
+    def test_store_if_large(self):
+        self.assertEqual(self.store.store_if_large("small"), "small")
+        self.assertEqual(self.store.store_if_large(42), 42)
+        self.assertIsInstance(self.store.store_if_large(BIG_TEXT), BlobRef)
+        self.assertIsInstance(self.store.store_if_large(["x" * 2000]), BlobRef)
+        with self.assertRaises(TypeError):
+            self.store.put(object())
+
+    def test_serialized_refs_round_trip(self):
+        ref = self.store.put(BIG_TEXT)
+        restored = as_blob_ref(ref.to_dict(), self.store)
+        self.assertEqual((restored, restored.read()), (ref, BIG_TEXT))
+        self.assertEqual(as_blob_ref({"other": 1}), {"other": 1})
+        self.assertEqual(resolve_blob_refs([ref, "small"]), [BIG_TEXT, "small"])
+
+    def test_reference_counting_and_gc(self):
+        held = self.store.put(BIG_TEXT)
+        unheld = self.store.put(BIG_TEXT + "!")
+        self.assertEqual(self.store.acquire(held), 1)
+        self.assertEqual(self.store.gc(), 0) # Within the grace period
+        self.assertEqual(self.store.gc(grace_seconds=0), 1)
+        self.assertFalse(self.store.exists(unheld))
+        self.assertEqual(self.store.release(held), 0)
+        self.assertEqual(self.store.gc(grace_seconds=0), 1)
+        self.assertEqual(self._blob_files(), [])
+
+    def test_reflection_entries_log_the_reference(self):
+        ref = self.store.put(BIG_TEXT)
+        entry = ReflectionLogEntry("goal", [{"tool_name": "t"}], [ref], "SUCCESS")
+        logged = entry.to_serializable_dict()["execution_results"][0]
+        self.assertEqual(logged[BLOB_REF_MARKER], ref.handle)
+        self.assertLess(len(str(logged)), 500)
+        self.assertIn("bytes", ReflectionLogEntry.from_serializable_dict(entry.to_serializable_dict()).to_formatted_string())
+
+
+class FakeToolSystem:
+    def __init__(self):
+        self.received = {}
+
+    def list_tools(self):
+        return {}
+
+    async def execute_tool(self, name, args=(), kwargs=None, task_manager=None, notification_manager=None):
+        self.received[name] = args
+        return BIG_TEXT if name == "search" else f"summary of {len(args[0])} chars"
+
+
+@patch("ai_assistant.planning.execution.log_event")
+@patch("ai_assistant.planning.execution.record_tool_goal_association")
+@patch("ai_assistant.planning.execution.global_reflection_log")
+class TestExecutionAgentBlobs(BlobStoreTestCase):
+    def test_large_results_are_logged_by_reference_and_resolved_for_tools(self, mock_log, *_):
+        agent = ExecutionAgent()
+        agent.blob_store = self.store
+        tool_system = FakeToolSystem()
+        plan = [{"tool_name": "search", "args": ["q"]}, {"tool_name": "summarize", "args": ["[[step_1_output]]"]}]
+
+        final_plan, results = asyncio.run(agent.execute_plan("goal", plan, tool_system, MagicMock(), None))
+
+        self.assertEqual(tool_system.received["summarize"], (BIG_TEXT,)) # Streamed back in for the tool
+        self.assertEqual(results, [BIG_TEXT, f"summary of {len(BIG_TEXT)} chars"]) # Callers get the content
+        logged_results = mock_log.log_execution.call_args.kwargs["execution_results"]
+        self.assertIsInstance(logged_results[0], BlobRef)
+        self.assertEqual(self.store.refcount(logged_results[0]), 0) # Nothing holds it beyond the run
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
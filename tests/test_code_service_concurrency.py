@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import time
+from unittest import mock
+
+from ai_assistant.code_services.service import CodeService
+from ai_assistant.core.task_manager import ActiveTaskStatus
+
+
+def _outline(function_count):
+    return {
+        "module_name": "tool.py",
+        "imports": [],
+        "components": [
+            {"type": "function", "name": f"func_{i}", "signature": "()", "description": f"d{i}", "body_placeholder": "pass"}
+            for i in range(function_count)
+        ]
+    }
+
+
+class TestConcurrentComponentGeneration(unittest.IsolatedAsyncioTestCase):
+    """Component details of an outline are generated concurrently, bounded, with retries and progress."""
+
+    def setUp(self):
+        self.task_manager = mock.Mock()
+        self.task_manager.add_task.return_value = mock.Mock(task_id="task-1")
+        self.code_service = CodeService(llm_provider=mock.AsyncMock(), task_manager=self.task_manager)
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _patch_outline(self, outline):
+        return mock.patch.object(self.code_service, '_generate_hierarchical_outline', return_value={
+            "status": "SUCCESS_OUTLINE_GENERATED", "parsed_outline": outline, "logs": [], "error": None
+        })
+
+    def _slow_detail(self, delays=None, failures=None):
+        failures = dict(failures or {})
+        async def detail(component_definition, full_outline, llm_config):
+            name = component_definition["name"]
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep((delays or {}).get(name, 0.05))
+            finally:
+                self.in_flight -= 1
+            if failures.get(name, 0) > 0:
+                failures[name] -= 1
+                return None
+            return f"def {name}():\n    return '{name}'"
+        return detail
+
+    async def test_components_generated_concurrently_in_outline_order(self):
+        outline = _outline(10)
+        # Later components finish first; assembly must still follow the outline.
+        delays = {f"func_{i}": 0.01 * (10 - i) for i in range(10)}
+        with self._patch_outline(outline), \
+             mock.patch.object(self.code_service, '_generate_detail_for_component', side_effect=self._slow_detail(delays)), \
+             mock.patch('ai_assistant.code_services.service.CODE_GEN_COMPONENT_CONCURRENCY', 10), \
+             mock.patch.object(self.code_service, '_run_linter', return_value=([], None)):
+            start = time.perf_counter()
+            result = await self.code_service.generate_code("HIERARCHICAL_GEN_COMPLETE_TOOL", "ten functions")
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(result["status"], "SUCCESS_HIERARCHICAL_ASSEMBLED")
+        self.assertLess(elapsed, 0.5) # Sequential would take ~0.55s
+        self.assertEqual(self.max_in_flight, 10)
+        self.assertEqual(list(result["component_details"]), [f"func_{i}" for i in range(10)])
+        positions = [result["code_string"].index(f"def func_{i}()") for i in range(10)]
+        self.assertEqual(positions, sorted(positions))
+
+    async def test_concurrency_is_bounded(self):
+        with self._patch_outline(_outline(6)), \
+             mock.patch.object(self.code_service, '_generate_detail_for_component', side_effect=self._slow_detail()), \
+             mock.patch('ai_assistant.code_services.service.CODE_GEN_COMPONENT_CONCURRENCY', 2):
+            result = await self.code_service.generate_code("EXPERIMENTAL_HIERARCHICAL_FULL_TOOL", "six functions")
+        self.assertEqual(result["status"], "SUCCESS_HIERARCHICAL_DETAILS_GENERATED")
+        self.assertEqual(self.max_in_flight, 2)
+
+    async def test_failed_and_timed_out_components_are_retried(self):
+        detail = self._slow_detail(delays={"func_1": 0.01}, failures={"func_0": 1})
+        attempts = {"func_1": 0}
+        async def detail_with_hang(component_definition, full_outline, llm_config):
+            if component_definition["name"] == "func_1":
+                attempts["func_1"] += 1
+                if attempts["func_1"] == 1:
+                    await asyncio.sleep(10) # Hangs until the per-attempt timeout
+            return await detail(component_definition, full_outline, llm_config)
+
+        with self._patch_outline(_outline(3)), \
+             mock.patch.object(self.code_service, '_generate_detail_for_component', side_effect=detail_with_hang) as mock_detail, \
+             mock.patch('ai_assistant.code_services.service.CODE_GEN_COMPONENT_TIMEOUT_SECONDS', 0.2), \
+             mock.patch('ai_assistant.code_services.service.CODE_GEN_COMPONENT_MAX_RETRIES', 1):
+            result = await self.code_service.generate_code("EXPERIMENTAL_HIERARCHICAL_FULL_TOOL", "three functions")
+
+        self.assertEqual(result["status"], "SUCCESS_HIERARCHICAL_DETAILS_GENERATED")
+        self.assertEqual(mock_detail.call_count, 5)
+        self.assertTrue(any("Timed out" in line and "func_1" in line for line in result["logs"]))
+
+    async def test_component_failing_every_attempt_gives_partial_result(self):
+        with self._patch_outline(_outline(2)), \
+             mock.patch.object(self.code_service, '_generate_detail_for_component',
+                               side_effect=self._slow_detail(failures={"func_1": 5})), \
+             mock.patch('ai_assistant.code_services.service.CODE_GEN_COMPONENT_MAX_RETRIES', 2):
+            result = await self.code_service.generate_code("EXPERIMENTAL_HIERARCHICAL_FULL_TOOL", "two functions")
+        self.assertEqual(result["status"], "PARTIAL_HIERARCHICAL_DETAILS_GENERATED")
+        self.assertIsNone(result["component_details"]["func_1"])
+
+    async def test_progress_reported_to_task_manager(self):
+        with self._patch_outline(_outline(4)), \
+             mock.patch.object(self.code_service, '_generate_detail_for_component', side_effect=self._slow_detail()):
+            await self.code_service.generate_code("EXPERIMENTAL_HIERARCHICAL_FULL_TOOL", "four functions")
+        progress_values = [
+            call.kwargs["progress"] for call in self.task_manager.update_task_status.call_args_list
+            if call.args[1] == ActiveTaskStatus.GENERATING_CODE and call.kwargs.get("progress") is not None
+        ]
+        self.assertEqual(progress_values, [25, 50, 75, 100])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from ai_assistant.communication import cli
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.core.deadline import (
+    Deadline, DeadlineExceededError, check_deadline, current_deadline, deadline_expired, deadline_scope,
+    run_within_deadline, shrink_timeout
+)
+from ai_assistant.llm_interface.circuit_breaker import reset_circuit_breakers
+from ai_assistant.llm_interface.errors import LLMDeadlineExceededError
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.planning.execution import ExecutionAgent
+from ai_assistant.tools import tool_catalog
+from ai_assistant.tools.tool_system import ToolSystem
+from tests.ollama_stub_server import OllamaStubServer
+
+
+async def _slow_tool(seconds: float) -> str:
+    await asyncio.sleep(float(seconds))
+    return "done"
+
+
+class TestDeadline(unittest.TestCase):
+    def test_remaining_shrink_and_nesting(self):
+        self.assertIsNone(current_deadline())
+        self.assertEqual(shrink_timeout(600.0), 600.0) # No deadline: timeouts are unchanged
+        with deadline_scope(10) as outer:
+            self.assertIs(current_deadline(), outer)
+            self.assertLessEqual(shrink_timeout(600.0), 10)
+            self.assertEqual(shrink_timeout(1.0), 1.0)
+            self.assertLessEqual(shrink_timeout(0), 10) # "No timeout" becomes the remaining time
+            with deadline_scope(60, label="step") as inner:
+                self.assertLessEqual(inner.remaining(), 10) # Never outlives the enclosing deadline
+            with deadline_scope(None) as unbounded_inner:
+                self.assertLessEqual(unbounded_inner.remaining(), 10)
+        self.assertIsNone(current_deadline())
+        self.assertIsNone(Deadline(0).remaining())
+
+    def test_expiry_and_cancellation(self):
+        with deadline_scope(0.01) as deadline:
+            check_deadline("planning")
+            time.sleep(0.02)
+            self.assertTrue(deadline_expired())
+            with self.assertRaisesRegex(DeadlineExceededError, "used up before planning"):
+                check_deadline("planning")
+        with deadline_scope(60) as deadline:
+            with deadline_scope(30) as inner:
+                deadline.cancel()
+                self.assertTrue(inner.expired())
+                with self.assertRaisesRegex(DeadlineExceededError, "cancelled"):
+                    check_deadline()
+
+
+class TestRunWithinDeadline(unittest.IsolatedAsyncioTestCase):
+    async def test_work_is_cancelled_when_the_deadline_passes(self):
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with deadline_scope(0.05):
+            started = time.perf_counter()
+            with self.assertRaises(DeadlineExceededError):
+                await run_within_deadline(slow(), "slow work finished")
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertTrue(cancelled.is_set())
+
+    async def test_own_timeouts_and_unbounded_work_pass_through(self):
+        async def own_timeout():
+            raise asyncio.TimeoutError()
+
+        with deadline_scope(60):
+            with self.assertRaises(asyncio.TimeoutError) as ctx:
+                await run_within_deadline(own_timeout())
+            self.assertNotIsInstance(ctx.exception, DeadlineExceededError)
+        self.assertEqual(await run_within_deadline(asyncio.sleep(0, result="ok")), "ok")
+
+    async def test_deadline_follows_work_into_threads(self):
+        with deadline_scope(60) as deadline:
+            self.assertIs(await asyncio.to_thread(current_deadline), deadline)
+
+
+class TestOllamaClientDeadline(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        reset_circuit_breakers()
+        self.server = OllamaStubServer().start()
+        self.provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=self.server.base_url)
+
+    async def asyncTearDown(self):
+        await self.provider.close()
+        self.server.stop()
+        reset_circuit_breakers()
+
+    async def test_no_request_is_sent_once_the_deadline_has_expired(self):
+        with deadline_scope(60) as deadline:
+            deadline.cancel()
+            self.assertIsNone(await self.provider.invoke_ollama_model_async("hello", cache=False))
+            self.assertIsNone(self.provider.invoke_ollama_model("hello", cache=False))
+            with self.assertRaises(LLMDeadlineExceededError):
+                [c async for c in self.provider.stream_async("hello")]
+        self.assertEqual(self.server.requests, [])
+
+    async def test_request_timeout_is_shrunk_to_the_remaining_budget_and_not_retried(self):
+        self.server.delay_seconds = 2.0
+        with deadline_scope(0.2):
+            started = time.perf_counter()
+            self.assertIsNone(await self.provider.invoke_ollama_model_async("slow", cache=False))
+            self.assertLess(time.perf_counter() - started, 1.5)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.provider.get_circuit_stats()[self.server.base_url]["window_failures"], 0)
+
+
+class TestToolAndPlanDeadline(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.previous_provider = tool_catalog._active_catalog_provider
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", []):
+            self.tool_system = ToolSystem(tool_registry_file=os.path.join(self.temp_dir, "tool_registry.json"))
+        self.tool_system.register_tool("slow_tool", "Sleeps.", __name__, "_slow_tool", func_callable=_slow_tool)
+
+    def tearDown(self):
+        tool_catalog.set_active_catalog_provider(self.previous_provider)
+        shutil.rmtree(self.temp_dir)
+
+    def test_tool_calls_are_bounded_by_the_deadline(self):
+        async def run():
+            with deadline_scope(0.05):
+                self.assertEqual(await self.tool_system.execute_tool("slow_tool", args=(0,)), "done")
+                with self.assertRaises(DeadlineExceededError):
+                    await self.tool_system.execute_tool("slow_tool", args=(5,))
+                with self.assertRaises(DeadlineExceededError): # Not started at all any more
+                    await self.tool_system.execute_tool("slow_tool", args=(0,))
+
+        started = time.perf_counter()
+        asyncio.run(run())
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_expired_deadline_stops_step_retries_and_replanning(self):
+        tool_system = MagicMock()
+        tool_system.execute_tool = AsyncMock(side_effect=DeadlineExceededError("used up"))
+        planner = MagicMock()
+        planner.replan_after_failure = AsyncMock()
+        agent = ExecutionAgent()
+
+        async def run():
+            with deadline_scope(60) as deadline:
+                deadline.cancel()
+                return await agent.execute_plan("goal", [{"tool_name": "t", "args": ()}], tool_system, planner, None)
+
+        with patch("ai_assistant.planning.execution.global_reflection_log"):
+            _, results = asyncio.run(run())
+        self.assertIsInstance(results[0], DeadlineExceededError)
+        self.assertEqual(tool_system.execute_tool.await_count, 1)
+        planner.replan_after_failure.assert_not_called()
+
+
+class TestCliPromptDeadline(unittest.IsolatedAsyncioTestCase):
+    def _orchestrator(self, process_prompt):
+        orchestrator = MagicMock()
+        orchestrator.process_prompt = process_prompt
+        return orchestrator
+
+    async def test_prompt_is_cancelled_when_its_budget_runs_out(self):
+        seen = {}
+
+        async def slow_prompt(prompt, on_partial_output=None):
+            seen["deadline"] = current_deadline()
+            await asyncio.sleep(5)
+
+        queue = asyncio.Queue()
+        with patch.object(cli, "PROMPT_DEADLINE_SECONDS", 0.05), patch.object(cli, "PROMPT_DEADLINE_GRACE_SECONDS", 0.0), \
+             patch.object(cli, "_orchestrator", None), patch.object(cli, "log_event"):
+            await cli._process_command_wrapper("do it", self._orchestrator(slow_prompt), queue)
+        self.assertIsNotNone(seen["deadline"])
+        items = [queue.get_nowait() for _ in range(queue.qsize())]
+        self.assertEqual(items[-1]["type"], "command_result")
+        self.assertFalse(items[-1]["success"])
+        self.assertIn("time budget", items[-1]["response"])
+
+    async def test_user_cancel_cancels_the_prompt(self):
+        started = asyncio.Event()
+
+        async def slow_prompt(prompt, on_partial_output=None):
+            started.set()
+            await asyncio.sleep(5)
+
+        queue = asyncio.Queue()
+        task = asyncio.create_task(cli._process_command_wrapper("do it", self._orchestrator(slow_prompt), queue))
+        await started.wait()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(queue.get_nowait(), {"type": "command_result", "prompt": "do it", "success": False, "response": "Cancelled."})
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from ai_assistant.memory import event_logger
+from ai_assistant.memory.event_logger import EventLogStore, migrate_legacy_event_log, rotated_log_path
+
+
+def _event(n):
+    return {"timestamp": "2025-01-01T00:00:00+00:00", "event_id": f"e{n}", "event_type": "T", "description": str(n)}
+
+
+class TestEventLogStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "event_log.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_writes_one_line_per_event(self):
+        store = EventLogStore(self.log_path)
+        for n in range(3):
+            store.append(_event(n))
+        store.close()
+        with open(self.log_path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(line)["event_id"] for line in lines], ["e0", "e1", "e2"])
+
+    def test_tail_returns_newest_first_across_blocks(self):
+        store = EventLogStore(self.log_path)
+        for n in range(500): # Several tail-read blocks worth of lines
+            store.append(_event(n))
+        tail = store.tail(3)
+        self.assertEqual([e["event_id"] for e in tail], ["e499", "e498", "e497"])
+        self.assertEqual(len(store.tail(1000)), 500)
+        store.close()
+
+    def test_tail_skips_corrupted_lines(self):
+        store = EventLogStore(self.log_path)
+        store.append(_event(1))
+        store.close()
+        with open(self.log_path, 'a', encoding='utf-8') as f:
+            f.write('{"truncated": \n')
+        store.append(_event(2))
+        self.assertEqual([e["event_id"] for e in store.tail(5)], ["e2", "e1"])
+        store.close()
+
+    def test_size_rotation_keeps_bounded_segments_and_tail_spans_them(self):
+        line_size = len(json.dumps(_event(10)) + "\n")
+        store = EventLogStore(self.log_path, max_bytes=line_size * 3, max_rotated_files=2)
+        for n in range(10, 22):
+            store.append(_event(n))
+        self.assertEqual(store.segment_paths(), [self.log_path, rotated_log_path(self.log_path, 1), rotated_log_path(self.log_path, 2)])
+        self.assertFalse(os.path.exists(rotated_log_path(self.log_path, 3)))
+        tail = store.tail(100)
+        self.assertEqual([e["event_id"] for e in tail], [f"e{n}" for n in range(21, 12, -1)])
+        store.close()
+
+    def test_age_rotation(self):
+        store = EventLogStore(self.log_path, max_age_seconds=60.0)
+        with patch("ai_assistant.memory.event_logger.time.time", return_value=1000.0):
+            store.append(_event(1))
+        with patch("ai_assistant.memory.event_logger.time.time", return_value=1100.0):
+            store.append(_event(2))
+        self.assertTrue(os.path.exists(rotated_log_path(self.log_path, 1)))
+        self.assertEqual([e["event_id"] for e in store.tail(5)], ["e2", "e1"])
+        store.close()
+
+    def test_fsync_is_batched(self):
+        store = EventLogStore(self.log_path, fsync_batch_size=5, fsync_interval_seconds=3600.0)
+        with patch("ai_assistant.memory.event_logger.os.fsync") as mock_fsync:
+            for n in range(12):
+                store.append(_event(n))
+            self.assertEqual(mock_fsync.call_count, 2)
+            store.close()
+            self.assertEqual(mock_fsync.call_count, 3) # Remaining events synced on close
+
+
+class TestLegacyMigration(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.temp_dir, "event_log.jsonl")
+        self.legacy_path = os.path.join(self.temp_dir, "event_log.json")
+        with open(self.legacy_path, 'w', encoding='utf-8') as f:
+            json.dump([_event(1), _event(2)], f, indent=4)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_migration_preserves_order_and_runs_once(self):
+        with open(self.log_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(_event(3)) + "\n")
+        self.assertEqual(migrate_legacy_event_log(self.legacy_path, self.log_path), 2)
+        self.assertFalse(os.path.exists(self.legacy_path))
+        self.assertTrue(os.path.exists(self.legacy_path + ".migrated"))
+        self.assertEqual(migrate_legacy_event_log(self.legacy_path, self.log_path), 0)
+        store = EventLogStore(self.log_path)
+        self.assertEqual([e["event_id"] for e in store.tail(10)], ["e3", "e2", "e1"])
+        store.close()
+
+    def test_module_functions_migrate_on_first_use(self):
+        with patch.object(event_logger, "EVENT_LOG_FILE", self.log_path), \
+             patch.object(event_logger, "LEGACY_EVENT_LOG_FILE", self.legacy_path):
+            try:
+                logged = event_logger.log_event("NEW", "new event", "test")
+                recent = event_logger.get_recent_events(limit=2)
+            finally:
+                event_logger.close_event_log()
+        self.assertEqual([e["event_id"] for e in recent], [logged["event_id"], "e2"])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
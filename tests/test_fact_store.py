@@ -0,0 +1,116 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from ai_assistant.memory.fact_store import FactStore, tokenize
+from ai_assistant.custom_tools import knowledge_tools
+
+
+def _fact(fact_id, text, category="general_knowledge"):
+    return {"fact_id": fact_id, "text": text, "category": category, "source": "test",
+            "created_at": "2025-01-01T00:00:00+00:00", "updated_at": "2025-01-01T00:00:00+00:00"}
+
+
+class TestFactStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.facts_path = os.path.join(self.temp_dir, "learned_facts.json")
+        self.facts = [
+            _fact("f1", "The user's name is Alex.", "user_preference"),
+            _fact("f2", "The capital of France is Paris."),
+            _fact("f3", "The user prefers Python for scripting and Python tooling.", "user_preference"),
+            _fact("f4", "The project name is 'hangman'.", "project_context"),
+            _fact("f5", "Paris hosted the 2024 Olympics."),
+        ]
+        with open(self.facts_path, 'w', encoding='utf-8') as f:
+            json.dump(self.facts, f)
+        self.store = FactStore(self.facts_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tokenize_drops_stopwords_and_punctuation(self):
+        self.assertEqual(tokenize("What is the capital of France?"), ["capital", "france"])
+
+    def test_search_ranks_by_bm25(self):
+        results = self.store.search("capital of Paris, France")
+        self.assertEqual([f["fact_id"] for f in results], ["f2", "f5"])
+        self.assertEqual(self.store.search("python")[0]["fact_id"], "f3")
+        self.assertEqual(self.store.search("nothing relevant"), [])
+
+    def test_search_top_k_and_category_filter(self):
+        self.assertEqual(len(self.store.search("paris", top_k=1)), 1)
+        results = self.store.search("user name paris", top_k=None, categories=["user_preference"])
+        self.assertEqual({f["fact_id"] for f in results}, {"f1", "f3"})
+
+    def test_recent_filters_categories_and_excludes(self):
+        results = self.store.recent(limit=2, categories=["user_preference", "project_context"], exclude_ids=["f4"])
+        self.assertEqual([f["fact_id"] for f in results], ["f3", "f1"])
+        self.assertEqual([f["fact_id"] for f in self.store.recent(limit=1)], ["f5"])
+
+    def test_external_write_invalidates_by_mtime(self):
+        self.assertEqual(len(self.store), 5)
+        with open(self.facts_path, 'w', encoding='utf-8') as f:
+            json.dump(self.facts + [_fact("f6", "Rust is a systems language.")], f)
+        self.assertEqual(self.store.search("rust")[0]["fact_id"], "f6")
+
+    def test_unchanged_file_is_not_reloaded(self):
+        self.store.search("paris")
+        with patch("ai_assistant.memory.fact_store.load_learned_facts") as mock_load:
+            self.store.search("python")
+            self.store.recent(limit=2)
+        mock_load.assert_not_called()
+
+    def test_save_is_write_through(self):
+        self.store.search("paris")
+        new_facts = self.facts[:1] + [_fact("f9", "The user likes green tea.")]
+        with patch("ai_assistant.memory.fact_store.load_learned_facts") as mock_load:
+            self.assertTrue(self.store.save(new_facts))
+            self.assertEqual(self.store.search("tea")[0]["fact_id"], "f9")
+        mock_load.assert_not_called()
+        with open(self.facts_path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)), 2)
+
+    def test_missing_file_is_empty(self):
+        store = FactStore(os.path.join(self.temp_dir, "missing.json"))
+        self.assertEqual(store.search("anything"), [])
+        self.assertEqual(store.all_facts(), [])
+
+    def test_search_stays_fast_with_many_facts(self):
+        many_facts = [_fact(f"n{i}", f"Fact number {i} about topic{i % 500} and subject{i % 37}.") for i in range(30000)]
+        self.store.save(many_facts)
+        self.store.search("topic7 subject3") # Warm up
+        start = time.perf_counter()
+        for _ in range(20):
+            results = self.store.search("tell me about topic7 and subject3", top_k=5)
+        per_query = (time.perf_counter() - start) / 20
+        self.assertEqual(len(results), 5)
+        self.assertLess(per_query, 0.01) # Generous bound for slow CI; typically well under 1ms
+
+
+class TestRecallFacts(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        facts_path = os.path.join(self.temp_dir, "learned_facts.json")
+        with open(facts_path, 'w', encoding='utf-8') as f:
+            json.dump([_fact("f1", "The capital of France is Paris."), _fact("f2", "The user's name is Alex.")], f)
+        self.store_patcher = patch("ai_assistant.custom_tools.knowledge_tools.get_fact_store",
+                                   return_value=FactStore(facts_path))
+        self.store_patcher.start()
+
+    def tearDown(self):
+        self.store_patcher.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_recall_returns_fact_texts(self):
+        self.assertEqual(knowledge_tools.recall_facts(), ["The capital of France is Paris.", "The user's name is Alex."])
+        self.assertEqual(knowledge_tools.recall_facts("paris"), ["The capital of France is Paris."])
+        self.assertEqual(knowledge_tools.recall_facts("Berlin"), [])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -4,6 +4,7 @@ import asyncio
 import os
 import datetime
 import tempfile
+import shutil
 import json
 import uuid # Added for generating entry_ids
 from typing import List, Dict, Any, Optional
@@ -52,14 +53,13 @@ class TestActionableInsight(unittest.TestCase):
 class TestLearningAgent(unittest.TestCase):
 
     def setUp(self):
-        self.temp_insights_file = tempfile.NamedTemporaryFile(delete=False, mode='w+', suffix='.json')
-        self.temp_insights_filepath = self.temp_insights_file.name
-        self.temp_insights_file.close()
+        # Each test gets its own data directory, so its own insights table
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_insights_filepath = os.path.join(self.temp_dir, "actionable_insights.json")
         # self.agent is no longer created here to allow per-test mocking of ActionExecutor
 
     def tearDown(self):
-        if os.path.exists(self.temp_insights_filepath):
-            os.remove(self.temp_insights_filepath)
+        shutil.rmtree(self.temp_dir)
 
     def _create_mock_reflection_entry(
         self,
@@ -119,6 +119,9 @@ class TestLearningAgent(unittest.TestCase):
             self.assertEqual(len(agent.insights), 2)
             self.assertEqual(agent.insights[0].insight_id, "id1")
             self.assertEqual(agent.insights[1].type, InsightType.TOOL_BUG_SUSPECTED)
+        # The legacy JSON file is imported once and set aside
+        self.assertFalse(os.path.exists(self.temp_insights_filepath))
+        self.assertTrue(os.path.exists(self.temp_insights_filepath + ".migrated"))
 
     def test_process_reflection_entry_generates_insight(self):
         with mock.patch('ai_assistant.learning.learning.ActionExecutor'): # Mock ActionExecutor
@@ -139,11 +142,9 @@ class TestLearningAgent(unittest.TestCase):
             self.assertEqual(insight.source_reflection_entry_ids[0], mock_entry_failure.entry_id) # Verify entry_id
             self.assertEqual(insight.metadata.get("original_reflection_entry_ref_id"), mock_entry_failure.entry_id) # Verify metadata
 
-            self.assertTrue(os.path.exists(self.temp_insights_filepath))
-            with open(self.temp_insights_filepath, 'r') as f:
-                saved_data = json.load(f)
-                self.assertEqual(len(saved_data), 1)
-                self.assertEqual(saved_data[0]['insight_id'], insight.insight_id)
+            saved_data = agent.repository.find()
+            self.assertEqual(len(saved_data), 1)
+            self.assertEqual(saved_data[0]['insight_id'], insight.insight_id)
 
     async def test_review_and_propose_next_action_selects_highest_priority(self):
         # Instantiate agent here to allow easier mocking of its action_executor
@@ -0,0 +1,188 @@
+import unittest
+import socket
+import time
+from unittest.mock import patch
+
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.debugging.resilience import retry_with_backoff
+from ai_assistant.llm_interface.circuit_breaker import (
+    CircuitBreaker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, get_circuit_breaker, reset_circuit_breakers
+)
+from ai_assistant.llm_interface.errors import (
+    LLMCircuitOpenError, LLMConnectionError, LLMHTTPError, LLMResponseError, is_retryable_llm_error
+)
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.utils.conversational_helpers import rephrase_error_message_conversationally
+from tests.ollama_stub_server import OllamaStubServer
+
+
+def _unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _fail(breaker, error=None):
+    try:
+        with breaker.guard():
+            raise error or LLMConnectionError("refused")
+    except LLMConnectionError:
+        pass
+
+
+def _succeed(breaker):
+    with breaker.guard():
+        pass
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_once_the_failure_rate_is_reached_over_enough_requests(self):
+        breaker = CircuitBreaker("b", min_requests=4, failure_rate=0.5, open_seconds=60)
+        _succeed(breaker)
+        _fail(breaker)
+        _fail(breaker)
+        self.assertEqual(breaker.state, STATE_CLOSED) # Only 3 requests in the window
+        _succeed(breaker)
+        self.assertEqual(breaker.state, STATE_OPEN)   # 2/4 failed
+        with self.assertRaises(LLMCircuitOpenError):
+            breaker.before_request()
+        self.assertEqual(breaker.stats()["rejected"], 1)
+
+    def test_client_errors_and_old_failures_do_not_count(self):
+        breaker = CircuitBreaker("b", window_seconds=0.05, min_requests=2, failure_rate=0.5)
+        for _ in range(3):
+            try:
+                with breaker.guard():
+                    raise LLMHTTPError("not found", status=404)
+            except LLMHTTPError:
+                pass
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.stats()["window_requests"], 0) # Not counted as successes either
+        _fail(breaker)
+        time.sleep(0.06)
+        _fail(breaker)
+        self.assertEqual(breaker.stats()["window_failures"], 1)
+        self.assertEqual(breaker.state, STATE_CLOSED)
+
+    def test_errors_that_are_not_the_servers_fault_do_not_dilute_the_failure_rate(self):
+        breaker = CircuitBreaker("b", min_requests=2, failure_rate=0.5, open_seconds=60)
+        _fail(breaker)
+        for error in (LLMHTTPError("bad request", status=400), ValueError("bug"), LLMHTTPError("unavailable", status=503)):
+            with self.assertRaises(type(error)):
+                with breaker.guard():
+                    raise error
+        self.assertEqual(breaker.state, STATE_OPEN) # 2/2 failed, not 2/4
+
+    def test_half_open_probe_closes_or_reopens_the_circuit(self):
+        breaker = CircuitBreaker("b", min_requests=1, failure_rate=0.5, open_seconds=0.05)
+        _fail(breaker)
+        self.assertEqual(breaker.state, STATE_OPEN)
+        time.sleep(0.06)
+        self.assertTrue(breaker.before_request()) # The probe
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        with self.assertRaises(LLMCircuitOpenError): # Only one probe at a time
+            breaker.before_request()
+        breaker.record(True, probe=True)
+        self.assertEqual(breaker.state, STATE_OPEN)
+
+        time.sleep(0.06)
+        _succeed(breaker)
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.stats()["times_opened"], 2)
+
+    def test_disabled_breaker_never_opens(self):
+        breaker = CircuitBreaker("b", min_requests=1, enabled=False)
+        _fail(breaker)
+        _succeed(breaker)
+        self.assertEqual(breaker.state, STATE_CLOSED)
+
+
+class TestRetryIf(unittest.TestCase):
+    def test_only_retryable_errors_are_retried(self):
+        calls = []
+
+        @retry_with_backoff(retries=2, base_delay=0.001, jitter=False, retry_if=is_retryable_llm_error)
+        def call(error):
+            calls.append(error)
+            raise error
+
+        with self.assertRaises(LLMConnectionError):
+            call(LLMConnectionError("refused"))
+        self.assertEqual(len(calls), 3)
+        for error in (LLMResponseError("bad json"), LLMCircuitOpenError("open"), LLMHTTPError("missing", status=404)):
+            calls.clear()
+            with self.assertRaises(type(error)):
+                call(error)
+            self.assertEqual(len(calls), 1)
+        self.assertTrue(is_retryable_llm_error(LLMHTTPError("unavailable", status=503)))
+
+
+class TestOllamaClientFailFast(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        reset_circuit_breakers()
+        self.patcher = patch("ai_assistant.llm_interface.ollama_client.LLM_REQUEST_RETRIES", 0)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        reset_circuit_breakers()
+
+    async def test_requests_to_a_dead_server_fail_fast_once_the_circuit_opens(self):
+        base_url = f"http://127.0.0.1:{_unused_port()}"
+        provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=base_url)
+        try:
+            for i in range(5):
+                self.assertIsNone(await provider.invoke_ollama_model_async(f"prompt {i}", cache=False))
+            self.assertEqual(provider.get_circuit_stats()[base_url]["state"], STATE_OPEN)
+
+            started = time.perf_counter()
+            self.assertIsNone(await provider.invoke_ollama_model_async("another prompt", cache=False))
+            self.assertIsNone(provider.invoke_ollama_model("a sync prompt", cache=False))
+            message = await rephrase_error_message_conversationally("Tool X failed", "do the thing", provider, model_name="m")
+            self.assertLess(time.perf_counter() - started, 0.5)
+            self.assertIn("Tool X failed", message)
+            self.assertEqual(provider.get_circuit_stats()[base_url]["rejected"], 3)
+        finally:
+            await provider.close()
+
+    async def test_transient_server_errors_are_retried_and_a_probe_closes_the_circuit(self):
+        with OllamaStubServer() as server:
+            provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=server.base_url)
+            try:
+                server.fail_requests = 1
+                with patch("ai_assistant.llm_interface.ollama_client.LLM_REQUEST_RETRIES", 1):
+                    self.assertEqual(await provider.invoke_ollama_model_async("hello", cache=False), "stub:hello")
+                self.assertEqual(len(server.requests), 2)
+
+                server.fail_status, server.fail_requests = 404, 1 # Not transient: neither retried nor counted
+                self.assertIsNone(await provider.invoke_ollama_model_async("hello", cache=False))
+                self.assertEqual(len(server.requests), 3)
+                self.assertEqual(provider.get_circuit_stats()[server.base_url]["window_failures"], 1)
+
+                breaker = get_circuit_breaker(server.base_url)
+                breaker.open_seconds = 0.05
+                server.fail_status, server.fail_requests = 500, 2 # Opens the circuit (3 of 5 failed); the rest are rejected
+                for _ in range(4):
+                    await provider.invoke_ollama_model_async("hello", cache=False)
+                self.assertEqual(breaker.state, STATE_OPEN)
+                time.sleep(0.06)
+                self.assertEqual(await provider.invoke_ollama_model_async("hello", cache=False), "stub:hello")
+                self.assertEqual(breaker.state, STATE_CLOSED)
+            finally:
+                await provider.close()
+
+    async def test_unexpected_errors_and_empty_responses_are_failures_not_successes(self):
+        with OllamaStubServer(responder=lambda path, payload: {"response": "", "done": True}) as server:
+            provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=server.base_url)
+            try:
+                self.assertIsNone(provider.invoke_ollama_model("hello", cache=False))
+                with patch("ai_assistant.llm_interface.ollama_client.process_llm_response", side_effect=RuntimeError("bug")):
+                    self.assertIsNone(await provider.invoke_ollama_model_async("hello", cache=False))
+                self.assertEqual(len(server.requests), 2)
+                self.assertEqual(provider.get_circuit_stats()[server.base_url]["window_requests"], 0) # Not recorded as successes
+            finally:
+                await provider.close()
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import asyncio
+import threading
+from unittest.mock import patch
+
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.llm_interface.request_scheduler import (
+    LLMRequestScheduler, PRIORITY_BACKGROUND, PRIORITY_BATCH, PRIORITY_INTERACTIVE,
+    current_llm_priority, endpoint_key, llm_priority
+)
+from tests.ollama_stub_server import OllamaStubServer
+
+ENDPOINT = "http://ollama:11434"
+
+
+class TestLLMRequestScheduler(unittest.IsolatedAsyncioTestCase):
+    async def _queue(self, scheduler, order, name, priority, model="m", endpoint=ENDPOINT):
+        async with scheduler.slot(model, endpoint, priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def test_interactive_requests_overtake_queued_background_work(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=1, interactive_reserved_slots=0)
+        order = []
+        await scheduler.acquire("m", ENDPOINT, PRIORITY_BACKGROUND)
+        queued = [asyncio.create_task(self._queue(scheduler, order, name, priority)) for name, priority in
+                  [("batch", PRIORITY_BATCH), ("background", PRIORITY_BACKGROUND), ("user", PRIORITY_INTERACTIVE)]]
+        await asyncio.sleep(0.01)
+        self.assertEqual(scheduler.stats()["queue_depth"], {PRIORITY_INTERACTIVE: 1, PRIORITY_BACKGROUND: 1, PRIORITY_BATCH: 1})
+
+        scheduler.release("m", ENDPOINT)
+        await asyncio.gather(*queued)
+        self.assertEqual(order, ["user", "background", "batch"])
+        stats = scheduler.stats()
+        self.assertEqual(stats["in_flight"], {"models": {}, "endpoints": {}})
+        self.assertEqual(stats["wait_seconds"][PRIORITY_BATCH]["admitted"], 1)
+        self.assertGreater(stats["wait_seconds"][PRIORITY_BATCH]["max"], stats["wait_seconds"][PRIORITY_INTERACTIVE]["max"])
+
+    async def test_reserved_slot_is_kept_for_interactive_requests(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=2, interactive_reserved_slots=1)
+        await scheduler.acquire("m", ENDPOINT, PRIORITY_BACKGROUND)
+        background = asyncio.create_task(scheduler.acquire("m", ENDPOINT, PRIORITY_BACKGROUND))
+        await asyncio.sleep(0.01)
+        self.assertFalse(background.done())
+        await asyncio.wait_for(scheduler.acquire("m", ENDPOINT, PRIORITY_INTERACTIVE), timeout=1)
+        scheduler.release("m", ENDPOINT)
+        scheduler.release("m", ENDPOINT)
+        await asyncio.wait_for(background, timeout=1)
+
+    async def test_per_model_limits_and_separate_endpoints(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=4, max_per_model=4, model_limits={"big": 1})
+        await scheduler.acquire("big", ENDPOINT)
+        second_big = asyncio.create_task(scheduler.acquire("big", ENDPOINT))
+        await asyncio.wait_for(scheduler.acquire("small", ENDPOINT), timeout=1) # Not held up by the busy model
+        await asyncio.wait_for(scheduler.acquire("big", "http://other:11434"), timeout=1)
+        self.assertFalse(second_big.done())
+        self.assertEqual(scheduler.stats()["in_flight"]["models"], {"big": 2, "small": 1})
+        scheduler.release("big", ENDPOINT)
+        await asyncio.wait_for(second_big, timeout=1)
+
+    async def test_waiting_requests_age_into_higher_classes(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=1, interactive_reserved_slots=0, aging_seconds=0.05)
+        order = []
+        await scheduler.acquire("m", ENDPOINT)
+        old_batch = asyncio.create_task(self._queue(scheduler, order, "old batch", PRIORITY_BATCH))
+        await asyncio.sleep(0.12) # Two classes' worth of waiting
+        new_user = asyncio.create_task(self._queue(scheduler, order, "new user", PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        scheduler.release("m", ENDPOINT)
+        await asyncio.gather(old_batch, new_user)
+        self.assertEqual(order, ["old batch", "new user"])
+
+    async def test_cancelled_waiters_leave_the_queue(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=1)
+        await scheduler.acquire("m", ENDPOINT)
+        waiter = asyncio.create_task(scheduler.acquire("m", ENDPOINT))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(sum(scheduler.stats()["queue_depth"].values()), 0)
+        scheduler.release("m", ENDPOINT)
+        self.assertEqual(scheduler.stats()["in_flight"]["endpoints"], {})
+
+    def test_sync_callers_share_the_queue(self):
+        scheduler = LLMRequestScheduler(max_per_endpoint=1)
+        scheduler.acquire_sync("m", ENDPOINT)
+        admitted = threading.Event()
+
+        def worker():
+            with scheduler.slot_sync("m", ENDPOINT):
+                admitted.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertFalse(admitted.wait(0.05))
+        scheduler.release("m", ENDPOINT)
+        thread.join(timeout=1)
+        self.assertTrue(admitted.is_set())
+
+    def test_priority_comes_from_the_calling_context(self):
+        self.assertEqual(current_llm_priority(), PRIORITY_INTERACTIVE)
+        with llm_priority(PRIORITY_BATCH):
+            self.assertEqual(current_llm_priority(), PRIORITY_BATCH)
+        self.assertEqual(current_llm_priority(), PRIORITY_INTERACTIVE)
+        with self.assertRaises(ValueError):
+            with llm_priority("urgent"):
+                pass
+        self.assertEqual(endpoint_key("http://host:11434/api/chat"), "http://host:11434")
+
+
+class TestOllamaProviderScheduling(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = OllamaStubServer(delay_seconds=0.05).start()
+        self.provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=self.server.base_url)
+        self.scheduler = LLMRequestScheduler(max_per_endpoint=1, interactive_reserved_slots=0)
+        self.patcher = patch("ai_assistant.llm_interface.ollama_client.get_request_scheduler", return_value=self.scheduler)
+        self.patcher.start()
+
+    async def asyncTearDown(self):
+        self.patcher.stop()
+        await self.provider.close()
+        self.server.stop()
+
+    async def _invoke(self, prompt, priority):
+        with llm_priority(priority):
+            return await self.provider.invoke_ollama_model_async(prompt)
+
+    async def test_user_request_is_sent_before_queued_background_requests(self):
+        first = asyncio.create_task(self._invoke("background 1", PRIORITY_BACKGROUND))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.create_task(self._invoke("background 2", PRIORITY_BACKGROUND))]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.create_task(self._invoke("user", PRIORITY_INTERACTIVE)))
+        await asyncio.gather(first, *queued)
+
+        prompts = [payload["messages"][-1]["content"] for _, payload in self.server.requests]
+        self.assertEqual(prompts, ["background 1", "user", "background 2"])
+        self.assertEqual(self.scheduler.stats()["wait_seconds"][PRIORITY_BACKGROUND]["admitted"], 2)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
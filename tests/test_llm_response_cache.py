@@ -0,0 +1,128 @@
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+from unittest.mock import patch
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path: # pragma: no cover
+    sys.path.insert(0, project_root)
+
+from ai_assistant.llm_interface.response_cache import LLMResponseCache
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from tests.ollama_stub_server import OllamaStubServer
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "cache.sqlite3")
+        self.cache = LLMResponseCache(
+            db_path=self.db_path,
+            max_memory_entries=2,
+            default_ttl_seconds=60.0,
+            task_ttl_seconds={"reflection": 120.0, "planning": 0.0}
+        )
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_key_covers_every_request_parameter(self):
+        base = LLMResponseCache.make_key("m", "p", 0.0, 100, "none")
+        self.assertEqual(base, LLMResponseCache.make_key("m", "p", 0, 100, "none"))
+        for variant in (("m2", "p", 0.0, 100, "none"), ("m", "p2", 0.0, 100, "none"),
+                        ("m", "p", 0.5, 100, "none"), ("m", "p", 0.0, 200, "none"),
+                        ("m", "p", 0.0, 100, "native_thinking")):
+            self.assertNotEqual(base, LLMResponseCache.make_key(*variant))
+
+    def test_should_cache_rules(self):
+        self.assertTrue(self.cache.should_cache(0.0))
+        self.assertFalse(self.cache.should_cache(0.7))
+        self.assertTrue(self.cache.should_cache(0.7, task_name="reflection", cache=True))
+        self.assertFalse(self.cache.should_cache(0.0, cache=False))
+        self.assertFalse(self.cache.should_cache(0.0, task_name="planning", cache=True))
+        self.assertEqual(self.cache.stats()["bypasses"], 3)
+
+    def test_memory_lru_evicts_oldest_and_disk_keeps_it(self):
+        for key in ("a", "b", "c"):
+            self.cache.put(key, f"resp-{key}")
+        stats = self.cache.stats()
+        self.assertEqual(stats["memory_entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(self.cache.get("a"), "resp-a") # Served from disk and promoted
+        self.assertEqual(self.cache.get("c"), "resp-c")
+        stats = self.cache.stats()
+        self.assertEqual((stats["disk_hits"], stats["memory_hits"]), (1, 1))
+
+    def test_entries_expire_after_ttl(self):
+        with patch("ai_assistant.llm_interface.response_cache.time.time", return_value=1000.0):
+            self.cache.put("k", "v", task_name="reflection")
+        with patch("ai_assistant.llm_interface.response_cache.time.time", return_value=1100.0):
+            self.assertEqual(self.cache.get("k"), "v")
+        with patch("ai_assistant.llm_interface.response_cache.time.time", return_value=1121.0):
+            self.assertIsNone(self.cache.get("k"))
+        stats = self.cache.stats()
+        self.assertEqual(stats["expirations"], 2) # Memory and disk tiers
+        self.assertEqual(stats["misses"], 1)
+
+    def test_disk_tier_survives_new_instance(self):
+        self.cache.put("persisted", "value")
+        self.cache.close()
+        reopened = LLMResponseCache(db_path=self.db_path)
+        try:
+            self.assertEqual(reopened.get("persisted"), "value")
+        finally:
+            reopened.close()
+
+    def test_zero_ttl_task_is_not_stored(self):
+        self.cache.put("plan", "steps", task_name="planning")
+        self.assertIsNone(self.cache.get("plan"))
+        self.assertEqual(self.cache.stats()["stores"], 0)
+
+
+class TestOllamaClientResponseCaching(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = LLMResponseCache(db_path=os.path.join(self.temp_dir, "cache.sqlite3"))
+        self.cache_patcher = patch(
+            "ai_assistant.llm_interface.ollama_client.get_response_cache", return_value=self.cache
+        )
+        self.cache_patcher.start()
+        self.server = OllamaStubServer().start()
+        self.provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=self.server.base_url)
+
+    async def asyncTearDown(self):
+        await self.provider.close()
+        self.provider.close_sync()
+        self.server.stop()
+        self.cache_patcher.stop()
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+
+    async def test_identical_deterministic_calls_hit_cache(self):
+        first = await self.provider.invoke_ollama_model_async("same prompt", temperature=0.0)
+        second = await self.provider.invoke_ollama_model_async("same prompt", temperature=0.0)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.provider.get_cache_stats()["hits"], 1)
+
+    async def test_sampled_calls_bypass_cache_unless_opted_in(self):
+        await self.provider.invoke_ollama_model_async("sampled", temperature=0.7)
+        await self.provider.invoke_ollama_model_async("sampled", temperature=0.7)
+        self.assertEqual(len(self.server.requests), 2)
+        await self.provider.invoke_ollama_model_async("sampled", temperature=0.7, task_name="reflection", cache=True)
+        await self.provider.invoke_ollama_model_async("sampled", temperature=0.7, task_name="reflection", cache=True)
+        self.assertEqual(len(self.server.requests), 3)
+
+    async def test_sync_and_async_share_entries(self):
+        self.provider.invoke_ollama_model("shared", temperature=0.0)
+        result = await self.provider.invoke_ollama_model_async("shared", temperature=0.0)
+        self.assertEqual(result, "stub:shared")
+        self.assertEqual(len(self.server.requests), 1)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import asyncio
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.core.critical_reviewer import CriticalReviewCoordinator
+from ai_assistant.core.reviewer import ReviewerAgent
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.llm_interface.singleflight import SingleFlight, should_coalesce
+from tests.ollama_stub_server import OllamaStubServer
+
+
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_identical_calls_share_one_execution(self):
+        flights, calls = SingleFlight(), []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "answer"
+
+        results = await asyncio.gather(*(flights.do("key", call) for _ in range(3)), flights.do("other", call))
+        self.assertEqual(results, ["answer"] * 4)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(flights.stats(), {"executed": 2, "coalesced": 2, "in_flight": 0})
+
+        await flights.do("key", call) # Nothing in flight any more: runs again
+        self.assertEqual(len(calls), 3)
+
+    async def test_errors_are_shared(self):
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(flights.do("key", failing), flights.do("key", failing), return_exceptions=True)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(flights.stats()["executed"], 1)
+
+    async def test_followers_run_the_call_themselves_when_the_leader_is_cancelled(self):
+        flights, calls = SingleFlight(), []
+
+        async def call():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "answer"
+
+        leader = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("key", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.assertEqual(await follower, "answer")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(flights.stats()["coalesced"], 0)
+
+    def test_sync_callers_share_flights_across_threads(self):
+        flights, calls, results = SingleFlight(), [], []
+
+        def call():
+            calls.append(1)
+            time.sleep(0.05)
+            return "answer"
+
+        threads = [threading.Thread(target=lambda: results.append(flights.do_sync("key", call))) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((results, len(calls)), (["answer"] * 3, 1))
+
+    def test_should_coalesce(self):
+        self.assertTrue(should_coalesce(0))
+        self.assertFalse(should_coalesce(0.7))
+        self.assertTrue(should_coalesce(0.7, coalesce=True))
+        self.assertFalse(should_coalesce(0, coalesce=False))
+
+
+class TestOllamaClientCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = OllamaStubServer(delay_seconds=0.05).start()
+        self.provider = OllamaProvider(model_name=THINKING_SUPPORTED_MODELS[0], base_url=self.server.base_url)
+        self.flights = SingleFlight()
+        self.patcher = patch("ai_assistant.llm_interface.ollama_client.get_singleflight", return_value=self.flights)
+        self.patcher.start()
+
+    async def asyncTearDown(self):
+        self.patcher.stop()
+        await self.provider.close()
+        self.server.stop()
+
+    async def _invoke_three_times(self, **kwargs):
+        return await asyncio.gather(*(self.provider.invoke_ollama_model_async("same prompt", cache=False, **kwargs)
+                                      for _ in range(3)))
+
+    async def test_identical_deterministic_requests_share_one_http_call(self):
+        results = await self._invoke_three_times(temperature=0)
+        self.assertEqual(results, ["stub:same prompt"] * 3)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.provider.get_coalescing_stats(), {"executed": 1, "coalesced": 2, "in_flight": 0})
+
+    async def test_sampled_and_opted_out_requests_are_sent_separately(self):
+        await self._invoke_three_times(temperature=0.7)
+        await self._invoke_three_times(temperature=0, coalesce=False)
+        self.assertEqual(len(self.server.requests), 6)
+        await self._invoke_three_times(temperature=0.7, coalesce=True)
+        self.assertEqual(len(self.server.requests), 7)
+
+    async def test_critics_of_a_critical_review_share_the_identical_prompt(self):
+        calls = []
+
+        async def fake_uncached(prompt, *args):
+            calls.append(prompt)
+            await asyncio.sleep(0.02)
+            return json.dumps({"status": "approved", "comments": "Looks good.", "suggestions": ""})
+
+        with patch("ai_assistant.llm_interface.ollama_client._invoke_ollama_model_async_uncached", side_effect=fake_uncached):
+            approved, reviews = await CriticalReviewCoordinator(ReviewerAgent("m"), ReviewerAgent("m")).request_critical_review(
+                "old", "new", "diff", "requirements")
+            self.assertEqual((approved, len(calls)), (True, 1))
+
+            await CriticalReviewCoordinator(ReviewerAgent("m", coalesce=False), ReviewerAgent("m", coalesce=False)
+                                            ).request_critical_review("old", "new", "diff", "requirements")
+            self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
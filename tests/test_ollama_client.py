@@ -0,0 +1,149 @@
+import unittest
+import asyncio
+import os
+import sys
+
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if project_root not in sys.path: # pragma: no cover
+    sys.path.insert(0, project_root)
+
+from ai_assistant.llm_interface.ollama_client import OllamaProvider, STREAM_CHUNK_CONTENT, STREAM_CHUNK_THINKING
+from ai_assistant.config import THINKING_SUPPORTED_MODELS
+from ai_assistant.llm_interface.errors import LLMClientError
+from tests.ollama_stub_server import OllamaStubServer
+
+THINKING_MODEL = THINKING_SUPPORTED_MODELS[0]   # Routed to /api/chat, single request
+NON_THINKING_MODEL = "stub-model:latest"        # Chain-of-thought: two /api/generate requests
+
+
+class TestOllamaProviderPooledSessionsSync(unittest.TestCase):
+    def setUp(self):
+        self.server = OllamaStubServer().start()
+        self.provider = OllamaProvider(model_name=THINKING_MODEL, base_url=self.server.base_url)
+
+    def tearDown(self):
+        self.provider.close_sync()
+        self.server.stop()
+
+    def test_sync_calls_reuse_one_connection(self):
+        for i in range(5):
+            result = self.provider.invoke_ollama_model(f"prompt {i}")
+            self.assertEqual(result, f"stub:prompt {i}")
+        self.assertEqual(len(self.server.requests), 5)
+        self.assertTrue(all(path == "/api/chat" for path, _ in self.server.requests))
+        self.assertEqual(len(self.server.client_connections), 1)
+
+    def test_sync_session_is_created_once_and_closed(self):
+        session = self.provider.get_sync_session()
+        self.assertIs(session, self.provider.get_sync_session())
+        self.provider.close_sync()
+        self.assertIsNot(session, self.provider.get_sync_session())
+
+    def test_sync_pool_is_sized_per_host(self):
+        provider = OllamaProvider(model_name=THINKING_MODEL, base_urls=["http://a:1", "http://b:2"], max_connections_per_host=3)
+        adapter = provider.get_sync_session().get_adapter("http://a:1")
+        self.assertEqual(adapter._pool_connections, 2) # One pool per backend host
+        self.assertEqual(adapter._pool_maxsize, 3)
+        provider.close_sync()
+
+    def test_async_session_of_a_finished_loop_is_closed_when_replaced(self):
+        first = asyncio.run(self.provider.get_async_session())
+        async def second_loop():
+            session = await self.provider.get_async_session()
+            self.assertTrue(first.closed)
+            self.assertEqual(await self.provider.invoke_ollama_model_async("again", cache=False), "stub:again")
+            await self.provider.close()
+            return session
+        self.assertTrue(asyncio.run(second_loop()).closed)
+
+
+class TestOllamaProviderPooledSessionsAsync(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = OllamaStubServer().start()
+        self.provider = OllamaProvider(model_name=THINKING_MODEL, base_url=self.server.base_url)
+
+    async def asyncTearDown(self):
+        await self.provider.close()
+        self.server.stop()
+
+    async def test_async_calls_reuse_session_and_connection(self):
+        session = await self.provider.get_async_session()
+        for i in range(5):
+            result = await self.provider.invoke_ollama_model_async(f"async {i}")
+            self.assertEqual(result, f"stub:async {i}")
+        self.assertIs(session, await self.provider.get_async_session())
+        self.assertEqual(len(self.server.client_connections), 1)
+
+    async def test_chain_of_thought_uses_provider_host_and_session(self):
+        result = await self.provider.invoke_ollama_model_async("cot prompt", model_name=NON_THINKING_MODEL)
+        self.assertTrue(result.startswith("stub:"))
+        paths = [path for path, _ in self.server.requests]
+        self.assertEqual(paths, ["/api/generate", "/api/generate"])
+        self.assertEqual(len(self.server.client_connections), 1)
+
+    async def test_concurrent_calls_respect_per_host_limit(self):
+        await self.provider.close()
+        self.provider = OllamaProvider(
+            model_name=THINKING_MODEL, base_url=self.server.base_url, max_connections_per_host=2
+        )
+        self.server.delay_seconds = 0.05
+        results = await asyncio.gather(*(self.provider.invoke_ollama_model_async(f"p{i}") for i in range(6)))
+        self.assertEqual(sorted(results), sorted(f"stub:p{i}" for i in range(6)))
+        self.assertLessEqual(len(self.server.client_connections), 2)
+
+    async def test_stream_async_yields_incremental_content(self):
+        chunks = [chunk async for chunk in self.provider.stream_async("streamed prompt")]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk.kind == STREAM_CHUNK_CONTENT for chunk in chunks))
+        self.assertEqual("".join(chunk.text for chunk in chunks), "stub:streamed prompt")
+        path, payload = self.server.requests[-1]
+        self.assertEqual(path, "/api/chat")
+        self.assertTrue(payload["stream"])
+
+    async def test_stream_async_chain_of_thought_streams_thinking_first(self):
+        chunks = [chunk async for chunk in self.provider.stream_async("q", model_name=NON_THINKING_MODEL)]
+        kinds = [chunk.kind for chunk in chunks]
+        self.assertEqual(kinds[0], STREAM_CHUNK_THINKING)
+        self.assertEqual(kinds[-1], STREAM_CHUNK_CONTENT)
+        self.assertEqual(kinds.index(STREAM_CHUNK_CONTENT), kinds.count(STREAM_CHUNK_THINKING))
+        self.assertEqual(len(self.server.requests), 2)
+
+    async def test_stream_async_first_chunk_arrives_before_completion(self):
+        self.server.stream_token_delay_seconds = 0.05
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        stream = self.provider.stream_async("a fairly long prompt to stream")
+        await stream.__anext__()
+        first_chunk_time = loop.time() - start
+        async for _ in stream:
+            pass
+        total_time = loop.time() - start
+        self.assertLess(first_chunk_time, total_time / 2)
+
+    async def test_stream_that_breaks_off_raises(self):
+        self.server.stream_cut_after_lines = 2
+        chunks = []
+        with self.assertRaises(LLMClientError):
+            async for chunk in self.provider.stream_async("a prompt that is cut off"):
+                chunks.append(chunk.text)
+        self.assertEqual("".join(chunks), "stub:a p")
+
+    async def test_closing_a_stream_early_releases_its_scheduler_slot(self):
+        self.server.stream_token_delay_seconds = 0.01
+        stream = self.provider.stream_async("a prompt read only in part")
+        await stream.__anext__()
+        self.assertEqual(sum(self.provider.get_scheduler_stats()["in_flight"]["endpoints"].values()), 1)
+        await stream.aclose()
+        self.assertEqual(self.provider.get_scheduler_stats()["in_flight"]["endpoints"], {})
+
+    async def test_list_models_and_close(self):
+        models = await self.provider.list_models_async()
+        self.assertEqual(models[0]["name"], "stub-model:latest")
+        session = await self.provider.get_async_session()
+        await self.provider.close()
+        self.assertTrue(session.closed)
+        await self.provider.close() # Idempotent
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
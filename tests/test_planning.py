@@ -2,6 +2,8 @@ import unittest
 from unittest.mock import patch
 import json # To construct mock LLM responses
 from ai_assistant.planning.planning import PlannerAgent
+from ai_assistant.llm_interface.ollama_client import LLMStreamChunk, STREAM_CHUNK_CONTENT
+from ai_assistant.llm_interface.errors import LLMConnectionError
 
 class TestPlannerAgentLLMSearch(unittest.TestCase):
 
@@ -332,5 +334,114 @@ class TestPlannerAgentLLMSearch(unittest.TestCase):
         self.assertEqual(step3.get("args"), expected_args_step3)
 
 
+class TestPlannerAgentStreaming(unittest.IsolatedAsyncioTestCase):
+    """create_plan_with_llm with on_step: steps are validated while the response streams."""
+
+    def setUp(self):
+        self.planner = PlannerAgent()
+        self.available_tools = {
+            "search_duckduckgo": {"description": "Searches the web.", "schema_details": {}},
+            "process_search_results": {"description": "Processes search results.", "schema_details": {}},
+        }
+
+    @staticmethod
+    def _fake_stream(responses):
+        calls = []
+        async def fake_stream(prompt, model_name=None):
+            text = responses[len(calls)]
+            calls.append(prompt)
+            for i in range(0, len(text), 5):
+                yield LLMStreamChunk(STREAM_CHUNK_CONTENT, text[i:i + 5])
+        return fake_stream, calls
+
+    async def test_steps_reported_before_stream_completes(self):
+        plan_json = json.dumps([
+            {"tool_name": "search_duckduckgo", "args": ["weather"], "kwargs": {}},
+            {"tool_name": "process_search_results", "args": ["weather", "[[step_1_output]]"], "kwargs": {}},
+        ])
+        fake_stream, _ = self._fake_stream([plan_json])
+        seen = []
+        with patch('ai_assistant.planning.planning.stream_ollama_model_async', fake_stream):
+            plan = await self.planner.create_plan_with_llm("weather?", self.available_tools, on_step=seen.append)
+        self.assertEqual([event["index"] for event in seen], [0, 1])
+        self.assertEqual(seen[0]["step"]["tool_name"], "search_duckduckgo")
+        self.assertEqual([step["tool_name"] for step in plan], ["search_duckduckgo", "process_search_results"])
+
+    async def test_invalid_step_aborts_stream_and_triggers_correction(self):
+        bad_plan = json.dumps([{"tool_name": "no_such_tool", "args": [], "kwargs": {}}]) + " " * 500 + "never read"
+        good_plan = json.dumps([{"tool_name": "search_duckduckgo", "args": ["x"], "kwargs": {}}])
+        fake_stream, calls = self._fake_stream([bad_plan, good_plan])
+        seen = []
+        with patch('ai_assistant.planning.planning.stream_ollama_model_async', fake_stream):
+            plan = await self.planner.create_plan_with_llm("x", self.available_tools, on_step=seen.append)
+        self.assertEqual(len(calls), 2)
+        self.assertIn("unavailable tool 'no_such_tool'", calls[1])
+        self.assertEqual(len(seen), 1)
+        self.assertEqual(plan[0]["tool_name"], "search_duckduckgo")
+
+    async def test_abandoned_stream_is_closed(self):
+        closed = []
+        async def fake_stream(prompt, model_name=None):
+            try:
+                yield LLMStreamChunk(STREAM_CHUNK_CONTENT, json.dumps([{"tool_name": "no_such_tool"}]))
+                yield LLMStreamChunk(STREAM_CHUNK_CONTENT, "never read")
+            finally:
+                closed.append(True)
+        with patch('ai_assistant.planning.planning.stream_ollama_model_async', fake_stream):
+            response, step_error = await self.planner._stream_plan_response("p", "m", self.available_tools, lambda e: None)
+        self.assertIn("no_such_tool", step_error)
+        self.assertEqual(closed, [True]) # Closed before returning, not left to garbage collection
+
+    async def test_stream_that_breaks_off_is_not_used_as_the_plan(self):
+        good_plan = json.dumps([{"tool_name": "search_duckduckgo", "args": ["x"], "kwargs": {}}])
+        calls = []
+        async def fake_stream(prompt, model_name=None):
+            calls.append(prompt)
+            if len(calls) == 1:
+                yield LLMStreamChunk(STREAM_CHUNK_CONTENT, good_plan[:-1]) # Missing the closing bracket
+                raise LLMConnectionError("connection lost")
+            yield LLMStreamChunk(STREAM_CHUNK_CONTENT, good_plan)
+        with patch('ai_assistant.planning.planning.stream_ollama_model_async', fake_stream):
+            plan = await self.planner.create_plan_with_llm("x", self.available_tools, on_step=lambda e: None)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(plan[0]["tool_name"], "search_duckduckgo")
+
+
+class TestPlannerAgentIncrementalReplan(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.planner = PlannerAgent()
+        self.tools = {
+            "read_text_from_file": {"description": "Reads a file.", "schema_details": {}},
+            "summarize_text": {"description": "Summarizes text.", "schema_details": {}},
+        }
+
+    async def test_prompt_shows_completed_outputs_and_asks_only_for_the_suffix(self):
+        suffix_json = json.dumps([{"tool_name": "summarize_text", "args": ["[[step_1_output]]"], "kwargs": {}}])
+        with patch('ai_assistant.planning.planning.invoke_ollama_model_async', return_value=suffix_json) as mock_llm:
+            suffix = await self.planner.replan_remaining_steps(
+                "Summarize notes.txt",
+                completed_steps=[({"tool_name": "read_text_from_file", "args": ("notes.txt",), "kwargs": {}}, "x" * 2000)],
+                failed_step={"tool_name": "summarize_text", "args": ("",), "kwargs": {}},
+                failure_analysis="summarize_text was given no text.",
+                available_tools=self.tools
+            )
+        prompt = mock_llm.call_args[0][0]
+        self.assertIn("Steps 1 to 1 already completed", prompt)
+        self.assertIn("Your first step will be step 2", prompt)
+        self.assertIn("x" * 500 + "... (truncated)", prompt)
+        self.assertNotIn("x" * 501, prompt)
+        self.assertEqual(suffix, [{"tool_name": "summarize_text", "args": ("[[step_1_output]]",), "kwargs": {}}])
+
+    async def test_invalid_suffix_is_corrected_once(self):
+        responses = ["not json", json.dumps([{"tool_name": "summarize_text", "args": [], "kwargs": {}}])]
+        with patch('ai_assistant.planning.planning.invoke_ollama_model_async', side_effect=responses) as mock_llm:
+            suffix = await self.planner.replan_remaining_steps(
+                "Summarize notes.txt", [], {"tool_name": "summarize_text"}, "analysis", self.tools
+            )
+        self.assertEqual(mock_llm.call_count, 2)
+        self.assertIn("not valid JSON", mock_llm.call_args[0][0])
+        self.assertEqual(suffix[0]["tool_name"], "summarize_text")
+
+
 if __name__ == '__main__':
     unittest.main()
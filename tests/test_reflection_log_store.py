@@ -0,0 +1,112 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from ai_assistant.core.reflection import ReflectionLog
+from ai_assistant.memory.reflection_log_store import ReflectionLogStore, INDEX_FILENAME
+
+
+def _entry(i):
+    return {"entry_id": f"id-{i}", "goal_description": f"goal {i}", "plan": [], "execution_results": [i], "status": "SUCCESS"}
+
+
+class TestReflectionLogStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.directory = os.path.join(self.temp_dir, "reflection_log")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_appends_roll_over_segments_and_are_found_by_id(self):
+        store = ReflectionLogStore(self.directory, segment_max_bytes=300)
+        for i in range(20):
+            store.append(_entry(i))
+        segments = [name for name in os.listdir(self.directory) if name.startswith("segment-")]
+        self.assertGreater(len(segments), 3)
+        self.assertEqual(store.get("id-0")["goal_description"], "goal 0")
+        self.assertEqual(store.get("id-13")["execution_results"], [13])
+        self.assertIsNone(store.get("missing"))
+        self.assertEqual([e["entry_id"] for e in store.tail(3)], ["id-19", "id-18", "id-17"])
+        self.assertEqual([e["entry_id"] for e in store.iter_entries()], [f"id-{i}" for i in range(20)])
+        store.close()
+
+    def test_index_lines_lost_in_a_crash_are_rebuilt(self):
+        store = ReflectionLogStore(self.directory, segment_max_bytes=300)
+        for i in range(10):
+            store.append(_entry(i))
+        store.close()
+        index_path = os.path.join(self.directory, INDEX_FILENAME)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.writelines(lines[:4])
+
+        reopened = ReflectionLogStore(self.directory, segment_max_bytes=300)
+        self.assertEqual(reopened.get("id-9")["goal_description"], "goal 9")
+        self.assertEqual(reopened.get("id-5")["goal_description"], "goal 5")
+        reopened.close()
+        with open(index_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 10)
+
+
+class TestSegmentedReflectionLog(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.temp_dir, "reflection_log.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _log(self, reflection_log, i):
+        return reflection_log.log_execution(f"goal {i}", [{"tool_name": "t"}], [f"result {i}"], overall_success=True)
+
+    def test_ring_keeps_recent_entries_and_older_ones_load_lazily(self):
+        reflection_log = ReflectionLog(filepath=self.filepath, ring_size=3)
+        entries = [self._log(reflection_log, i) for i in range(6)]
+        self.assertEqual([e.goal_description for e in reflection_log.log_entries], ["goal 3", "goal 4", "goal 5"])
+        self.assertEqual([e.goal_description for e in reflection_log.get_entries(5)], [f"goal {i}" for i in range(1, 6)])
+        self.assertEqual(len(reflection_log.get_entries(2)), 2)
+
+        reopened = ReflectionLog(filepath=self.filepath, ring_size=3)
+        self.assertEqual([e.entry_id for e in reopened.log_entries], [e.entry_id for e in entries[3:]])
+        oldest = reopened.get_entry(entries[0].entry_id)
+        self.assertEqual(oldest.goal_description, "goal 0")
+        self.assertEqual(oldest.execution_results, ["result 0"])
+        self.assertIsNone(reopened.get_entry("missing"))
+        reflection_log.store.close()
+        reopened.store.close()
+
+    def test_adding_an_entry_does_not_rewrite_the_log(self):
+        reflection_log = ReflectionLog(filepath=self.filepath, ring_size=3)
+        for i in range(5):
+            self._log(reflection_log, i)
+        with patch("ai_assistant.core.reflection.ReflectionLogEntry.to_serializable_dict",
+                   autospec=True, side_effect=lambda entry: {"entry_id": entry.entry_id}) as mock_serialize:
+            self._log(reflection_log, 5)
+        mock_serialize.assert_called_once()
+        reflection_log.store.close()
+
+    def test_legacy_json_log_is_migrated(self):
+        with open(self.filepath, 'w', encoding='utf-8') as f:
+            json.dump([_entry(1), _entry(2)], f)
+        reflection_log = ReflectionLog(filepath=self.filepath)
+        self.assertEqual([e.entry_id for e in reflection_log.log_entries], ["id-1", "id-2"])
+        self.assertTrue(os.path.exists(self.filepath + ".migrated"))
+        self.assertFalse(os.path.exists(self.filepath))
+        reflection_log.store.close()
+
+    def test_memory_only_log_writes_nothing(self):
+        with patch("os.getcwd", return_value=self.temp_dir):
+            reflection_log = ReflectionLog(filepath=":memory:")
+            self._log(reflection_log, 1)
+        self.assertIsNone(reflection_log.store)
+        self.assertEqual(len(reflection_log.get_entries(10)), 1)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
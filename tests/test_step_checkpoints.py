@@ -0,0 +1,149 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+
+from ai_assistant.core.deadline import deadline_scope
+from ai_assistant.core.startup_services import resume_interrupted_tasks
+from ai_assistant.core.task_manager import ActiveTask, ActiveTaskStatus, ActiveTaskType, TaskManager
+from ai_assistant.custom_tools.project_execution_tools import execute_project_plan
+from ai_assistant.memory.step_checkpoints import StepCheckpointStore, inputs_hash
+from ai_assistant.memory.structured_store import get_structured_store
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-plan: nothing below execute_project_plan catches it."""
+
+
+class CheckpointTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "store.sqlite3")
+        self.store = StepCheckpointStore(self.db_path)
+
+    def tearDown(self):
+        get_structured_store(self.db_path).close()
+        shutil.rmtree(self.temp_dir)
+
+
+class TestStepCheckpointStore(CheckpointTestCase):
+    def test_save_load_and_inputs_hash(self):
+        step_hash = inputs_hash({"tool_name": "t", "args": ["a"]})
+        self.assertEqual(step_hash, inputs_hash({"args": ["a"], "tool_name": "t"})) # Key order does not matter
+        self.assertTrue(self.store.save("run", "step_1", 0, step_hash, {"out": [1, 2]}))
+        self.assertEqual(self.store.load("run", "step_1", step_hash), (True, {"out": [1, 2]}))
+        self.assertEqual(self.store.load("run", "step_1", inputs_hash({"tool_name": "t", "args": ["b"]})), (False, None))
+        self.assertEqual(self.store.load("other_run", "step_1", step_hash), (False, None))
+
+    def test_unserializable_results_are_not_checkpointed(self):
+        self.assertFalse(self.store.save("run", "step_1", 0, inputs_hash([]), object()))
+        self.assertIsNone(inputs_hash({"value": {1, 2}}))
+        self.assertEqual(self.store.completed_steps("run"), [])
+
+    def test_clear_run_and_expiry(self):
+        self.store.save("run", "step_2", 1, "h", "two")
+        self.store.save("run", "step_1", 0, "h", "one")
+        self.store.save("other", "step_1", 0, "h", "kept")
+        self.assertEqual([c["step_id"] for c in self.store.completed_steps("run")], ["step_1", "step_2"])
+        self.assertEqual(self.store.clear_run("run"), 2)
+        self.assertEqual(self.store.load("other", "step_1", "h"), (True, "kept"))
+
+        later = datetime.now(timezone.utc) + timedelta(hours=self.store.max_age_hours + 1)
+        with patch("ai_assistant.memory.step_checkpoints.datetime") as mock_datetime:
+            mock_datetime.now.return_value = later
+            mock_datetime.fromisoformat = datetime.fromisoformat
+            self.assertEqual(self.store.load("other", "step_1", "h"), (False, None))
+            self.assertEqual(self.store.prune_expired(), 1)
+
+
+class TestProjectPlanCheckpoints(CheckpointTestCase):
+    PLAN = [
+        {"step_id": "1", "description": "Build", "type": "python_script", "details": {"script_content": "print(1)"}},
+        {"step_id": "2", "description": "Test", "type": "python_script", "details": {"script_content": "print(2)"}},
+    ]
+
+    def _sandbox_result(self, **kwargs):
+        return {"status": "success", "stdout": f"ran {kwargs['script_content']}", "stderr": "", "return_code": 0,
+                "output_files": {}, "error_message": None}
+
+    def test_interrupted_project_plan_resumes_at_the_first_incomplete_step(self):
+        task_manager = MagicMock(spec=TaskManager)
+        scripts_run = []
+
+        def sandbox(**kwargs):
+            scripts_run.append(kwargs["script_content"])
+            if kwargs["script_content"] == "print(2)" and len(scripts_run) == 2:
+                raise Crash()
+            return self._sandbox_result(**kwargs)
+
+        with patch("ai_assistant.custom_tools.project_execution_tools.get_step_checkpoint_store", return_value=self.store), \
+             patch("ai_assistant.custom_tools.project_execution_tools.execute_sandboxed_python_script", side_effect=sandbox):
+            with self.assertRaises(Crash):
+                execute_project_plan(self.PLAN, "task_1", task_manager, "Proj")
+            result = execute_project_plan(self.PLAN, "task_1", task_manager, "Proj")
+
+        self.assertEqual(scripts_run, ["print(1)", "print(2)", "print(2)"])
+        self.assertEqual(result["overall_status"], "success")
+        self.assertTrue(result["step_results"][0]["restored_from_checkpoint"])
+        self.assertEqual(result["step_results"][0]["output"]["stdout"], "ran print(1)")
+        self.assertEqual(task_manager.update_task_status.call_args.kwargs["new_status"], ActiveTaskStatus.COMPLETED_SUCCESSFULLY)
+        self.assertEqual(self.store.completed_steps("project_plan_task_1"), [])
+
+
+    def test_project_plan_stops_between_steps_once_the_prompt_deadline_has_passed(self):
+        task_manager = MagicMock(spec=TaskManager)
+        scripts_run = []
+
+        with patch("ai_assistant.custom_tools.project_execution_tools.get_step_checkpoint_store", return_value=self.store), \
+             patch("ai_assistant.custom_tools.project_execution_tools.execute_sandboxed_python_script") as sandbox:
+            with deadline_scope(60) as deadline:
+                def first_step_then_cancel(**kwargs):
+                    scripts_run.append(kwargs["script_content"])
+                    deadline.cancel() # /cancel, or the budget running out, while the step runs
+                    return self._sandbox_result(**kwargs)
+
+                sandbox.side_effect = first_step_then_cancel
+                result = execute_project_plan(self.PLAN, "task_1", task_manager, "Proj")
+            self.assertEqual(scripts_run, ["print(1)"])
+            self.assertEqual(result["overall_status"], "stopped")
+            last_update = task_manager.update_task_status.call_args.kwargs
+            self.assertEqual(last_update["new_status"], ActiveTaskStatus.PROJECT_PLAN_FAILED_STEP)
+            self.assertIn("cancelled", last_update["reason"])
+
+            sandbox.side_effect = lambda **kwargs: scripts_run.append(kwargs["script_content"]) or self._sandbox_result(**kwargs)
+            result = execute_project_plan(self.PLAN, "task_1", task_manager, "Proj") # Retrying resumes it
+        self.assertEqual(scripts_run, ["print(1)", "print(2)"])
+        self.assertEqual(result["overall_status"], "success")
+
+
+class TestResumeInterruptedTasks(unittest.TestCase):
+    def test_executing_project_plans_resume_and_other_tasks_are_marked_interrupted(self):
+        project_task = ActiveTask(description="Project", task_type=ActiveTaskType.HIERARCHICAL_PROJECT_EXECUTION,
+                                  status=ActiveTaskStatus.EXECUTING_PROJECT_PLAN,
+                                  details={"project_plan": [{"step_id": "1"}], "user_goal": "g", "project_name": "P"})
+        other_task = ActiveTask(description="Tool", task_type=ActiveTaskType.AGENT_TOOL_CREATION, status=ActiveTaskStatus.PLANNING)
+        task_manager = MagicMock(spec=TaskManager)
+        task_manager.list_active_tasks.return_value = [project_task, other_task]
+
+        async def run():
+            with patch("ai_assistant.custom_tools.project_execution_tools.execute_project_plan",
+                       return_value={"overall_status": "success", "step_results": [{"restored_from_checkpoint": True}]}) as mock_execute, \
+                 patch("ai_assistant.core.startup_services.get_step_checkpoint_store"), \
+                 patch("ai_assistant.core.startup_services.get_blob_store"):
+                runs = await resume_interrupted_tasks(task_manager)
+                results = await asyncio.gather(*runs)
+            return mock_execute, results
+
+        mock_execute, results = asyncio.run(run())
+        mock_execute.assert_called_once_with([{"step_id": "1"}], project_task.task_id, task_manager, "P")
+        self.assertEqual(results[0]["overall_status"], "success")
+        statuses = {call.args[0]: call.args[1] for call in task_manager.update_task_status.call_args_list}
+        self.assertEqual(statuses, {project_task.task_id: ActiveTaskStatus.EXECUTING_PROJECT_PLAN,
+                                    other_task.task_id: ActiveTaskStatus.FAILED_INTERRUPTED})
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
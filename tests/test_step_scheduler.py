@@ -0,0 +1,212 @@
+import unittest
+import asyncio
+import time
+from unittest.mock import patch, MagicMock
+
+from ai_assistant.planning.execution import ExecutionAgent
+from ai_assistant.planning.step_scheduler import StepOutcome, build_step_dependencies, referenced_steps, run_plan_steps
+
+
+class FakeToolSystem:
+    """Tools sleep for `delay` seconds; names starting with 'read' are read-only, 'fail' tools raise."""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        self.running = 0
+        self.max_running = 0
+
+    def is_read_only_tool(self, name):
+        return name.startswith("read")
+
+    def list_tools(self):
+        return {}
+
+    async def execute_tool(self, name, args=(), kwargs=None, task_manager=None, notification_manager=None):
+        self.calls.append((name, args))
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.running -= 1
+        if name.startswith("fail"):
+            raise ValueError(f"{name} failed")
+        return f"{name}({', '.join(map(str, args))})"
+
+
+class TestStepDependencies(unittest.TestCase):
+    def test_referenced_steps(self):
+        self.assertEqual(referenced_steps(["[[step_1_output]]", {"k": "see [[step_3_output]]"}, 5]), {1, 3})
+
+    def test_placeholders_and_barriers(self):
+        plan = [
+            {"tool_name": "read_a"},
+            {"tool_name": "read_b"},
+            {"tool_name": "read_c", "args": ["[[step_1_output]]"]},
+            {"tool_name": "write_d"},
+            {"tool_name": "read_e"},
+            {"tool_name": "read_f", "kwargs": {"x": "[[step_9_output]]"}}, # Invalid (later) reference
+        ]
+        read_only = [step["tool_name"].startswith("read") for step in plan]
+        self.assertEqual(build_step_dependencies(plan, read_only), [set(), set(), {0}, {0, 1, 2}, {3}, {3}])
+
+
+class TestRunPlanSteps(unittest.TestCase):
+    def test_failure_reports_the_lowest_failed_step_and_cancels_later_ones(self):
+        started = []
+
+        async def run_step(index, completed):
+            started.append(index)
+            await asyncio.sleep({0: 0.05, 1: 0.01, 2: 0.2}[index])
+            return StepOutcome(index, failed=index in (0, 1))
+
+        outcomes, failed = asyncio.run(run_plan_steps([set(), set(), set()], run_step, 3))
+        self.assertEqual(failed, 0) # Step 2 failed first in time, but step 1 comes first in the plan
+        self.assertEqual([o.result for o in outcomes], [0])
+        self.assertEqual(sorted(started), [0, 1, 2])
+
+    def test_cancelled_steps_have_unwound_when_the_failure_is_reported(self):
+        unwound = []
+
+        async def run_step(index, completed):
+            try:
+                await asyncio.sleep({0: 0.01, 1: 1.0}[index])
+            finally:
+                unwound.append(index)
+            return StepOutcome(index, failed=index == 0)
+
+        async def run_and_inspect():
+            _, failed = await run_plan_steps([set(), set()], run_step, 2)
+            return failed, sorted(unwound) # Before asyncio.run reaps leftover tasks
+
+        self.assertEqual(asyncio.run(run_and_inspect()), (0, [0, 1]))
+
+    def test_concurrency_limit(self):
+        running, peak = [0], [0]
+
+        async def run_step(index, completed):
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+            await asyncio.sleep(0.01)
+            running[0] -= 1
+            return StepOutcome(index)
+
+        outcomes, failed = asyncio.run(run_plan_steps([set()] * 6, run_step, 2))
+        self.assertIsNone(failed)
+        self.assertEqual([o.result for o in outcomes], list(range(6)))
+        self.assertEqual(peak[0], 2)
+
+    def test_completed_steps_are_not_run_again(self):
+        started = []
+
+        async def run_step(index, completed):
+            started.append(index)
+            return StepOutcome(f"new {index}")
+
+        reused = {0: StepOutcome("old 0"), 1: StepOutcome("old 1")}
+        outcomes, failed = asyncio.run(run_plan_steps([set(), {0}, {1}, {2}], run_step, 2, completed=reused))
+        self.assertIsNone(failed)
+        self.assertEqual(started, [2, 3])
+        self.assertEqual([o.result for o in outcomes], ["old 0", "old 1", "new 2", "new 3"])
+
+
+@patch("ai_assistant.planning.execution.log_event")
+@patch("ai_assistant.planning.execution.record_tool_goal_association")
+@patch("ai_assistant.planning.execution.global_reflection_log")
+class TestExecutionAgentConcurrency(unittest.TestCase):
+    def _execute(self, plan, tool_system, planner=None):
+        return asyncio.run(ExecutionAgent().execute_plan(
+            "goal", plan, tool_system, planner or MagicMock(), learning_agent=None
+        ))
+
+    def test_independent_reads_run_concurrently_with_results_in_plan_order(self, mock_log, *_):
+        tool_system = FakeToolSystem(delay=0.1)
+        plan = [
+            {"tool_name": "read_search", "args": ["a"]},
+            {"tool_name": "read_search", "args": ["b"]},
+            {"tool_name": "read_file", "args": ["c"]},
+            {"tool_name": "read_summary", "args": ["[[step_1_output]]"]},
+        ]
+        start = time.perf_counter()
+        final_plan, results = self._execute(plan, tool_system)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(results, ["read_search(a)", "read_search(b)", "read_file(c)", "read_summary(read_search(a))"])
+        self.assertEqual(tool_system.max_running, 3)
+        self.assertLess(elapsed, 0.35) # Longest branch is two steps; sequential would take four
+        logged = mock_log.log_execution.call_args.kwargs
+        self.assertTrue(logged["overall_success"])
+        self.assertEqual(logged["execution_results"], results)
+
+    def test_mutating_steps_keep_plan_order(self, *_):
+        tool_system = FakeToolSystem(delay=0.01)
+        plan = [{"tool_name": "read_a"}, {"tool_name": "write_b"}, {"tool_name": "read_c"}]
+        self._execute(plan, tool_system)
+        self.assertEqual([name for name, _ in tool_system.calls], ["read_a", "write_b", "read_c"])
+        self.assertEqual(tool_system.max_running, 1)
+
+    def test_failure_is_logged_at_the_failed_step(self, mock_log, *_):
+        tool_system = FakeToolSystem(delay=0.01)
+        plan = [{"tool_name": "read_a"}, {"tool_name": "fail_read"}, {"tool_name": "read_c"}, {"tool_name": "write_d"}]
+        with patch("ai_assistant.planning.execution.analyze_last_failure", return_value=""):
+            final_plan, results = self._execute(plan, tool_system)
+        self.assertEqual(len(results), 2)
+        self.assertIsInstance(results[1], ValueError)
+        self.assertNotIn("write_d", [name for name, _ in tool_system.calls]) # Never starts after a failure
+        logged = mock_log.log_execution.call_args.kwargs
+        self.assertFalse(logged["overall_success"])
+        self.assertIn("failed at step 2 (fail_read)", logged["notes"])
+
+
+class SuffixPlanner:
+    """Replaces the failed step (and everything after it) with `suffix`; a whole re-plan returns `full_plan`."""
+
+    def __init__(self, suffix, full_plan=None):
+        self.suffix = suffix
+        self.full_plan = full_plan
+        self.completed_steps = None
+
+    async def replan_remaining_steps(self, original_goal, completed_steps, failed_step, failure_analysis,
+                                     available_tools, ollama_model_name=None):
+        self.completed_steps = completed_steps
+        return self.suffix
+
+    async def replan_after_failure(self, original_goal, failure_analysis, available_tools, ollama_model_name=None):
+        return self.full_plan
+
+
+@patch("ai_assistant.planning.execution.analyze_last_failure", return_value="fail_read is broken; use read_alt.")
+@patch("ai_assistant.planning.execution.log_event")
+@patch("ai_assistant.planning.execution.record_tool_goal_association")
+@patch("ai_assistant.planning.execution.global_reflection_log")
+class TestIncrementalReplanning(unittest.TestCase):
+    def test_resumes_at_the_failed_step_with_earlier_outputs_addressable(self, mock_log, *_):
+        tool_system = FakeToolSystem(delay=0.01)
+        plan = [{"tool_name": "write_a", "args": ["x"]}, {"tool_name": "read_b"}, {"tool_name": "fail_read"}]
+        planner = SuffixPlanner([{"tool_name": "read_alt", "args": ["[[step_1_output]]"]}])
+        final_plan, results = asyncio.run(ExecutionAgent().execute_plan(
+            "goal", plan, tool_system, planner, learning_agent=None
+        ))
+
+        self.assertEqual([step["tool_name"] for step in final_plan], ["write_a", "read_b", "read_alt"])
+        self.assertEqual(results, ["write_a(x)", "read_b()", "read_alt(write_a(x))"])
+        # write_a and read_b ran once; the failed step ran with its retry
+        self.assertEqual([name for name, _ in tool_system.calls], ["write_a", "read_b", "fail_read", "fail_read", "read_alt"])
+        self.assertEqual(planner.completed_steps, [(plan[0], "write_a(x)"), (plan[1], "read_b()")])
+        logged = mock_log.log_execution.call_args.kwargs
+        self.assertTrue(logged["overall_success"])
+        self.assertIn("reusing 2 completed step(s): saved 2 tool call(s)", logged["notes"])
+
+    def test_failure_at_the_first_step_asks_for_a_whole_new_plan(self, *_):
+        tool_system = FakeToolSystem(delay=0)
+        planner = SuffixPlanner([], full_plan=[{"tool_name": "read_alt"}])
+        final_plan, results = asyncio.run(ExecutionAgent().execute_plan(
+            "goal", [{"tool_name": "fail_read"}], tool_system, planner, learning_agent=None
+        ))
+        self.assertIsNone(planner.completed_steps)
+        self.assertEqual(results, ["read_alt()"])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import json
+
+from ai_assistant.llm_interface.stream_parsing import IncrementalJSONArrayParser, IncrementalLineListParser
+
+
+def _feed_in_pieces(parser, text, size):
+    items = []
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+    return items
+
+
+class TestIncrementalJSONArrayParser(unittest.TestCase):
+    PLAN = [
+        {"tool_name": "search_duckduckgo", "args": ["weather [London] {today}"], "kwargs": {}},
+        {"tool_name": "process_search_results", "args": ["q", "[[step_1_output]]"], "kwargs": {"x": "a \"quoted\" }"}},
+    ]
+
+    def test_elements_emitted_as_they_complete(self):
+        parser = IncrementalJSONArrayParser()
+        text = json.dumps(self.PLAN)
+        first_close = text.index("}, {") + 1
+        self.assertEqual(parser.feed(text[:first_close - 1]), [])
+        self.assertEqual(parser.feed(text[first_close - 1:first_close + 2]), [self.PLAN[0]])
+        self.assertEqual(parser.feed(text[first_close + 2:]), [self.PLAN[1]])
+        self.assertTrue(parser.finished)
+
+    def test_any_chunking_yields_same_elements(self):
+        text = "```json\nJSON Plan:\n" + json.dumps(self.PLAN, indent=2) + "\n```"
+        for size in (1, 2, 3, 7, 50, len(text)):
+            with self.subTest(size=size):
+                self.assertEqual(_feed_in_pieces(IncrementalJSONArrayParser(), text, size), self.PLAN)
+
+    def test_invalid_element_is_skipped(self):
+        parser = IncrementalJSONArrayParser()
+        items = parser.feed('[{"tool_name": "a", // comment\n "args": []}, {"tool_name": "b"}]')
+        self.assertEqual(items, [{"tool_name": "b"}])
+
+    def test_text_after_array_is_ignored(self):
+        parser = IncrementalJSONArrayParser()
+        self.assertEqual(parser.feed('[{"a": 1}] trailing [{"b": 2}]'), [{"a": 1}])
+        self.assertEqual(parser.feed('{"c": 3}'), [])
+
+
+class TestIncrementalLineListParser(unittest.TestCase):
+    def test_lines_emitted_on_newline_and_markers_stripped(self):
+        parser = IncrementalLineListParser()
+        self.assertEqual(parser.feed("- Game Co"), [])
+        self.assertEqual(parser.feed("re\n* Display\n\n1. In"), ["Game Core", "Display"])
+        self.assertEqual(parser.feed("put"), [])
+        self.assertEqual(parser.close(), ["Input"])
+        self.assertEqual(parser.close(), [])
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from ai_assistant.memory.structured_store import StructuredStore, get_structured_store, structured_store_path_for
+
+
+def _record(record_id, status="pending", kind="a", created_at="2025-01-01T00:00:00"):
+    return {"record_id": record_id, "status": status, "kind": kind, "created_at": created_at}
+
+
+def _load_json(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class TestStructuredStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.legacy_path = os.path.join(self.temp_dir, "records.json")
+        self.db_path = structured_store_path_for(self.legacy_path)
+        self.store = StructuredStore(self.db_path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _repository(self, store=None):
+        return (store or self.store).repository(
+            "records", "record_id",
+            columns={
+                "status": lambda r: r.get("status"),
+                "kind": lambda r: r.get("kind"),
+                "created_at": lambda r: r.get("created_at"),
+            },
+            legacy_path=self.legacy_path, legacy_loader=_load_json
+        )
+
+    def test_reads_do_not_create_database(self):
+        repository = self._repository()
+        self.assertIsNone(repository.get("missing"))
+        self.assertEqual(repository.find(), [])
+        self.assertEqual(repository.count(), 0)
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_upsert_get_and_insertion_order(self):
+        repository = self._repository()
+        self.assertTrue(repository.upsert(_record("r1")))
+        self.assertTrue(repository.upsert(_record("r2")))
+        self.assertTrue(repository.upsert(_record("r1", status="done"))) # Keeps its position
+        self.assertEqual(repository.get("r1")["status"], "done")
+        self.assertEqual([r["record_id"] for r in repository.find()], ["r1", "r2"])
+
+    def test_delete_where(self):
+        repository = self._repository()
+        repository.upsert_many([_record("r1", "pending"), _record("r2", "done"), _record("r3", "pending")])
+        self.assertEqual(repository.delete_where({"status": "pending"}), 2)
+        self.assertEqual([r["record_id"] for r in repository.find()], ["r2"])
+        with self.assertRaises(ValueError):
+            repository.delete_where({})
+
+    def test_find_filters_orders_and_limits(self):
+        repository = self._repository()
+        repository.upsert_many([
+            _record("r1", "pending", "a", "2025-01-03"),
+            _record("r2", "done", "a", "2025-01-01"),
+            _record("r3", "pending", "b", "2025-01-02"),
+        ])
+        self.assertEqual([r["record_id"] for r in repository.find({"status": "pending"})], ["r1", "r3"])
+        self.assertEqual([r["record_id"] for r in repository.find({"status": "pending", "kind": "b"})], ["r3"])
+        self.assertEqual([r["record_id"] for r in repository.find({"id": ["r2", "r3"]})], ["r2", "r3"])
+        self.assertEqual([r["record_id"] for r in repository.find(order_by="created_at", descending=True, limit=2)], ["r1", "r3"])
+        self.assertEqual(repository.find_one({"kind": "b"})["record_id"], "r3")
+        self.assertEqual(repository.count({"status": "pending"}), 2)
+        self.assertEqual(repository.count_by("status"), {"pending": 2, "done": 1})
+        with self.assertRaises(ValueError):
+            repository.find({"description": "x"}) # Not an indexed column
+
+    def test_delete_and_replace_all(self):
+        repository = self._repository()
+        repository.upsert_many([_record("r1"), _record("r2")])
+        self.assertTrue(repository.delete("r1"))
+        self.assertFalse(repository.delete("r1"))
+        self.assertTrue(repository.replace_all([_record("r3")]))
+        self.assertEqual([r["record_id"] for r in repository.find()], ["r3"])
+
+    def test_failed_change_rolls_back(self):
+        repository = self._repository()
+        repository.upsert(_record("r1"))
+        with self.assertRaises(TypeError): # Not JSON serializable
+            repository.upsert_many([_record("r2"), {"record_id": "r3", "bad": {1, 2}}])
+        self.assertEqual([r["record_id"] for r in repository.find()], ["r1"])
+
+    def test_legacy_file_is_migrated_once(self):
+        with open(self.legacy_path, 'w', encoding='utf-8') as f:
+            json.dump([_record("r1"), _record("r2", status="done")], f)
+
+        with patch('builtins.print'):
+            repository = self._repository()
+            self.assertEqual(repository.count(), 2)
+        self.assertEqual(repository.get("r2")["status"], "done")
+        self.assertFalse(os.path.exists(self.legacy_path))
+        self.assertTrue(os.path.exists(self.legacy_path + ".migrated"))
+
+        # A reopened store reads the table, not the renamed file
+        reopened = StructuredStore(self.db_path)
+        self.addCleanup(reopened.close)
+        self.assertEqual([r["record_id"] for r in self._repository(reopened).find()], ["r1", "r2"])
+
+    def test_unreadable_legacy_file_is_kept(self):
+        with open(self.legacy_path, 'w', encoding='utf-8') as f:
+            f.write("{not json")
+        repository = self.store.repository("records", "record_id", legacy_path=self.legacy_path,
+                                           legacy_loader=lambda path: None)
+        self.assertEqual(repository.find(), [])
+        self.assertTrue(os.path.exists(self.legacy_path))
+
+    def test_get_structured_store_is_shared_per_path(self):
+        store = get_structured_store(self.db_path)
+        self.addCleanup(store.close)
+        self.assertIs(store, get_structured_store(os.path.join(self.temp_dir, ".", os.path.basename(self.db_path))))
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import PropertyMock, patch
+
+from ai_assistant.tools import tool_catalog
+from ai_assistant.tools.tool_catalog import render_tools_json, describe_tools_for_prompt
+from ai_assistant.tools.tool_system import ToolSystem
+
+
+class TestToolCatalogFragments(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.previous_provider = tool_catalog._active_catalog_provider
+        self.tool_system = ToolSystem(tool_registry_file=os.path.join(self.temp_dir, "tool_registry.json"))
+        self.tool_system.register_tool(
+            "lookup_weather", "Looks up the weather.", "some.module", "lookup_weather",
+            schema_details={"parameters": [{"name": "city", "type": "str", "description": "City name."}]}
+        )
+
+    def tearDown(self):
+        tool_catalog.set_active_catalog_provider(self.previous_provider)
+        shutil.rmtree(self.temp_dir)
+
+    def test_version_bumps_on_registry_changes(self):
+        version = self.tool_system.version
+        self.tool_system.register_tool("extra_tool", "Extra.", "some.module", "extra_tool")
+        self.assertEqual(self.tool_system.version, version + 1)
+        self.tool_system.remove_tool("extra_tool")
+        self.assertEqual(self.tool_system.version, version + 2)
+        self.tool_system._system_update_tool_metadata_impl("lookup_weather", "Looks up the weather forecast.")
+        self.assertEqual(self.tool_system.version, version + 3)
+        self.tool_system.remove_tool("missing_tool")
+        self.assertEqual(self.tool_system.version, version + 3)
+
+    def test_registry_renderings_are_memoized_per_version(self):
+        tools = self.tool_system.list_tools()
+        rendered = render_tools_json(tools)
+        self.assertEqual(rendered, json.dumps(tools, indent=2))
+        with patch("ai_assistant.tools.tool_catalog.json.dumps") as mock_dumps:
+            self.assertIs(render_tools_json(self.tool_system.list_tools()), rendered)
+            mock_dumps.assert_not_called()
+        self.tool_system.register_tool("extra_tool", "Extra.", "some.module", "extra_tool")
+        self.assertIn('"extra_tool"', render_tools_json(self.tool_system.list_tools()))
+
+    def test_variants(self):
+        rich = self.tool_system.list_tools_with_sources()
+        annotated = json.loads(render_tools_json(rich, annotated=True))
+        self.assertEqual(annotated["lookup_weather"], "Looks up the weather. Parameters: [city (str): City name.]")
+        self.assertIs(render_tools_json(rich, annotated=True), render_tools_json(rich, annotated=True))
+        compact = render_tools_json(self.tool_system.list_tools(), compact=True)
+        self.assertNotIn("\n", compact)
+        self.assertEqual(json.loads(compact), self.tool_system.list_tools())
+        escaped = render_tools_json(self.tool_system.list_tools(), escape_braces=True)
+        self.assertTrue(escaped.startswith("{{") and escaped.endswith("}}"))
+
+    def test_other_tool_dicts_are_rendered_directly(self):
+        subset = {"lookup_weather": self.tool_system.list_tools_with_sources()["lookup_weather"], "adhoc": "Ad hoc tool."}
+        self.assertEqual(
+            describe_tools_for_prompt(subset),
+            {"lookup_weather": "Looks up the weather. Parameters: [city (str): City name.]", "adhoc": "Ad hoc tool."}
+        )
+        self.assertEqual(render_tools_json({"a": "b"}), json.dumps({"a": "b"}, indent=2))
+
+    def test_registry_listings_are_recognised_by_version_not_by_contents(self):
+        tools = self.tool_system.list_tools_with_sources()
+        expected = describe_tools_for_prompt(tools)
+        rendered = render_tools_json(self.tool_system.list_tools())
+        with patch.object(tool_catalog.ToolCatalogFragments, "descriptions", new_callable=PropertyMock) as descriptions:
+            self.assertIs(describe_tools_for_prompt(self.tool_system.list_tools_with_sources()), expected)
+            self.assertIs(render_tools_json(self.tool_system.list_tools()), rendered)
+            descriptions.assert_not_called() # Nothing to compare the listings against
+        # Plain copies of the registry are still recognised, by comparing them.
+        self.assertIs(describe_tools_for_prompt(dict(tools)), expected)
+        # A modified listing loses its tag and is rendered as given.
+        tools["adhoc"] = "Ad hoc tool."
+        self.assertIsNone(tools.catalog_key)
+        self.assertIn("adhoc", describe_tools_for_prompt(tools))
+        # As does a listing of an older version.
+        stale = self.tool_system.list_tools()
+        self.tool_system.register_tool("extra_tool", "Extra.", "some.module", "extra_tool")
+        self.assertNotIn('"extra_tool"', render_tools_json(stale))
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
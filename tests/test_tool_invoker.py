@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from ai_assistant.tools import tool_catalog
+from ai_assistant.tools.tool_invoker import ToolInvoker, EXECUTOR_INLINE, EXECUTOR_THREAD, EXECUTOR_PROCESS
+from ai_assistant.tools.tool_system import ToolSystem
+
+
+def _typed_tool(count: int, ratio: float, verbose: bool = False, label: str = "x"):
+    return count, ratio, verbose, label
+
+
+def _managed_tool(value, task_manager=None, notification_manager=None):
+    return value, task_manager, notification_manager
+
+
+def _current_thread_name() -> str:
+    return threading.current_thread().name
+
+
+def _slow_tool() -> str:
+    time.sleep(0.02)
+    return "done"
+
+
+async def _async_tool(value: int) -> int:
+    return value * 2
+
+
+class TestToolInvoker(unittest.TestCase):
+    def test_coerces_string_arguments_from_annotations(self):
+        invoker = ToolInvoker("typed", _typed_tool)
+        args, kwargs = invoker.prepare(("3", "0.5"), {"verbose": "yes", "label": "7"})
+        self.assertEqual(args, (3, 0.5))
+        self.assertEqual(kwargs, {"verbose": True, "label": "7"}) # str parameters are left alone
+
+        args, kwargs = invoker.prepare(("three",), {"verbose": "maybe"})
+        self.assertEqual(args, ("three",)) # Unparseable values pass through for the tool to reject
+        self.assertEqual(kwargs, {"verbose": "maybe"})
+
+    def test_injects_only_accepted_managers(self):
+        invoker = ToolInvoker("managed", _managed_tool)
+        self.assertEqual(invoker.injected, ("task_manager", "notification_manager"))
+        kwargs = {"value": 1}
+        _, prepared = invoker.prepare((), kwargs, task_manager="tm")
+        self.assertEqual(prepared, {"value": 1, "task_manager": "tm"})
+        self.assertEqual(kwargs, {"value": 1}) # The caller's dict is not modified
+
+        plain = ToolInvoker("typed", _typed_tool)
+        _, prepared = plain.prepare((1, 2.0), {}, task_manager="tm", notification_manager="nm")
+        self.assertEqual(prepared, {})
+
+    def test_executor_choice(self):
+        self.assertIsNone(ToolInvoker("async", _async_tool, executor=EXECUTOR_INLINE).executor)
+        self.assertEqual(ToolInvoker("thread_name", _current_thread_name).executor, EXECUTOR_THREAD)
+        self.assertEqual(ToolInvoker("typed", _typed_tool, executor=EXECUTOR_PROCESS).executor, EXECUTOR_PROCESS)
+        # Injected managers cannot be sent to another process, and lambdas cannot be pickled
+        self.assertEqual(ToolInvoker("managed", _managed_tool, executor=EXECUTOR_PROCESS).executor, EXECUTOR_THREAD)
+        self.assertEqual(ToolInvoker("lambda", lambda: 1, executor=EXECUTOR_PROCESS).executor, EXECUTOR_THREAD)
+        self.assertEqual(ToolInvoker("typed", _typed_tool, executor="gpu").executor, EXECUTOR_THREAD)
+
+    def test_inline_and_thread_executors(self):
+        main_thread = threading.current_thread().name
+        inline = ToolInvoker("thread_name", _current_thread_name, executor=EXECUTOR_INLINE)
+        threaded = ToolInvoker("thread_name", _current_thread_name)
+        self.assertEqual(asyncio.run(inline.invoke()), main_thread)
+        self.assertNotEqual(asyncio.run(threaded.invoke()), main_thread)
+        self.assertEqual(asyncio.run(ToolInvoker("async", _async_tool).invoke(("4",))), 8)
+
+    def test_slow_inline_tool_moves_to_thread_pool(self):
+        invoker = ToolInvoker("slow", _slow_tool, executor=EXECUTOR_INLINE)
+        self.assertEqual(asyncio.run(invoker.invoke()), "done")
+        self.assertEqual(invoker.executor, EXECUTOR_THREAD)
+
+
+class TestToolSystemInvokerCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.previous_provider = tool_catalog._active_catalog_provider
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", []):
+            self.tool_system = ToolSystem(tool_registry_file=os.path.join(self.temp_dir, "tool_registry.json"))
+
+    def tearDown(self):
+        tool_catalog.set_active_catalog_provider(self.previous_provider)
+        shutil.rmtree(self.temp_dir)
+
+    def test_invoker_is_built_once_and_rebuilt_for_a_new_callable(self):
+        self.assertEqual(asyncio.run(self.tool_system.execute_tool("add_numbers", args=("2", "3"))), 5)
+        invoker = self.tool_system.get_tool("add_numbers")["invoker_cache"]
+        self.assertEqual(invoker.executor, EXECUTOR_INLINE)
+        asyncio.run(self.tool_system.execute_tool("add_numbers", args=(1, 1)))
+        self.assertIs(self.tool_system.get_tool("add_numbers")["invoker_cache"], invoker)
+
+        self.tool_system.get_tool("add_numbers")["callable_cache"] = lambda a, b: a - b
+        self.assertEqual(asyncio.run(self.tool_system.execute_tool("add_numbers", args=(5, 3))), 2)
+        self.assertIsNot(self.tool_system.get_tool("add_numbers")["invoker_cache"], invoker)
+
+    def test_executor_declared_in_schema_details(self):
+        self.tool_system.register_tool("typed", "Typed tool.", __name__, "_typed_tool",
+                                       func_callable=_typed_tool, schema_details={"executor": EXECUTOR_PROCESS})
+        self.assertEqual(asyncio.run(self.tool_system.execute_tool("typed", args=("2", "1.5"))), (2, 1.5, False, "x"))
+        self.assertEqual(self.tool_system.get_tool("typed")["invoker_cache"].executor, EXECUTOR_PROCESS)
+
+    def test_invoker_is_not_persisted(self):
+        asyncio.run(self.tool_system.execute_tool("no_op_tool"))
+        self.assertTrue(self.tool_system.save_registered_tools())
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", []):
+            reloaded = ToolSystem(tool_registry_file=os.path.join(self.temp_dir, "tool_registry.json"))
+        self.assertNotIn("invoker_cache", reloaded.get_tool("no_op_tool"))
+        self.assertEqual(reloaded.get_tool("no_op_tool")["executor"], EXECUTOR_INLINE)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+from ai_assistant.tools import tool_catalog
+from ai_assistant.tools.tool_manifest import ToolDiscoveryManifest, describe_module_tools, module_source_files
+from ai_assistant.tools.tool_system import ToolSystem
+
+MODULE_NAME = "manifest_test_tools"
+MODULE_SOURCE = '''
+from os.path import join # Imported functions are not tools
+
+SHOUT_SCHEMA = {"name": "shout", "description": "Shouts a message.", "parameters": []}
+
+def shout(message: str) -> str:
+    """Upper-cases a message.
+
+    More detail that is not part of the description.
+    """
+    return message.upper()
+
+def whisper(message: str) -> str:
+    """Lower-cases a message."""
+    return message.lower()
+
+def _helper():
+    return None
+'''
+
+
+class TestToolDiscoveryManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.module_dir = os.path.join(self.temp_dir, "modules")
+        os.makedirs(self.module_dir)
+        self.module_path = os.path.join(self.module_dir, MODULE_NAME + ".py")
+        with open(self.module_path, "w", encoding="utf-8") as f:
+            f.write(MODULE_SOURCE)
+        sys.path.insert(0, self.module_dir)
+        self.registry_file = os.path.join(self.temp_dir, "data", "tool_registry.json")
+        self.manifest_file = os.path.join(self.temp_dir, "data", "tool_discovery_manifest.json")
+        self.previous_provider = tool_catalog._active_catalog_provider
+
+    def tearDown(self):
+        tool_catalog.set_active_catalog_provider(self.previous_provider)
+        sys.path.remove(self.module_dir)
+        sys.modules.pop(MODULE_NAME, None)
+        shutil.rmtree(self.temp_dir)
+
+    def _tool_system(self):
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", [(MODULE_NAME, MODULE_NAME + ".py")]):
+            return ToolSystem(tool_registry_file=self.registry_file)
+
+    def test_describe_module_tools(self):
+        __import__(MODULE_NAME)
+        tools = describe_module_tools(sys.modules[MODULE_NAME])
+        self.assertEqual([t["name"] for t in tools], ["shout", "whisper"])
+        self.assertEqual(tools[0]["docstring_first_line"], "Upper-cases a message.")
+        self.assertEqual(tools[0]["schema_details"]["description"], "Shouts a message.")
+        self.assertIsNone(tools[1]["schema_details"])
+
+    def test_module_source_files_does_not_import(self):
+        self.assertEqual(module_source_files(MODULE_NAME), [self.module_path])
+        self.assertNotIn(MODULE_NAME, sys.modules)
+        self.assertIsNone(module_source_files("no_such_module_for_manifest_test"))
+
+    def test_lookup_matches_until_content_changes(self):
+        manifest = ToolDiscoveryManifest(self.manifest_file)
+        tools = [{"name": "shout", "docstring_first_line": "Upper-cases a message.", "schema_details": None}]
+        manifest.record(MODULE_NAME, [self.module_path], tools)
+        self.assertTrue(manifest.save())
+
+        reloaded = ToolDiscoveryManifest(self.manifest_file)
+        self.assertEqual(reloaded.lookup(MODULE_NAME, [self.module_path]), tools)
+        self.assertIsNone(reloaded.lookup(MODULE_NAME, [self.module_path, "other.py"]))
+
+        # A touch changes the mtime but not the content
+        stat = os.stat(self.module_path)
+        os.utime(self.module_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(reloaded.lookup(MODULE_NAME, [self.module_path]), tools)
+
+        with open(self.module_path, "a", encoding="utf-8") as f:
+            f.write("\ndef extra():\n    return 1\n")
+        self.assertIsNone(reloaded.lookup(MODULE_NAME, [self.module_path]))
+
+    def test_warm_start_registers_without_importing_and_executes_lazily(self):
+        cold = self._tool_system()
+        self.assertIn(MODULE_NAME, sys.modules)
+        self.assertEqual(cold.get_tool("shout")["description"], "Shouts a message.")
+        self.assertTrue(os.path.exists(self.manifest_file))
+
+        sys.modules.pop(MODULE_NAME)
+        os.remove(self.registry_file) # Discovery alone must register the tools
+        warm = self._tool_system()
+        self.assertNotIn(MODULE_NAME, sys.modules)
+        self.assertEqual(warm.get_tool("shout")["description"], "Shouts a message.")
+        self.assertEqual(warm.get_tool("whisper")["description"], "Lower-cases a message.")
+        self.assertIsNone(warm.get_tool("whisper")["callable_cache"])
+
+        self.assertEqual(asyncio.run(warm.execute_tool("whisper", args=("HeLLo",))), "hello")
+        self.assertIn(MODULE_NAME, sys.modules)
+
+    def test_changed_module_is_rediscovered(self):
+        self._tool_system()
+        sys.modules.pop(MODULE_NAME)
+        with open(self.module_path, "a", encoding="utf-8") as f:
+            f.write('\ndef murmur(message: str) -> str:\n    """Murmurs a message."""\n    return message\n')
+        tool_system = self._tool_system()
+        self.assertIn(MODULE_NAME, sys.modules)
+        self.assertEqual(tool_system.get_tool("murmur")["description"], "Murmurs a message.")
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from ai_assistant.core import project_manager
+from ai_assistant.custom_tools.file_system_tools import (
+    GET_PROJECT_FILE_CONTENT_SCHEMA, LIST_PROJECT_FILES_SCHEMA, get_project_file_content, list_project_files, write_text_to_file
+)
+from ai_assistant.memory.persistent_memory import save_learned_facts, LEARNED_FACTS_CACHE_TAG
+from ai_assistant.tools import tool_catalog
+from ai_assistant.tools.tool_result_cache import ToolCachePolicy, ToolResultCache, fingerprint_paths
+from ai_assistant.tools.tool_system import ToolSystem
+
+CALLS = []
+
+
+def _read_file(full_filepath: str) -> str:
+    CALLS.append(full_filepath)
+    with open(full_filepath, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _describe_file(full_filepath: str) -> dict:
+    CALLS.append(full_filepath)
+    if not os.path.exists(full_filepath):
+        return {"status": "error", "message": "not found"}
+    return {"status": "success", "file_path": full_filepath, "lines": [1, 2]}
+
+
+def _count_facts() -> int:
+    CALLS.append("facts")
+    return len(CALLS)
+
+
+class TestToolCachePolicy(unittest.TestCase):
+    def test_from_schema(self):
+        self.assertIsNone(ToolCachePolicy.from_schema(None))
+        self.assertIsNone(ToolCachePolicy.from_schema({"name": "t", "description": "d", "idempotent": True}))
+        policy = ToolCachePolicy.from_schema({
+            "cacheable": True, "cache_ttl_seconds": 10,
+            "invalidation_keys": [{"path_arg": "p"}, {"result_path": "file_path"}, {"tag": "facts"}]
+        })
+        self.assertEqual((policy.ttl_seconds, policy.path_args, policy.result_paths, policy.tags),
+                         (10.0, ("p",), ("file_path",), ("facts",)))
+
+    def test_argument_and_result_paths(self):
+        policy = ToolCachePolicy.from_schema({"cacheable": True, "invalidation_keys": [{"path_arg": "full_filepath"}, {"result_path": "file_path"}]})
+        self.assertEqual(policy.argument_paths(["full_filepath"], ("a.txt",), {}), [os.path.abspath("a.txt")])
+        self.assertEqual(policy.argument_paths(["full_filepath"], (), {"full_filepath": "b.txt"}), [os.path.abspath("b.txt")])
+        self.assertIsNone(policy.result_paths_of({"status": "error"}))
+        self.assertIsNone(ToolCachePolicy.make_key(({1, 2},), {})) # Sets are not serializable
+
+
+class TestToolResultCache(unittest.TestCase):
+    def test_lru_eviction_and_ttl(self):
+        cache = ToolResultCache(max_entries=2)
+        cache.put("t", "a", "A", 60, {})
+        cache.put("t", "b", "B", 60, {})
+        self.assertEqual(cache.get("t", "a"), (True, "A")) # "b" is now least recently used
+        cache.put("t", "c", "C", 60, {})
+        self.assertEqual(cache.get("t", "b"), (False, None))
+        cache.put("t", "old", "X", 60, {})
+        with patch("ai_assistant.tools.tool_result_cache.time.time", return_value=10**12):
+            self.assertEqual(cache.get("t", "old"), (False, None))
+        stats = cache.stats()["t"]
+        self.assertEqual((stats["hits"], stats["misses"], stats["evictions"]), (1, 2, 2))
+
+    def test_results_are_detached_from_callers(self):
+        cache = ToolResultCache()
+        result = {"files": ["a"]}
+        cache.put("t", "k", result, 60, {})
+        result["files"].append("mutated")
+        _, cached = cache.get("t", "k")
+        cached["files"].append("also mutated")
+        self.assertEqual(cache.get("t", "k"), (True, {"files": ["a"]}))
+
+    def test_path_fingerprint_and_invalidation(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(temp_dir, "f.txt")
+            with open(path, "w") as f:
+                f.write("one")
+            cache = ToolResultCache()
+            cache.put("t", "k", "one", 60, fingerprint_paths([path]))
+            cache.put("t", "listing", ["f.txt"], 60, fingerprint_paths([temp_dir]))
+            self.assertTrue(cache.get("t", "k")[0])
+            self.assertEqual(cache.invalidate_path(path), 2) # The entry and its directory's listing
+            cache.put("t", "k", "one", 60, fingerprint_paths([path]))
+            with open(path, "a") as f:
+                f.write(" two")
+            self.assertFalse(cache.get("t", "k")[0])
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestToolSystemResultCaching(unittest.TestCase):
+    def setUp(self):
+        CALLS.clear()
+        self.temp_dir = tempfile.mkdtemp()
+        self.previous_provider = tool_catalog._active_catalog_provider
+        with patch("ai_assistant.tools.tool_system.CUSTOM_TOOL_MODULES_TO_DISCOVER", []):
+            self.tool_system = ToolSystem(tool_registry_file=os.path.join(self.temp_dir, "tool_registry.json"))
+        self.file_path = os.path.join(self.temp_dir, "notes.txt")
+        with open(self.file_path, "w", encoding="utf-8") as f:
+            f.write("first")
+
+    def tearDown(self):
+        tool_catalog.set_active_catalog_provider(self.previous_provider)
+        shutil.rmtree(self.temp_dir)
+
+    def _register(self, name, func, **schema):
+        self.tool_system.register_tool(name, "Test tool.", __name__, func.__name__, func_callable=func,
+                                       schema_details={"name": name, "description": "Test tool.", "cacheable": True, **schema})
+
+    def _run(self, name, *args):
+        return asyncio.run(self.tool_system.execute_tool(name, args=args))
+
+    def test_repeated_reads_hit_until_the_file_is_written(self):
+        self._register("read_file", _read_file, invalidation_keys=[{"path_arg": "full_filepath"}])
+        self.assertEqual(self._run("read_file", self.file_path), "first")
+        self.assertEqual(self._run("read_file", self.file_path), "first")
+        self.assertEqual(len(CALLS), 1)
+
+        self.assertTrue(write_text_to_file(self.file_path, "second").startswith("Success"))
+        self.assertEqual(self._run("read_file", self.file_path), "second")
+        self.assertEqual(len(CALLS), 2)
+        stats = self.tool_system.tool_result_cache_stats()["read_file"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_error_results_without_result_path_are_not_cached(self):
+        self._register("describe_file", _describe_file, invalidation_keys=[{"result_path": "file_path"}])
+        missing = os.path.join(self.temp_dir, "missing.txt")
+        self._run("describe_file", missing)
+        self._run("describe_file", missing)
+        self.assertEqual(len(CALLS), 2)
+        self._run("describe_file", self.file_path)
+        self.assertEqual(self._run("describe_file", self.file_path)["lines"], [1, 2])
+        self.assertEqual(len(CALLS), 3)
+
+    def test_tag_invalidation_and_reregistration(self):
+        self._register("count_facts", _count_facts, invalidation_keys=[{"tag": LEARNED_FACTS_CACHE_TAG}])
+        self.assertEqual(self._run("count_facts"), self._run("count_facts"))
+        save_learned_facts([], os.path.join(self.temp_dir, "facts.json"))
+        self._run("count_facts")
+        self.assertEqual(len(CALLS), 2)
+
+        self._register("count_facts", _count_facts, invalidation_keys=[{"tag": LEARNED_FACTS_CACHE_TAG}])
+        self._run("count_facts")
+        self.assertEqual(len(CALLS), 3)
+
+    def test_project_tools_follow_a_moved_project_root(self):
+        self.tool_system.register_tool("list_project_files", "Lists.", "ai_assistant.custom_tools.file_system_tools",
+                                       "list_project_files", func_callable=list_project_files,
+                                       schema_details=LIST_PROJECT_FILES_SCHEMA)
+        self.tool_system.register_tool("get_project_file_content", "Reads.", "ai_assistant.custom_tools.file_system_tools",
+                                       "get_project_file_content", func_callable=get_project_file_content,
+                                       schema_details=GET_PROJECT_FILE_CONTENT_SCHEMA)
+        root_a, root_b = os.path.join(self.temp_dir, "a"), os.path.join(self.temp_dir, "b")
+        for root, content in ((root_a, "from a"), (root_b, "from b")):
+            os.makedirs(root)
+            with open(os.path.join(root, f"{os.path.basename(root)}.txt"), "w", encoding="utf-8") as f:
+                f.write(content)
+        with open(os.path.join(root_b, "a.txt"), "w", encoding="utf-8") as f:
+            f.write("a.txt in b")
+
+        with patch("ai_assistant.core.project_manager.get_data_dir", return_value=self.temp_dir), \
+             patch("builtins.print"):
+            project_manager.create_project("demo")
+            project_manager.set_project_root_path("demo", root_a)
+            self.assertEqual(self._run("list_project_files", "demo")["files"], ["a.txt"])
+            self.assertEqual(self._run("get_project_file_content", "demo", "a.txt")["content"], "from a")
+            self.assertEqual(self.tool_system.tool_result_cache_stats()["list_project_files"]["entries"], 1)
+
+            project_manager.set_project_root_path("demo", root_b)
+            listing = self._run("list_project_files", "demo")
+            self.assertEqual((listing["path_listed"], listing["files"]), (root_b, ["a.txt", "b.txt"]))
+            self.assertEqual(self._run("get_project_file_content", "demo", "a.txt")["content"], "a.txt in b")
+
+            # A project removed and created again under the same name starts without a root
+            project_manager.remove_project("demo")
+            project_manager.create_project("demo")
+            self.assertEqual(self._run("list_project_files", "demo")["status"], "error")
+
+    def test_tools_without_cacheable_schema_always_run(self):
+        self.tool_system.register_tool("read_plain", "Test tool.", __name__, "_read_file", func_callable=_read_file)
+        self._run("read_plain", self.file_path)
+        self._run("read_plain", self.file_path)
+        self.assertEqual(len(CALLS), 2)
+        self.assertNotIn("read_plain", self.tool_system.tool_result_cache_stats())
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import json
+import threading
+from unittest.mock import patch
+
+from ai_assistant.llm_interface.embeddings import HashingEmbeddingBackend
+from ai_assistant.memory.vector_index import VectorIndex
+from ai_assistant.planning.planning import PlannerAgent
+from ai_assistant.planning.tool_retrieval import ToolRetriever
+from ai_assistant.tools.tool_catalog import format_tool_description
+
+
+def _tool(description, params=()):
+    return {
+        "description": description,
+        "schema_details": {"parameters": [{"name": name, "type": "str", "description": desc} for name, desc in params]}
+    }
+
+
+def _registry(filler_count=40):
+    tools = {
+        "search_duckduckgo": _tool("Searches the internet using DuckDuckGo.", [("query", "The search query.")]),
+        "no_op_tool": _tool("Does nothing."),
+        "read_text_file": _tool("Reads the contents of a text file from disk.", [("file_path", "Path of the file.")]),
+        "write_text_file": _tool("Writes text to a file on disk.", [("file_path", "Path of the file."), ("content", "Text to write.")]),
+        "git_commit_changes": _tool("Commits staged changes in the project repository.", [("message", "Commit message.")]),
+        "convert_currency": _tool("Converts an amount between currencies using exchange rates.", [("amount", "Amount to convert.")]),
+    }
+    for i in range(filler_count):
+        tools[f"generated_tool_{i}"] = _tool(f"Generated helper number {i} for widget{i} processing.", [("widget_id", "Widget identifier.")])
+    return tools
+
+
+class TestToolRetriever(unittest.TestCase):
+    def setUp(self):
+        self.tools = _registry()
+        self.retriever = ToolRetriever(shortlist_size=3, core_tools=["no_op_tool", "missing_core_tool"], use_embeddings=False)
+
+    def test_format_tool_description_includes_parameters(self):
+        self.assertEqual(
+            format_tool_description(self.tools["read_text_file"]),
+            "Reads the contents of a text file from disk. Parameters: [file_path (str): Path of the file.]"
+        )
+        self.assertEqual(format_tool_description("Plain description."), "Plain description.")
+
+    def test_shortlist_keeps_relevant_and_core_tools_in_registry_order(self):
+        shortlist = self.retriever.shortlist("Read the file notes.txt and write a summary to a file", self.tools)
+        self.assertEqual(list(shortlist)[:3], ["no_op_tool", "read_text_file", "write_text_file"])
+        self.assertLessEqual(len(shortlist), 4)
+        self.assertIs(shortlist["read_text_file"], self.tools["read_text_file"])
+
+    def test_schema_parameters_are_indexed(self):
+        self.assertIn("generated_tool_7", self.retriever.rank("process widget7", self.tools, limit=1))
+        self.assertEqual(self.retriever.rank("exchange rates", self.tools, limit=1), ["convert_currency"])
+
+    def test_small_registries_and_unmatched_goals_are_unchanged(self):
+        small = {name: self.tools[name] for name in ["no_op_tool", "read_text_file", "write_text_file", "search_duckduckgo"]}
+        self.assertIs(self.retriever.shortlist("read a file", small), small)
+        self.assertIs(self.retriever.shortlist("zzz qqq", self.tools), self.tools)
+
+    def test_index_rebuilt_when_catalog_changes(self):
+        self.retriever.rank("file", self.tools)
+        postings = self.retriever._postings
+        self.retriever.rank("commit", self.tools)
+        self.assertIs(self.retriever._postings, postings)
+        tools = dict(self.tools, deploy_service=_tool("Deploys the service to production."))
+        self.assertEqual(self.retriever.rank("deploy to production", tools, limit=1), ["deploy_service"])
+
+    def test_semantic_ranking_matches_paraphrases(self):
+        retriever = ToolRetriever(
+            vector_index=VectorIndex("tools", backend=HashingEmbeddingBackend(), persist=False),
+            shortlist_size=2, core_tools=[]
+        )
+        # "currencies" shares no BM25 term with the goal's "currency"; character n-grams still match.
+        shortlist = retriever.shortlist("how much is 10 USD in EUR currency", self.tools)
+        self.assertIn("convert_currency", shortlist)
+        self.assertEqual(len(shortlist), 2)
+
+
+class TestPlannerToolShortlisting(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.planner = PlannerAgent()
+        self.planner.tool_retriever = ToolRetriever(shortlist_size=2, core_tools=["no_op_tool"], use_embeddings=False)
+        self.tools = _registry()
+
+    async def test_planning_prompt_lists_only_shortlisted_tools(self):
+        plan_json = json.dumps([{"tool_name": "git_commit_changes", "args": ["msg"], "kwargs": {}}])
+        with patch('ai_assistant.planning.planning.invoke_ollama_model_async', return_value=plan_json) as mock_llm:
+            plan = await self.planner.create_plan_with_llm("Commit my changes to the repository", self.tools)
+        prompt = mock_llm.call_args[0][0]
+        self.assertIn('"git_commit_changes"', prompt)
+        self.assertIn('"no_op_tool"', prompt)
+        self.assertNotIn("generated_tool_", prompt)
+        self.assertEqual(plan[0]["tool_name"], "git_commit_changes")
+
+    async def test_replan_prompt_uses_goal_and_failure_analysis(self):
+        plan_json = json.dumps([{"tool_name": "write_text_file", "args": ["out.txt", "hi"], "kwargs": {}}])
+        with patch('ai_assistant.planning.planning.invoke_ollama_model_async', return_value=plan_json) as mock_llm:
+            plan = await self.planner.replan_after_failure(
+                "Save a greeting", "git_commit_changes failed; write text to a file instead.", self.tools
+            )
+        prompt = mock_llm.call_args[0][0]
+        self.assertIn('"write_text_file"', prompt)
+        self.assertNotIn("generated_tool_", prompt)
+        self.assertEqual(plan[0]["tool_name"], "write_text_file")
+
+    async def test_shortlisting_runs_off_the_event_loop(self):
+        loop_thread = threading.get_ident()
+        shortlist_threads = []
+        original_shortlist = self.planner.tool_retriever.shortlist
+        def shortlist(query, available_tools):
+            shortlist_threads.append(threading.get_ident())
+            return original_shortlist(query, available_tools)
+        plan_json = json.dumps([{"tool_name": "git_commit_changes", "args": ["msg"], "kwargs": {}}])
+        with patch.object(self.planner.tool_retriever, "shortlist", side_effect=shortlist), \
+             patch('ai_assistant.planning.planning.invoke_ollama_model_async', return_value=plan_json):
+            await self.planner.create_plan_with_llm("Commit my changes to the repository", self.tools)
+        self.assertEqual(len(shortlist_threads), 1)
+        self.assertNotEqual(shortlist_threads[0], loop_thread)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()
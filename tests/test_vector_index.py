@@ -0,0 +1,234 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+import numpy as np
+
+from ai_assistant.llm_interface.embeddings import (
+    HashingEmbeddingBackend,
+    OllamaEmbeddingBackend,
+    FallbackEmbeddingBackend
+)
+from ai_assistant.llm_interface.circuit_breaker import get_circuit_breaker, reset_circuit_breakers
+from ai_assistant.llm_interface.ollama_client import OllamaProvider
+from ai_assistant.memory.vector_index import VectorIndex
+from ai_assistant.memory.fact_store import FactStore
+from tests.ollama_stub_server import OllamaStubServer
+
+
+class TestHashingEmbeddingBackend(unittest.TestCase):
+    def test_deterministic_unit_vectors(self):
+        backend = HashingEmbeddingBackend(dimension=64)
+        first = backend.embed(["search the web for news", ""])
+        second = HashingEmbeddingBackend(dimension=64).embed(["search the web for news", ""])
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+        self.assertEqual(float(np.linalg.norm(first[1])), 0.0)
+
+    def test_related_texts_are_closer(self):
+        vectors = HashingEmbeddingBackend().embed([
+            "Search the web with DuckDuckGo", "web search using duckduckgo", "Multiply two floats"
+        ])
+        self.assertGreater(vectors[0] @ vectors[1], vectors[0] @ vectors[2])
+
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.backend = HashingEmbeddingBackend(dimension=128)
+        self.items = {
+            "t1": "Search the web with DuckDuckGo",
+            "t2": "Read the contents of a file from disk",
+            "t3": "Write text to a file on disk",
+            "t4": "Run a git commit in the project repository",
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _index(self, **kwargs):
+        return VectorIndex("test", backend=self.backend, directory=self.temp_dir, **kwargs)
+
+    def test_batched_query_returns_best_matches_first(self):
+        index = self._index()
+        index.add(self.items)
+        results = index.query(["web search engine", "save text into a file"], top_k=2)
+        self.assertEqual(results[0][0][0], "t1")
+        self.assertEqual(results[1][0][0], "t3")
+        self.assertEqual(len(results[1]), 2)
+        self.assertGreaterEqual(results[1][0][1], results[1][1][1])
+
+    def test_min_score_and_allowed_ids(self):
+        index = self._index()
+        index.add(self.items)
+        self.assertEqual(index.query(["web search"], top_k=4, min_score=0.99), [[]])
+        results = index.query(["web search"], top_k=4, allowed_ids=["t2", "t4"])
+        self.assertEqual({item_id for item_id, _ in results[0]}, {"t2", "t4"})
+
+    def test_delete_and_replace(self):
+        index = self._index()
+        index.add(self.items)
+        self.assertEqual(index.delete(["t1", "missing"]), 1)
+        self.assertNotIn("t1", index)
+        self.assertNotIn("t1", [item_id for item_id, _ in index.query(["web search"], top_k=4)[0]])
+        index.add({"t2": "Search the web with DuckDuckGo"})
+        self.assertEqual(index.query(["web search"], top_k=1)[0][0][0], "t2")
+        self.assertEqual(len(index), 3)
+
+    def test_sync_embeds_only_changes(self):
+        index = self._index()
+        self.assertEqual(index.sync(self.items), 4)
+        self.assertEqual(index.sync(self.items), 0)
+        changed = dict(self.items, t2="Delete a file", t5="Create a new project")
+        del changed["t4"]
+        self.assertEqual(index.sync(changed), 2)
+        self.assertEqual(len(index), 4)
+        self.assertNotIn("t4", index)
+
+    def test_persists_to_memory_mapped_file(self):
+        index = self._index()
+        index.add(self.items)
+        reopened = self._index()
+        self.assertIsInstance(reopened._matrix, np.memmap)
+        self.assertEqual(len(reopened), 4)
+        self.assertEqual(reopened.sync(self.items), 0)
+        self.assertEqual(reopened.query(["git commit"], top_k=1)[0][0][0], "t4")
+
+    def test_grows_and_compacts(self):
+        index = self._index()
+        many = {f"id{i}": f"item number {i} topic{i % 7}" for i in range(150)}
+        index.sync(many)
+        self.assertGreaterEqual(index._matrix.shape[0], 150)
+        index.sync({f"id{i}": many[f"id{i}"] for i in range(40)})
+        self.assertEqual(len(index), 40)
+        self.assertEqual(len(index._ids), 40) # Dead rows were compacted away
+        self.assertEqual(index.query(["item number 3 topic3"], top_k=1)[0][0][0], "id3")
+
+    def test_index_is_rebuilt_for_a_different_backend(self):
+        index = self._index()
+        index.add(self.items)
+        other = VectorIndex("test", backend=HashingEmbeddingBackend(dimension=32), directory=self.temp_dir)
+        self.assertEqual(other.sync(self.items), 4)
+        with open(os.path.join(self.temp_dir, "test.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["backend"], "hashing-32")
+
+    def test_in_memory_index(self):
+        index = self._index(persist=False)
+        index.add(self.items)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+        self.assertEqual(index.query(["read a file"], top_k=1)[0][0][0], "t2")
+
+
+class TestOllamaEmbeddingBackend(unittest.TestCase):
+    def setUp(self):
+        self.server = OllamaStubServer().start()
+        self.provider = OllamaProvider(base_url=self.server.base_url)
+        self.provider_patcher = patch(
+            "ai_assistant.llm_interface.ollama_client.get_default_provider", return_value=self.provider
+        )
+        self.provider_patcher.start()
+
+    def tearDown(self):
+        self.provider_patcher.stop()
+        self.provider.close_sync()
+        self.server.stop()
+
+    def test_embeds_batch_with_one_request(self):
+        backend = OllamaEmbeddingBackend(model="embed-model")
+        vectors = backend.embed(["banana", "kiwi"])
+        self.assertEqual(vectors.shape, (2, 4))
+        self.assertEqual(backend.dimension, 4)
+        np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), [1.0, 1.0], rtol=1e-6)
+        self.assertEqual(self.server.requests, [("/api/embed", {"model": "embed-model", "input": ["banana", "kiwi"]})])
+
+    def test_fallback_backend_switches_after_failure_and_retries_primary_later(self):
+        self.server.fail_requests = 1
+        backend = FallbackEmbeddingBackend(OllamaEmbeddingBackend(), HashingEmbeddingBackend(dimension=16), retry_primary_seconds=60)
+        self.assertEqual(backend.embed_with_name(["text"])[0], "hashing-16")
+        self.assertEqual(backend.name, "hashing-16")
+        backend.embed(["text"]) # Within the cooldown: the primary is not asked again
+        self.assertEqual(len(self.server.requests), 1)
+        backend.retry_primary_seconds = 0
+        name, vectors = backend.embed_with_name(["text"])
+        self.assertEqual((name, vectors.shape), ("ollama-nomic-embed-text", (1, 4)))
+        self.assertEqual(backend.name, "ollama-nomic-embed-text")
+
+    def test_embeddings_respect_the_circuit_breaker(self):
+        reset_circuit_breakers()
+        try:
+            get_circuit_breaker(self.server.base_url)._open(time.monotonic())
+            backend = FallbackEmbeddingBackend(OllamaEmbeddingBackend(), HashingEmbeddingBackend(dimension=16))
+            self.assertEqual(backend.embed_with_name(["text"])[0], "hashing-16")
+            self.assertEqual(self.server.requests, [])
+        finally:
+            reset_circuit_breakers()
+
+
+class TestFactStoreSemanticSearch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        facts_path = os.path.join(self.temp_dir, "learned_facts.json")
+        facts = [
+            {"fact_id": "f1", "text": "The user's favourite programming language is Python.", "category": "user_preference"},
+            {"fact_id": "f2", "text": "The capital of France is Paris.", "category": "general_knowledge"},
+            {"fact_id": "f3", "text": "The hangman project uses a terminal interface.", "category": "project_context"},
+        ]
+        with open(facts_path, 'w', encoding='utf-8') as f:
+            json.dump(facts, f)
+        self.vector_index = VectorIndex("facts", backend=HashingEmbeddingBackend(), directory=self.temp_dir)
+        self.store = FactStore(facts_path, vector_index=self.vector_index)
+        self.store.sync_vector_index()
+
+    def tearDown(self):
+        self.store.wait_for_vector_sync()
+        shutil.rmtree(self.temp_dir)
+
+    def test_semantic_search_matches_partial_words(self):
+        # "languages" is not a token of any fact; character n-grams still match "language".
+        self.assertEqual(self.store.semantic_search("programming languages", top_k=1)[0]["fact_id"], "f1")
+        self.assertEqual(self.store.semantic_search("Paris", top_k=3, categories=["project_context"])[0]["fact_id"], "f3")
+
+    def test_vectors_synced_in_the_background_once_per_fact_change(self):
+        with patch.object(self.vector_index, "sync", wraps=self.vector_index.sync) as mock_sync:
+            self.store.semantic_search("paris")
+            mock_sync.assert_not_called()
+            self.store.save(self.store.all_facts() + [{"fact_id": "f4", "text": "Rust is fast.", "category": "general_knowledge"}])
+            self.store.wait_for_vector_sync()
+            self.assertEqual(self.store.semantic_search("rust", top_k=1)[0]["fact_id"], "f4")
+            mock_sync.assert_called_once()
+
+    def test_queries_do_not_wait_for_embeddings(self):
+        embedding = threading.Event()
+        release = threading.Event()
+        original_embed = self.vector_index.backend.embed_with_name
+        def slow_embed(texts):
+            if texts != ["Rust"]: # Facts being synced, not the query
+                embedding.set()
+                release.wait(5)
+            return original_embed(texts)
+        with patch.object(self.vector_index.backend, "embed_with_name", side_effect=slow_embed):
+            self.store.save(self.store.all_facts() + [{"fact_id": "f4", "text": "Rust is fast.", "category": "general_knowledge"}])
+            self.assertTrue(embedding.wait(5))
+            started = time.perf_counter()
+            results = self.store.semantic_search("Rust", top_k=4)
+            self.assertLess(time.perf_counter() - started, 1.0)
+            self.assertNotIn("f4", [fact["fact_id"] for fact in results]) # Not embedded yet
+            self.assertEqual(self.store.search("Rust", top_k=1)[0]["fact_id"], "f4") # BM25 already finds it
+            release.set()
+            self.store.wait_for_vector_sync()
+        self.assertEqual(self.store.semantic_search("Rust", top_k=1)[0]["fact_id"], "f4")
+
+    def test_hybrid_search_fuses_rankings(self):
+        results = self.store.hybrid_search("capital city of France", top_k=2)
+        self.assertEqual(results[0]["fact_id"], "f2")
+        self.assertEqual(len(results), 2)
+
+
+if __name__ == '__main__': # pragma: no cover
+    unittest.main()